@@ -7,21 +7,50 @@ import datetime
 import json
 import pandas as pd
 import re
+import time
 from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, g, session, send_file, send_from_directory, current_app
 from markupsafe import Markup
 from werkzeug.utils import secure_filename
 from werkzeug.security import generate_password_hash, check_password_hash
-from sqlalchemy import or_, and_, text, func, String
-from sqlalchemy.orm.attributes import flag_modified
-import copy
+from sqlalchemy import or_, and_, text, func, String, false
+from sqlalchemy.orm.attributes import flag_modified, set_committed_value
 import json
 from datetime import date, timedelta
 
 # 데이터베이스 관련 임포트
-from db import get_db, close_db, init_db
-from models import Order, User, SecurityLog, ChatRoom, ChatRoomMember, ChatMessage, ChatAttachment, OrderAttachment, OrderEvent, OrderTask
-from business_calendar import add_business_days
+from db import get_db, close_db, init_db, db_session
+from models import Order, User, SecurityLog, ChatRoom, ChatRoomMember, ChatMessage, ChatAttachment, OrderAttachment, OrderEvent, OrderTask, OrderAlert, OrderQuest, GEO_OK
+from business_calendar import add_business_days, get_holidays_kr
 from erp_automation import apply_auto_tasks
+import erp_telemetry
+from erp_panels import assigned_workers, construction_panel_totals, measurement_counts as measurement_panel_counts, normalize_worker_name
+from erp_alerts import compute_alert_state, alerts_view, ensure_alerts_current, register_alert_hooks, refresh_alerts_if_ready
+from crew_planner import crews_from_settings, load_plan_orders, plan_assignments
+from calendar_feed import build_event as build_calendar_event, calendar_feed, event_status_matches
+from route_optimizer import (
+    AVG_SPEED_KMH as ROUTE_AVG_SPEED_KMH, RouteManager, RouteStop, format_clock, haversine_km as route_haversine_km,
+    optimize_route, plan_day, time_window,
+)
+from map_features import feature_collection, located_points, parse_bbox, parse_zoom as parse_map_zoom, pending_count
+from directions_cache import directions_cache, time_bucket
+from order_geocoding import geocode_workers, mark_geocode_pending, order_geo_address, orders_coordinates, register_geocode_hooks
+from build_steps import step_ready
+from order_dates import order_date, order_date_value, parse_order_date
+from order_paging import keyset_page, order_count
+from order_rows import OrderRow, PRODUCT_SUMMARY, order_rows
+from order_search import apply_order_search, order_search_rank
+from erp_structured_patch import apply_patch, build_jsonb_update, format_pointer, is_touched, JsonPatchError
+from erp_quests import (
+    migrate_order_quests,
+    load_order_quests,
+    find_stage_quest,
+    add_quest,
+    quest_dicts,
+    refresh_quest_summary,
+    lock_order,
+    apply_quest_approval,
+    QuestApprovalError,
+)
 from erp_policy import (
     recommend_owner_team, 
     get_required_task_keys_for_stage, 
@@ -29,12 +58,12 @@ from erp_policy import (
     STAGE_NAME_TO_CODE,
     get_quest_templates,
     get_quest_template_for_stage,
-    get_required_approval_teams_for_stage,
-    get_next_stage_for_completed_quest,
     check_quest_approvals_complete,
     create_quest_from_template,
     get_stage,
-    DEFAULT_OWNER_TEAM_BY_STAGE,
+    resolve_quest_summary,
+    QUEST_SUMMARY_INPUTS,
+    STAGE_CODE_TO_NAME,
 )
 
 # 견적 계산기 독립 데이터베이스 임포트
@@ -45,14 +74,13 @@ from wdcalculator_models import Estimate, EstimateOrderMatch, EstimateHistory
 from simple_backup_system import SimpleBackupSystem
 
 # 지도 시스템 임포트
-from foms_address_converter import FOMSAddressConverter
-from foms_map_generator import FOMSMapGenerator
+from foms_address_converter import get_address_converter
+from geocode_cache import geocode_cache
 
 # 스토리지 시스템 임포트 (Quest 2)
 from storage import get_storage
 from erp_order_text_parser import parse_order_text
 from map_config import KAKAO_REST_API_KEY
-from business_calendar import business_days_until
 
 # SocketIO Import (Quest 5)
 try:
@@ -129,6 +157,19 @@ os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 # 데이터베이스 연결 설정
 app.teardown_appcontext(close_db)
 app.teardown_appcontext(close_wdcalculator_db)  # 견적 계산기 독립 DB
+# ERP 경보: structured_data 변경이 flush될 때 order_alerts 동기 갱신
+register_alert_hooks(db_session)
+# 주문 좌표: 주소가 바뀐 주문 commit 시 지오코딩 워커 깨우기 (큐 등록은 DB 트리거)
+register_geocode_hooks(db_session)
+
+
+@app.before_request
+def _start_geocode_workers():
+    # 첫 요청 시 1회 시작 (스크립트에서 app을 import만 할 때는 워커를 띄우지 않음)
+    # step 27(좌표 컬럼/큐 트리거/foms_geo_address) 완료 전에는 시작하지 않음 - 미완료 확인은 step_ready가 주기적으로만 조회
+    if not geocode_workers.started and step_ready(get_db(), 27):
+        geocode_workers.ensure_started()
+
 
 # Function to check if file has allowed extension
 def allowed_file(filename):
@@ -384,6 +425,35 @@ def _erp_get_stage(order, structured_data):
     # ERP Beta 테스트 기준: 레거시(Order 컬럼)로 추정하지 않음
     return '주문접수'
 
+def _erp_stage_clause(stage_label):
+    """
+    ERP 대시보드 단계(한글) 필터 SQL 조건 (orders.erp_stage 투영 컬럼 사용).
+    _erp_get_stage와 동일하게 단계가 없거나 알 수 없는 코드는 '주문접수'로 취급한다.
+    """
+    stage_code = STAGE_NAME_TO_CODE.get(stage_label)
+    if not stage_code:
+        return false()
+    if stage_code != 'RECEIVED':
+        return Order.erp_stage == stage_code
+    other_codes = [c for c in STAGE_NAME_TO_CODE.values() if c != 'RECEIVED']
+    return or_(Order.erp_stage.is_(None), Order.erp_stage.notin_(other_codes))
+
+def _erp_measurement_date_clause(date_str):
+    """
+    실측일 필터 SQL 조건.
+    - 레거시 주문: Order.measurement_date
+    - ERP Beta 주문: Order.measurement_date 또는 structured_data 실측일(orders.erp_measurement_date 투영 컬럼)
+    """
+    legacy = Order.measurement_date == date_str
+    measurement_on = parse_order_date(date_str)
+    if measurement_on and step_ready(get_db(), 23):
+        # DATE 컬럼 ((status, measurement_on) 인덱스) - '2024.1.5' 같은 비표준 표기도 일치
+        legacy = Order.measurement_on == measurement_on
+    return or_(
+        legacy,
+        and_(Order.is_erp_beta.is_(True), Order.erp_measurement_date == date_str),
+    )
+
 def _ensure_dict(data):
     """Ensure data is a dict, properly parsing stringified JSON if needed (migration fix)"""
     if isinstance(data, dict):
@@ -401,55 +471,72 @@ def _erp_has_media(order, attachments_count: int):
 
 def _erp_alerts(order, structured_data, attachments_count: int):
     """
-    경보 규칙(영업일 기준, 오늘 기준):
-    - 도면 48h: MVP에서는 도면 업로드 시각 정보가 없어 '도면있고 컨펌 미완' 등을 추후 고도화 필요.
-      여기서는 structured_updated_at이 있고 blueprint가 있으면 48h 체크용으로 사용(보수적).
+    경보 규칙(영업일 기준, 오늘 기준) - 규칙 본체는 erp_alerts.compute_alert_state
+    - 도면 48h: DRAWING/CONFIRM 단계 진입(workflow.stage_updated_at) 후 48시간 경과
     - 실측 D-4: measurement_date 기준 오늘부터 영업일 계산
     - 시공 D-3: construction_date 기준 오늘부터 영업일 계산
     - 생산 D-2: construction_date 기준 오늘부터 영업일 계산
     - 긴급 발주: structured_data.flags.urgent
+    대시보드는 저장된 order_alerts를 사용하고, 이 함수는 경보 행이 없을 때의 폴백용.
     """
-    urgent = _erp_get_urgent_flag(structured_data)
-    meas_date = (((structured_data or {}).get('schedule') or {}).get('measurement') or {}).get('date')
-    cons_date = (((structured_data or {}).get('schedule') or {}).get('construction') or {}).get('date')
-
-    # 오늘을 기준으로 영업일 계산 (business_days_until은 이미 오늘을 기준으로 계산함)
-    meas_d = business_days_until(meas_date) if meas_date else None
-    cons_d = business_days_until(cons_date) if cons_date else None
-
-    # 실측 D-4: 실측일 기준 오늘부터 영업일 0~4일 이내
-    measurement_d4 = meas_d is not None and 0 <= meas_d <= 4
-    # 시공 D-3: 시공일 기준 오늘부터 영업일 0~3일 이내
-    construction_d3 = cons_d is not None and 0 <= cons_d <= 3
-    # 생산 D-2: 시공일 기준 오늘부터 영업일 0~2일 이내, 아직 시공 단계가 아니면 생산 준비 경보로 간주(MVP)
-    try:
-        stage = ((structured_data or {}).get('workflow') or {}).get('stage')
-    except Exception:
-        stage = None
-    production_d2 = cons_d is not None and 0 <= cons_d <= 2 and stage not in ('CONSTRUCTION',)
+    state = compute_alert_state(structured_data)
+    return alerts_view(state, _erp_get_urgent_flag(structured_data))
 
-    drawing_overdue = False
-    try:
-        wf = (structured_data or {}).get('workflow') or {}
-        stage = wf.get('stage')
-        stage_updated_at = wf.get('stage_updated_at')
-        if stage in ('DRAWING', 'CONFIRM') and stage_updated_at:
-            ts = datetime.datetime.fromisoformat(str(stage_updated_at))
-            delta = datetime.datetime.now() - ts
-            drawing_overdue = delta.total_seconds() >= (48 * 3600)
-    except Exception:
-        drawing_overdue = False
 
-    return {
-        'urgent': urgent,
-        'measurement_d4': measurement_d4,
-        'measurement_days': meas_d,  # 실제 D-값 표시용
-        'construction_d3': construction_d3,
-        'construction_days': cons_d,  # 실제 D-값 표시용
-        'production_d2': production_d2,
-        'production_days': cons_d,  # 생산도 시공일 기준
-        'drawing_overdue': drawing_overdue
-    }
+_ERP_ALERT_TYPE_COLUMNS = {
+    'urgent': Order.erp_urgent,
+    'measurement_d4': OrderAlert.measurement_d4,
+    'construction_d3': OrderAlert.construction_d3,
+    'production_d2': OrderAlert.production_d2,
+}
+
+
+def _erp_drawing_overdue_clause(now_dt):
+    return OrderAlert.drawing_due_at <= now_dt
+
+
+def _erp_imminent_clause():
+    return or_(
+        OrderAlert.measurement_d4.is_(True),
+        OrderAlert.construction_d3.is_(True),
+        OrderAlert.production_d2.is_(True),
+    )
+
+
+def _erp_alert_kpis(query, now_dt, kpis, step_stats):
+    """
+    ERP 대시보드 KPI/단계별 통계를 SQL GROUP BY(erp_stage)로 집계해 kpis/step_stats에 누적.
+    query는 order_alerts가 outer join된 필터 적용 쿼리(limit 이전).
+    """
+    count = func.count(Order.id)
+    rows = (
+        query.order_by(None)
+        .with_entities(
+            Order.erp_stage,
+            count,
+            count.filter(Order.erp_urgent.is_(True)),
+            count.filter(OrderAlert.measurement_d4.is_(True)),
+            count.filter(OrderAlert.construction_d3.is_(True)),
+            count.filter(OrderAlert.production_d2.is_(True)),
+            count.filter(_erp_drawing_overdue_clause(now_dt)),
+            count.filter(_erp_imminent_clause()),
+        )
+        .group_by(Order.erp_stage)
+        .all()
+    )
+    code_to_label = {code: label for label, code in STAGE_NAME_TO_CODE.items()}
+    for stage_code, total, urgent, meas_d4, cons_d3, prod_d2, overdue, imminent in rows:
+        kpis['urgent_count'] += urgent
+        kpis['measurement_d4_count'] += meas_d4
+        kpis['construction_d3_count'] += cons_d3
+        kpis['production_d2_count'] += prod_d2
+        # _erp_get_stage와 동일: 단계 없음/알 수 없는 코드는 '주문접수'
+        label = code_to_label.get(stage_code, '주문접수')
+        stats = step_stats.get(label)
+        if stats is not None:
+            stats['count'] += total
+            stats['overdue'] += overdue
+            stats['imminent'] += imminent
 
 
 @app.template_filter('split_count')
@@ -505,21 +592,6 @@ def spec_w300_filter(value):
         return ''
 
 
-def spec_w300_value(value):
-    """규격(W)/300 수치 계산 (숫자 반환). 복합규격이면 첫 숫자 사용"""
-    if value is None or value == '':
-        return 0.0
-    s = str(value).strip().replace(',', '')
-    try:
-        m = re.search(r'[\d.]+', s)
-        if not m:
-            return 0.0
-        n = float(m.group())
-        return round(n / 300, 1) if n else 0.0
-    except (ValueError, TypeError):
-        return 0.0
-
-
 ## NOTE: auto task 로직은 erp_automation.py 로 분리됨
 
 @app.route('/erp/dashboard')
@@ -544,13 +616,48 @@ def erp_dashboard():
     f_team = (request.args.get('team') or '').strip()  # 팀 필터 추가
 
     # ERP 대시보드: ERP Beta로 생성된 주문만 표시 (기존 주문은 과거 기록용)
-    orders = (
-        db.query(Order)
-        .filter(Order.deleted_at.is_(None), Order.is_erp_beta.is_(True))
-        .order_by(Order.created_at.desc())
-        .limit(300)
-        .all()
-    )
+    query = db.query(Order).filter(Order.deleted_at.is_(None), Order.is_erp_beta.is_(True))
+
+    # 단계/긴급/검색 필터는 structured_data 투영 컬럼으로 SQL에서 적용 (limit 이전에 걸러야 결과가 정확함)
+    if f_stage:
+        query = query.filter(_erp_stage_clause(f_stage))
+    if f_urgent == '1' or f_alert_type == 'urgent':
+        query = query.filter(Order.erp_urgent.is_(True))
+    if f_q:
+        like = f'%{f_q}%'
+        query = query.filter(or_(
+            Order.structured_data[('parties', 'customer', 'name')].astext.ilike(like),
+            Order.erp_customer_phone.ilike(like),
+            Order.structured_data[('site', 'address_full')].astext.ilike(like),
+            Order.structured_data[('site', 'address_main')].astext.ilike(like),
+            Order.structured_data[('parties', 'manager', 'name')].astext.ilike(like),
+        ))
+
+    # 팀 필터: 관리자가 아닐 때만 적용 (관리자는 모든 Quest 접근 가능)
+    # 저장된 현재 Quest 요약의 필수 승인 팀 기준 (GIN 인덱스). 요약 미백필(NULL) 주문은 아래에서 즉석 계산한 요약으로 확인
+    team_filter = bool(f_team and not is_admin)
+    if team_filter:
+        query = query.filter(or_(
+            Order.erp_quest_summary.is_(None),
+            Order.erp_quest_summary['required_approvals'].has_key(f_team),
+        ))
+
+    # 경보 필터는 order_alerts(저장된 경보 상태)로 SQL에서 적용. 경보 테이블 사용 불가 시 아래 Python 필터로 폴백
+    now_dt = datetime.datetime.now()
+    alerts_ready = ensure_alerts_current(db)
+    if alerts_ready:
+        query = query.outerjoin(OrderAlert, OrderAlert.order_id == Order.id)
+        if f_has_alert == '1':
+            query = query.filter(or_(Order.erp_urgent.is_(True), _erp_drawing_overdue_clause(now_dt), _erp_imminent_clause()))
+        if f_alert_type in _ERP_ALERT_TYPE_COLUMNS:
+            query = query.filter(_ERP_ALERT_TYPE_COLUMNS[f_alert_type].is_(True))
+
+    if alerts_ready:
+        rows = query.add_entity(OrderAlert).order_by(Order.created_at.desc()).limit(300).all()
+    else:
+        rows = [(o, None) for o in query.order_by(Order.created_at.desc()).limit(300).all()]
+    orders = [o for o, _a in rows]
+    alert_rows = {o.id: a for o, a in rows if a is not None}
 
     # order_attachments count map
     att_counts = {}
@@ -572,177 +679,27 @@ def erp_dashboard():
     }
 
     enriched = []
+    team_fallback = False  # 요약 미백필 주문이 팀 필터로 제외되면 SQL 집계(KPI)와 목록이 달라지므로 Python 집계 사용
     for o in orders:
         sd = _ensure_dict(o.structured_data)
+
+        # 현재 Quest 요약: 저장 시점에 계산된 orders.erp_quest_summary 사용 (미백필 주문만 즉석 계산)
+        quest_summary = o.erp_quest_summary if isinstance(o.erp_quest_summary, dict) else None
+        if quest_summary is None:
+            quest_summary = resolve_quest_summary(sd, _erp_order_quest_dicts(db, o.id, sd))
+            if team_filter and f_team not in (quest_summary.get('required_approvals') or []):
+                team_fallback = True
+                continue
+
         cnt = att_counts.get(o.id, 0)
         stage = _erp_get_stage(o, sd)
-        alerts = _erp_alerts(o, sd, cnt)
+        alert_row = alert_rows.get(o.id)
+        if alert_row is not None:
+            alerts = alerts_view(alert_row, o.erp_urgent, now=now_dt)
+        else:
+            alerts = _erp_alerts(o, sd, cnt)
         has_media = _erp_has_media(o, cnt)
 
-        # Quest 정보 가져오기 (quests는 리스트 형태로 저장됨)
-        current_quest = None
-        quests = sd.get('quests') or []
-        if stage:
-            # 리스트에서 현재 단계의 quest 찾기 (한글/영문 모두 확인)
-            # stage는 한글 단계명이지만, quest의 stage는 한글 또는 영문일 수 있음
-            # 가장 최근의 퀘스트를 찾기 위해 created_at 기준으로 정렬
-            CODE_TO_STAGE_NAME = {v: k for k, v in STAGE_NAME_TO_CODE.items()}
-            stage_code = STAGE_NAME_TO_CODE.get(stage, stage)
-            
-            # 현재 단계에 해당하는 모든 퀘스트 찾기
-            matching_quests = []
-            for q in quests:
-                if isinstance(q, dict):
-                    quest_stage = q.get('stage')
-                    # 한글 단계명 또는 영문 코드 모두 확인
-                    if quest_stage == stage or quest_stage == stage_code:
-                        matching_quests.append(q)
-            
-            # 가장 최근의 퀘스트 선택 (created_at 기준, 없으면 updated_at 기준)
-            # status가 OPEN인 퀘스트를 우선 선택 (새로 생성된 퀘스트)
-            if matching_quests:
-                # OPEN 상태인 퀘스트를 먼저 찾기
-                open_quests = [q for q in matching_quests if str(q.get('status', 'OPEN')).upper() == 'OPEN']
-                if open_quests:
-                    # OPEN 퀘스트 중 가장 최근 것 선택
-                    open_quests.sort(key=lambda x: (
-                        x.get('created_at') or x.get('updated_at') or '1970-01-01T00:00:00',
-                    ), reverse=True)
-                    current_quest = open_quests[0]
-                else:
-                    # OPEN 퀘스트가 없으면 모든 퀘스트 중 가장 최근 것 선택
-                    matching_quests.sort(key=lambda x: (
-                        x.get('created_at') or x.get('updated_at') or '1970-01-01T00:00:00',
-                    ), reverse=True)
-                    current_quest = matching_quests[0]
-            
-            # Quest가 없으면 템플릿에서 생성 (표시용, 저장하지 않음)
-            if not current_quest:
-                quest_tpl = get_quest_template_for_stage(stage)
-                if quest_tpl:
-                    # create_quest_from_template을 사용하여 동적 팀 할당 적용
-                    temp_quest = create_quest_from_template(stage, None, sd)
-                    if temp_quest:
-                        current_quest = temp_quest
-                    else:
-                        # 폴백: 기본 템플릿 사용
-                        team_approvals_template = {}
-                        for team in quest_tpl.get('required_approvals', []):
-                            if team:
-                                team_approvals_template[str(team)] = {
-                                    'approved': False,
-                                    'approved_by': None,
-                                    'approved_at': None,
-                                }
-                        current_quest = {
-                            'stage': stage,
-                            'title': quest_tpl.get('title', ''),
-                            'description': quest_tpl.get('description', ''),
-                            'owner_team': quest_tpl.get('owner_team', ''),
-                            'status': 'OPEN',
-                            'team_approvals': team_approvals_template
-                        }
-
-        # Quest 승인 상태 확인
-        all_approved = False
-        missing_teams = []
-        team_approvals = {}
-        required_teams = []
-        if current_quest:
-            # 담당 팀 재배정 규칙 (표시용 quest에도 동적 팀 할당 반영):
-            # - 주문접수, 해피콜: 라홈팀(CS) - 템플릿에서 이미 설정됨
-            # - 실측, 고객컨펌: 영업팀(SALES) - 단, 발주사에 '라홈' 포함 시 라홈팀(CS)으로 변경
-            # - 도면: 도면팀(DRAWING) - 템플릿에서 이미 설정됨
-            # - 생산: 생산팀(PRODUCTION) - 템플릿에서 이미 설정됨
-            # - 시공: 시공팀(CONSTRUCTION) - 템플릿에서 이미 설정됨
-            
-            # ============================================
-            # 새로운 접근법: 단순하고 명확한 규칙만 사용
-            # ============================================
-            # 규칙 1: status == 'OPEN' → 무조건 all_approved = False (절대 예외 없음)
-            # 규칙 2: status == 'COMPLETED' → all_approved = True
-            # 규칙 3: 그 외 → 실제 승인 상태 확인
-            
-            quest_status = str(current_quest.get('status', 'OPEN')).upper()
-            team_approvals_raw = current_quest.get('team_approvals', {})
-            
-            # required_teams는 템플릿에서 가져옴
-            required_teams = get_required_approval_teams_for_stage(stage)
-            
-            # 동적 팀 할당: 실측/고객컨펌에서 발주사에 '라홈' 포함 시 라홈팀(CS)으로 변경
-            if stage in ("실측", "MEASURE", "고객컨펌", "CONFIRM"):
-                orderer_name = (((sd.get("parties") or {}).get("orderer") or {}).get("name") or "").strip()
-                if orderer_name and "라홈" in orderer_name:
-                    # owner_team과 required_teams를 CS로 변경
-                    current_quest['owner_team'] = 'CS'
-                    required_teams = ['CS']  # required_teams도 CS로 변경
-                    # team_approvals도 CS로 변경 (기존 승인 상태 유지)
-                    existing_cs_approval = current_quest.get('team_approvals', {}).get('CS', {})
-                    if isinstance(existing_cs_approval, dict):
-                        approved_status = existing_cs_approval.get('approved', False)
-                    else:
-                        approved_status = bool(existing_cs_approval)
-                    
-                    current_quest['team_approvals'] = {
-                        'CS': {
-                            'approved': approved_status,
-                            'approved_by': existing_cs_approval.get('approved_by') if isinstance(existing_cs_approval, dict) else None,
-                            'approved_at': existing_cs_approval.get('approved_at') if isinstance(existing_cs_approval, dict) else None,
-                        }
-                    }
-                    # team_approvals_raw도 업데이트
-                    team_approvals_raw = current_quest.get('team_approvals', {})
-            
-            # 규칙 1: OPEN 상태는 무조건 미승인
-            if quest_status == 'OPEN':
-                all_approved = False
-                missing_teams = required_teams.copy() if required_teams else []
-                team_approvals = {}
-                for team in required_teams:
-                    team_approvals[team] = False
-            
-            # 규칙 2: COMPLETED 상태는 무조건 완료
-            elif quest_status == 'COMPLETED':
-                all_approved = True
-                missing_teams = []
-                team_approvals = {}
-                for team in required_teams:
-                    team_approvals[team] = True
-            
-            # 규칙 3: 그 외 상태 (IN_PROGRESS 등)는 실제 승인 상태 확인
-            else:
-                if not required_teams:
-                    # 승인 필요 없으면 status로만 판단
-                    all_approved = (quest_status == 'COMPLETED')
-                    missing_teams = []
-                    team_approvals = {}
-                else:
-                    # 실제 승인 상태 확인
-                    team_approvals = {}
-                    for team in required_teams:
-                        team_key = str(team)
-                        approval_data = team_approvals_raw.get(team_key) or team_approvals_raw.get(team)
-                        
-                        if approval_data is None:
-                            team_approvals[team] = False
-                        elif isinstance(approval_data, dict):
-                            team_approvals[team] = approval_data.get('approved', False)
-                        else:
-                            team_approvals[team] = bool(approval_data)
-                    
-                    missing_teams = [t for t in required_teams if not team_approvals.get(t, False)]
-                    all_approved = (len(missing_teams) == 0)
-
-        # 담당팀: 각 단계의 해당 담당팀으로 표기
-        # stage는 한글 단계명이므로 영문 코드로 변환 필요
-        stage_code = STAGE_NAME_TO_CODE.get(stage, stage)
-        responsible_team = DEFAULT_OWNER_TEAM_BY_STAGE.get(stage_code, None)
-        # 실측/고객컨펌에서 발주사에 '라홈' 포함 시 라홈팀(CS)으로 변경
-        if stage_code in ("MEASURE", "CONFIRM"):
-            orderer_name_check = (((sd.get("parties") or {}).get("orderer") or {}).get("name") or "").strip()
-            if orderer_name_check and "라홈" in orderer_name_check:
-                responsible_team = 'CS'
-        
         enriched.append({
             'id': o.id,
             'customer_name': (((sd.get('parties') or {}).get('customer') or {}).get('name')) or '-',
@@ -752,37 +709,33 @@ def erp_dashboard():
             'construction_date': (((sd.get('schedule') or {}).get('construction') or {}).get('date')),
             'manager_name': (((sd.get('parties') or {}).get('manager') or {}).get('name')) or '-',
             'orderer_name': (((sd.get('parties') or {}).get('orderer') or {}).get('name') or '').strip() or None,
-            'owner_team': responsible_team,
+            'owner_team': quest_summary.get('responsible_team'),
             'stage': stage,
             'alerts': alerts,
             'has_media': has_media,
             'attachments_count': cnt,  # 첨부 파일 개수
             'recommended_owner_team': recommend_owner_team(sd) or None,
             'current_quest': {
-                'title': current_quest.get('title', '') if current_quest else '',
-                'description': current_quest.get('description', '') if current_quest else '',
-                'owner_team': current_quest.get('owner_team', '') if current_quest else '',
-                'status': current_quest.get('status', 'OPEN') if current_quest else 'OPEN',
-                'all_approved': all_approved,
-                'missing_teams': missing_teams,
-                'required_approvals': required_teams,  # 템플릿에서 사용할 수 있도록 추가
-                'team_approvals': team_approvals,
-            } if current_quest else None,
+                'title': quest_summary.get('title', ''),
+                'description': quest_summary.get('description', ''),
+                'owner_team': quest_summary.get('owner_team', ''),
+                'status': quest_summary.get('status', 'OPEN'),
+                'all_approved': quest_summary.get('all_approved', False),
+                'missing_teams': quest_summary.get('missing_teams') or [],
+                'required_approvals': quest_summary.get('required_approvals') or [],  # 템플릿에서 사용할 수 있도록 추가
+                'team_approvals': quest_summary.get('team_approvals') or {},
+            } if quest_summary.get('has_quest') else None,
         })
 
-    # apply filters (ERP Beta = raw/structured 기준)
+    # apply filters (단계/긴급/검색/경보는 SQL에서 이미 적용됨)
     filtered = []
     for r in enriched:
-        if f_stage and r.get('stage') != f_stage:
-            continue
-        if f_urgent == '1' and not (r.get('alerts') or {}).get('urgent'):
-            continue
-        if f_has_alert == '1':
+        if f_has_alert == '1' and not alerts_ready:
             a = r.get('alerts') or {}
             if not (a.get('urgent') or a.get('drawing_overdue') or a.get('measurement_d4') or a.get('construction_d3') or a.get('production_d2')):
                 continue
         # 알람 타입별 필터링
-        if f_alert_type:
+        if f_alert_type and not alerts_ready:
             a = r.get('alerts') or {}
             if f_alert_type == 'urgent' and not a.get('urgent'):
                 continue
@@ -792,23 +745,6 @@ def erp_dashboard():
                 continue
             elif f_alert_type == 'production_d2' and not a.get('production_d2'):
                 continue
-        if f_q:
-            hay = ' '.join([
-                str(r.get('customer_name') or ''),
-                str(r.get('phone') or ''),
-                str(r.get('address') or ''),
-                str(r.get('manager_name') or ''),
-            ]).lower()
-            if f_q.lower() not in hay:
-                continue
-        # 팀 필터: 관리자가 아닐 때만 적용 (관리자는 모든 Quest 접근 가능)
-        if f_team and not is_admin:
-            quest = r.get('current_quest')
-            if not quest:
-                continue
-            required_teams = get_required_approval_teams_for_stage(r.get('stage'))
-            if f_team not in required_teams:
-                continue
         filtered.append(r)
 
     # KPI/프로세스맵도 "필터 결과 기준"으로 재계산 (필터가 안 먹는 것처럼 보이는 문제 방지)
@@ -829,7 +765,12 @@ def erp_dashboard():
         '시공': {'count': 0, 'overdue': 0, 'imminent': 0},
     }
 
-    for r in filtered:
+    # 경보 테이블 사용 가능하면 SQL GROUP BY 한 번으로 집계
+    sql_kpis = alerts_ready and not team_fallback
+    if sql_kpis:
+        _erp_alert_kpis(query, now_dt, kpis, step_stats)
+
+    for r in ([] if sql_kpis else filtered):
         alerts = r.get('alerts') or {}
         stage = r.get('stage')
 
@@ -1263,6 +1204,19 @@ def api_order_tasks_delete(order_id, task_id):
 # Quest API (단계별 명확한 퀘스트 시스템)
 # -----------------------------
 
+def _erp_order_quest_dicts(db, order_id, sd):
+    """order_quests 행 dict 목록 (테이블에 없으면 이관 전 structured_data.quests) - 읽기 전용"""
+    rows = db.query(OrderQuest).filter(OrderQuest.order_id == order_id).order_by(OrderQuest.id.asc()).all()
+    if rows:
+        return quest_dicts(rows)
+    return (sd or {}).get('quests') or []
+
+
+def _erp_refresh_quest_summary(order, sd, quests=None):
+    """현재 Quest 요약(orders.erp_quest_summary) 갱신 - quests/단계 변경 저장 직전에 호출"""
+    refresh_quest_summary(order, sd, quests)
+
+
 @app.route('/api/orders/<int:order_id>/quest', methods=['GET'])
 @login_required
 def api_order_quest_get(order_id):
@@ -1273,50 +1227,48 @@ def api_order_quest_get(order_id):
         if not order:
             return jsonify({'success': False, 'message': '주문을 찾을 수 없습니다.'}), 404
         
+        # order_quests 조회 (structured_data.quests 미이관 주문은 이관)
+        quest_rows = load_order_quests(db, order)
         sd = order.structured_data or {}
         current_stage_code = get_stage(sd)  # 영문 코드 (예: 'RECEIVED')
         
         if not current_stage_code:
+            db.commit()
             return jsonify({'success': True, 'quest': None, 'stage': None})
         
         # 영문 코드를 한글 단계명으로 변환 (quest의 stage는 한글 단계명으로 저장될 수 있음)
-        CODE_TO_STAGE_NAME = {v: k for k, v in STAGE_NAME_TO_CODE.items()}
-        current_stage_name = CODE_TO_STAGE_NAME.get(current_stage_code, current_stage_code)
+        current_stage_name = STAGE_CODE_TO_NAME.get(current_stage_code, current_stage_code)
         
         # 현재 단계의 quest 찾기 (한글 단계명 또는 영문 코드 모두 확인)
-        quests = sd.get("quests") or []
-        current_quest = None
-        for q in quests:
-            if isinstance(q, dict):
-                quest_stage = q.get("stage")
-                # 한글 단계명 또는 영문 코드 모두 확인
-                if quest_stage == current_stage_name or quest_stage == current_stage_code:
-                    current_quest = q
-                    break
+        quest_row = find_stage_quest(quest_rows, current_stage_name, current_stage_code)
         
         # quest가 없으면 템플릿에서 생성하고 DB에 저장 (한글 단계명으로 생성)
-        if not current_quest:
+        if not quest_row:
             quest_tpl = get_quest_template_for_stage(current_stage_code)
             if quest_tpl:
                 owner_person = session.get('username') or ''
                 # 한글 단계명으로 quest 생성 (일관성 유지)
-                current_quest = create_quest_from_template(current_stage_name, owner_person, sd)
-                if current_quest:
-                    # DB에 저장
-                    if not sd.get("quests"):
-                        sd["quests"] = []
-                    sd["quests"].append(current_quest)
-                    order.structured_data = sd
-                    order.updated_at = datetime.datetime.now()
-                    db.commit()
+                new_quest = create_quest_from_template(current_stage_name, owner_person, sd)
+                if new_quest:
+                    quest_row = add_quest(db, order.id, new_quest)
+                    quest_rows.append(quest_row)
+                    _erp_refresh_quest_summary(order, sd, quest_dicts(quest_rows))
+        
+        current_quest = quest_row.to_dict() if quest_row else None
+        db.commit()
         
         return jsonify({
             'success': True,
             'quest': current_quest,
-            'stage': current_stage,
-            'stage_label': STAGE_LABELS.get(current_stage, current_stage),
+            'stage': current_stage_code,
+            'stage_label': STAGE_LABELS.get(current_stage_code, current_stage_code),
         })
     except Exception as e:
+        db = get_db()
+        try:
+            db.rollback()
+        except Exception:
+            pass
         import traceback
         print(f"Quest 조회 오류: {e}")
         print(traceback.format_exc())
@@ -1330,28 +1282,22 @@ def api_order_quest_create(order_id):
     """Quest 생성 (현재 단계 기준)"""
     try:
         db = get_db()
-        order = db.query(Order).filter(Order.id == order_id).first()
+        order = lock_order(db, order_id)  # 같은 주문의 Quest 변경 직렬화
         if not order:
             return jsonify({'success': False, 'message': '주문을 찾을 수 없습니다.'}), 404
         
+        quest_rows = load_order_quests(db, order)
+        sd = order.structured_data or {}
         payload = request.get_json(silent=True) or {}
-        stage = payload.get('stage') or get_stage(order.structured_data or {})
+        stage = payload.get('stage') or get_stage(sd)
         
         if not stage:
+            db.commit()
             return jsonify({'success': False, 'message': '단계가 지정되지 않았습니다.'}), 400
         
         # 이미 해당 단계의 quest가 있는지 확인
-        sd = order.structured_data or {}
-        if not sd.get("quests"):
-            sd["quests"] = []
-        
-        existing = None
-        for q in sd["quests"]:
-            if isinstance(q, dict) and q.get("stage") == stage:
-                existing = q
-                break
-        
-        if existing:
+        if any(r.stage == stage for r in quest_rows):
+            db.commit()
             return jsonify({'success': False, 'message': '이미 해당 단계의 Quest가 존재합니다.'}), 400
         
         # Quest 생성
@@ -1359,11 +1305,13 @@ def api_order_quest_create(order_id):
         new_quest = create_quest_from_template(stage, owner_person, sd)
         
         if not new_quest:
+            db.commit()
             return jsonify({'success': False, 'message': 'Quest 템플릿을 찾을 수 없습니다.'}), 400
         
-        sd["quests"].append(new_quest)
-        order.structured_data = sd
-        order.updated_at = datetime.datetime.now()
+        quest_row = add_quest(db, order.id, new_quest)
+        quest_rows.append(quest_row)
+        _erp_refresh_quest_summary(order, sd, quest_dicts(quest_rows))
+        new_quest = quest_row.to_dict()
         db.commit()
         
         return jsonify({'success': True, 'quest': new_quest})
@@ -1383,143 +1331,25 @@ def api_order_quest_create(order_id):
 @login_required
 @role_required(['ADMIN', 'MANAGER', 'STAFF'])
 def api_order_quest_approve(order_id):
-    """팀별 Quest 승인 및 자동 단계 전환"""
+    """팀별 Quest 승인 및 자동 단계 전환 (주문 행 잠금 + version 재시도로 동시 승인 안전)"""
     try:
         db = get_db()
-        order = db.query(Order).filter(Order.id == order_id).first()
-        if not order:
-            return jsonify({'success': False, 'message': '주문을 찾을 수 없습니다.'}), 404
-        
         payload = request.get_json(silent=True) or {}
         team = (payload.get('team') or '').strip()
         
         if not team:
             return jsonify({'success': False, 'message': '팀이 지정되지 않았습니다.'}), 400
         
-        sd = order.structured_data or {}
-        current_stage_code = get_stage(sd)  # 영문 코드 (예: 'RECEIVED')
-        
-        if not current_stage_code:
-            return jsonify({'success': False, 'message': '현재 단계가 없습니다.'}), 400
-        
-        # 영문 코드를 한글 단계명으로 변환 (quest의 stage는 한글 단계명으로 저장됨)
-        CODE_TO_STAGE_NAME = {v: k for k, v in STAGE_NAME_TO_CODE.items()}
-        current_stage_name = CODE_TO_STAGE_NAME.get(current_stage_code, current_stage_code)
-        
-        # 현재 단계의 quest 찾기 (한글 단계명으로 저장된 quest와 비교)
-        quests = sd.get("quests") or []
-        current_quest = None
-        quest_index = -1
-        for i, q in enumerate(quests):
-            if isinstance(q, dict):
-                # quest의 stage는 한글 단계명 또는 영문 코드일 수 있으므로 둘 다 확인
-                quest_stage = q.get("stage")
-                if quest_stage == current_stage_name or quest_stage == current_stage_code:
-                    current_quest = q
-                    quest_index = i
-                    break
-        
-        if not current_quest:
-            # Quest가 없으면 생성 (한글 단계명으로 생성)
-            owner_person = session.get('username') or ''
-            current_quest = create_quest_from_template(current_stage_name, owner_person, sd)
-            if not current_quest:
-                return jsonify({'success': False, 'message': 'Quest 템플릿을 찾을 수 없습니다.'}), 400
-            if not sd.get("quests"):
-                sd["quests"] = []
-            sd["quests"].append(current_quest)
-            quest_index = len(sd["quests"]) - 1
-        
-        # 팀 승인 처리
-        if not current_quest.get("team_approvals"):
-            current_quest["team_approvals"] = {}
-        
-        user_id = session.get('user_id')
-        username = session.get('username') or ''
-        now = datetime.datetime.now()
-        
-        current_quest["team_approvals"][team] = {
-            "approved": True,
-            "approved_by": user_id,
-            "approved_by_name": username,
-            "approved_at": now.isoformat(),
-        }
-        
-        current_quest["updated_at"] = now.isoformat()
-        if current_quest.get("status") == "OPEN":
-            current_quest["status"] = "IN_PROGRESS"
-        
-        # quests 배열 업데이트
-        sd["quests"][quest_index] = current_quest
-        
-        # 모든 필수 팀 승인 완료 확인 (한글 단계명 사용)
-        is_complete, missing_teams = check_quest_approvals_complete(sd, current_stage_name)
-        
-        auto_transitioned = False
-        if is_complete:
-            # Quest 완료 처리
-            current_quest["status"] = "COMPLETED"
-            current_quest["completed_at"] = now.isoformat()
-            sd["quests"][quest_index] = current_quest
-            
-            # 다음 단계로 자동 전환
-            # get_next_stage_for_completed_quest는 영문 코드를 반환함 (템플릿의 next_stage가 영문 코드)
-            next_stage_code = get_next_stage_for_completed_quest(current_stage_name)
-            if next_stage_code:
-                # 영문 코드를 한글 단계명으로 변환 (quest 생성 시 사용)
-                CODE_TO_STAGE_NAME = {v: k for k, v in STAGE_NAME_TO_CODE.items()}
-                next_stage_name = CODE_TO_STAGE_NAME.get(next_stage_code, next_stage_code)
-                
-                workflow = sd.get("workflow") or {}
-                old_stage = workflow.get("stage")
-                workflow["stage"] = next_stage_code  # 영문 코드로 저장
-                workflow["stage_updated_at"] = now.isoformat()
-                sd["workflow"] = workflow
-                
-                # 다음 단계의 Quest 자동 생성 (한글 단계명으로 생성)
-                next_quest = create_quest_from_template(next_stage_name, username, sd)
-                if next_quest:
-                    if not sd.get("quests"):
-                        sd["quests"] = []
-                    sd["quests"].append(next_quest)
-                
-                # 이벤트 기록
-                ev = OrderEvent(
-                    order_id=order.id,
-                    event_type='STAGE_AUTO_TRANSITIONED',
-                    payload={
-                        'from': old_stage,
-                        'to': next_stage_code,
-                        'reason': 'quest_approvals_complete',
-                        'approved_teams': get_required_approval_teams_for_stage(current_stage_name),
-                    },
-                    created_by_user_id=user_id
-                )
-                db.add(ev)
-                auto_transitioned = True
-        
-        # 최종 structured_data 저장 및 변경 감지
-        order.structured_data = sd
-        flag_modified(order, "structured_data")  # JSONB 필드 변경 명시적 표시
-        order.updated_at = now
-        db.commit()
-        
-        # 응답용 next_stage는 한글 단계명으로 변환
-        next_stage_for_response = None
-        if is_complete:
-            next_stage_code = get_next_stage_for_completed_quest(current_stage_name)
-            if next_stage_code:
-                CODE_TO_STAGE_NAME = {v: k for k, v in STAGE_NAME_TO_CODE.items()}
-                next_stage_for_response = CODE_TO_STAGE_NAME.get(next_stage_code, next_stage_code)
-        
-        return jsonify({
-            'success': True,
-            'quest': current_quest,
-            'all_approved': is_complete,
-            'missing_teams': missing_teams,
-            'auto_transitioned': auto_transitioned,
-            'next_stage': next_stage_for_response,
-        })
+        result = apply_quest_approval(
+            db,
+            order_id,
+            team,
+            user_id=session.get('user_id'),
+            username=session.get('username') or '',
+        )
+        return jsonify({'success': True, **result})
+    except QuestApprovalError as e:
+        return jsonify({'success': False, 'message': e.message}), e.status_code
     except Exception as e:
         db = get_db()
         try:
@@ -1539,7 +1369,7 @@ def api_order_quest_update_status(order_id):
     """Quest 상태 수동 업데이트 (OPEN, IN_PROGRESS, COMPLETED)"""
     try:
         db = get_db()
-        order = db.query(Order).filter(Order.id == order_id).first()
+        order = lock_order(db, order_id)  # 같은 주문의 Quest 변경 직렬화
         if not order:
             return jsonify({'success': False, 'message': '주문을 찾을 수 없습니다.'}), 404
         
@@ -1550,39 +1380,36 @@ def api_order_quest_update_status(order_id):
         if status not in ['OPEN', 'IN_PROGRESS', 'COMPLETED']:
             return jsonify({'success': False, 'message': '유효하지 않은 상태입니다.'}), 400
         
+        quest_rows = load_order_quests(db, order)
         sd = order.structured_data or {}
         current_stage = get_stage(sd)
         
         if not current_stage:
+            db.commit()
             return jsonify({'success': False, 'message': '현재 단계가 없습니다.'}), 400
         
-        # 현재 단계의 quest 찾기
-        quests = sd.get("quests") or []
-        quest_index = -1
-        for i, q in enumerate(quests):
-            if isinstance(q, dict) and q.get("stage") == current_stage:
-                quest_index = i
-                break
+        # 현재 단계의 quest 찾기 (한글 단계명 또는 영문 코드 모두 확인)
+        quest_row = find_stage_quest(quest_rows, STAGE_CODE_TO_NAME.get(current_stage, current_stage), current_stage)
         
-        if quest_index == -1:
+        if not quest_row:
+            db.commit()
             return jsonify({'success': False, 'message': 'Quest를 찾을 수 없습니다.'}), 404
         
         now = datetime.datetime.now()
-        quests[quest_index]["status"] = status
-        quests[quest_index]["updated_at"] = now.isoformat()
+        quest_row.status = status
+        quest_row.updated_at = now
         
         if owner_person:
-            quests[quest_index]["owner_person"] = owner_person
+            quest_row.owner_person = owner_person
         
-        if status == "COMPLETED" and not quests[quest_index].get("completed_at"):
-            quests[quest_index]["completed_at"] = now.isoformat()
+        if status == "COMPLETED" and not quest_row.completed_at:
+            quest_row.completed_at = now
         
-        sd["quests"] = quests
-        order.structured_data = sd
-        order.updated_at = now
+        _erp_refresh_quest_summary(order, sd, quest_dicts(quest_rows))
+        current_quest = quest_row.to_dict()
         db.commit()
         
-        return jsonify({'success': True, 'quest': quests[quest_index]})
+        return jsonify({'success': True, 'quest': current_quest})
     except Exception as e:
         db = get_db()
         try:
@@ -1821,77 +1648,6 @@ def get_preserved_filter_args(request_args):
 def utility_processor():
     return dict(parse_json_string=parse_json_string)
 
-# ERP Beta structured_data -> Order 표시 필드 반영 (대시보드용)
-def apply_erp_beta_display_fields(order):
-    if not order or not getattr(order, 'is_erp_beta', False) or not order.structured_data:
-        return
-    sd = order.structured_data
-    if not isinstance(sd, dict):
-        return
-
-    parties = sd.get('parties') or {}
-    customer = (parties.get('customer') or {}).get('name')
-    if customer:
-        order.customer_name = customer
-
-    phone = (parties.get('customer') or {}).get('phone')
-    if phone:
-        order.phone = phone
-
-    manager_name = (parties.get('manager') or {}).get('name')
-    if manager_name:
-        order.manager_name = manager_name
-
-    site = sd.get('site') or {}
-    address_full = site.get('address_full')
-    address_main = site.get('address_main')
-    address_detail = site.get('address_detail')
-    if address_full:
-        order.address = address_full
-    elif address_main:
-        order.address = f"{address_main} {address_detail}".strip() if address_detail else address_main
-
-    items = sd.get('items') or []
-    if isinstance(items, list) and items:
-        product_parts = []
-        for item in items:
-            if not isinstance(item, dict):
-                continue
-            product_name = item.get('product_name')
-            if isinstance(product_name, str):
-                product_name = product_name.strip()
-            else:
-                product_name = None
-            if not product_name:
-                continue
-            product_parts.append(product_name)
-        if product_parts:
-            order.product = ", ".join(product_parts)
-
-    schedule = sd.get('schedule') or {}
-    measurement = schedule.get('measurement') or {}
-    measurement_date = measurement.get('date')
-    if measurement_date:
-        order.measurement_date = str(measurement_date)
-    measurement_time = measurement.get('time')
-    if measurement_time:
-        order.measurement_time = measurement_time
-
-    construction = schedule.get('construction') or {}
-    construction_date = construction.get('date')
-    if construction_date:
-        order.scheduled_date = str(construction_date)
-
-def apply_erp_beta_display_fields_to_orders(orders, processed_ids=None):
-    if not orders:
-        return
-    if processed_ids is None:
-        processed_ids = set()
-    for order in orders:
-        if order and order.id not in processed_ids:
-            apply_erp_beta_display_fields(order)
-            processed_ids.add(order.id)
-
 # Routes
 @app.route('/favicon.ico')
 def favicon():
@@ -2071,8 +1827,12 @@ def index():
         search_query = request.args.get('search', '').strip()
         sort_column = request.args.get('sort', 'id')
         sort_direction = request.args.get('direction', 'desc')
-        page = request.args.get('page', 1, type=int)
+        page = max(request.args.get('page', 1, type=int) or 1, 1)
         per_page = 100
+        # keyset 커서 (ID 역순): after=다음 페이지, before=이전 페이지 (0이면 마지막 페이지)
+        after_id = request.args.get('after', type=int)
+        before_id = request.args.get('before', type=int)
+        exact_count = request.args.get('count') == 'exact'
 
         status_filter = request.args.get('status')
         region_filter = request.args.get('region')
@@ -2107,26 +1867,8 @@ def index():
             query = query.filter(Order.is_regional == True)
         
         if search_query:
-            search_term = f"%{search_query}%"
-            query = query.filter(
-                or_(
-                    Order.id.cast(String).like(search_term),
-                    Order.received_date.like(search_term),
-                    Order.received_time.like(search_term),
-                    Order.customer_name.like(search_term),
-                    Order.phone.like(search_term),
-                    Order.address.like(search_term),
-                    Order.product.like(search_term),
-                    Order.options.like(search_term),
-                    Order.notes.like(search_term),
-                    Order.status.like(search_term),
-                    Order.measurement_date.like(search_term),
-                    Order.measurement_time.like(search_term),
-                    Order.scheduled_date.like(search_term),
-                    Order.completion_date.like(search_term),
-                    Order.manager_name.like(search_term)
-                )
-            )
+            # search_document(pg_trgm/bigram GIN) 공용 검색 - order_search.py
+            query = apply_order_search(query, db, search_query)
 
         for column, filter_value in active_column_filters.items():
             if filter_value:
@@ -2143,73 +1885,44 @@ def index():
         sort_column = 'id'
         sort_direction = 'desc'
 
-        query = query.order_by(Order.id.desc())
+        # 건수: 플래너 추정치(큰 결과) 또는 정확한 COUNT(작은 결과/요청 시), 필터별 짧은 TTL 캐시
+        total_orders, total_exact = order_count(db, query, exact=exact_count)
+        total_pages = max((total_orders + per_page - 1) // per_page, 1)
 
-        total_orders = query.count()
-        orders_from_db = query.offset((page - 1) * per_page).limit(per_page).all()
+        if after_id is None and before_id is None and page > 1:
+            # 기존 ?page=N 링크 호환 (OFFSET)
+            orders_from_db = query.order_by(Order.id.desc()).offset((page - 1) * per_page).limit(per_page + 1).all()
+            has_next = len(orders_from_db) > per_page
+            orders_from_db = orders_from_db[:per_page]
+            has_prev = True
+        else:
+            orders_from_db, has_prev, has_next = keyset_page(query, per_page, after_id=after_id, before_id=before_id)
+            if before_id == 0:
+                page = total_pages
+            elif after_id is None and before_id is None:
+                page = 1
+        if not has_prev:
+            page = 1
+
+        nav_args = {k: v for k, v in request.args.items() if k not in ('page', 'after', 'before')}
+        pagination = {
+            'page': page,
+            'total_pages': total_pages,
+            'total_exact': total_exact,
+            'has_prev': has_prev,
+            'has_next': has_next,
+            'first_args': nav_args,
+            'last_args': dict(nav_args, before=0),
+            'prev_args': dict(nav_args, before=orders_from_db[0].id, page=max(page - 1, 1)) if orders_from_db else nav_args,
+            'next_args': dict(nav_args, after=orders_from_db[-1].id, page=page + 1) if orders_from_db else nav_args,
+            'exact_args': dict(request.args.to_dict(), count='exact'),
+        }
 
-        processed_orders = []
-        for order_db_item in orders_from_db:
-            order_display_data = copy.deepcopy(order_db_item)
-            order_display_data.display_options = format_options_for_display(order_db_item.options)
-            
-            # ERP Beta 주문인 경우 structured_data에서 정보 추출하여 표시
-            if order_db_item.is_erp_beta and order_db_item.structured_data:
-                sd = _ensure_dict(order_db_item.structured_data)
-                
-                # 고객명: structured_data.parties.customer.name
-                customer_name = ((sd.get('parties') or {}).get('customer') or {}).get('name')
-                if customer_name:
-                    order_display_data.customer_name = customer_name
-                
-                # 연락처: structured_data.parties.customer.phone
-                phone = ((sd.get('parties') or {}).get('customer') or {}).get('phone')
-                if phone:
-                    order_display_data.phone = phone
-                
-                # 주소: structured_data.site.address_full 또는 address_main
-                address = ((sd.get('site') or {}).get('address_full') or 
-                          (sd.get('site') or {}).get('address_main'))
-                if address:
-                    order_display_data.address = address
-                
-                # 제품: structured_data.items에서 첫 번째 제품명 또는 items의 요약
-                items = sd.get('items') or []
-                if items and len(items) > 0:
-                    # 첫 번째 제품의 product_name 또는 name 사용
-                    first_item = items[0]
-                    product_name = first_item.get('product_name') or first_item.get('name')
-                    if product_name:
-                        # 여러 제품이 있으면 "제품1 외 N개" 형식으로 표시
-                        if len(items) > 1:
-                            order_display_data.product = f"{product_name} 외 {len(items) - 1}개"
-                        else:
-                            order_display_data.product = product_name
-                
-                # 실측일: structured_data.schedule.measurement.date
-                measurement_date = (((sd.get('schedule') or {}).get('measurement') or {}).get('date'))
-                if measurement_date:
-                    order_display_data.measurement_date = measurement_date
-                
-                # 실측시간: structured_data.schedule.measurement.time
-                # "종일", "오전", "오후" 또는 실제 시간(예: "14:00") 형식 지원
-                measurement_time = (((sd.get('schedule') or {}).get('measurement') or {}).get('time'))
-                if measurement_time:
-                    # 시간 값이 있으면 그대로 사용 (종일, 오전, 오후, 또는 실제 시간)
-                    order_display_data.measurement_time = measurement_time
-                
-                # 시공일: structured_data.schedule.construction.date
-                construction_date = (((sd.get('schedule') or {}).get('construction') or {}).get('date'))
-                if construction_date:
-                    # scheduled_date 필드에 저장 (Order 모델에 construction_date가 없으므로)
-                    order_display_data.scheduled_date = construction_date
-                
-                # 담당자: structured_data.parties.manager.name
-                manager_name = ((sd.get('parties') or {}).get('manager') or {}).get('name')
-                if manager_name:
-                    order_display_data.manager_name = manager_name
-            
-            processed_orders.append(order_display_data)
+        # ERP Beta 주문은 structured_data 기준 표시값 (읽기 전용 OrderRow, ORM 인스턴스는 수정하지 않음)
+        processed_orders = [
+            OrderRow.from_order(o, product_mode=PRODUCT_SUMMARY, display_options=format_options_for_display(o.options))
+            for o in orders_from_db
+        ]
 
         user = None
         if 'user_id' in session:
@@ -2227,6 +1940,7 @@ def index():
             page=page,
             per_page=per_page,
             total_orders=total_orders,
+            pagination=pagination,
             active_column_filters=column_filters,
             user=user,
             current_region=region_filter
@@ -2247,6 +1961,7 @@ def index():
             page=1,
             per_page=100,
             total_orders=0,
+            pagination=None,
             active_column_filters={},
             user=None,
             current_region=None
@@ -2332,6 +2047,8 @@ def add_order():
                     structured_confidence=None,
                     structured_updated_at=datetime.datetime.now(),
                 )
+                # 신규 주문도 팀 필터(erp_quest_summary)에 바로 잡히도록 요약 계산 (quest 행은 아직 없음)
+                _erp_refresh_quest_summary(new_order, structured_data, [])
 
                 db.add(new_order)
                 db.flush()
@@ -3554,29 +3271,9 @@ def download_excel():
         else:
             query = query.filter(Order.status == status_filter)
     
-    # 검색어 필터 적용 (index 함수와 동일하게)
+    # 검색어 필터 적용 (index 함수와 동일한 공용 검색)
     if search_query:
-        search_term = f"%{search_query}%"
-        query = query.filter( 
-            or_(
-                Order.id.cast(String).like(search_term),  # integer 타입을 String으로 캐스팅
-                Order.received_date.like(search_term),
-                Order.received_time.like(search_term),
-                Order.customer_name.like(search_term),
-                Order.phone.like(search_term),
-                Order.address.like(search_term),
-                Order.product.like(search_term),
-                Order.options.like(search_term),
-                Order.notes.like(search_term),
-                Order.status.like(search_term),
-                Order.measurement_date.like(search_term),
-                Order.measurement_time.like(search_term),
-                Order.completion_date.like(search_term),
-                Order.manager_name.like(search_term),
-                # payment_amount는 숫자형이므로 캐스팅 필요
-                func.cast(Order.payment_amount, String).like(search_term)
-            )
-        )
+        query = apply_order_search(query, db, search_query)
 
     # 컬럼별 입력 필터 적용 (index 함수와 동일한 로직으로 변경)
     filterable_columns = [
@@ -3705,8 +3402,10 @@ def wdplanner_app():
 @app.route('/map_view')
 @login_required
 def map_view():
-    """지도 보기 페이지"""
-    return render_template('map_view.html')
+    """지도 보기 페이지 (정적 셸 - 마커는 /api/map/features, 목록은 /api/map/orders에서 조회)"""
+    resp = app.make_response(render_template('map_view.html'))
+    resp.headers['Cache-Control'] = 'private, max-age=3600'
+    return resp
 
 
 # ============================================
@@ -3728,62 +3427,16 @@ def erp_measurement_dashboard():
     if manager_filter:
         base_query = base_query.filter(Order.manager_name.ilike(f'%{manager_filter}%'))
 
-    query = base_query
-
-    # 날짜 필터: ERP Beta 주문은 Order.measurement_date가 null일 수 있으므로
-    # SQL에서는 최대한 넓게 가져온 후 Python에서 structured_data.measurement_date를 확인
-    # ERP Beta 주문도 포함하기 위해 is_erp_beta == True인 주문도 넓게 가져옴
-    if selected_date:
-        from sqlalchemy import or_, and_
-        # 넓은 범위로 가져오기: measurement_date 또는 received_date가 필터 날짜와 일치
-        # 또는 ERP Beta 주문도 포함 (최근 30일 범위로 제한하여 성능 고려)
-        try:
-            filter_date = datetime.datetime.strptime(selected_date, '%Y-%m-%d').date()
-            date_start = filter_date - datetime.timedelta(days=30)
-            date_end = filter_date + datetime.timedelta(days=30)
-        except:
-            date_start = None
-            date_end = None
-        
-        date_conditions = [
-            Order.measurement_date == selected_date,
-            Order.received_date == selected_date,
-            Order.scheduled_date == selected_date,
-            Order.completion_date == selected_date,
-            Order.as_received_date == selected_date,
-            Order.as_completed_date == selected_date
-        ]
-        
-        # ERP Beta 주문도 포함 (최근 범위로 제한)
-        # received_date는 String 타입이므로 문자열로 비교 (명시적 캐스팅)
-        if date_start and date_end:
-            date_start_str = date_start.strftime('%Y-%m-%d')
-            date_end_str = date_end.strftime('%Y-%m-%d')
-            date_conditions.append(
-                and_(
-                    Order.is_erp_beta == True,
-                    func.cast(Order.received_date, String) >= date_start_str,
-                    func.cast(Order.received_date, String) <= date_end_str
-                )
-            )
-        else:
-            date_conditions.append(Order.is_erp_beta == True)
-        
-        query = query.filter(or_(*date_conditions))
-
-    # 먼저 더 많은 주문을 가져온 후 Python에서 필터링
-    all_rows = query.order_by(Order.id.desc()).limit(500).all()
-
-    # 패널 집계는 날짜 필터와 무관하게 계산
-    panel_orders = base_query.order_by(Order.id.desc()).limit(1500).all()
+    # 날짜 필터: 레거시 measurement_date 또는 ERP Beta structured_data 실측일(투영 컬럼)을 SQL에서 바로 비교
+    # 상태와 관계없이 실측일이 지정 날짜와 일치하면 포함
+    query = base_query.filter(_erp_measurement_date_clause(selected_date))
+    rows = query.order_by(Order.id.desc()).limit(300).all()
 
-    # 날짜별 실측 건수 패널 데이터 생성
+    # 날짜별 실측 건수 패널 데이터 생성 (날짜 필터와 무관, 기간 내 GROUP BY 집계 - erp_panels)
     def load_holidays_for_year(year):
+        # business_calendar 캐시 재사용 (요청마다 JSON 재파싱하지 않음)
         try:
-            file_path = os.path.join('data', f'holidays_kr_{year}.json')
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            return set(data.get('dates', []))
+            return get_holidays_kr(year)
         except Exception:
             return set()
 
@@ -3801,26 +3454,7 @@ def erp_measurement_dashboard():
     for y in years:
         holiday_dates |= load_holidays_for_year(y)
 
-    measurement_counts = {}
-    for order in panel_orders:
-        date_value = None
-        if order.is_erp_beta and order.structured_data:
-            sd = order.structured_data
-            erp_measurement_date = (((sd.get('schedule') or {}).get('measurement') or {}).get('date'))
-            if erp_measurement_date:
-                date_value = str(erp_measurement_date)
-        if not date_value and order.measurement_date:
-            date_value = str(order.measurement_date)
-        if not date_value:
-            continue
-        try:
-            d = datetime.datetime.strptime(date_value, '%Y-%m-%d').date()
-        except Exception:
-            continue
-        if d < range_start or d > range_end:
-            continue
-        key = d.strftime('%Y-%m-%d')
-        measurement_counts[key] = measurement_counts.get(key, 0) + 1
+    measurement_counts = measurement_panel_counts(db, base_query, range_start, range_end)
 
     measurement_panel_dates = []
     current = range_start
@@ -3837,40 +3471,9 @@ def erp_measurement_dashboard():
             'is_selected': date_str == selected_date
         })
         current += datetime.timedelta(days=1)
-    
-    # Python 레벨에서 정확한 필터링: measurement_date가 필터 날짜와 일치하는 주문만 포함
-    # 상태와 관계없이 measurement_date가 지정되어 있으면 무조건 포함
-    rows = []
-    for order in all_rows:
-        if selected_date:
-            should_include = False
-            
-            # ERP Beta 주문: structured_data.measurement_date 우선 확인
-            if order.is_erp_beta and order.structured_data:
-                sd = order.structured_data
-                erp_measurement_date = (((sd.get('schedule') or {}).get('measurement') or {}).get('date'))
-                # structured_data의 measurement_date가 필터 날짜와 일치하면 포함 (상태와 관계없이)
-                if erp_measurement_date and str(erp_measurement_date) == selected_date:
-                    should_include = True
-                # 또는 Order.measurement_date가 필터 날짜와 일치하면 포함
-                elif order.measurement_date and str(order.measurement_date) == selected_date:
-                    should_include = True
-            else:
-                # 일반 주문: measurement_date가 필터 날짜와 일치하면 포함 (상태와 관계없이)
-                if order.measurement_date and str(order.measurement_date) == selected_date:
-                    should_include = True
-            
-            if should_include:
-                rows.append(order)
-        else:
-            # 날짜 필터가 없으면 모두 포함
-            rows.append(order)
-    
-    # 최종 결과를 300개로 제한
-    rows = rows[:300]
 
-    # ERP Beta 주문의 제품 표시값을 structured_data 기준으로 보정
-    apply_erp_beta_display_fields_to_orders(rows)
+    # ERP Beta 주문의 표시값을 structured_data 기준으로 보정 (OrderRow)
+    rows = order_rows(rows)
     
     # 담당자 기준으로 정렬 (같은 담당자끼리 그룹화)
     def get_manager_name_for_sort(order):
@@ -3925,58 +3528,14 @@ def erp_shipment_dashboard():
     if manager_filter:
         base_query = base_query.filter(Order.manager_name.ilike(f'%{manager_filter}%'))
 
-    # 패널용: ERP Beta + AS 주문 넓게 (날짜별 시공 건수 집계)
-    panel_orders = base_query.filter(
-        or_(
-            Order.is_erp_beta == True,
-            Order.status.in_(['AS_RECEIVED', 'AS_COMPLETED'])
-        )
-    ).order_by(Order.id.desc()).limit(1500).all()
-
     settings = load_erp_shipment_settings()
     worker_settings = normalize_erp_shipment_workers(settings.get('construction_workers', []))
-
-    def normalize_worker_name(name):
-        return str(name or '').strip().lower()
-
     worker_name_map = {normalize_worker_name(w['name']): w for w in worker_settings if w.get('name')}
 
-    def get_order_construction_date(order):
-        date_value = None
-        if order.status in ('AS_RECEIVED', 'AS_COMPLETED'):
-            if order.as_received_date and str(order.as_received_date) != '':
-                date_value = str(order.as_received_date)
-            if not date_value and order.as_completed_date:
-                date_value = str(order.as_completed_date)
-        if not date_value and order.is_erp_beta and order.structured_data:
-            sd = order.structured_data
-            cons = (sd.get('schedule') or {}).get('construction') or {}
-            cons_date = cons.get('date')
-            if cons_date:
-                date_value = str(cons_date)
-        if not date_value and order.is_erp_beta and order.scheduled_date:
-            date_value = str(order.scheduled_date)
-        return date_value
-
-    def get_order_spec_units(order):
-        if not order.is_erp_beta or not order.structured_data:
-            return 0.0
-        sd = order.structured_data or {}
-        items = sd.get('items') or []
-        total = 0.0
-        for it in items:
-            if not isinstance(it, dict):
-                continue
-            w_raw = (it.get('spec_width') or it.get('spec') or '')
-            total += spec_w300_value(w_raw)
-        return total
-
     def load_holidays_for_year(year):
+        # business_calendar 캐시 재사용 (요청마다 JSON 재파싱하지 않음)
         try:
-            file_path = os.path.join('data', f'holidays_kr_{year}.json')
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            return set(data.get('dates', []))
+            return get_holidays_kr(year)
         except Exception:
             return set()
 
@@ -3993,34 +3552,11 @@ def erp_shipment_dashboard():
     for y in years:
         holiday_dates |= load_holidays_for_year(y)
 
-    construction_counts = {}
-    assigned_workers_by_date = {}
-    spec_units_by_date = {}
-    for order in panel_orders:
-        date_value = get_order_construction_date(order)
-        if not date_value:
-            continue
-        try:
-            d = datetime.datetime.strptime(date_value, '%Y-%m-%d').date()
-        except Exception:
-            continue
-        if d < range_start or d > range_end:
-            continue
-        key = d.strftime('%Y-%m-%d')
-        construction_counts[key] = construction_counts.get(key, 0) + 1
-
-        shipment = {}
-        if order.structured_data and isinstance(order.structured_data, dict):
-            shipment = (order.structured_data.get('shipment') or {})
-        workers = shipment.get('construction_workers') or []
-        for w in workers:
-            name_key = normalize_worker_name(w)
-            if not name_key:
-                continue
-            if name_key in worker_name_map:
-                assigned_workers_by_date.setdefault(key, set()).add(name_key)
-
-        spec_units_by_date[key] = spec_units_by_date.get(key, 0.0) + get_order_spec_units(order)
+    # 날짜별 시공 건수/규격 합계/배정 시공자 (ERP Beta + AS, 기간 내 GROUP BY 집계 - erp_panels)
+    panel_totals = construction_panel_totals(db, base_query, range_start, range_end)
+    construction_counts = {day: t['count'] for day, t in panel_totals.items()}
+    spec_units_by_date = {day: t['spec_units'] for day, t in panel_totals.items()}
+    assigned_workers_by_date = assigned_workers(panel_totals, set(worker_name_map))
 
     construction_panel_dates = []
     current = range_start
@@ -4099,8 +3635,7 @@ def erp_shipment_dashboard():
         if match:
             rows.append(order)
 
-    rows = rows[:300]
-    apply_erp_beta_display_fields_to_orders(rows)
+    rows = order_rows(rows[:300])
 
     def get_manager_name_for_sort(order):
         if order.is_erp_beta and order.structured_data:
@@ -4171,26 +3706,53 @@ def api_erp_shipment_settings_save():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+@app.route('/api/erp/shipment/plan', methods=['GET'])
+@login_required
+def api_erp_shipment_plan():
+    """출고 대시보드: 기간 내 시공 주문 시공자 배정 제안 (용량/휴무 준수, 저장하지 않음 - crew_planner)"""
+    try:
+        db = get_db()
+        try:
+            start = datetime.datetime.strptime(request.args.get('start') or '', '%Y-%m-%d').date()
+        except ValueError:
+            start = datetime.date.today()
+        try:
+            days = min(max(int(request.args.get('days', 14)), 1), 31)
+        except (ValueError, TypeError):
+            days = 14
+        end = start + datetime.timedelta(days=days - 1)
+        manager_filter = (request.args.get('manager') or '').strip()
+        cluster = request.args.get('cluster', '1') != '0'
+
+        base_query = db.query(Order).filter(Order.status != 'DELETED')
+        if manager_filter:
+            base_query = base_query.filter(Order.manager_name.ilike(f'%{manager_filter}%'))
+
+        settings = load_erp_shipment_settings()
+        crews = crews_from_settings(settings.get('construction_workers', []))
+        orders = load_plan_orders(db, base_query, start, end)
+        plan = plan_assignments(orders, crews, cluster=cluster)
+        return jsonify({'success': True, 'start': start.isoformat(), 'end': end.isoformat(), **plan})
+    except Exception as e:
+        db.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
 @app.route('/api/erp/shipment/update/<int:order_id>', methods=['POST'])
 @login_required
 @role_required(['ADMIN', 'MANAGER', 'STAFF'])
 def api_erp_shipment_update(order_id):
-    """출고 대시보드: 현장주소 추가, 시공시간, 도면담당자, 시공자 저장 (structured_data.shipment)"""
+    """출고 대시보드: 현장주소 추가, 시공시간, 도면담당자, 시공자 저장 (structured_data.shipment 하위 경로만 갱신)"""
     try:
         db = get_db()
-        order = db.query(Order).filter(Order.id == order_id, Order.status != 'DELETED').first()
-        if not order:
+        order = lock_order(db, order_id)
+        if not order or order.status == 'DELETED':
             return jsonify({'success': False, 'error': '주문을 찾을 수 없습니다.'}), 404
         if not order.is_erp_beta and order.status not in ('AS_RECEIVED', 'AS_COMPLETED'):
             return jsonify({'success': False, 'error': 'ERP Beta 또는 AS 주문만 수정할 수 있습니다.'}), 400
 
         payload = request.get_json(silent=True) or {}
-        structured_data = dict(order.structured_data or {})
-
-        if 'shipment' not in structured_data:
-            structured_data['shipment'] = {}
-
-        shipment = structured_data['shipment']
+        shipment = {}
 
         if 'site_extra' in payload:
             site_extra = payload.get('site_extra')
@@ -4226,11 +3788,11 @@ def api_erp_shipment_update(order_id):
             else:
                 shipment['construction_workers'] = []
 
-        structured_data['shipment'] = shipment
-        order.structured_data = structured_data
-        order.structured_updated_at = datetime.datetime.now()
-        from sqlalchemy.orm.attributes import flag_modified
-        flag_modified(order, 'structured_data')
+        operations = [
+            {'op': 'add', 'path': format_pointer(('shipment', key)), 'value': value}
+            for key, value in shipment.items()
+        ]
+        _erp_patch_structured(db, order, operations, create_parents=True, detect_changes=False)
         db.commit()
         return jsonify({'success': True})
     except Exception as e:
@@ -4248,8 +3810,8 @@ def api_erp_measurement_update(order_id):
     """실측 대시보드에서 담당자, 주소, 전화번호 인라인 편집용 API"""
     try:
         db = get_db()
-        order = db.query(Order).filter(Order.id == order_id, Order.status != 'DELETED').first()
-        if not order:
+        order = lock_order(db, order_id)
+        if not order or order.status == 'DELETED':
             return jsonify({'success': False, 'error': '주문을 찾을 수 없습니다.'}), 404
         
         if not order.is_erp_beta:
@@ -4262,58 +3824,40 @@ def api_erp_measurement_update(order_id):
         if not field:
             return jsonify({'success': False, 'error': '필드명이 필요합니다.'}), 400
         
-        # structured_data 가져오기
-        structured_data = order.structured_data or {}
-        
-        # 필드별 업데이트
+        # 필드별 업데이트 (structured_data는 해당 경로만 갱신)
         if field == 'manager':
             # structured_data.parties.manager.name 업데이트
-            if 'parties' not in structured_data:
-                structured_data['parties'] = {}
-            if 'manager' not in structured_data['parties']:
-                structured_data['parties']['manager'] = {}
-            structured_data['parties']['manager']['name'] = value
+            operations = [{'op': 'add', 'path': '/parties/manager/name', 'value': value}]
             # Order.manager_name도 업데이트 (호환성)
             order.manager_name = value
         
         elif field == 'address':
             # structured_data.site.address_full 업데이트
-            if 'site' not in structured_data:
-                structured_data['site'] = {}
-            structured_data['site']['address_full'] = value
             # 주소를 address_main과 address_detail로 분리 (간단히)
             # address_main은 첫 부분, address_detail은 나머지
             parts = value.split(' ', 1)
             if len(parts) >= 2:
-                structured_data['site']['address_main'] = parts[0]
-                structured_data['site']['address_detail'] = parts[1]
+                address_main, address_detail = parts[0], parts[1]
             else:
-                structured_data['site']['address_main'] = value
-                structured_data['site']['address_detail'] = ''
+                address_main, address_detail = value, ''
+            operations = [
+                {'op': 'add', 'path': '/site/address_full', 'value': value},
+                {'op': 'add', 'path': '/site/address_main', 'value': address_main},
+                {'op': 'add', 'path': '/site/address_detail', 'value': address_detail},
+            ]
             # Order.address도 업데이트 (호환성)
             order.address = value
         
         elif field == 'phone':
             # structured_data.parties.customer.phone 업데이트
-            if 'parties' not in structured_data:
-                structured_data['parties'] = {}
-            if 'customer' not in structured_data['parties']:
-                structured_data['parties']['customer'] = {}
-            structured_data['parties']['customer']['phone'] = value
+            operations = [{'op': 'add', 'path': '/parties/customer/phone', 'value': value}]
             # Order.phone도 업데이트 (호환성)
             order.phone = value
         
         else:
             return jsonify({'success': False, 'error': f'지원하지 않는 필드: {field}'}), 400
         
-        # structured_data 저장
-        order.structured_data = structured_data
-        order.structured_updated_at = datetime.datetime.now()
-        
-        # flag_modified로 JSONB 변경 알림
-        from sqlalchemy.orm.attributes import flag_modified
-        flag_modified(order, 'structured_data')
-        
+        _erp_patch_structured(db, order, operations, create_parents=True, detect_changes=False)
         db.commit()
         
         return jsonify({'success': True})
@@ -4329,10 +3873,10 @@ def api_erp_measurement_update(order_id):
 @login_required
 def api_erp_measurement_route():
     """
-    ERP Beta - 실측 동선 추천 (MVP)
-    - 지정 날짜/담당자 기준으로 주문 주소를 좌표로 변환
-    - 간단한 그리디(최근접)로 방문 순서 추천
-    - 거리 계산은 Haversine(근사) 사용 (API 과호출 방지)
+    ERP Beta - 실측 동선 추천
+    - 지정 날짜/담당자 기준으로 주문 좌표 조회 (저장 좌표 우선, 나머지는 일괄 변환)
+    - route_optimizer: 실측시간(오전/오후/시각) 시간대를 지키며 2-opt/Or-opt로 방문 순서 최적화
+    - 순서 계산은 Haversine 거리 행렬 사용 (API 과호출 방지)
     """
     db = get_db()
     date_filter = request.args.get('date') or datetime.datetime.now().strftime('%Y-%m-%d')
@@ -4344,54 +3888,24 @@ def api_erp_measurement_route():
 
     query = db.query(Order).filter(Order.status != 'DELETED')
     
-    # 날짜 필터: 기존 주문은 Order.measurement_date, ERP Beta는 structured_data.measurement_date도 확인
+    # 날짜 필터: 기존 주문은 Order.measurement_date, ERP Beta는 structured_data 실측일(투영 컬럼)도 확인
     if date_filter:
-        from sqlalchemy import or_
-        # 기존 주문: Order.measurement_date 사용
-        # ERP Beta 주문: Order.measurement_date 또는 structured_data.measurement_date 사용
-        date_conditions = [
-            Order.measurement_date == date_filter
-        ]
-        query = query.filter(or_(*date_conditions))
+        query = query.filter(_erp_measurement_date_clause(date_filter))
     
     if manager_filter:
         query = query.filter(Order.manager_name.ilike(f'%{manager_filter}%'))
 
-    # 먼저 더 많은 주문을 가져온 후 Python에서 필터링
-    all_orders = query.order_by(Order.measurement_time.asc().nullslast(), Order.id.asc()).limit(limit * 2).all()
-    
-    # ERP Beta 주문의 경우 structured_data에서 measurement_date 확인하여 추가 필터링
-    orders = []
-    for order in all_orders:
-        if date_filter:
-            # ERP Beta 주문이고 structured_data에 measurement_date가 있는 경우 확인
-            if order.is_erp_beta and order.structured_data:
-                sd = order.structured_data
-                erp_measurement_date = (((sd.get('schedule') or {}).get('measurement') or {}).get('date'))
-                # structured_data의 measurement_date가 필터 날짜와 일치하거나
-                # Order.measurement_date가 필터 날짜와 일치하면 포함
-                if (erp_measurement_date and str(erp_measurement_date) == date_filter) or \
-                   (order.measurement_date and str(order.measurement_date) == date_filter):
-                    orders.append(order)
-            else:
-                # 일반 주문: Order.measurement_date가 필터 날짜와 일치하면 포함
-                if order.measurement_date and str(order.measurement_date) == date_filter:
-                    orders.append(order)
-        else:
-            # 날짜 필터가 없으면 모두 포함
-            orders.append(order)
-    
-    # 최종 결과를 limit로 제한
-    orders = orders[:limit]
+    orders = query.order_by(Order.measurement_time.asc().nullslast(), Order.id.asc()).limit(limit).all()
 
-    converter = FOMSAddressConverter()
+    converter = get_address_converter()
 
-    points = []
+    candidates = []
     for o in orders:
         # ERP Beta 주문의 경우 structured_data에서 주소 추출
         address_to_use = o.address
         customer_name = o.customer_name
         phone = o.phone
+        measurement_time = o.measurement_time
         
         if o.is_erp_beta and o.structured_data:
             sd = o.structured_data
@@ -4417,22 +3931,29 @@ def api_erp_measurement_route():
             erp_phone = ((sd.get('parties') or {}).get('customer') or {}).get('phone')
             if erp_phone:
                 phone = erp_phone
+            
+            # 실측시간: structured_data.schedule.measurement.time (종일/오전/오후/HH:MM)
+            erp_measurement_time = (((sd.get('schedule') or {}).get('measurement') or {}).get('time'))
+            if erp_measurement_time:
+                measurement_time = erp_measurement_time
         
-        lat, lng, status = converter.convert_address(address_to_use)
-        if lat is None or lng is None:
-            continue
-        points.append({
+        candidates.append((o, address_to_use, {
             "id": o.id,
             "customer_name": customer_name,
             "phone": phone,
             "address": address_to_use,
-            "measurement_time": o.measurement_time,
+            "measurement_time": measurement_time,
             "manager_name": o.manager_name,
             "status": o.status,
-            "lat": float(lat),
-            "lng": float(lng),
-            "geo_status": status
-        })
+        }))
+
+    points = []
+    coordinates = orders_coordinates([(o, address) for o, address, _ in candidates], converter)
+    for (_o, _address, point), (lat, lng, status) in zip(candidates, coordinates):
+        if lat is None or lng is None:
+            continue
+        point.update(lat=float(lat), lng=float(lng), geo_status=status)
+        points.append(point)
 
     if len(points) <= 1:
         return jsonify({
@@ -4449,44 +3970,40 @@ def api_erp_measurement_route():
     kakao_max_legs = int(request.args.get('kakao_max_legs', 12))  # 과도한 API 호출 방지
     kakao_max_legs = max(0, min(kakao_max_legs, 30))
 
-    # Haversine distance (km) - 순서 추천(최근접)용
-    import math
+    # 방문 순서 최적화 (시간대 + 2-opt/Or-opt)
+    # use_kakao=1이면 캐시된 카카오 구간 소요시간을 비용으로 사용 (캐시에 없는 구간은 직선거리 추정, API 호출 없음)
+    durations = None
+    if use_kakao:
+        durations = directions_cache.cached_matrix(
+            [(p["lat"], p["lng"]) for p in points], time_bucket(datetime.datetime.now())
+        )
+    plan = optimize_route([
+        RouteStop(key=i, lat=p["lat"], lng=p["lng"], window=time_window(p["measurement_time"]))
+        for i, p in enumerate(points)
+    ], durations=durations)
+    route = []
+    for node, start, late in zip(plan["order"], plan["starts"], plan["late"]):
+        point = dict(points[node])
+        point["eta"] = format_clock(start)
+        point["late_min"] = round(late)
+        route.append(point)
+
     def haversine_km(a, b):
-        R = 6371.0
-        lat1 = math.radians(a["lat"])
-        lon1 = math.radians(a["lng"])
-        lat2 = math.radians(b["lat"])
-        lon2 = math.radians(b["lng"])
-        dlat = lat2 - lat1
-        dlon = lon2 - lon1
-        h = math.sin(dlat / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2) ** 2
-        return 2 * R * math.asin(math.sqrt(h))
-
-    # 시작점: 실측시간이 가장 빠른 항목(정렬 결과의 첫번째)
-    remaining = points[:]
-    route = [remaining.pop(0)]
-    total_km = 0.0
-
-    while remaining:
-        last = route[-1]
-        best_i = 0
-        best_d = float("inf")
-        for i, cand in enumerate(remaining):
-            d = haversine_km(last, cand)
-            if d < best_d:
-                best_d = d
-                best_i = i
-        next_pt = remaining.pop(best_i)
-        total_km += best_d
-        route.append(next_pt)
+        return route_haversine_km(a["lat"], a["lng"], b["lat"], b["lng"])
 
     # 구간 거리(legs)
     # - 기본: Haversine(근사)
-    # - use_kakao=1이면: 카카오 내비 API로 구간 거리/시간(차량) 계산 (호출 수 제한)
+    # - use_kakao=1이면: 카카오 내비 구간 거리/시간(차량) - directions_cache 우선, 없는 구간만 동시 호출 (호출 수 제한)
     legs = []
     total_km_h = 0.0
     total_km_kakao = 0.0
     total_min_kakao = 0
+    kakao_legs = []
+    if use_kakao:
+        kakao_legs = converter.route_legs([
+            (route[i]["lat"], route[i]["lng"], route[i + 1]["lat"], route[i + 1]["lng"])
+            for i in range(min(len(route) - 1, kakao_max_legs))
+        ])
 
     for i in range(len(route) - 1):
         a = route[i]
@@ -4500,8 +4017,9 @@ def api_erp_measurement_route():
             "distance_km_est": round(d_h, 2),
         }
 
-        if use_kakao and i < kakao_max_legs:
-            route_info = converter.calculate_route(a["lat"], a["lng"], b["lat"], b["lng"])
+        if use_kakao and i < len(kakao_legs):
+            route_info = kakao_legs[i]
+            leg["cached"] = route_info.get("cached", False)
             if route_info and route_info.get("status") == "success":
                 leg["distance_km"] = route_info.get("distance_km")
                 leg["duration_min"] = route_info.get("duration_min")
@@ -4528,6 +4046,8 @@ def api_erp_measurement_route():
         "legs": legs,
         "total_distance_km": round(total_km_kakao, 2) if use_kakao and total_km_kakao > 0 else round(total_km_h, 2),
         "total_duration_min": total_min_kakao if use_kakao and total_min_kakao > 0 else None,
+        "late_min": plan["late_min"],
+        "optimizer": plan["stats"],
         "note": (
             f"카카오 내비 경로 기반(구간 {min(len(route)-1, kakao_max_legs)}개 계산)입니다."
             if use_kakao else
@@ -4536,6 +4056,140 @@ def api_erp_measurement_route():
     })
 
 
+def _measurement_stop_info(o):
+    """실측 주문 → (주소, 고객명, 연락처, 실측시간, 담당자) - ERP Beta는 structured_data 우선"""
+    customer_name, phone = o.customer_name, o.phone
+    measurement_time, manager_name = o.measurement_time, o.manager_name
+    sd = o.structured_data if o.is_erp_beta and isinstance(o.structured_data, dict) else {}
+    customer = (sd.get('parties') or {}).get('customer') or {}
+    customer_name = customer.get('name') or customer_name
+    phone = customer.get('phone') or phone
+    measurement_time = (((sd.get('schedule') or {}).get('measurement') or {}).get('time')) or measurement_time
+    manager_name = (((sd.get('parties') or {}).get('manager') or {}).get('name')) or manager_name
+    return order_geo_address(o), customer_name, phone, measurement_time, (manager_name or '').strip()
+
+
+@app.route('/api/erp/measurement/dispatch', methods=['POST'])
+@login_required
+def api_erp_measurement_dispatch():
+    """
+    ERP Beta - 하루 실측 배차 제안 (여러 담당자, 저장하지 않음 - route_optimizer.plan_day)
+    body: {date, managers: [{name, start_address?|start_lat,start_lng}], keep_assigned, time_budget_ms}
+    - managers 생략 시 해당 날짜 주문의 담당자 전원
+    - keep_assigned=true면 목록에 있는 담당자에게 이미 배정된 주문은 고정
+    """
+    db = get_db()
+    try:
+        payload = request.get_json(silent=True) or {}
+        date_filter = payload.get('date') or datetime.datetime.now().strftime('%Y-%m-%d')
+        keep_assigned = bool(payload.get('keep_assigned'))
+        try:
+            time_budget = min(max(int(payload.get('time_budget_ms', 300)), 50), 2000) / 1000.0
+        except (ValueError, TypeError):
+            time_budget = 0.3
+
+        orders = (
+            db.query(Order)
+            .filter(Order.status != 'DELETED', _erp_measurement_date_clause(date_filter))
+            .order_by(Order.id.asc())
+            .limit(200)
+            .all()
+        )
+        infos = [_measurement_stop_info(o) for o in orders]
+
+        manager_specs = [m for m in (payload.get('managers') or []) if isinstance(m, dict) and str(m.get('name') or '').strip()]
+        if not manager_specs:
+            manager_specs = [{'name': name} for name in sorted({info[4] for info in infos if info[4]})]
+        if not manager_specs:
+            return jsonify({'success': False, 'error': '배차할 담당자가 없습니다.'}), 400
+
+        converter = get_address_converter()
+        start_addresses = [
+            (str(m.get('start_address') or '').strip() if m.get('start_lat') is None or m.get('start_lng') is None else '')
+            for m in manager_specs
+        ]
+        start_coords = converter.convert_many(start_addresses) if any(start_addresses) else [(None, None, '')] * len(manager_specs)
+        managers = []
+        for spec, address, (lat, lng, _status) in zip(manager_specs, start_addresses, start_coords):
+            if not address and spec.get('start_lat') is not None and spec.get('start_lng') is not None:
+                try:
+                    lat, lng = float(spec['start_lat']), float(spec['start_lng'])
+                except (ValueError, TypeError):
+                    lat, lng = None, None
+            managers.append(RouteManager(str(spec['name']).strip(), lat, lng))
+        manager_index = {m.name.lower(): k for k, m in enumerate(managers)}
+
+        coordinates = orders_coordinates([(o, info[0]) for o, info in zip(orders, infos)], converter)
+        points, stops, pinned, unlocated = [], [], {}, []
+        for o, (address, customer_name, phone, measurement_time, manager_name), (lat, lng, status) in zip(orders, infos, coordinates):
+            point = {
+                'id': o.id,
+                'customer_name': customer_name,
+                'phone': phone,
+                'address': address,
+                'measurement_time': measurement_time,
+                'manager_name': manager_name or None,
+                'status': o.status,
+            }
+            if lat is None or lng is None:
+                unlocated.append(point)
+                continue
+            point.update(lat=float(lat), lng=float(lng), geo_status=status)
+            if keep_assigned and manager_name.lower() in manager_index:
+                pinned[len(stops)] = manager_index[manager_name.lower()]
+            stops.append(RouteStop(key=o.id, lat=float(lat), lng=float(lng), window=time_window(measurement_time)))
+            points.append(point)
+
+        # 캐시된 카카오 구간 소요시간을 비용으로 사용 (없는 구간은 직선거리 추정, API 호출 없음)
+        matrix_points = [(st.lat, st.lng) for st in stops] + [(m.lat, m.lng) for m in managers if m.has_origin]
+        durations = directions_cache.cached_matrix(matrix_points, time_bucket(datetime.datetime.now()))
+        plan = plan_day(stops, managers, pinned=pinned, durations=durations, time_budget=time_budget)
+
+        routes = []
+        for mgr, r in zip(managers, plan['routes']):
+            route = []
+            for node, start, late in zip(r['order'], r['starts'], r['late']):
+                point = dict(points[node])
+                point['eta'] = format_clock(start)
+                point['late_min'] = round(late)
+                point['reassigned'] = bool(point['manager_name']) and point['manager_name'].lower() != mgr.name.lower()
+                route.append(point)
+            path = ([{'id': None, 'lat': mgr.lat, 'lng': mgr.lng}] if mgr.has_origin else []) + route
+            legs = []
+            for a, b in zip(path, path[1:]):
+                d_km = route_haversine_km(a['lat'], a['lng'], b['lat'], b['lng'])
+                legs.append({
+                    'from_id': a['id'],
+                    'to_id': b['id'],
+                    'distance_km_est': round(d_km, 2),
+                    'duration_min_est': round(d_km / ROUTE_AVG_SPEED_KMH * 60),
+                })
+            routes.append({
+                'manager': mgr.name,
+                'start': {'lat': mgr.lat, 'lng': mgr.lng} if mgr.has_origin else None,
+                'route': route,
+                'legs': legs,
+                'total_points': len(route),
+                'total_distance_km': r['distance_km'],
+                'travel_min': r['travel_min'],
+                'late_min': r['late_min'],
+                'finish': format_clock(r['finish']) if r['finish'] is not None else None,
+            })
+
+        return jsonify({
+            'success': True,
+            'date': date_filter,
+            'routes': routes,
+            'unlocated': unlocated,
+            'pinned': len(pinned),
+            'optimizer': plan['stats'],
+            'note': '순서 계산은 캐시된 카카오 구간 소요시간 우선(없으면 직선거리 추정), 구간 거리/시간은 직선거리 기반 근사치입니다. 배정은 저장되지 않습니다.',
+        })
+    except Exception as e:
+        db.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
 @app.route('/erp/as')
 @login_required
 def erp_as_dashboard():
@@ -4599,80 +4253,19 @@ def api_map_data():
         if status_filter and status_filter != 'ALL':
             query = query.filter(Order.status == status_filter)
         
-        # 날짜 필터: ERP Beta 주문은 Order.measurement_date가 null일 수 있으므로
-        # SQL에서는 최대한 넓게 가져온 후 Python에서 structured_data.measurement_date를 확인
-        # ERP Beta 주문도 포함하기 위해 is_erp_beta == True인 주문도 넓게 가져옴
+        # 날짜 필터: 상태와 관계없이 실측일(레거시 measurement_date 또는 ERP Beta structured_data 실측일)이
+        # 지정 날짜와 일치하는 주문만 SQL에서 바로 필터링 (투영 컬럼 인덱스 사용)
         if date_filter:
-            from sqlalchemy import or_, and_
-            try:
-                filter_date = datetime.datetime.strptime(date_filter, '%Y-%m-%d').date()
-                date_start = filter_date - datetime.timedelta(days=30)
-                date_end = filter_date + datetime.timedelta(days=30)
-            except:
-                date_start = None
-                date_end = None
-            
-            date_conditions = [
-                Order.measurement_date == date_filter,
-                Order.received_date == date_filter,
-                Order.scheduled_date == date_filter,
-                Order.completion_date == date_filter,
-                Order.as_received_date == date_filter,
-                Order.as_completed_date == date_filter
-            ]
-            
-            # ERP Beta 주문도 포함 (최근 범위로 제한)
-            # received_date는 String 타입이므로 문자열로 비교
-            if date_start and date_end:
-                date_start_str = date_start.strftime('%Y-%m-%d')
-                date_end_str = date_end.strftime('%Y-%m-%d')
-                date_conditions.append(
-                    and_(
-                        Order.is_erp_beta == True,
-                        Order.received_date >= date_start_str,
-                        Order.received_date <= date_end_str
-                    )
-                )
-            else:
-                date_conditions.append(Order.is_erp_beta == True)
-            
-            query = query.filter(or_(*date_conditions))
+            query = query.filter(_erp_measurement_date_clause(date_filter))
         
-        # 최신 주문부터 정렬하고 제한 (넓은 범위로 가져오기 위해 limit 증가)
-        orders = query.order_by(Order.id.desc()).limit(limit * 5).all()
-        
-        # Python 레벨에서 정확한 필터링: measurement_date가 필터 날짜와 일치하는 주문만 포함
-        # 상태와 관계없이 measurement_date가 지정되어 있으면 무조건 포함
-        if date_filter:
-            filtered_orders = []
-            for order in orders:
-                should_include = False
-                
-                # ERP Beta 주문: structured_data.measurement_date 우선 확인
-                if order.is_erp_beta and order.structured_data:
-                    sd = order.structured_data
-                    erp_measurement_date = (((sd.get('schedule') or {}).get('measurement') or {}).get('date'))
-                    # structured_data의 measurement_date가 필터 날짜와 일치하면 포함 (상태와 관계없이)
-                    if erp_measurement_date and str(erp_measurement_date) == date_filter:
-                        should_include = True
-                    # 또는 Order.measurement_date가 필터 날짜와 일치하면 포함
-                    elif order.measurement_date and str(order.measurement_date) == date_filter:
-                        should_include = True
-                else:
-                    # 일반 주문: measurement_date가 필터 날짜와 일치하면 포함 (상태와 관계없이)
-                    if order.measurement_date and str(order.measurement_date) == date_filter:
-                        should_include = True
-                
-                if should_include:
-                    filtered_orders.append(order)
-            
-            orders = filtered_orders[:limit]  # 최종 결과를 limit로 제한
+        # 최신 주문부터 정렬하고 제한
+        orders = query.order_by(Order.id.desc()).limit(limit).all()
         
         # 주소 변환 시스템 초기화
-        converter = FOMSAddressConverter()
+        converter = get_address_converter()
         
-        # 주문 데이터를 지도용 데이터로 변환
-        map_data = []
+        # 주문 데이터를 지도용 데이터로 변환 (좌표는 아래에서 일괄 변환)
+        candidates = []
         for order in orders:
             # ERP Beta 주문의 경우 structured_data에서 정보 추출
             customer_name = order.customer_name
@@ -4717,22 +4310,23 @@ def api_map_data():
                         else:
                             product = product_name
             
-            # 주소를 좌표로 변환
-            lat, lng, status = converter.convert_address(address_to_use)
-            
+            candidates.append((order, address_to_use, {
+                'id': order.id,
+                'customer_name': customer_name,
+                'phone': phone,
+                'address': address_to_use,
+                'product': product,
+                'status': order.status,
+                'received_date': order.received_date,
+            }))
+        
+        # 주소를 좌표로 변환: 저장 좌표 우선, 나머지는 중복 제거 후 동시 변환
+        coordinates = orders_coordinates([(order, address) for order, address, _ in candidates], converter)
+        map_data = []
+        for (_order, _address, item), (lat, lng, status) in zip(candidates, coordinates):
             if lat is not None and lng is not None:
-                map_data.append({
-                    'id': order.id,
-                    'customer_name': customer_name,
-                    'phone': phone,
-                    'address': address_to_use,
-                    'product': product,
-                    'status': order.status,
-                    'received_date': order.received_date,
-                    'latitude': lat,
-                    'longitude': lng,
-                    'conversion_status': status
-                })
+                item.update(latitude=lat, longitude=lng, conversion_status=status)
+                map_data.append(item)
         
         return jsonify({
             'success': True,
@@ -4747,285 +4341,96 @@ def api_map_data():
             'error': str(e)
         }), 500
 
-@app.route('/api/generate_map')
-@login_required
-def api_generate_map():
-    """지도 HTML 생성 API"""
-    try:
-        # 요청 파라미터
-        date_filter = request.args.get('date')
-        status_filter = request.args.get('status')
-        manager_filter = (request.args.get('manager') or '').strip()
-        title = request.args.get('title', '주문 위치 지도')
-        
-        db = get_db()
-        
-        # 기본 쿼리
-        query = db.query(Order).filter(Order.status != 'DELETED')
-        
-        # 수도권 주문만 필터링 (지방 주문 및 자가실측 제외)
+def _map_orders_query(db, args):
+    """지도 공통 필터 (date/status/manager/scope) 적용 Order 쿼리"""
+    date_filter = args.get('date')
+    status_filter = args.get('status')
+    manager_filter = (args.get('manager') or '').strip()
+    query = db.query(Order).filter(Order.status != 'DELETED')
+    if args.get('scope') != 'all':
+        # 기본: 수도권 주문만 (지방 주문 및 자가실측 제외) - scope=all이면 전국
         query = query.filter(
-            Order.is_regional != True,  # 지방 주문 제외
-            ~Order.status.in_(['SELF_MEASUREMENT', 'SELF_MEASURED'])  # 자가실측 제외
+            Order.is_regional != True,
+            ~Order.status.in_(['SELF_MEASUREMENT', 'SELF_MEASURED'])
         )
-        
-        # 상태 필터 적용 (날짜 필터 전에 적용)
-        if status_filter and status_filter != 'ALL':
-            query = query.filter(Order.status == status_filter)
-        
-        # 날짜 필터: ERP Beta 주문은 Order.measurement_date가 null일 수 있으므로
-        # SQL에서는 최대한 넓게 가져온 후 Python에서 structured_data.measurement_date를 확인
-        # ERP Beta 주문도 포함하기 위해 is_erp_beta == True인 주문도 넓게 가져옴
-        if date_filter:
-            from sqlalchemy import or_, and_
-            try:
-                filter_date = datetime.datetime.strptime(date_filter, '%Y-%m-%d').date()
-                date_start = filter_date - datetime.timedelta(days=30)
-                date_end = filter_date + datetime.timedelta(days=30)
-            except:
-                date_start = None
-                date_end = None
-            
-            date_conditions = [
-                Order.measurement_date == date_filter,
-                Order.received_date == date_filter,
-                Order.scheduled_date == date_filter,
-                Order.completion_date == date_filter,
-                Order.as_received_date == date_filter,
-                Order.as_completed_date == date_filter
-            ]
-            
-            # ERP Beta 주문도 포함 (최근 범위로 제한)
-            # received_date는 String 타입이므로 문자열로 비교
-            if date_start and date_end:
-                date_start_str = date_start.strftime('%Y-%m-%d')
-                date_end_str = date_end.strftime('%Y-%m-%d')
-                date_conditions.append(
-                    and_(
-                        Order.is_erp_beta == True,
-                        Order.received_date >= date_start_str,
-                        Order.received_date <= date_end_str
-                    )
-                )
-            else:
-                date_conditions.append(Order.is_erp_beta == True)
-            
-            query = query.filter(or_(*date_conditions))
-        
-        # 최신 주문부터 정렬하고 제한 (넓은 범위로 가져오기 위해 limit 증가)
-        orders = query.order_by(Order.id.desc()).limit(500).all()
-        
-        # Python 레벨에서 정확한 필터링: measurement_date가 필터 날짜와 일치하는 주문만 포함
-        # 상태와 관계없이 measurement_date가 지정되어 있으면 무조건 포함
-        if date_filter:
-            filtered_orders = []
-            for order in orders:
-                should_include = False
-                
-                # ERP Beta 주문: structured_data.measurement_date 우선 확인
-                if order.is_erp_beta and order.structured_data:
-                    sd = order.structured_data
-                    erp_measurement_date = (((sd.get('schedule') or {}).get('measurement') or {}).get('date'))
-                    # structured_data의 measurement_date가 필터 날짜와 일치하면 포함 (상태와 관계없이)
-                    if erp_measurement_date and str(erp_measurement_date) == date_filter:
-                        should_include = True
-                    # 또는 Order.measurement_date가 필터 날짜와 일치하면 포함
-                    elif order.measurement_date and str(order.measurement_date) == date_filter:
-                        should_include = True
-                else:
-                    # 일반 주문: measurement_date가 필터 날짜와 일치하면 포함 (상태와 관계없이)
-                    if order.measurement_date and str(order.measurement_date) == date_filter:
-                        should_include = True
-                
-                if should_include:
-                    filtered_orders.append(order)
-            
-            orders = filtered_orders[:100]  # 최종 결과를 100개로 제한
-        
-        # 주소 변환 및 지도 데이터 준비
-        converter = FOMSAddressConverter()
-        map_data = []
-        orders_list = []
-        
-        for order in orders:
-            # ERP Beta 주문의 경우 structured_data에서 정보 추출
-            customer_name = order.customer_name
-            phone = order.phone
-            address_to_use = order.address
-            product = order.product
-            measurement_date = order.measurement_date
-            scheduled_date = order.scheduled_date
-            manager_name = order.manager_name or '-'
-            
-            if order.is_erp_beta and order.structured_data:
-                sd = order.structured_data
-                
-                # 고객명: structured_data.parties.customer.name
-                erp_customer_name = ((sd.get('parties') or {}).get('customer') or {}).get('name')
-                if erp_customer_name:
-                    customer_name = erp_customer_name
-                
-                # 연락처: structured_data.parties.customer.phone
-                erp_phone = ((sd.get('parties') or {}).get('customer') or {}).get('phone')
-                if erp_phone:
-                    phone = erp_phone
-                
-                # 주소: structured_data.site.address_full 또는 address_main + address_detail
-                erp_address_full = (sd.get('site') or {}).get('address_full')
-                erp_address_main = (sd.get('site') or {}).get('address_main')
-                erp_address_detail = (sd.get('site') or {}).get('address_detail')
-                
-                if erp_address_full and erp_address_full.strip() and erp_address_full != '-':
-                    address_to_use = erp_address_full.strip()
-                elif erp_address_main and erp_address_main.strip():
-                    if erp_address_detail and erp_address_detail.strip() and erp_address_detail != '-':
-                        address_to_use = f"{erp_address_main.strip()} {erp_address_detail.strip()}"
-                    else:
-                        address_to_use = erp_address_main.strip()
-                
-                # 제품: structured_data.items에서 첫 번째 제품명 또는 items의 요약
-                items = sd.get('items') or []
-                if items and len(items) > 0:
-                    first_item = items[0]
-                    product_name = first_item.get('product_name') or first_item.get('name')
-                    if product_name:
-                        if len(items) > 1:
-                            product = f"{product_name} 외 {len(items) - 1}개"
-                        else:
-                            product = product_name
-                
-                # 실측일: structured_data.schedule.measurement.date
-                erp_measurement_date = (((sd.get('schedule') or {}).get('measurement') or {}).get('date'))
-                if erp_measurement_date:
-                    measurement_date = erp_measurement_date
-                
-                # 시공일: structured_data.schedule.construction.date
-                erp_scheduled_date = (((sd.get('schedule') or {}).get('construction') or {}).get('date'))
-                if erp_scheduled_date:
-                    scheduled_date = erp_scheduled_date
-                
-                # 담당자: structured_data.parties.manager.name
-                erp_manager_name = ((sd.get('parties') or {}).get('manager') or {}).get('name')
-                if erp_manager_name:
-                    manager_name = erp_manager_name
-
-            if manager_filter:
-                manager_name_str = str(manager_name or '')
-                if manager_filter.lower() not in manager_name_str.lower():
-                    continue
-            
-            # 주소 변환 시도
-            lat, lng, status = converter.convert_address(address_to_use)
-            
-            # 날짜 필드 처리 (datetime 객체 또는 문자열 모두 처리)
-            def format_date(date_value):
-                if date_value is None:
-                    return None
-                if isinstance(date_value, str):
-                    return date_value
-                if hasattr(date_value, 'strftime'):
-                    return date_value.strftime('%Y-%m-%d')
-                return str(date_value)
-            
-            # 주문 목록 데이터 준비 (주소 변환 성공 여부와 관계없이 모든 주문 포함)
-            order_list_item = {
-                'id': order.id,
-                'customer_name': customer_name,
-                'phone': phone,
-                'address': address_to_use,
-                'product': product,
-                'status': order.status,
-                'received_date': format_date(order.received_date),
-                'measurement_date': format_date(measurement_date),
-                'scheduled_date': format_date(scheduled_date),
-                'completion_date': format_date(order.completion_date),
-                'manager_name': manager_name,
-                'notes': order.notes or '-'
-            }
-            orders_list.append(order_list_item)
-            
-            # 주소 변환이 성공한 경우에만 지도 마커 추가
-            if lat is not None and lng is not None:
-                map_data.append({
-                    'id': order.id,
-                    'customer_name': customer_name,
-                    'phone': phone,
-                    'address': address_to_use,
-                    'product': product,
-                    'status': order.status,
-                    'received_date': order.received_date,
-                    'latitude': lat,
-                    'longitude': lng
-                })
-        
-        # 지도 생성
-        map_generator = FOMSMapGenerator()
-        
-        # 디버깅: 주문 목록 데이터 확인
-        print(f"DEBUG: orders_list 길이: {len(orders_list)}")
-        print(f"DEBUG: map_data 길이: {len(map_data)}")
-        if orders_list and len(orders_list) > 0:
-            print(f"DEBUG: 첫 번째 주문: {orders_list[0]}")
-        
-        if map_data:
-            folium_map = map_generator.create_map(map_data, title)
-            
-            if folium_map:
-                map_html = folium_map._repr_html_()
-            else:
-                map_html = '<div class="error-message">지도를 생성할 수 없습니다.</div>'
-            
-            response_data = {
-                'success': True,
-                'map_html': map_html,
-                'total_orders': len(map_data),
-                'orders': orders_list
-            }
-            print(f"DEBUG: 응답 데이터 - orders 필드 길이: {len(orders_list)}")
-            print(f"DEBUG: 응답 데이터 - map_data 길이: {len(map_data)}")
-            return jsonify(response_data)
-        
-        # 주문이 없어도 빈 지도 생성
-        empty_map = map_generator.create_empty_map(title)
-        if empty_map:
-            map_html = empty_map._repr_html_()
-            return jsonify({
-                'success': True,
-                'map_html': map_html,
-                'total_orders': 0,
-                'orders': [],
-                'message': f'{title}에 해당하는 주문이 없습니다.'
+    if status_filter and status_filter != 'ALL':
+        query = query.filter(Order.status == status_filter)
+    if date_filter:
+        query = query.filter(_erp_measurement_date_clause(date_filter))
+    if manager_filter:
+        pattern = f'%{manager_filter}%'
+        query = query.filter(or_(
+            Order.manager_name.ilike(pattern),
+            and_(
+                Order.is_erp_beta.is_(True),
+                Order.structured_data[('parties', 'manager', 'name')].astext.ilike(pattern),
+            ),
+        ))
+    return query
+
+
+@app.route('/api/map/features')
+@login_required
+def api_map_features():
+    """
+    주문 지도 GeoJSON (map_features): 저장 좌표만 사용, 낮은 줌은 서버 측 격자 클러스터
+    - date/status/manager/scope(metro|all): 지도 필터, zoom: 지도 줌, bbox: 서,남,동,북
+    - 본문 strong ETag (If-None-Match 일치 시 304)
+    """
+    db = get_db()
+    try:
+        zoom = parse_map_zoom(request.args.get('zoom'))
+        bbox = parse_bbox(request.args.get('bbox'))
+        query = _map_orders_query(db, request.args)
+        points = located_points(query, bbox)
+        pending = pending_count(query)
+        if pending:
+            geocode_workers.wake()
+        body, etag = feature_collection(points, zoom, bbox, pending=pending)
+        if request.if_none_match.contains(etag):
+            resp = app.response_class(status=304)
+        else:
+            resp = app.response_class(body, mimetype='application/geo+json')
+        resp.set_etag(etag)
+        resp.headers['Cache-Control'] = 'private, no-cache'
+        return resp
+    except Exception as e:
+        db.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@app.route('/api/map/orders')
+@login_required
+def api_map_orders():
+    """지도 우측 주문 목록 (지오코딩 없이 표시값 + 저장 좌표, 날짜 지정 시 100건 / 전체 500건)"""
+    db = get_db()
+    try:
+        query = _map_orders_query(db, request.args)
+        orders = query.order_by(Order.id.desc()).limit(100 if request.args.get('date') else 500).all()
+        items = []
+        for order in orders:
+            row = OrderRow.from_order(order, product_mode=PRODUCT_SUMMARY)
+            located = order.geo_status == GEO_OK and order.lat is not None and order.lng is not None
+            items.append({
+                'id': row.id,
+                'customer_name': row.customer_name,
+                'phone': row.phone,
+                'address': row.address,
+                'product': row.product,
+                'status': row.status,
+                'received_date': row.received_date,
+                'measurement_date': row.measurement_date,
+                'scheduled_date': row.scheduled_date,
+                'completion_date': row.completion_date,
+                'manager_name': row.manager_name or '-',
+                'lat': float(order.lat) if located else None,
+                'lng': float(order.lng) if located else None,
             })
-        
-        return jsonify({
-            'success': False,
-            'error': '지도를 생성할 수 없습니다.'
-        })
-        
+        return jsonify({'success': True, 'orders': items})
     except Exception as e:
-        # 상세한 오류 로깅
-        import traceback
-        import sys
-        
-        error_msg = str(e)
-        error_type = type(e).__name__
-        traceback_str = traceback.format_exc()
-        
-        print(f"ERROR: generate_map 에러 발생")
-        print(f"ERROR: 타입: {error_type}")
-        print(f"ERROR: 메시지: {error_msg}")
-        print(f"ERROR: 전체 스택 트레이스:")
-        print(traceback_str)
-        
-        # 로그 파일에도 기록
-        app.logger.error(f"generate_map 에러: {error_type}: {error_msg}")
-        app.logger.error(f"스택 트레이스: {traceback_str}")
-        
-        return jsonify({
-            'success': False,
-            'error': f'{error_type}: {error_msg}',
-            'debug_info': traceback_str if app.debug else None
-        }), 500
+        db.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 
 @app.route('/api/calculate_route')
 @login_required
@@ -5044,7 +4449,7 @@ def api_calculate_route():
             }), 400
         
         # 주소 변환기 초기화
-        address_converter = FOMSAddressConverter()
+        address_converter = get_address_converter()
         
         # 경로 계산
         route_result = address_converter.calculate_route(
@@ -5077,7 +4482,7 @@ def api_address_suggestions():
         if not address:
             return jsonify({'success': False, 'error': '주소가 필요합니다.'}), 400
         
-        converter = FOMSAddressConverter()
+        converter = get_address_converter()
         suggestions = converter.get_address_suggestions(address)
         
         return jsonify({
@@ -5109,7 +4514,7 @@ def api_add_address_learning():
                 'error': '모든 필드가 필요합니다.'
             }), 400
         
-        converter = FOMSAddressConverter()
+        converter = get_address_converter()
         converter.add_learning_data(original_address, corrected_address, latitude, longitude)
         
         return jsonify({
@@ -5132,7 +4537,7 @@ def api_validate_address():
         if not address:
             return jsonify({'success': False, 'error': '주소가 필요합니다.'}), 400
         
-        converter = FOMSAddressConverter()
+        converter = get_address_converter()
         validation = converter.validate_address(address)
         
         return jsonify({
@@ -5149,194 +4554,48 @@ def api_validate_address():
 @app.route('/api/orders')
 @login_required
 def api_orders():
+    """
+    캘린더(FullCalendar) 이벤트 피드 - calendar_feed.py
+    - start/end: 월 버킷 캐시 + strong ETag (If-None-Match 일치 시 304), X-Feed-Cursor 헤더로 커서 전달
+    - since=<cursor>: 커서 이후 변경분 {"cursor", "events", "removed", "reset"}
+    """
     start_date = request.args.get('start')
     end_date = request.args.get('end')
     status_filter = request.args.get('status', None)
-    
+    since = request.args.get('since', type=int)
+    if status_filter not in STATUS:
+        status_filter = None
+
     db = get_db()
-    
-    # Base query for orders
-    query = db.query(Order).filter(Order.status != 'DELETED')
-    
-    # Add status filter if provided
-    if status_filter and status_filter in STATUS:
-        # 접수 탭에서는 RECEIVED와 ON_HOLD 상태를 모두 표시
-        if status_filter == 'RECEIVED':
-            query = query.filter(Order.status.in_(['RECEIVED', 'ON_HOLD']))
+
+    # ISO format with time (YYYY-MM-DDTHH:MM:SS)이면 날짜 부분만 사용
+    start_on = parse_order_date(start_date.split('T')[0]) if start_date else None
+    end_on = parse_order_date(end_date.split('T')[0]) if end_date else None
+
+    if since is not None:
+        payload = calendar_feed.delta(db, since, start=start_on, end=end_on, status=status_filter)
+        resp = jsonify(payload)
+        resp.headers['X-Feed-Cursor'] = str(payload['cursor'])
+        resp.headers['Cache-Control'] = 'private, no-cache'
+        return resp
+
+    if start_on and end_on:
+        events, etag, cursor = calendar_feed.events(db, start_on, end_on, status=status_filter)
+        if request.if_none_match.contains(etag):
+            resp = app.response_class(status=304)
         else:
-            query = query.filter(Order.status == status_filter)
-    
-    # Add date range filter if provided
-    # ERP Beta 주문의 경우 measurement_date도 고려해야 하므로 OR 조건 사용
-    if start_date and end_date:
-        from sqlalchemy import or_
-        # Handle date and datetime format properly
-        if 'T' in start_date:  # ISO format with time (YYYY-MM-DDTHH:MM:SS)
-            start_date_only = start_date.split('T')[0]
-            end_date_only = end_date.split('T')[0]
-            # received_date 또는 measurement_date가 범위 내에 있는 주문 포함
-            query = query.filter(
-                or_(
-                    Order.received_date.between(start_date_only, end_date_only),
-                    Order.measurement_date.between(start_date_only, end_date_only)
-                )
-            )
-        else:  # Date only format (YYYY-MM-DD)
-            # received_date 또는 measurement_date가 범위 내에 있는 주문 포함
-            query = query.filter(
-                or_(
-                    Order.received_date.between(start_date, end_date),
-                    Order.measurement_date.between(start_date, end_date)
-                )
-            )
-    
-    orders = query.all()
-    
-    # Map status to colors
-    status_colors = {
-        'RECEIVED': '#3788d8',   # Blue
-        'MEASURED': '#f39c12',   # Orange
-        'SCHEDULED': '#e74c3c',  # Red
-        'SHIPPED_PENDING': '#ff6b35', # Bright Orange
-        'COMPLETED': '#2ecc71',  # Green
-        'AS_RECEIVED': '#9b59b6', # Purple
-        'AS_COMPLETED': '#1abc9c'  # Teal
-    }
-    
+            resp = jsonify(events)
+        resp.set_etag(etag)
+        resp.headers['X-Feed-Cursor'] = str(cursor)
+        resp.headers['Cache-Control'] = 'private, no-cache'
+        return resp
+
+    # 기간 없이 호출: 전체 주문 (캐시 없음)
     events = []
-    for order in orders:
-        # ERP Beta 주문인 경우 structured_data에서 정보 추출
-        customer_name = order.customer_name
-        phone = order.phone
-        address = order.address
-        product = order.product
-        measurement_date = order.measurement_date
-        measurement_time = order.measurement_time
-        scheduled_date = order.scheduled_date
-        
-        if order.is_erp_beta and order.structured_data:
-            sd = order.structured_data
-            
-            # 고객명: structured_data.parties.customer.name
-            erp_customer_name = ((sd.get('parties') or {}).get('customer') or {}).get('name')
-            if erp_customer_name:
-                customer_name = erp_customer_name
-            
-            # 연락처: structured_data.parties.customer.phone
-            erp_phone = ((sd.get('parties') or {}).get('customer') or {}).get('phone')
-            if erp_phone:
-                phone = erp_phone
-            
-            # 주소: structured_data.site.address_full 또는 address_main
-            erp_address = ((sd.get('site') or {}).get('address_full') or 
-                          (sd.get('site') or {}).get('address_main'))
-            if erp_address:
-                address = erp_address
-            
-            # 제품: structured_data.items에서 첫 번째 제품명 또는 items의 요약
-            items = sd.get('items') or []
-            if items and len(items) > 0:
-                first_item = items[0]
-                product_name = first_item.get('product_name') or first_item.get('name')
-                if product_name:
-                    if len(items) > 1:
-                        product = f"{product_name} 외 {len(items) - 1}개"
-                    else:
-                        product = product_name
-            
-            # 실측일: structured_data.schedule.measurement.date
-            erp_measurement_date = (((sd.get('schedule') or {}).get('measurement') or {}).get('date'))
-            if erp_measurement_date:
-                measurement_date = erp_measurement_date
-            
-            # 실측시간: structured_data.schedule.measurement.time
-            erp_measurement_time = (((sd.get('schedule') or {}).get('measurement') or {}).get('time'))
-            if erp_measurement_time:
-                measurement_time = erp_measurement_time
-            
-            # 시공일: structured_data.schedule.construction.date
-            erp_scheduled_date = (((sd.get('schedule') or {}).get('construction') or {}).get('date'))
-            if erp_scheduled_date:
-                scheduled_date = erp_scheduled_date
-        
-        # ERP Beta 주문의 경우 measurement_date가 있으면 우선 사용 (상태와 관계없이)
-        # 일반 주문의 경우 상태별 날짜 필드 매핑
-        if order.is_erp_beta and measurement_date:
-            # ERP Beta 주문이고 measurement_date가 있으면 실측일 기준으로 표시
-            start_date = measurement_date
-        else:
-            # 상태별 날짜 필드 매핑
-            status_date_map = {
-                'RECEIVED': order.received_date,  
-                'MEASURED': measurement_date,  # ERP Beta 주문의 경우 structured_data에서 추출한 날짜 사용
-                'SCHEDULED': scheduled_date,  # ERP Beta 주문의 경우 structured_data에서 추출한 날짜 사용
-                'SHIPPED_PENDING': scheduled_date,  # 상차 예정도 스케줄된 날짜 사용
-                'COMPLETED': order.completion_date,
-                'AS_RECEIVED': order.as_received_date,  # AS 접수일 필드 사용
-                'AS_COMPLETED': order.as_completed_date  # AS 완료일 필드 사용
-            }
-            
-            # 상태에 맞는 날짜 선택, 없는 경우 기본값으로 received_date 사용
-            start_date = status_date_map.get(order.status)
-        
-        # 날짜 필드가 없는 경우 이벤트를 생성하지 않음
-        if not start_date:
-            continue
-            
-        # 시간 필드 매핑 (ERP Beta 주문의 경우 추출한 시간 사용)
-        status_time_map = {
-            'RECEIVED': order.received_time,
-            'MEASURED': measurement_time,  # ERP Beta 주문의 경우 structured_data에서 추출한 시간 사용
-            'SCHEDULED': None,  # 설치 예정은 일반적으로 시간 없음
-            'SHIPPED_PENDING': None,  # 상차 예정은 일반적으로 시간 없음
-            'COMPLETED': None,  # 완료는 일반적으로 시간 없음
-            'AS_RECEIVED': None,  # AS는 일반적으로 시간 없음
-            'AS_COMPLETED': None  # AS 완료는 일반적으로 시간 없음
-        }
-        
-        time_str = status_time_map.get(order.status)
-        
-        # '실측' 상태이고 measurement_time이 '종일', '오전', '오후'인 경우 allDay를 true로 설정
-        if order.status == 'MEASURED' and measurement_time in ['종일', '오전', '오후']:
-            start_datetime = start_date # 날짜만 사용
-            all_day = True
-        elif time_str: # 기존 시간 처리 로직
-            start_datetime = f"{start_date}T{time_str}:00"
-            all_day = False
-        else: # 시간이 없는 다른 경우 (기존 allDay=True 로직 유지)
-            start_datetime = start_date
-            all_day = True
-            
-        color = status_colors.get(order.status, '#3788d8')
-        title = f"{customer_name} | {phone} | {product}"
-        
-        events.append({
-            'id': order.id,
-            'title': title,
-            'start': start_datetime,
-            'allDay': all_day,
-            'backgroundColor': color,
-            'borderColor': color,
-            'extendedProps': {
-                'customer_name': customer_name,
-                'phone': phone,
-                'address': address,
-                'product': product,
-                'options': order.options,
-                'notes': order.notes,
-                'status': order.status,
-                'received_date': order.received_date,
-                'received_time': order.received_time,
-                'measurement_date': measurement_date,
-                'measurement_time': measurement_time,
-                'completion_date': order.completion_date,
-                'scheduled_date': scheduled_date,
-                'as_received_date': order.as_received_date,
-                'as_completed_date': order.as_completed_date,
-                'manager_name': order.manager_name
-            }
-        })
-    
+    for order in db.query(Order).filter(Order.status != 'DELETED').all():
+        event = build_calendar_event(OrderRow.from_order(order, product_mode=PRODUCT_SUMMARY))
+        if event and event_status_matches(event, status_filter):
+            events.append(event)
     return jsonify(events)
 
 # Admin routes for menu management
@@ -5941,34 +5200,13 @@ def regional_dashboard():
     
     # 검색 기능 적용
     if search_query:
-        search_term = f"%{search_query}%"
-        # ID 검색을 위한 숫자 체크
-        id_conditions = []
-        try:
-            # 검색어가 숫자인 경우 ID로 검색
-            search_id = int(search_query)
-            id_conditions.append(Order.id == search_id)
-        except ValueError:
-            # 숫자가 아닌 경우 ID를 문자열로 캐스팅해서 검색
-            id_conditions.append(func.cast(Order.id, String).ilike(search_term))
-        
-        base_query = base_query.filter(
-            or_(
-                Order.customer_name.ilike(search_term),
-                Order.phone.ilike(search_term),
-                Order.address.ilike(search_term),
-                Order.product.ilike(search_term),
-                Order.regional_memo.ilike(search_term),
-                Order.notes.ilike(search_term),
-                *id_conditions
-            )
-        )
+        base_query = apply_order_search(base_query, db, search_query)
     
     # 모든 지방 주문 가져오기
     all_regional_orders = base_query.order_by(Order.id.desc()).all()
     
-    # ERP Beta 주문 표시 정보 반영
-    apply_erp_beta_display_fields_to_orders(all_regional_orders)
+    # ERP Beta 주문 표시 정보 반영 (OrderRow)
+    all_regional_orders = order_rows(all_regional_orders)
     
     # 오늘 날짜
     today = date.today()
@@ -5995,32 +5233,21 @@ def regional_dashboard():
     shipping_alerts = []
     for order in all_regional_orders:
         if (getattr(order, 'measurement_completed', False) and 
-            order.shipping_scheduled_date and 
-            order.shipping_scheduled_date.strip() and
             order.status not in ['COMPLETED', 'ON_HOLD']):  # 완료된 주문과 보류 상태 제외
-            try:
-                shipping_date = datetime.datetime.strptime(order.shipping_scheduled_date, '%Y-%m-%d').date()
-                # 오늘 이후의 상차일만 포함 (지난 상차일은 제외)
-                if shipping_date >= today:
-                    shipping_alerts.append(order)
-            except (ValueError, TypeError):
-                # 날짜 형식이 잘못된 경우 무시
-                pass
+            # 상차일 DATE 컬럼 (없거나 해석 불가면 None → 제외)
+            shipping_date = order_date_value(order, 'shipping_scheduled_date')
+            # 오늘 이후의 상차일만 포함 (지난 상차일은 제외)
+            if shipping_date and shipping_date >= today:
+                shipping_alerts.append(order)
 
     # 상차완료: 상차일이 지났지만 완료 처리되지 않은 주문들 + 보류 상태 제외
     shipping_completed_orders = []
     for order in all_regional_orders:
-        if (order.shipping_scheduled_date and 
-            order.shipping_scheduled_date.strip() and
-            order.status not in ['COMPLETED', 'ON_HOLD']):  # 완료된 주문과 보류 상태 제외
-            try:
-                shipping_date = datetime.datetime.strptime(order.shipping_scheduled_date, '%Y-%m-%d').date()
-                # 상차일이 오늘보다 이전인 경우 (지난 상차일)
-                if shipping_date < today:
-                    shipping_completed_orders.append(order)
-            except (ValueError, TypeError):
-                # 날짜 형식이 잘못된 경우 무시
-                pass
+        if order.status not in ['COMPLETED', 'ON_HOLD']:  # 완료된 주문과 보류 상태 제외
+            shipping_date = order_date_value(order, 'shipping_scheduled_date')
+            # 상차일이 오늘보다 이전인 경우 (지난 상차일)
+            if shipping_date and shipping_date < today:
+                shipping_completed_orders.append(order)
 
     # 진행 중인 주문: 실측 미완료 + 완료되지 않은 주문 + 상차 예정 알림에 없는 주문 + 상차완료에 없는 주문 + 보류 상태 및 설치예정 상태 제외
     shipping_alert_order_ids = {order.id for order in shipping_alerts}
@@ -6065,39 +5292,18 @@ def metropolitan_dashboard():
 
     def get_filtered_orders(query):
         if search_query:
-            search_term = f"%{search_query}%"
-            # ID 검색을 위한 숫자 체크
-            id_conditions = []
-            try:
-                # 검색어가 숫자인 경우 ID로 검색
-                search_id = int(search_query)
-                id_conditions.append(Order.id == search_id)
-            except ValueError:
-                # 숫자가 아닌 경우 ID를 문자열로 캐스팅해서 검색
-                id_conditions.append(func.cast(Order.id, String).ilike(search_term))
-            
-            return query.filter(
-                or_(
-                    Order.customer_name.ilike(search_term),
-                    Order.phone.ilike(search_term),
-                    Order.address.ilike(search_term),
-                    Order.product.ilike(search_term),
-                    Order.notes.ilike(search_term),
-                    Order.manager_name.ilike(search_term),
-                    *id_conditions
-                )
-            )
+            return apply_order_search(query, db, search_query)
         return query
 
     base_query = db.query(Order).filter(Order.is_regional == False)
 
-    # 쿼리에서 날짜 비교 시 func.date()를 사용하여 타입 일치
+    # 날짜 비교는 DATE 컬럼((status, 날짜) 인덱스) 사용, 이관 전에는 문자열 date() 캐스팅 (order_dates.order_date)
     # .all()을 호출하기 전에 필터링이 적용되도록 수정
     urgent_alerts_query = base_query.filter(
         Order.status.in_(['MEASURED']),
         Order.measurement_date != None,
         Order.measurement_date != '',
-        func.date(Order.measurement_date) == date.today()
+        order_date(db, 'measurement_date') == date.today()
     )
     urgent_alerts = get_filtered_orders(urgent_alerts_query).order_by(Order.measurement_date.asc()).all()
 
@@ -6106,7 +5312,7 @@ def metropolitan_dashboard():
         Order.status.in_(['MEASURED']),
         Order.measurement_date != None,
         Order.measurement_date != '',
-        func.date(Order.measurement_date) < date.today(),  # 당일 제외, 과거 실측일만
+        order_date(db, 'measurement_date') < date.today(),  # 당일 제외, 과거 실측일만
         or_(
             Order.scheduled_date == None,
             Order.scheduled_date == ''
@@ -6121,7 +5327,7 @@ def metropolitan_dashboard():
                 Order.status.in_(['RECEIVED', 'MEASURED']),
                 Order.measurement_date != None,
                 Order.measurement_date != '',
-                func.date(Order.measurement_date) > date.today()
+                order_date(db, 'measurement_date') > date.today()
             ),
             # 실측일이 없거나 상태가 RECEIVED인 경우 (실측 전 단계)
             and_(
@@ -6140,7 +5346,7 @@ def metropolitan_dashboard():
         # scheduled_date가 None이 아니고 빈 문자열이 아닌 경우에만 비교
         Order.scheduled_date != None,
         Order.scheduled_date != '',
-        func.date(Order.scheduled_date) < date.today()
+        order_date(db, 'scheduled_date') < date.today()
     )
     installation_alerts = get_filtered_orders(installation_alerts_query).order_by(Order.scheduled_date.asc()).all()
 
@@ -6175,11 +5381,16 @@ def metropolitan_dashboard():
     )
     completed_orders = get_filtered_orders(completed_orders_query).order_by(Order.completion_date.desc()).limit(50).all()
     
-    # 모든 주문 리스트 수집
-    all_metro_orders = urgent_alerts + measurement_alerts + pre_measurement_alerts + installation_alerts + as_orders + hold_orders + normal_orders + completed_orders
-    
-    # ERP Beta 주문 표시 정보 반영
-    apply_erp_beta_display_fields_to_orders(all_metro_orders)
+    # ERP Beta 주문 표시 정보 반영 (OrderRow, 여러 섹션에 나오는 주문은 한 번만 변환)
+    row_cache = {}
+    urgent_alerts = order_rows(urgent_alerts, cache=row_cache)
+    measurement_alerts = order_rows(measurement_alerts, cache=row_cache)
+    pre_measurement_alerts = order_rows(pre_measurement_alerts, cache=row_cache)
+    installation_alerts = order_rows(installation_alerts, cache=row_cache)
+    as_orders = order_rows(as_orders, cache=row_cache)
+    hold_orders = order_rows(hold_orders, cache=row_cache)
+    normal_orders = order_rows(normal_orders, cache=row_cache)
+    completed_orders = order_rows(completed_orders, cache=row_cache)
         
     return render_template('metropolitan_dashboard.html', 
                            urgent_alerts=urgent_alerts,
@@ -6287,33 +5498,13 @@ def self_measurement_dashboard():
     
     # 검색 기능 적용
     if search_query:
-        search_term = f"%{search_query}%"
-        # ID 검색을 위한 숫자 체크
-        id_conditions = []
-        try:
-            # 검색어가 숫자인 경우 ID로 검색
-            search_id = int(search_query)
-            id_conditions.append(Order.id == search_id)
-        except ValueError:
-            # 숫자가 아닌 경우 ID를 문자열로 캐스팅해서 검색
-            id_conditions.append(func.cast(Order.id, String).ilike(search_term))
-        
-        base_query = base_query.filter(
-            or_(
-                Order.customer_name.ilike(search_term),
-                Order.phone.ilike(search_term),
-                Order.address.ilike(search_term),
-                Order.product.ilike(search_term),
-                Order.notes.ilike(search_term),
-                *id_conditions
-            )
-        )
+        base_query = apply_order_search(base_query, db, search_query)
     
     # 모든 자가실측 주문 가져오기
     all_self_measurement_orders = base_query.order_by(Order.id.desc()).all()
     
-    # ERP Beta 주문 표시 정보 반영
-    apply_erp_beta_display_fields_to_orders(all_self_measurement_orders)
+    # ERP Beta 주문 표시 정보 반영 (OrderRow)
+    all_self_measurement_orders = order_rows(all_self_measurement_orders)
     
     # AS 접수된 주문 분류
     as_orders = [
@@ -6360,26 +5551,9 @@ def storage_dashboard():
     )
 
     if search_query:
-        search_term = f"%{search_query}%"
-        id_conditions = []
-        try:
-            search_id = int(search_query)
-            id_conditions.append(Order.id == search_id)
-        except ValueError:
-            id_conditions.append(func.cast(Order.id, String).ilike(search_term))
-
-        base_query = base_query.filter(
-            or_(
-                Order.customer_name.ilike(search_term),
-                Order.phone.ilike(search_term),
-                Order.address.ilike(search_term),
-                Order.product.ilike(search_term),
-                Order.notes.ilike(search_term),
-                *id_conditions
-            )
-        )
+        base_query = apply_order_search(base_query, db, search_query)
 
-    all_cabinet_orders = base_query.order_by(Order.id.desc()).all()
+    all_cabinet_orders = order_rows(base_query.order_by(Order.id.desc()).all())
 
     # 카테고리 분류: 접수(RECEIVED), 제작중(IN_PRODUCTION), 발송(SHIPPED)
     received_orders = [o for o in all_cabinet_orders if (o.cabinet_status or 'RECEIVED') == 'RECEIVED']
@@ -6414,24 +5588,7 @@ def export_storage_dashboard_excel():
     
     # 검색어 필터 적용
     if search_query:
-        search_term = f"%{search_query}%"
-        id_conditions = []
-        try:
-            search_id = int(search_query)
-            id_conditions.append(Order.id == search_id)
-        except ValueError:
-            id_conditions.append(func.cast(Order.id, String).ilike(search_term))
-        
-        base_query = base_query.filter(
-            or_(
-                Order.customer_name.ilike(search_term),
-                Order.phone.ilike(search_term),
-                Order.address.ilike(search_term),
-                Order.product.ilike(search_term),
-                Order.regional_memo.ilike(search_term),
-                *id_conditions
-            )
-        )
+        base_query = apply_order_search(base_query, db, search_query)
     
     orders = base_query.order_by(Order.id.desc()).all()
     
@@ -7650,9 +6807,9 @@ def api_wdcalculator_search_orders():
         
         # FOMS 주문 검색 (읽기 전용)
         foms_db = get_db()
-        orders = foms_db.query(Order).filter(
-            Order.customer_name.ilike(f'%{customer_name}%')
-        ).order_by(Order.created_at.desc()).limit(50).all()
+        orders = apply_order_search(
+            foms_db.query(Order), foms_db, customer_name, columns=('customer_name',)
+        ).order_by(order_search_rank(foms_db, customer_name).desc(), Order.created_at.desc()).limit(50).all()
         
         orders_list = [{
             'id': order.id,
@@ -8375,15 +7532,12 @@ def api_chat_search_orders():
                 'count': 0
             })
         
-        # 고객명 또는 주문 ID로 검색
-        orders = db.query(Order).filter(
-            or_(
-                Order.customer_name.ilike(f'%{query}%'),
-                Order.id == query if query.isdigit() else None
-            )
+        # 고객명/연락처/주소 등 검색 문서 또는 주문 ID로 검색 (관련도순)
+        orders = apply_order_search(
+            db.query(Order), db, query, columns=('customer_name', 'phone', 'address')
         ).filter(
             Order.deleted_at.is_(None)  # 삭제되지 않은 주문만
-        ).order_by(Order.created_at.desc()).limit(limit).all()
+        ).order_by(order_search_rank(db, query).desc(), Order.created_at.desc()).limit(limit).all()
         
         orders_list = [{
             'id': order.id,
@@ -8851,7 +8005,7 @@ def api_chat_get_message(message_id):
 # ============================================
 
 def _ensure_system_build_steps_table(db):
-    """B안: 진행상태는 DB 테이블에만 기록. 테이블이 없으면 생성."""
+    """B안: 진행상태는 DB 테이블에만 기록. 테이블이 없으면 생성 (앱 시작 시 1회)"""
     db.execute(text("""
     CREATE TABLE IF NOT EXISTS system_build_steps (
         step_key VARCHAR(100) PRIMARY KEY,
@@ -8865,40 +8019,29 @@ def _ensure_system_build_steps_table(db):
     db.commit()
 
 
-def _record_build_step(db, step_key, status, message=None, meta=None):
-    # 빌드 체크포인트는 "부가 기능"이므로, 실패해도 API 자체는 죽지 않게 한다.
+def _record_api_call(endpoint, started, status, order_id=None, message=None):
+    # 저장 경로 텔레메트리는 메모리 링버퍼에만 기록 (추가 DB 트랜잭션 없음)
+    erp_telemetry.record(endpoint, status, (time.perf_counter() - started) * 1000.0, order_id=order_id, message=message)
+
+
+@app.route('/api/admin/erp-telemetry', methods=['GET'])
+@login_required
+@role_required(['ADMIN'])
+def api_admin_erp_telemetry():
+    """ERP 저장/파싱 API 호출 수·지연시간 (프로세스별 집계)"""
     try:
-        _ensure_system_build_steps_table(db)
-        meta_json = json.dumps(meta, ensure_ascii=False) if isinstance(meta, (dict, list)) else None
-        now = datetime.datetime.now()
-        db.execute(
-            text("""
-            INSERT INTO system_build_steps (step_key, status, started_at, completed_at, message, meta)
-            VALUES (:k, :s, :started, :completed, :m, CAST(:meta AS JSONB))
-            ON CONFLICT (step_key)
-            DO UPDATE SET
-                status = EXCLUDED.status,
-                started_at = COALESCE(system_build_steps.started_at, EXCLUDED.started_at),
-                completed_at = CASE WHEN EXCLUDED.status IN ('COMPLETED','FAILED') THEN EXCLUDED.completed_at ELSE system_build_steps.completed_at END,
-                message = EXCLUDED.message,
-                meta = COALESCE(EXCLUDED.meta, system_build_steps.meta);
-            """),
-            {
-                "k": step_key,
-                "s": status,
-                "started": now if status == "RUNNING" else None,
-                "completed": now if status in ["COMPLETED", "FAILED"] else None,
-                "m": message,
-                "meta": meta_json,
-            }
-        )
-        db.commit()
-    except Exception as e:
-        try:
-            db.rollback()
-        except Exception:
-            pass
-        print(f"[ERP_BETA] build-step log warning: {e}")
+        recent = int(request.args.get('recent', 50))
+    except (TypeError, ValueError):
+        recent = 50
+    return jsonify({'success': True, 'pid': os.getpid(), **erp_telemetry.snapshot(recent=max(0, min(recent, erp_telemetry.RING_SIZE)))})
+
+
+@app.route('/api/admin/geocode-cache', methods=['GET'])
+@login_required
+@role_required(['ADMIN'])
+def api_admin_geocode_cache():
+    """지오코딩 캐시 히트율/조회 수 (프로세스별 집계) + 카카오 내비 구간 캐시"""
+    return jsonify({'success': True, 'pid': os.getpid(), **geocode_cache.stats(), 'directions': directions_cache.stats()})
 
 
 @app.route('/api/orders/<int:order_id>/structured', methods=['GET'])
@@ -8929,18 +8072,184 @@ def api_get_order_structured(order_id):
         return jsonify({'success': False, 'message': str(e)}), 500
 
 
+def _erp_detect_structured_changes(db, order, old_sd, structured_data, quest_rows, touched=None):
+    """
+    structured_data 변경 감지 → 이벤트 기록 (단계/긴급/일정/오너팀).
+    - touched: JSON Patch 변경 경로 목록. 주어지면 겹치는 항목만 비교한다.
+    - 단계 변경 시 workflow.stage_updated_at 기록 + 새 단계 Quest 생성
+    반환: 여기서 structured_data에 추가로 기록한 경로 목록
+    """
+    def _check(*prefix):
+        return touched is None or is_touched(touched, *prefix)
+
+    extra_touched = []
+
+    # workflow.stage 변경 감지 + timestamp 기록 + 검증
+    try:
+        new_stage = (structured_data.get('workflow') or {}).get('stage')
+        old_stage = (old_sd.get('workflow') or {}).get('stage')
+        if _check('workflow', 'stage') and new_stage and new_stage != old_stage:
+            # 단계 전환 검증: Quest 시스템 사용 시 팀 승인 완료 여부 확인
+            # (수동 단계 변경 시에도 Quest 승인 완료 여부를 확인)
+            is_quest_complete, missing_teams = check_quest_approvals_complete(old_sd, old_stage, quests=quest_dicts(quest_rows))
+            
+            if not is_quest_complete and missing_teams:
+                # Quest 승인 미완료 시 경고 (강제 전환은 허용하되 경고)
+                stage_label = STAGE_LABELS.get(old_stage, old_stage) if old_stage else '알 수 없음'
+                # 팀 라벨 매핑
+                TEAM_LABELS = {
+                    'CS': '라홈팀',
+                    'SALES': '영업팀',
+                    'MEASURE': '실측팀',
+                    'DRAWING': '도면팀',
+                    'PRODUCTION': '생산팀',
+                    'CONSTRUCTION': '시공팀',
+                }
+                missing_team_labels = [TEAM_LABELS.get(t, t) for t in missing_teams]
+                # 경고만 표시하고 전환은 허용 (수동 전환 가능하도록)
+                print(f"경고: [{stage_label}] 단계의 Quest 승인 미완료 팀: {', '.join(missing_team_labels)}")
+            
+            # 단계 전환 허용 (Quest 승인 완료 여부와 관계없이 수동 전환 가능)
+            (structured_data.get('workflow') or {})['stage_updated_at'] = datetime.datetime.now().isoformat()
+            extra_touched.append(('workflow', 'stage_updated_at'))
+            # 이벤트 기록
+            ev = OrderEvent(
+                order_id=order.id,
+                event_type='STAGE_CHANGED',
+                payload={'from': old_stage, 'to': new_stage, 'manual': True},
+                created_by_user_id=session.get('user_id')
+            )
+            db.add(ev)
+            
+            # 새 단계의 Quest가 없으면 자동 생성
+            has_new_stage_quest = any(r.stage == new_stage for r in quest_rows)
+            if not has_new_stage_quest:
+                new_quest = create_quest_from_template(new_stage, session.get('username') or '', structured_data)
+                if new_quest:
+                    quest_rows.append(add_quest(db, order.id, new_quest))
+    except Exception as _e:
+        import traceback
+        print(f"단계 전환 검증 오류: {_e}")
+        print(traceback.format_exc())
+        pass
+
+    # 긴급 변경 이벤트
+    try:
+        new_urgent = bool((structured_data.get('flags') or {}).get('urgent'))
+        old_urgent = bool((old_sd.get('flags') or {}).get('urgent'))
+        if _check('flags', 'urgent') and new_urgent != old_urgent:
+            ev = OrderEvent(
+                order_id=order.id,
+                event_type='URGENT_CHANGED',
+                payload={'from': old_urgent, 'to': new_urgent, 'reason': (structured_data.get('flags') or {}).get('urgent_reason')},
+                created_by_user_id=session.get('user_id')
+            )
+            db.add(ev)
+    except Exception:
+        pass
+
+    # 일정 변경 이벤트(실측/시공)
+    try:
+        new_meas = ((structured_data.get('schedule') or {}).get('measurement') or {}).get('date')
+        old_meas = ((old_sd.get('schedule') or {}).get('measurement') or {}).get('date')
+        if _check('schedule', 'measurement', 'date') and new_meas != old_meas:
+            db.add(OrderEvent(
+                order_id=order.id,
+                event_type='MEASUREMENT_DATE_CHANGED',
+                payload={'from': old_meas, 'to': new_meas},
+                created_by_user_id=session.get('user_id')
+            ))
+    except Exception:
+        pass
+
+    try:
+        new_cons = ((structured_data.get('schedule') or {}).get('construction') or {}).get('date')
+        old_cons = ((old_sd.get('schedule') or {}).get('construction') or {}).get('date')
+        if _check('schedule', 'construction', 'date') and new_cons != old_cons:
+            db.add(OrderEvent(
+                order_id=order.id,
+                event_type='CONSTRUCTION_DATE_CHANGED',
+                payload={'from': old_cons, 'to': new_cons},
+                created_by_user_id=session.get('user_id')
+            ))
+    except Exception:
+        pass
+
+    # 오너팀 변경 이벤트
+    try:
+        new_team = (structured_data.get('assignments') or {}).get('owner_team')
+        old_team = (old_sd.get('assignments') or {}).get('owner_team')
+        if _check('assignments', 'owner_team') and new_team != old_team:
+            db.add(OrderEvent(
+                order_id=order.id,
+                event_type='OWNER_TEAM_CHANGED',
+                payload={'from': old_team, 'to': new_team},
+                created_by_user_id=session.get('user_id')
+            ))
+    except Exception:
+        pass
+
+    return extra_touched
+
+
+def _erp_patch_structured(db, order, operations, create_parents=False, detect_changes=True):
+    """
+    structured_data에 JSON Patch 적용 (호출측은 lock_order로 행 잠금 후 호출, commit은 호출측).
+    - 변경 경로만 jsonb_set/#-로 UPDATE 1회 → 같은 주문의 다른 경로 동시 수정을 덮어쓰지 않음
+    - 단계/긴급/일정/오너팀 이벤트, 자동 Task, 경보/Quest 요약은 해당 경로가 바뀐 경우에만 처리
+    반환: (new_sd, touched 경로 목록)
+    """
+    # structured_data.quests 미이관 주문은 먼저 이관 (이관 후 문서를 기준으로 patch)
+    migrate_order_quests(db, order)
+    old_sd = order.structured_data or {}
+    new_sd, touched = apply_patch(old_sd, operations, create_parents=create_parents)
+    if is_touched(touched, 'quests'):
+        raise JsonPatchError('quests는 Quest API로만 변경할 수 있습니다.')
+    if not touched:
+        return new_sd, touched
+
+    quest_rows = None
+    if detect_changes and any(is_touched(touched, k) for k in ('workflow', 'flags', 'schedule', 'assignments')):
+        quest_rows = load_order_quests(db, order)
+        touched = touched + _erp_detect_structured_changes(db, order, old_sd, new_sd, quest_rows, touched=touched)
+        try:
+            apply_auto_tasks(db, order.id, new_sd)
+        except Exception as _e:
+            # 자동화 실패가 저장 자체를 막지 않음
+            print(f"[ERP_BETA] auto-task apply warning: {_e}")
+
+    expr, params = build_jsonb_update(old_sd, new_sd, touched)
+    params['order_id'] = order.id
+    db.execute(text(f"UPDATE orders SET structured_data = {expr} WHERE id = :order_id"), params)
+    # ORM 상태는 DB와 동일하게 맞추되 전체 문서를 다시 쓰지 않도록 변경 이력 없이 반영
+    set_committed_value(order, 'structured_data', new_sd)
+    order.structured_updated_at = datetime.datetime.now()
+
+    if any(is_touched(touched, *path) for path in QUEST_SUMMARY_INPUTS):
+        # 단계/발주사(라홈 여부)가 바뀌면 요약 재계산
+        if quest_rows is None:
+            quest_rows = load_order_quests(db, order)
+        _erp_refresh_quest_summary(order, new_sd, quest_dicts(quest_rows))
+    if order.is_erp_beta and (is_touched(touched, 'workflow') or is_touched(touched, 'schedule')):
+        # raw UPDATE는 flush 훅을 거치지 않으므로 경보는 직접 갱신
+        refresh_alerts_if_ready(db, [order.id])
+    if is_touched(touched, 'site'):
+        # 현장주소 변경: 트리거가 지오코딩 큐에 등록, commit 후 워커 깨우기
+        mark_geocode_pending(db)
+    return new_sd, touched
+
+
 @app.route('/api/orders/<int:order_id>/structured', methods=['PUT'])
 @login_required
 @role_required(['ADMIN', 'MANAGER', 'STAFF'])
 def api_put_order_structured(order_id):
     """구조화 데이터 저장(전사 공용)."""
     db = get_db()
-    step_key = f"ERP_BETA_API_SAVE_{order_id}"
-    _record_build_step(db, step_key, "RUNNING", message="Saving structured data")
+    started = time.perf_counter()
     try:
         order = db.query(Order).filter(Order.id == order_id, Order.status != 'DELETED').first()
         if not order:
-            _record_build_step(db, step_key, "FAILED", message="Order not found")
+            _record_api_call("ERP_BETA_API_SAVE", started, "FAILED", order_id, "Order not found")
             return jsonify({'success': False, 'message': '주문을 찾을 수 없습니다.'}), 404
 
         payload = request.get_json(silent=True) or {}
@@ -8955,9 +8264,11 @@ def api_put_order_structured(order_id):
 
         # 최소 검증: dict 형태
         if structured_data is not None and not isinstance(structured_data, dict):
-            _record_build_step(db, step_key, "FAILED", message="structured_data must be an object")
+            _record_api_call("ERP_BETA_API_SAVE", started, "FAILED", order_id, "structured_data must be an object")
             return jsonify({'success': False, 'message': 'structured_data는 JSON 객체여야 합니다.'}), 400
 
+        # Quest는 order_quests 테이블이 원천 (structured_data.quests 미이관 주문은 여기서 이관)
+        quest_rows = load_order_quests(db, order)
         old_sd = order.structured_data or {}
 
         if raw_order_text is not None:
@@ -8975,116 +8286,10 @@ def api_put_order_structured(order_id):
                 structured_data['flags'] = {}
             if not structured_data.get('assignments'):
                 structured_data['assignments'] = {}
+            # quests는 order_quests 테이블에서 관리 (클라이언트가 보낸 구버전 quests는 무시)
+            structured_data.pop('quests', None)
 
-            # workflow.stage 변경 감지 + timestamp 기록 + 검증
-            try:
-                new_stage = (structured_data.get('workflow') or {}).get('stage')
-                old_stage = (old_sd.get('workflow') or {}).get('stage')
-                if new_stage and new_stage != old_stage:
-                    # 단계 전환 검증: Quest 시스템 사용 시 팀 승인 완료 여부 확인
-                    # (수동 단계 변경 시에도 Quest 승인 완료 여부를 확인)
-                    is_quest_complete, missing_teams = check_quest_approvals_complete(old_sd, old_stage)
-                    
-                    if not is_quest_complete and missing_teams:
-                        # Quest 승인 미완료 시 경고 (강제 전환은 허용하되 경고)
-                        stage_label = STAGE_LABELS.get(old_stage, old_stage) if old_stage else '알 수 없음'
-                        # 팀 라벨 매핑
-                        TEAM_LABELS = {
-                            'CS': '라홈팀',
-                            'SALES': '영업팀',
-                            'MEASURE': '실측팀',
-                            'DRAWING': '도면팀',
-                            'PRODUCTION': '생산팀',
-                            'CONSTRUCTION': '시공팀',
-                        }
-                        missing_team_labels = [TEAM_LABELS.get(t, t) for t in missing_teams]
-                        # 경고만 표시하고 전환은 허용 (수동 전환 가능하도록)
-                        print(f"경고: [{stage_label}] 단계의 Quest 승인 미완료 팀: {', '.join(missing_team_labels)}")
-                    
-                    # 단계 전환 허용 (Quest 승인 완료 여부와 관계없이 수동 전환 가능)
-                    (structured_data.get('workflow') or {})['stage_updated_at'] = datetime.datetime.now().isoformat()
-                    # 이벤트 기록
-                    ev = OrderEvent(
-                        order_id=order.id,
-                        event_type='STAGE_CHANGED',
-                        payload={'from': old_stage, 'to': new_stage, 'manual': True},
-                        created_by_user_id=session.get('user_id')
-                    )
-                    db.add(ev)
-                    
-                    # 새 단계의 Quest가 없으면 자동 생성
-                    quests = structured_data.get('quests') or []
-                    has_new_stage_quest = any(
-                        isinstance(q, dict) and q.get('stage') == new_stage 
-                        for q in quests
-                    )
-                    if not has_new_stage_quest:
-                        new_quest = create_quest_from_template(new_stage, session.get('username') or '', structured_data)
-                        if new_quest:
-                            if not structured_data.get('quests'):
-                                structured_data['quests'] = []
-                            structured_data['quests'].append(new_quest)
-            except Exception as _e:
-                import traceback
-                print(f"단계 전환 검증 오류: {_e}")
-                print(traceback.format_exc())
-                pass
-
-            # 긴급 변경 이벤트
-            try:
-                new_urgent = bool((structured_data.get('flags') or {}).get('urgent'))
-                old_urgent = bool((old_sd.get('flags') or {}).get('urgent'))
-                if new_urgent != old_urgent:
-                    ev = OrderEvent(
-                        order_id=order.id,
-                        event_type='URGENT_CHANGED',
-                        payload={'from': old_urgent, 'to': new_urgent, 'reason': (structured_data.get('flags') or {}).get('urgent_reason')},
-                        created_by_user_id=session.get('user_id')
-                    )
-                    db.add(ev)
-            except Exception:
-                pass
-
-            # 일정 변경 이벤트(실측/시공)
-            try:
-                new_meas = ((structured_data.get('schedule') or {}).get('measurement') or {}).get('date')
-                old_meas = ((old_sd.get('schedule') or {}).get('measurement') or {}).get('date')
-                if new_meas != old_meas:
-                    db.add(OrderEvent(
-                        order_id=order.id,
-                        event_type='MEASUREMENT_DATE_CHANGED',
-                        payload={'from': old_meas, 'to': new_meas},
-                        created_by_user_id=session.get('user_id')
-                    ))
-            except Exception:
-                pass
-
-            try:
-                new_cons = ((structured_data.get('schedule') or {}).get('construction') or {}).get('date')
-                old_cons = ((old_sd.get('schedule') or {}).get('construction') or {}).get('date')
-                if new_cons != old_cons:
-                    db.add(OrderEvent(
-                        order_id=order.id,
-                        event_type='CONSTRUCTION_DATE_CHANGED',
-                        payload={'from': old_cons, 'to': new_cons},
-                        created_by_user_id=session.get('user_id')
-                    ))
-            except Exception:
-                pass
-
-            # 오너팀 변경 이벤트
-            try:
-                new_team = (structured_data.get('assignments') or {}).get('owner_team')
-                old_team = (old_sd.get('assignments') or {}).get('owner_team')
-                if new_team != old_team:
-                    db.add(OrderEvent(
-                        order_id=order.id,
-                        event_type='OWNER_TEAM_CHANGED',
-                        payload={'from': old_team, 'to': new_team},
-                        created_by_user_id=session.get('user_id')
-                    ))
-            except Exception:
-                pass
+            _erp_detect_structured_changes(db, order, old_sd, structured_data, quest_rows)
 
             # ------------------------------------------------------------
             # SLA 기반 자동 Task 생성(중복 방지)
@@ -9107,6 +8312,7 @@ def api_put_order_structured(order_id):
                 pass
 
             order.structured_data = structured_data
+            _erp_refresh_quest_summary(order, structured_data, quest_dicts(quest_rows))
         order.structured_schema_version = int(schema_version) if schema_version else 1
         order.structured_confidence = confidence or (structured_data.get('confidence') if structured_data else None)
         order.structured_updated_at = now
@@ -9125,7 +8331,7 @@ def api_put_order_structured(order_id):
         # (필요 시 별도 스텝/옵션으로 브릿지 재활성화 가능)
 
         db.commit()
-        _record_build_step(db, step_key, "COMPLETED", message="Saved structured data")
+        _record_api_call("ERP_BETA_API_SAVE", started, "COMPLETED", order_id)
 
         return jsonify({'success': True, 'draft_cleared': draft_cleared})
     except Exception as e:
@@ -9133,7 +8339,84 @@ def api_put_order_structured(order_id):
         import traceback
         print(f"[ERP_BETA] structured PUT 오류: {e}")
         print(traceback.format_exc())
-        _record_build_step(db, step_key, "FAILED", message=str(e))
+        _record_api_call("ERP_BETA_API_SAVE", started, "FAILED", order_id, str(e))
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+
+@app.route('/api/orders/<int:order_id>/structured', methods=['PATCH'])
+@login_required
+@role_required(['ADMIN', 'MANAGER', 'STAFF'])
+def api_patch_order_structured(order_id):
+    """
+    구조화 데이터 부분 수정 (RFC 6902 JSON Patch).
+    - 본문: 연산 배열, 또는 {"patch": [...], "raw_order_text", "received_date", "received_time"} (ERP 탭 저장용)
+    - 변경 경로만 저장하므로 다른 팀의 동시 수정과 겹치지 않으면 덮어쓰지 않는다.
+    """
+    db = get_db()
+    started = time.perf_counter()
+    try:
+        payload = request.get_json(silent=True, force=True)
+        envelope = payload if isinstance(payload, dict) else {}
+        operations = envelope.get('patch') if isinstance(payload, dict) else payload
+        if not isinstance(operations, list):
+            _record_api_call("ERP_BETA_API_PATCH", started, "FAILED", order_id, "patch must be an array")
+            return jsonify({'success': False, 'message': 'JSON Patch 연산 배열이 필요합니다.'}), 400
+
+        order = lock_order(db, order_id)
+        if not order or order.status == 'DELETED':
+            _record_api_call("ERP_BETA_API_PATCH", started, "FAILED", order_id, "Order not found")
+            return jsonify({'success': False, 'message': '주문을 찾을 수 없습니다.'}), 404
+
+        raw_order_text = envelope.get('raw_order_text')
+        received_date = envelope.get('received_date')
+        received_time = envelope.get('received_time')
+        if raw_order_text is not None:
+            order.raw_order_text = raw_order_text
+        if received_date is not None and isinstance(received_date, str) and received_date.strip():
+            order.received_date = received_date.strip()
+        if received_time is not None and isinstance(received_time, str):
+            order.received_time = received_time.strip() or None
+
+        # Draft 주문이면 draft 플래그 해제 (신규 주문 덮어쓰기 방지) - 같은 UPDATE에 포함
+        draft_cleared = False
+        meta = (order.structured_data or {}).get('meta')
+        if operations and isinstance(meta, dict) and meta.get('draft') is True:
+            operations = operations + [
+                {'op': 'add', 'path': '/meta/draft', 'value': False},
+                {'op': 'add', 'path': '/meta/finalized_at', 'value': datetime.datetime.now().isoformat()},
+            ]
+            draft_cleared = True
+
+        _new_sd, touched = _erp_patch_structured(db, order, operations)
+        if not touched:
+            order.structured_updated_at = datetime.datetime.now()
+
+        # ERP Beta draft 세션 제거 (다음 새 주문에서 재사용되지 않도록)
+        try:
+            existing_id = session.get('erp_beta_draft_order_id')
+            if existing_id and int(existing_id) == order.id:
+                session.pop('erp_beta_draft_order_id', None)
+                draft_cleared = True
+        except Exception:
+            pass
+
+        db.commit()
+        _record_api_call("ERP_BETA_API_PATCH", started, "COMPLETED", order_id)
+        return jsonify({
+            'success': True,
+            'draft_cleared': draft_cleared,
+            'touched': [format_pointer(p) for p in touched],
+        })
+    except JsonPatchError as e:
+        db.rollback()
+        _record_api_call("ERP_BETA_API_PATCH", started, "FAILED", order_id, e.message)
+        return jsonify({'success': False, 'message': e.message}), e.status_code
+    except Exception as e:
+        db.rollback()
+        import traceback
+        print(f"[ERP_BETA] structured PATCH 오류: {e}")
+        print(traceback.format_exc())
+        _record_api_call("ERP_BETA_API_PATCH", started, "FAILED", order_id, str(e))
         return jsonify({'success': False, 'message': str(e)}), 500
 
 
@@ -9142,23 +8425,22 @@ def api_put_order_structured(order_id):
 @role_required(['ADMIN', 'MANAGER', 'STAFF'])
 def api_parse_order_text():
     """텍스트 붙여넣기 → 구조화 파싱(미리보기용). 저장은 하지 않음."""
-    db = get_db()
-    _record_build_step(db, "ERP_BETA_API_PARSE_TEXT", "RUNNING", message="Parsing order text")
+    started = time.perf_counter()
     try:
         payload = request.get_json(silent=True) or {}
         raw_text = (payload.get('raw_text') or '').strip()
         if not raw_text:
-            _record_build_step(db, "ERP_BETA_API_PARSE_TEXT", "FAILED", message="raw_text is empty")
+            _record_api_call("ERP_BETA_API_PARSE_TEXT", started, "FAILED", message="raw_text is empty")
             return jsonify({'success': False, 'message': 'raw_text가 필요합니다.'}), 400
 
         structured = parse_order_text(raw_text)
-        _record_build_step(db, "ERP_BETA_API_PARSE_TEXT", "COMPLETED", message="Parsed order text")
+        _record_api_call("ERP_BETA_API_PARSE_TEXT", started, "COMPLETED")
         return jsonify({'success': True, 'structured_data': structured})
     except Exception as e:
         import traceback
         print(f"[ERP_BETA] parse-text 오류: {e}")
         print(traceback.format_exc())
-        _record_build_step(db, "ERP_BETA_API_PARSE_TEXT", "FAILED", message=str(e))
+        _record_api_call("ERP_BETA_API_PARSE_TEXT", started, "FAILED", message=str(e))
         return jsonify({'success': False, 'message': str(e)}), 500
 
 
@@ -9214,6 +8496,7 @@ def api_erp_beta_create_draft():
             structured_confidence=None,
             structured_updated_at=now,
         )
+        _erp_refresh_quest_summary(order, structured, [])
         db.add(order)
         db.commit()
         db.refresh(order)
@@ -9546,6 +8829,9 @@ try:
         # Initialize WDCalculator DB
         init_wdcalculator_db()
         
+        # 빌드 체크포인트 테이블 (요청 경로에서는 더 이상 확인하지 않음)
+        _ensure_system_build_steps_table(get_db())
+
         print("[AUTO-INIT] Tables checked/created successfully.")
         
         # Check/Create Admin User
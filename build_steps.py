@@ -0,0 +1,89 @@
+"""
+build step 완료 여부 확인 (system_build_steps)
+
+- 런타임 모듈이 step 결과(컬럼/트리거/백필)를 쓰기 전에 step_ready(db, 번호)로 확인하고, 미완료면 폴백
+- COMPLETED는 프로세스에 영구 캐시, 미완료는 NOT_READY_RECHECK_SECONDS 후 다시 확인
+  (앱 실행 중에 step을 돌려도 재시작 없이 반영)
+- 요청 세션이 없는 모듈(engine 커넥션만 쓰는 캐시)은 engine_step_ready(engine, 번호)
+- STEP_KEYS는 erp_build_step_runner.STEP_* 와 같은 값 (runner는 app을 import하므로 여기서 따로 정의)
+- Flask app import 없이 재사용 가능
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Dict
+
+from sqlalchemy import text
+
+STEP_KEYS: Dict[int, str] = {
+    16: "ERP_DASH_STEP_16_ORDER_ALERTS",      # STEP_ORDER_ALERTS
+    20: "ERP_DASH_STEP_20_AUTO_TASK_UNIQUE",  # STEP_AUTO_TASK_UNIQUE
+    22: "ERP_DASH_STEP_22_ORDER_SEARCH",      # STEP_ORDER_SEARCH
+    23: "ERP_DASH_STEP_23_ORDER_DATES",       # STEP_ORDER_DATES
+    24: "ERP_DASH_STEP_24_CALENDAR_FEED",     # STEP_CALENDAR_FEED
+    25: "ERP_DASH_STEP_25_PANEL_METRICS",     # STEP_PANEL_METRICS
+    26: "ERP_DASH_STEP_26_GEOCODE_CACHE",     # STEP_GEOCODE_CACHE
+    27: "ERP_DASH_STEP_27_ORDER_GEO",         # STEP_ORDER_GEO
+    28: "ERP_DASH_STEP_28_DIRECTIONS_CACHE",  # STEP_DIRECTIONS_CACHE
+    29: "ERP_DASH_STEP_29_FEED_WATERMARK",    # STEP_FEED_WATERMARK
+    30: "ERP_DASH_STEP_30_FEED_TRIGGER_COLUMNS",  # STEP_FEED_TRIGGER_COLUMNS
+}
+
+NOT_READY_RECHECK_SECONDS = 60.0
+
+_completed: Dict[int, bool] = {}
+_checked_at: Dict[int, float] = {}
+_lock = threading.Lock()
+
+
+def _check_due(step: int) -> bool:
+    """미완료 step을 지금 다시 확인할 차례인지 (확인 시각 기록)"""
+    now = time.monotonic()
+    with _lock:
+        checked = _checked_at.get(step)
+        if checked is not None and now - checked < NOT_READY_RECHECK_SECONDS:
+            return False
+        _checked_at[step] = now
+    return True
+
+
+def _query_ready(db, step: int) -> bool:
+    try:
+        row = db.execute(
+            text("SELECT status FROM system_build_steps WHERE step_key = :k"),
+            {"k": STEP_KEYS[step]},
+        ).fetchone()
+    except Exception:
+        try:
+            db.rollback()
+        except Exception:
+            pass
+        return False
+    ready = bool(row and row.status == "COMPLETED")
+    if ready:
+        _completed[step] = True
+    return ready
+
+
+def step_ready(db, step: int) -> bool:
+    """step N이 COMPLETED인지 (완료는 영구 캐시, 미완료는 일정 시간 후 재확인)"""
+    if _completed.get(step):
+        return True
+    if not _check_due(step):
+        return False
+    return _query_ready(db, step)
+
+
+def engine_step_ready(bind, step: int) -> bool:
+    """step_ready의 별도 커넥션 버전 (요청 세션 없이 engine만 쓰는 캐시 모듈용, 재확인 시에만 연결)"""
+    if _completed.get(step):
+        return True
+    if not _check_due(step):
+        return False
+    try:
+        with bind.connect() as conn:
+            return _query_ready(conn, step)
+    except Exception:
+        return False
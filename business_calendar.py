@@ -1,14 +1,37 @@
+import bisect
 import json
 import os
 import datetime
-from typing import Iterable, Set, Optional
+import threading
+import time
+from typing import Iterable, List, Optional, Sequence, Set
+
+import numpy as np
 
 
 DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
 
+# 영업일 서수(ordinal) 테이블이 다루는 최대 범위: 올해 기준 ±N년
+# (범위를 벗어난 날짜는 기존 방식(하루씩 순회)으로 계산)
+CALENDAR_WINDOW_YEARS = 5
+
+# 공휴일 파일 변경 감지 주기(초). 매 호출마다 stat 하지 않도록 제한한다.
+RELOAD_CHECK_INTERVAL_SEC = 60
+
+
+def _holidays_path(year: int) -> str:
+    return os.path.join(DATA_DIR, f"holidays_kr_{year}.json")
+
+
+def _get_mtime(path: str) -> Optional[float]:
+    try:
+        return os.path.getmtime(path)
+    except Exception:
+        return None
+
 
 def _load_holidays_json(year: int) -> Optional[Set[str]]:
-    path = os.path.join(DATA_DIR, f"holidays_kr_{year}.json")
+    path = _holidays_path(year)
     if not os.path.exists(path):
         return None
     with open(path, "r", encoding="utf-8") as f:
@@ -31,35 +54,141 @@ def _generate_holidays_kr(year: int) -> Set[str]:
     dates = sorted([d.isoformat() for d in kr.keys()])
 
     os.makedirs(DATA_DIR, exist_ok=True)
-    out_path = os.path.join(DATA_DIR, f"holidays_kr_{year}.json")
+    out_path = _holidays_path(year)
     with open(out_path, "w", encoding="utf-8") as f:
         json.dump({"year": year, "country": "KR", "dates": dates}, f, ensure_ascii=False, indent=2)
 
     return set(dates)
 
 
+# year -> (파일 mtime, 공휴일 집합)
+_HOLIDAY_CACHE = {}
+_LOCK = threading.RLock()
+
+
 def get_holidays_kr(year: int) -> Set[str]:
-    """공휴일(YYYY-MM-DD 문자열 집합)"""
-    loaded = _load_holidays_json(year)
-    if loaded is not None:
-        return loaded
-    return _generate_holidays_kr(year)
+    """공휴일(YYYY-MM-DD 문자열 집합). 파일이 바뀌지 않았으면 캐시를 재사용한다."""
+    mtime = _get_mtime(_holidays_path(year))
+    cached = _HOLIDAY_CACHE.get(year)
+    if cached is not None and mtime is not None and cached[0] == mtime:
+        return set(cached[1])
 
+    with _LOCK:
+        loaded = _load_holidays_json(year)
+        if loaded is None:
+            loaded = _generate_holidays_kr(year)
+        _HOLIDAY_CACHE[year] = (_get_mtime(_holidays_path(year)), frozenset(loaded))
+        return set(loaded)
 
-def is_business_day(d: datetime.date) -> bool:
-    """영업일 = 주말(토/일) + 공휴일 제외"""
-    if d.weekday() >= 5:
-        return False
-    holidays_set = get_holidays_kr(d.year)
-    return d.isoformat() not in holidays_set
 
+# -----------------------------
+# Business-day ordinal table
+# -----------------------------
 
-def business_days_between(start: datetime.date, end: datetime.date) -> int:
+class _Calendar:
     """
-    start -> end 사이 영업일 수(양수/0/음수)
-    - end가 start 이후면: start 다음날부터 end까지(포함) 카운트
-    - end가 start 이전이면: 음수
+    [start, end] 구간의 영업일 누적 테이블.
+    prefix[i] = start ~ start+i-1 (i일) 중 영업일 수 → 구간 영업일 수는 prefix 차이로 O(1) 계산.
     """
+
+    def __init__(self, first_year: int, last_year: int):
+        self.first_year = first_year
+        self.last_year = last_year
+        self.start = datetime.date(first_year, 1, 1)
+        self.end = datetime.date(last_year, 12, 31)
+        self.mtimes = {y: _get_mtime(_holidays_path(y)) for y in range(first_year, last_year + 1)}
+
+        holiday_list = []
+        for y in range(first_year, last_year + 1):
+            holiday_list.extend(get_holidays_kr(y))
+        self.holidays = np.array(sorted(holiday_list), dtype="datetime64[D]")
+
+        days = np.arange(
+            np.datetime64(self.start, "D"),
+            np.datetime64(self.end + datetime.timedelta(days=1), "D"),
+            dtype="datetime64[D]",
+        )
+        is_busday = np.is_busday(days, holidays=self.holidays)
+        self.prefix = np.concatenate(([0], np.cumsum(is_busday, dtype=np.int64)))
+        self.prefix_list = self.prefix.tolist()
+        self.checked_at = time.monotonic()
+
+    def covers(self, d: datetime.date) -> bool:
+        return self.start <= d <= self.end
+
+    def index(self, d: datetime.date) -> int:
+        return (d - self.start).days
+
+    def is_stale(self) -> bool:
+        now = time.monotonic()
+        if now - self.checked_at < RELOAD_CHECK_INTERVAL_SEC:
+            return False
+        self.checked_at = now
+        return any(_get_mtime(_holidays_path(y)) != m for y, m in self.mtimes.items())
+
+
+_CALENDAR: Optional[_Calendar] = None
+
+
+def _window_limits() -> tuple:
+    this_year = datetime.date.today().year
+    return this_year - CALENDAR_WINDOW_YEARS, this_year + CALENDAR_WINDOW_YEARS
+
+
+def _get_calendar(*dates: datetime.date) -> Optional[_Calendar]:
+    """
+    주어진 날짜들을 모두 포함하는 영업일 테이블 반환.
+    허용 범위(올해 ±CALENDAR_WINDOW_YEARS)를 벗어나면 None (호출측에서 순회 방식으로 대체).
+    """
+    global _CALENDAR
+    min_year, max_year = _window_limits()
+    first = min(d.year for d in dates)
+    last = max(d.year for d in dates)
+    if first < min_year or last > max_year:
+        return None
+
+    cal = _CALENDAR
+    if cal is not None and cal.first_year <= first and last <= cal.last_year and not cal.is_stale():
+        return cal
+
+    with _LOCK:
+        cal = _CALENDAR
+        if cal is None:
+            first_year, last_year = first, last
+        else:
+            first_year, last_year = min(first, cal.first_year), max(last, cal.last_year)
+        _CALENDAR = _Calendar(first_year, last_year)
+        return _CALENDAR
+
+
+def reload_calendar() -> None:
+    """공휴일 캐시/영업일 테이블 강제 초기화 (공휴일 파일 수동 수정 직후 등)."""
+    global _CALENDAR
+    with _LOCK:
+        _HOLIDAY_CACHE.clear()
+        _CALENDAR = None
+
+
+# -----------------------------
+# Public API
+# -----------------------------
+
+def _is_business_day_uncached(d: datetime.date) -> bool:
+    if d.weekday() >= 5:
+        return False
+    return d.isoformat() not in get_holidays_kr(d.year)
+
+
+def is_business_day(d: datetime.date) -> bool:
+    """영업일 = 주말(토/일) + 공휴일 제외"""
+    cal = _get_calendar(d)
+    if cal is None:
+        return _is_business_day_uncached(d)
+    i = cal.index(d)
+    return cal.prefix_list[i + 1] != cal.prefix_list[i]
+
+
+def _business_days_between_walk(start: datetime.date, end: datetime.date) -> int:
     if start == end:
         return 0
     step = 1 if end > start else -1
@@ -67,11 +196,32 @@ def business_days_between(start: datetime.date, end: datetime.date) -> int:
     count = 0
     while cur != end:
         cur = cur + datetime.timedelta(days=step)
-        if is_business_day(cur):
+        if _is_business_day_uncached(cur):
             count += step
     return count
 
 
+def business_days_between(start: datetime.date, end: datetime.date) -> int:
+    """
+    start -> end 사이 영업일 수(양수/0/음수)
+    - end가 start 이후면: start 다음날부터 end까지(포함) 카운트
+    - end가 start 이전이면: 음수
+    """
+    if start == end:
+        return 0
+    cal = _get_calendar(start, end)
+    if cal is None:
+        return _business_days_between_walk(start, end)
+    p = cal.prefix_list
+    s = cal.index(start)
+    e = cal.index(end)
+    if e > s:
+        # (start, end] 영업일 수
+        return p[e + 1] - p[s + 1]
+    # [end, start) 영업일 수의 음수
+    return -(p[s] - p[e])
+
+
 def business_days_until(target_date_str: str, today: Optional[datetime.date] = None) -> Optional[int]:
     """today 기준 target까지 남은 영업일(오늘 제외, target 포함). 파싱 실패 시 None."""
     if not target_date_str:
@@ -84,6 +234,17 @@ def business_days_until(target_date_str: str, today: Optional[datetime.date] = N
     return business_days_between(base, target)
 
 
+def _add_business_days_walk(start: datetime.date, delta_days: int) -> datetime.date:
+    step = 1 if delta_days > 0 else -1
+    remaining = abs(delta_days)
+    cur = start
+    while remaining > 0:
+        cur = cur + datetime.timedelta(days=step)
+        if _is_business_day_uncached(cur):
+            remaining -= 1
+    return cur
+
+
 def add_business_days(start: datetime.date, delta_days: int) -> datetime.date:
     """
     영업일 기준 날짜 이동.
@@ -92,12 +253,118 @@ def add_business_days(start: datetime.date, delta_days: int) -> datetime.date:
     """
     if delta_days == 0:
         return start
-    step = 1 if delta_days > 0 else -1
-    remaining = abs(delta_days)
-    cur = start
-    while remaining > 0:
-        cur = cur + datetime.timedelta(days=step)
-        if is_business_day(cur):
-            remaining -= 1
-    return cur
+    # 영업일 n일 이동은 달력상 대략 n * 7/5일 + 연휴 → 넉넉히 포함하도록 범위 확보
+    span = datetime.timedelta(days=abs(delta_days) * 2 + 30)
+    probe = start + span if delta_days > 0 else start - span
+    cal = _get_calendar(start, probe)
+    if cal is None:
+        return _add_business_days_walk(start, delta_days)
+
+    p = cal.prefix_list
+    s = cal.index(start)
+    if delta_days > 0:
+        # (start, d] 영업일 수 == delta_days 인 최초 d
+        j = bisect.bisect_left(p, p[s + 1] + delta_days)
+        if j >= len(p):
+            return _add_business_days_walk(start, delta_days)
+        return cal.start + datetime.timedelta(days=j - 1)
+    # [d, start) 영업일 수 == |delta_days| 인 최근 d
+    target = p[s] + delta_days
+    if target < 0:
+        return _add_business_days_walk(start, delta_days)
+    j = bisect.bisect_right(p, target) - 1
+    return cal.start + datetime.timedelta(days=j)
+
+
+# -----------------------------
+# Batched API (대시보드 등 다건 계산용)
+# -----------------------------
+
+def _parse_dates(values: Iterable) -> List[Optional[datetime.date]]:
+    out: List[Optional[datetime.date]] = []
+    for v in values:
+        if isinstance(v, datetime.datetime):
+            out.append(v.date())
+        elif isinstance(v, datetime.date):
+            out.append(v)
+        elif v:
+            try:
+                out.append(datetime.date.fromisoformat(str(v)))
+            except Exception:
+                out.append(None)
+        else:
+            out.append(None)
+    return out
+
+
+def business_days_until_many(target_dates: Sequence, today: Optional[datetime.date] = None) -> List[Optional[int]]:
+    """
+    business_days_until의 다건 버전. 입력 순서대로 결과 반환(파싱 실패/빈 값은 None).
+    영업일 테이블 범위 안의 날짜는 numpy 인덱싱 한 번으로 계산한다.
+    """
+    base = today or datetime.date.today()
+    parsed = _parse_dates(target_dates)
+    valid = [d for d in parsed if d is not None]
+    if not valid:
+        return [None] * len(parsed)
+
+    min_year, max_year = _window_limits()
+    in_window = [d for d in valid if min_year <= d.year <= max_year]
+    cal = _get_calendar(base, *in_window) if in_window else None
+
+    result: List[Optional[int]] = [None] * len(parsed)
+    fast_pos: List[int] = []
+    fast_idx: List[int] = []
+    for pos, d in enumerate(parsed):
+        if d is None:
+            continue
+        if cal is not None and cal.covers(d):
+            fast_pos.append(pos)
+            fast_idx.append(cal.index(d))
+        else:
+            result[pos] = business_days_between(base, d)
+
+    if fast_pos and cal is not None:
+        p = cal.prefix
+        s = cal.index(base)
+        idx = np.asarray(fast_idx, dtype=np.int64)
+        forward = p[idx + 1] - p[s + 1]
+        backward = -(p[s] - p[idx])
+        values = np.where(idx >= s, forward, backward)
+        for pos, v in zip(fast_pos, values.tolist()):
+            result[pos] = int(v)
+    return result
+
+
+def business_days_between_many(starts: Sequence, ends: Sequence) -> List[Optional[int]]:
+    """
+    (start, end) 쌍 다건 영업일 수. numpy.busday_count와 공휴일 배열로 벡터화.
+    의미는 business_days_between과 동일(end > start: (start, end], end < start: -[end, start)).
+    """
+    s_parsed = _parse_dates(starts)
+    e_parsed = _parse_dates(ends)
+    if len(s_parsed) != len(e_parsed):
+        raise ValueError("starts와 ends의 길이가 같아야 합니다.")
+
+    pairs = [(i, s, e) for i, (s, e) in enumerate(zip(s_parsed, e_parsed)) if s is not None and e is not None]
+    result: List[Optional[int]] = [None] * len(s_parsed)
+    if not pairs:
+        return result
+
+    all_dates = [d for _, s, e in pairs for d in (s, e)]
+    cal = _get_calendar(*all_dates)
+    if cal is None:
+        for i, s, e in pairs:
+            result[i] = business_days_between(s, e)
+        return result
 
+    one_day = np.timedelta64(1, "D")
+    s_arr = np.array([s for _, s, _ in pairs], dtype="datetime64[D]")
+    e_arr = np.array([e for _, _, e in pairs], dtype="datetime64[D]")
+    # numpy.busday_count(begin, end)는 [begin, end) 구간 → (start, end]는 [start+1, end+1)
+    forward = np.busday_count(s_arr + one_day, e_arr + one_day, holidays=cal.holidays)
+    backward = -np.busday_count(e_arr, s_arr, holidays=cal.holidays)
+    values = np.where(e_arr >= s_arr, forward, backward)
+    for (i, _, _), v in zip(pairs, values.tolist()):
+        result[i] = int(v)
+    return result
@@ -0,0 +1,341 @@
+"""
+캘린더 이벤트 피드 (/api/orders)
+
+- 월(YYYY-MM) 단위 버킷으로 이벤트 목록을 만들어 프로세스 메모리에 캐시
+- 변경 감지: 트리거가 INSERT/UPDATE마다 orders.feed_version(orders_feed_seq 번호, build step 24)과
+  orders.feed_xid(쓴 트랜잭션 id, pg_current_xact_id, build step 29)를 기록
+  (UPDATE는 이벤트에 쓰이는 컬럼 값이 바뀐 경우만 - build step 30, 지오코딩/백필 UPDATE는 제외)
+  + order_feed_tombstones(하드 삭제, 같은 두 값)
+- 커서 = 커밋 워터마크: 조회 시점 스냅샷의 xmin (pg_snapshot_xmin(pg_current_snapshot()))
+  - xmin 미만 트랜잭션은 모두 끝났으므로, 다음 조회는 feed_xid >= 이전 커서인 행만 보면 된다
+  - 시퀀스 번호는 커밋 전에 발급되므로 커서로 쓰지 않음 (대량 변경 트랜잭션이 늦게 커밋돼도 누락 없음)
+  - 진행 중 트랜잭션이 있으면 같은 행이 다시 잡힐 수 있음 → 반영한 (id, feed_version)은 건너뜀
+    (델타 중복 전달은 클라이언트가 id로 덮어쓰므로 무해)
+- 요청 시 바뀐 주문만 읽어 이전/새 이벤트가 속한 월 버킷만 무효화
+- 응답 ETag = 버킷 ETag + 필터 조합 (strong) → 변경 없으면 304
+- since=<cursor>: 해당 커서 이후 변경된 주문의 이벤트/삭제 id만 반환 (델타 동기화)
+- step 29 미실행 시 캐시 없이 매 요청 월 버킷을 새로 계산 (ETag/304는 동일하게 동작)
+- Flask app import 없이 재사용 가능
+"""
+
+from __future__ import annotations
+
+import datetime
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import or_, text
+
+from build_steps import step_ready
+from models import ORDER_DATE_COLUMNS, Order
+from order_dates import parse_order_date
+from order_rows import PRODUCT_SUMMARY, OrderRow
+
+FEED_RESCAN_SECONDS = 5    # 시퀀스/워터마크 변화가 없어도 진행 중 트랜잭션 구간을 다시 확인하는 주기
+DELTA_LIMIT = 2000         # 한 번에 처리할 변경 주문 수 (초과 시 전체 재적재)
+MAX_BUCKETS = 36           # 캐시할 월 버킷 수
+
+STATUS_COLORS = {
+    'RECEIVED': '#3788d8',   # Blue
+    'MEASURED': '#f39c12',   # Orange
+    'SCHEDULED': '#e74c3c',  # Red
+    'SHIPPED_PENDING': '#ff6b35', # Bright Orange
+    'COMPLETED': '#2ecc71',  # Green
+    'AS_RECEIVED': '#9b59b6', # Purple
+    'AS_COMPLETED': '#1abc9c'  # Teal
+}
+
+_ALL_DAY_TIMES = ('종일', '오전', '오후')
+
+
+def build_event(row: OrderRow) -> Optional[Dict[str, Any]]:
+    """주문 1건 → FullCalendar 이벤트 (표시할 날짜가 없으면 None)"""
+    if row.is_erp_beta and row.measurement_date:
+        # ERP Beta 주문은 실측일이 있으면 상태와 관계없이 실측일 기준으로 표시
+        start_date = row.measurement_date
+    else:
+        start_date = {
+            'RECEIVED': row.received_date,
+            'MEASURED': row.measurement_date,
+            'SCHEDULED': row.scheduled_date,
+            'SHIPPED_PENDING': row.scheduled_date,
+            'COMPLETED': row.completion_date,
+            'AS_RECEIVED': row.as_received_date,
+            'AS_COMPLETED': row.as_completed_date,
+        }.get(row.status)
+    if not start_date:
+        return None
+
+    time_str = {'RECEIVED': row.received_time, 'MEASURED': row.measurement_time}.get(row.status)
+    if row.status == 'MEASURED' and row.measurement_time in _ALL_DAY_TIMES:
+        start, all_day = start_date, True
+    elif time_str:
+        start, all_day = f"{start_date}T{time_str}:00", False
+    else:
+        start, all_day = start_date, True
+
+    color = STATUS_COLORS.get(row.status, '#3788d8')
+    return {
+        'id': row.id,
+        'title': f"{row.customer_name} | {row.phone} | {row.product}",
+        'start': start,
+        'allDay': all_day,
+        'backgroundColor': color,
+        'borderColor': color,
+        'extendedProps': {
+            'customer_name': row.customer_name,
+            'phone': row.phone,
+            'address': row.address,
+            'product': row.product,
+            'options': row.options,
+            'notes': row.notes,
+            'status': row.status,
+            'received_date': row.received_date,
+            'received_time': row.received_time,
+            'measurement_date': row.measurement_date,
+            'measurement_time': row.measurement_time,
+            'completion_date': row.completion_date,
+            'scheduled_date': row.scheduled_date,
+            'as_received_date': row.as_received_date,
+            'as_completed_date': row.as_completed_date,
+            'manager_name': row.manager_name,
+        },
+    }
+
+
+def _order_entry(order: Order) -> Tuple[Optional[datetime.date], Optional[Dict[str, Any]]]:
+    """(이벤트 날짜, 이벤트) - 삭제 주문/날짜 없음/해석 불가면 (None, None)"""
+    if order.status == 'DELETED':
+        return None, None
+    event = build_event(OrderRow.from_order(order, product_mode=PRODUCT_SUMMARY))
+    day = parse_order_date(event['start']) if event else None
+    return (day, event) if day else (None, None)
+
+
+def _month_key(day: datetime.date) -> str:
+    return day.strftime('%Y-%m')
+
+
+def _months(start: datetime.date, end: datetime.date) -> List[str]:
+    keys = []
+    cur = start.replace(day=1)
+    while cur <= end:
+        keys.append(_month_key(cur))
+        cur = (cur.replace(day=28) + datetime.timedelta(days=4)).replace(day=1)
+    return keys
+
+
+def event_status_matches(event: Dict[str, Any], status: Optional[str]) -> bool:
+    if not status:
+        return True
+    event_status = event['extendedProps']['status']
+    # 접수 탭에서는 RECEIVED와 ON_HOLD 상태를 모두 표시
+    return event_status in ('RECEIVED', 'ON_HOLD') if status == 'RECEIVED' else event_status == status
+
+
+def _month_orders(db, month: str) -> List[Order]:
+    """월 버킷 후보 주문 (일정 날짜 중 하나라도 해당 월이면 후보, 이벤트 날짜는 build_event 기준)"""
+    first = datetime.datetime.strptime(month + '-01', '%Y-%m-%d').date()
+    last = (first.replace(day=28) + datetime.timedelta(days=4)).replace(day=1) - datetime.timedelta(days=1)
+    if step_ready(db, 23):
+        conds = [getattr(Order, typed).between(first, last) for _source, typed in ORDER_DATE_COLUMNS]
+    else:
+        conds = [getattr(Order, source).between(first.isoformat(), last.isoformat()) for source, _typed in ORDER_DATE_COLUMNS]
+    conds += [
+        Order.erp_measurement_date.between(first.isoformat(), last.isoformat()),
+        Order.erp_construction_date.between(first.isoformat(), last.isoformat()),
+    ]
+    return db.query(Order).filter(Order.status != 'DELETED', or_(*conds)).order_by(Order.id).all()
+
+
+class _Bucket:
+    __slots__ = ('month', 'entries', 'etag')
+
+    def __init__(self, month: str, entries: List[Tuple[datetime.date, Dict[str, Any]]]):
+        self.month = month
+        self.entries = entries
+        body = json.dumps([e for _d, e in entries], ensure_ascii=False, sort_keys=True, default=str)
+        self.etag = hashlib.sha1(body.encode('utf-8')).hexdigest()
+
+
+def feed_watermark(db) -> Tuple[int, int]:
+    """
+    (커밋 워터마크, 시퀀스 head).
+    워터마크 = 현재 스냅샷 xmin: 이보다 작은 트랜잭션은 모두 커밋/롤백 완료 → 이후 커밋될 행은 feed_xid >= 워터마크.
+    head는 '새로 쓴 행이 있는지' 빠른 확인용 (커서로 쓰지 않음)
+    """
+    row = db.execute(text("""
+        SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint AS xmin,
+               CASE WHEN s.is_called THEN s.last_value ELSE 0 END AS head
+        FROM orders_feed_seq s
+    """)).fetchone()
+    return int(row.xmin), int(row.head)
+
+
+def _changes_since(db, after: int):
+    """feed_xid >= after (after 시점에 진행 중이었거나 이후 시작된 트랜잭션)가 쓴 주문/삭제 → 가벼운 행 목록"""
+    changed = db.execute(text("""
+        SELECT id, feed_version FROM orders
+        WHERE feed_xid >= :after
+        ORDER BY feed_xid, feed_version
+        LIMIT :limit
+    """), {"after": after, "limit": DELTA_LIMIT + 1}).fetchall()
+    tombstones = db.execute(
+        text("SELECT order_id, feed_version FROM order_feed_tombstones WHERE feed_xid >= :after"),
+        {"after": after},
+    ).fetchall()
+    return changed, tombstones
+
+
+def _load_orders(db, ids: List[int]) -> List[Order]:
+    if not ids:
+        return []
+    return db.query(Order).filter(Order.id.in_(ids)).order_by(Order.id).all()
+
+
+class CalendarFeed:
+    """프로세스 단위 월 버킷 캐시"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets: "OrderedDict[str, _Bucket]" = OrderedDict()
+        self._order_months: Dict[int, str] = {}
+        self._applied: Dict[int, int] = {}  # 워터마크 이후 구간에서 이미 반영한 (주문 id → feed_version)
+        self._cursor: Optional[int] = None  # 커밋 워터마크 (feed_xid 기준)
+        self._head = 0
+        self._scanned_at = 0.0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+            self._order_months.clear()
+            self._applied.clear()
+            self._cursor = None
+
+    def _invalidate(self, month: Optional[str]) -> None:
+        if month:
+            self._buckets.pop(month, None)
+
+    def _sync(self, db) -> int:
+        watermark, head = feed_watermark(db)
+        if self._cursor is None or not self._buckets:
+            self._cursor, self._head, self._scanned_at = watermark, head, time.monotonic()
+            self._applied.clear()
+            return watermark
+        if (watermark == self._cursor and head == self._head
+                and time.monotonic() - self._scanned_at < FEED_RESCAN_SECONDS):
+            return watermark
+
+        # 이전 워터마크 이후 트랜잭션이 쓴 행 (이전 조회 때 진행 중이던 트랜잭션 포함)
+        changed, tombstones = _changes_since(db, self._cursor)
+        if len(changed) > DELTA_LIMIT:
+            self._buckets.clear()
+            self._order_months.clear()
+            self._applied.clear()
+        else:
+            fresh = [r for r in changed if self._applied.get(r.id) != r.feed_version]
+            for order in _load_orders(db, [r.id for r in fresh]):
+                self._invalidate(self._order_months.pop(order.id, None))
+                day, _event = _order_entry(order)
+                if day:
+                    self._invalidate(_month_key(day))
+            for r in fresh:
+                self._applied[r.id] = r.feed_version
+            for t in tombstones:
+                if self._applied.get(t.order_id) == t.feed_version:
+                    continue
+                self._applied[t.order_id] = t.feed_version
+                self._invalidate(self._order_months.pop(t.order_id, None))
+            # 새 워터마크 이후 구간에 다시 잡힐 수 있는 행만 유지
+            keep = {r.id for r in changed} | {t.order_id for t in tombstones}
+            self._applied = {k: v for k, v in self._applied.items() if k in keep}
+        self._cursor, self._head = watermark, head
+        self._scanned_at = time.monotonic()
+        return watermark
+
+    def _build(self, db, month: str) -> _Bucket:
+        entries = []
+        for order in _month_orders(db, month):
+            day, event = _order_entry(order)
+            if day and _month_key(day) == month:
+                entries.append((day, event))
+        return _Bucket(month, entries)
+
+    def _bucket(self, db, month: str) -> _Bucket:
+        bucket = self._buckets.get(month)
+        if bucket is not None:
+            self._buckets.move_to_end(month)
+            return bucket
+        bucket = self._build(db, month)
+        self._buckets[month] = bucket
+        for _day, event in bucket.entries:
+            self._order_months[event['id']] = month
+        while len(self._buckets) > MAX_BUCKETS:
+            self._buckets.popitem(last=False)
+        return bucket
+
+    def events(
+        self,
+        db,
+        start: datetime.date,
+        end: datetime.date,
+        status: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], str, int]:
+        """기간(start~end, 양끝 포함) 이벤트 → (이벤트 목록, ETag, 커서)"""
+        months = _months(start, end)
+        if step_ready(db, 29):
+            with self._lock:
+                cursor = self._sync(db)
+                buckets = [self._bucket(db, m) for m in months]
+        else:
+            cursor = 0
+            buckets = [self._build(db, m) for m in months]
+
+        etag = hashlib.sha1(
+            f"{start}|{end}|{status or ''}|{'.'.join(b.etag for b in buckets)}".encode('utf-8')
+        ).hexdigest()
+        events = [
+            event
+            for b in buckets
+            for day, event in b.entries
+            if start <= day <= end and event_status_matches(event, status)
+        ]
+        return events, etag, cursor
+
+    def delta(
+        self,
+        db,
+        since: int,
+        start: Optional[datetime.date] = None,
+        end: Optional[datetime.date] = None,
+        status: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        since 커서 이후 변경분: {"cursor", "events": 추가/변경 이벤트, "removed": 제거할 이벤트 id}.
+        변경이 너무 많거나 피드 미준비면 {"reset": true} (클라이언트는 전체 재조회)
+        """
+        if not step_ready(db, 29):
+            return {"reset": True, "cursor": 0, "events": [], "removed": []}
+        # 워터마크를 먼저 읽어야 변경 조회 이후 커밋되는 트랜잭션도 다음 커서 구간에 남는다
+        watermark, _head = feed_watermark(db)
+        changed, tombstones = _changes_since(db, since)
+        if len(changed) > DELTA_LIMIT:
+            return {"reset": True, "cursor": watermark, "events": [], "removed": []}
+
+        events, removed = [], []
+        for order in _load_orders(db, [r.id for r in changed]):
+            day, event = _order_entry(order)
+            in_range = day and (start is None or day >= start) and (end is None or day <= end)
+            if in_range and event_status_matches(event, status):
+                events.append(event)
+            else:
+                removed.append(order.id)
+        removed.extend(int(t.order_id) for t in tombstones)
+        return {"reset": False, "cursor": watermark, "events": events, "removed": removed}
+
+
+calendar_feed = CalendarFeed()
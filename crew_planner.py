@@ -0,0 +1,334 @@
+"""
+시공자(crew) 배정 플래너 (출고 대시보드)
+
+- 입력: 기간 내 시공 주문(날짜, 규격 합계 spec_w300_value, 기존 배정 시공자, 위치) + 시공자 설정
+  (data/erp_shipment_settings.json construction_workers: name/capacity/off_dates)
+- 날짜별로 독립 계산:
+  1) 이미 배정된 주문은 고정(해당 시공자들에게 규격을 균등 분배해 용량 차감)
+  2) 미배정 주문을 규격 큰 순서로 greedy 배치 (용량/휴무 준수, 비용 증가가 가장 작은 시공자)
+  3) local search: 주문 이동(relocate) / 교환(swap)으로 비용 감소가 없을 때까지 개선 (시간 제한)
+- 비용: 이동거리(좌표가 있으면 시공자별 중심점까지 km, 없으면 주소 권역이 다를 때 벌점)
+        + 시공자 투입 비용(여유 인원 확보) + 부하 균형 항
+- 제안만 계산하며 저장하지 않음 (배정 저장은 기존 /api/erp/shipment/update)
+- Flask app import 없이 재사용 가능
+"""
+
+from __future__ import annotations
+
+import datetime
+import math
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from erp_panels import (
+    construction_date_key,
+    construction_scope,
+    in_window,
+    normalize_worker_name,
+    order_construction_workers,
+    order_spec_units,
+)
+from models import GEO_OK, Order
+
+# 비용 가중치 (km 환산)
+AREA_PENALTY_KM = 15.0    # 좌표 없는 주문끼리 권역(시/구)이 다를 때
+CREW_OPEN_KM = 10.0       # 시공자 1명 추가 투입
+LOAD_BALANCE_KM = 4.0     # (부하율)^2 가중치
+DEFAULT_TIME_BUDGET = 0.5  # 초, 전체 기간 local search 상한
+
+
+@dataclass(frozen=True)
+class PlanOrder:
+    order_id: int
+    date: str  # YYYY-MM-DD
+    units: float
+    workers: Tuple[str, ...] = ()  # 기존 배정 시공자 (정규화 이름) - 있으면 고정
+    area: Optional[str] = None     # 주소 권역 (예: '서울 강남구')
+    lat: Optional[float] = None
+    lng: Optional[float] = None
+
+
+@dataclass(frozen=True)
+class Crew:
+    name: str
+    capacity: float
+    off_dates: frozenset = frozenset()
+
+    @property
+    def key(self) -> str:
+        return normalize_worker_name(self.name)
+
+
+def crews_from_settings(workers: Iterable[Dict[str, Any]]) -> List[Crew]:
+    """normalize_erp_shipment_workers 결과 → Crew 목록"""
+    crews = []
+    for w in workers or []:
+        name = str(w.get('name') or '').strip()
+        if not name:
+            continue
+        crews.append(Crew(
+            name=name,
+            capacity=float(w.get('capacity') or 0),
+            off_dates=frozenset(str(d) for d in (w.get('off_dates') or [])),
+        ))
+    return crews
+
+
+def address_area(address: Optional[str]) -> Optional[str]:
+    """주소 → 권역 (앞 두 단어: 시/도 + 시/군/구)"""
+    parts = str(address or '').split()
+    if not parts:
+        return None
+    return ' '.join(parts[:2])
+
+
+def _haversine_km(a: Tuple[float, float], b: Tuple[float, float]) -> float:
+    lat1, lng1 = map(math.radians, a)
+    lat2, lng2 = map(math.radians, b)
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 12742.0 * math.asin(min(1.0, math.sqrt(h)))
+
+
+class _Slot:
+    """시공자 1명의 하루 배정 상태"""
+
+    __slots__ = ('crew', 'capacity', 'pinned_load', 'pinned', 'orders')
+
+    def __init__(self, crew: Crew):
+        self.crew = crew
+        self.capacity = crew.capacity
+        self.pinned_load = 0.0
+        self.pinned: List[PlanOrder] = []
+        self.orders: List[PlanOrder] = []
+
+    @property
+    def load(self) -> float:
+        return self.pinned_load + sum(o.units for o in self.orders)
+
+    def fits(self, units: float, removed: float = 0.0) -> bool:
+        return self.load - removed + units <= self.capacity + 1e-9
+
+
+def _travel(members: Sequence[PlanOrder]) -> float:
+    points = [(o.lat, o.lng) for o in members if o.lat is not None and o.lng is not None]
+    cost = 0.0
+    if len(points) > 1:
+        center = (sum(p[0] for p in points) / len(points), sum(p[1] for p in points) / len(points))
+        cost += sum(_haversine_km(p, center) for p in points)
+    areas = {o.area for o in members if (o.lat is None or o.lng is None) and o.area}
+    if len(areas) > 1:
+        cost += AREA_PENALTY_KM * (len(areas) - 1)
+    return cost
+
+
+def _slot_cost(slot: _Slot, orders: List[PlanOrder], cluster: bool) -> float:
+    members = slot.pinned + orders
+    if not members:
+        return 0.0
+    load = slot.pinned_load + sum(o.units for o in orders)
+    ratio = load / slot.capacity if slot.capacity > 0 else 1.0
+    cost = CREW_OPEN_KM + LOAD_BALANCE_KM * ratio * ratio
+    if cluster:
+        cost += _travel(members)
+    return cost
+
+
+class _DayPlanner:
+    def __init__(self, date: str, crews: Sequence[Crew], orders: Sequence[PlanOrder], cluster: bool):
+        self.date = date
+        self.cluster = cluster
+        self.warnings: List[str] = []
+        self.slots: Dict[str, _Slot] = {c.key: _Slot(c) for c in crews if date not in c.off_dates}
+        off_keys = {c.key for c in crews if date in c.off_dates}
+        self.open: List[PlanOrder] = []
+        for order in orders:
+            assigned = [k for k in order.workers if k in self.slots]
+            for k in order.workers:
+                if k in off_keys:
+                    self.warnings.append(f"주문 {order.order_id}: 휴무 시공자 배정 ({k})")
+            if assigned:
+                share = order.units / len(assigned)
+                for k in assigned:
+                    self.slots[k].pinned.append(order)
+                    self.slots[k].pinned_load += share
+            elif order.workers and any(k in off_keys for k in order.workers):
+                continue  # 휴무자에게 고정된 주문은 재배정하지 않고 경고만 남김
+            else:
+                self.open.append(order)
+        for slot in self.slots.values():
+            if slot.pinned_load > slot.capacity + 1e-9:
+                self.warnings.append(f"{slot.crew.name}: 기존 배정 규격 {round(slot.pinned_load, 1)} > 용량 {slot.capacity:g}")
+        self.unassigned: List[PlanOrder] = []
+
+    def _cost(self, slot: _Slot, orders: Optional[List[PlanOrder]] = None) -> float:
+        return _slot_cost(slot, slot.orders if orders is None else orders, self.cluster)
+
+    def greedy(self) -> None:
+        for order in sorted(self.open, key=lambda o: (-o.units, o.order_id)):
+            best, best_delta = None, None
+            for slot in self.slots.values():
+                if not slot.fits(order.units):
+                    continue
+                delta = self._cost(slot, slot.orders + [order]) - self._cost(slot)
+                if best_delta is None or delta < best_delta - 1e-9:
+                    best, best_delta = slot, delta
+            if best is None:
+                self.unassigned.append(order)
+            else:
+                best.orders.append(order)
+
+    def _try_relocate(self) -> bool:
+        slots = list(self.slots.values())
+        for src in slots:
+            for order in list(src.orders):
+                src_after = [o for o in src.orders if o is not order]
+                gain_src = self._cost(src) - self._cost(src, src_after)
+                for dst in slots:
+                    if dst is src or not dst.fits(order.units):
+                        continue
+                    delta = self._cost(dst, dst.orders + [order]) - self._cost(dst) - gain_src
+                    if delta < -1e-6:
+                        src.orders.remove(order)
+                        dst.orders.append(order)
+                        return True
+        return False
+
+    def _try_swap(self) -> bool:
+        slots = list(self.slots.values())
+        for i, a in enumerate(slots):
+            for b in slots[i + 1:]:
+                for oa in list(a.orders):
+                    for ob in list(b.orders):
+                        if oa.units == ob.units and not self.cluster:
+                            continue
+                        if not a.fits(ob.units, removed=oa.units) or not b.fits(oa.units, removed=ob.units):
+                            continue
+                        a_after = [o for o in a.orders if o is not oa] + [ob]
+                        b_after = [o for o in b.orders if o is not ob] + [oa]
+                        delta = (self._cost(a, a_after) + self._cost(b, b_after)) - (self._cost(a) + self._cost(b))
+                        if delta < -1e-6:
+                            a.orders[:] = a_after
+                            b.orders[:] = b_after
+                            return True
+        return False
+
+    def _try_insert_unassigned(self) -> bool:
+        for order in list(self.unassigned):
+            for slot in self.slots.values():
+                if slot.fits(order.units):
+                    slot.orders.append(order)
+                    self.unassigned.remove(order)
+                    return True
+        return False
+
+    def improve(self, deadline: float) -> int:
+        moves = 0
+        while time.perf_counter() < deadline:
+            if self._try_insert_unassigned() or self._try_relocate() or self._try_swap():
+                moves += 1
+                continue
+            break
+        return moves
+
+    def total_cost(self) -> float:
+        return sum(self._cost(slot) for slot in self.slots.values())
+
+    def result(self) -> Dict[str, Any]:
+        crews = []
+        for slot in sorted(self.slots.values(), key=lambda s: s.crew.name):
+            orders = (
+                [{'order_id': o.order_id, 'units': o.units, 'pinned': True} for o in slot.pinned]
+                + [{'order_id': o.order_id, 'units': o.units, 'pinned': False}
+                   for o in sorted(slot.orders, key=lambda o: o.order_id)]
+            )
+            crews.append({
+                'name': slot.crew.name,
+                'capacity': slot.capacity,
+                'load': round(slot.load, 1),
+                'remaining': round(max(slot.capacity - slot.load, 0), 1),
+                'orders': orders,
+            })
+        return {
+            'date': self.date,
+            'crews': crews,
+            'unassigned': [o.order_id for o in sorted(self.unassigned, key=lambda o: o.order_id)],
+            'idle_workers': sum(1 for s in self.slots.values() if not s.pinned and not s.orders),
+            'cost': round(self.total_cost(), 2),
+            'warnings': self.warnings,
+        }
+
+
+def plan_assignments(
+    orders: Iterable[PlanOrder],
+    crews: Sequence[Crew],
+    cluster: bool = True,
+    time_budget: float = DEFAULT_TIME_BUDGET,
+) -> Dict[str, Any]:
+    """
+    주문/시공자 → 날짜별 배정 제안.
+    반환: {'dates': [날짜별 결과], 'stats': {...}} - 날짜별 crews[].orders, unassigned(용량 초과), warnings
+    """
+    started = time.perf_counter()
+    by_date: Dict[str, List[PlanOrder]] = {}
+    for order in orders:
+        by_date.setdefault(order.date, []).append(order)
+
+    planners = [_DayPlanner(d, crews, by_date[d], cluster) for d in sorted(by_date)]
+    for p in planners:
+        p.greedy()
+    greedy_cost = sum(p.total_cost() for p in planners)
+
+    # 남은 시간 예산을 날짜별로 나눠 개선
+    moves = 0
+    deadline = started + time_budget
+    for i, p in enumerate(planners):
+        remaining = max(deadline - time.perf_counter(), 0.0)
+        moves += p.improve(time.perf_counter() + remaining / (len(planners) - i))
+
+    dates = [p.result() for p in planners]
+    return {
+        'dates': dates,
+        'stats': {
+            'orders': sum(len(v) for v in by_date.values()),
+            'unassigned': sum(len(d['unassigned']) for d in dates),
+            'greedy_cost': round(greedy_cost, 2),
+            'cost': round(sum(d['cost'] for d in dates), 2),
+            'moves': moves,
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 1),
+        },
+    }
+
+
+def _site_address(sd: Any, fallback: Optional[str]) -> Optional[str]:
+    site = sd.get('site') if isinstance(sd, dict) else None
+    if isinstance(site, dict):
+        return site.get('address_full') or site.get('address_main') or fallback
+    return fallback
+
+
+def load_plan_orders(db, base_query, start: datetime.date, end: datetime.date) -> List[PlanOrder]:
+    """
+    기간 내 시공 주문 → PlanOrder 목록 (erp_panels 시공일 규칙/기간 인덱스 사용).
+    좌표는 백그라운드 지오코딩이 저장한 orders.lat/lng(geo_status='OK')만 사용 - 요청 중 변환하지 않음,
+    좌표 없는 주문은 주소 권역으로 비교
+    """
+    key = construction_date_key()
+    rows = construction_scope(db, base_query, start, end).with_entities(
+        key, Order.id, Order.is_erp_beta, Order.structured_data, Order.address,
+        Order.geo_status, Order.lat, Order.lng,
+    ).all()
+    orders = []
+    for day, row in in_window(rows, start, end):
+        sd = row[3]
+        located = row[5] == GEO_OK and row[6] is not None and row[7] is not None
+        orders.append(PlanOrder(
+            order_id=int(row[1]),
+            date=day,
+            units=order_spec_units(sd) if row[2] else 0.0,
+            workers=tuple(order_construction_workers(sd)),
+            area=address_area(_site_address(sd, row[4])),
+            lat=float(row[6]) if located else None,
+            lng=float(row[7]) if located else None,
+        ))
+    return orders
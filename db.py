@@ -43,7 +43,8 @@ def init_db():
         from models import (
             Order, User, AccessLog, SecurityLog,
             ChatRoom, ChatRoomMember, ChatMessage, ChatAttachment,
-            OrderAttachment, OrderEvent, OrderTask
+            OrderAttachment, OrderEvent, OrderTask, OrderAlert, OrderQuest, OrderDateQuarantine,
+            OrderFeedTombstone, GeocodeCacheEntry, DirectionsLeg
         )
         Base.metadata.create_all(bind=engine)
         print("Database tables initialization completed")
@@ -0,0 +1,203 @@
+"""
+카카오 내비 구간 캐시 (출발 좌표 → 도착 좌표: 거리/소요시간/통행료)
+
+- 키: 소수 4자리(약 10m)로 반올림한 출발/도착 좌표 + 출발 시간대(time_bucket) - leg_key()
+  - time_bucket: 시 // DIRECTIONS_TIME_BUCKET_HOURS (교통 상황이 비슷한 시간대끼리 공유), 시간대 무관이면 -1
+- 저장: directions_cache 테이블 (build step 28) + 프로세스 내 LRU
+  - 경로 좌표(폴리라인)는 저장하지 않음 - 지도 경로선은 /api/calculate_route가 그때그때 조회
+- 여러 구간은 get_many()로 DB 1회 조회, 없는 구간만 호출 측이 API로 채워 put()
+- cached_matrix(): 방문지 n개 사이 캐시된 소요시간 행렬 (없는 구간은 NaN) - 동선 최적화 비용으로 사용
+- DB 쓰기는 요청 세션과 분리된 별도 커넥션, build step 28 완료 전에는 프로세스 내 LRU만 사용 (build_steps.engine_step_ready)
+- Flask app import 없이 재사용 가능
+"""
+
+from __future__ import annotations
+
+import datetime
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import text
+
+from build_steps import engine_step_ready
+from db import engine
+
+DIRECTIONS_TTL = datetime.timedelta(days=30)
+DIRECTIONS_TIME_BUCKET_HOURS = 3
+COORD_DECIMALS = 4
+MEMORY_CACHE_SIZE = 20000
+
+LegKey = Tuple[str, str, int]
+
+
+def coord_key(lat: float, lng: float) -> str:
+    return f"{round(float(lat), COORD_DECIMALS):.{COORD_DECIMALS}f},{round(float(lng), COORD_DECIMALS):.{COORD_DECIMALS}f}"
+
+
+def time_bucket(when: Optional[datetime.datetime] = None) -> int:
+    """출발 시각 → 시간대 번호 (None이면 시간대 무관 -1)"""
+    if when is None:
+        return -1
+    return when.hour // DIRECTIONS_TIME_BUCKET_HOURS
+
+
+def leg_key(a_lat: float, a_lng: float, b_lat: float, b_lng: float, bucket: int = -1) -> LegKey:
+    return coord_key(a_lat, a_lng), coord_key(b_lat, b_lng), int(bucket)
+
+
+@dataclass(frozen=True)
+class CachedLeg:
+    distance_m: int
+    duration_s: int
+    toll: int
+    fetched_at: datetime.datetime
+    expires_at: datetime.datetime
+
+    @property
+    def expired(self) -> bool:
+        return self.expires_at <= datetime.datetime.now()
+
+    @property
+    def distance_km(self) -> float:
+        return round(self.distance_m / 1000, 1)
+
+    @property
+    def duration_min(self) -> int:
+        return round(self.duration_s / 60)
+
+
+class DirectionsCache:
+    def __init__(self, memory_size: int = MEMORY_CACHE_SIZE):
+        self.memory_size = memory_size
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[LegKey, CachedLeg]" = OrderedDict()
+        self._counters = {'lookups': 0, 'hits': 0, 'misses': 0, 'expired': 0, 'writes': 0}
+
+    # ---- 저장소 ----
+
+    def _db_ready(self) -> bool:
+        return engine_step_ready(engine, 28)
+
+    def _remember(self, key: LegKey, entry: CachedLeg) -> None:
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += n
+
+    def _load_many(self, keys: Sequence[LegKey]) -> Dict[LegKey, CachedLeg]:
+        found: Dict[LegKey, CachedLeg] = {}
+        missing: List[LegKey] = []
+        with self._lock:
+            for key in keys:
+                entry = self._memory.get(key)
+                if entry is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = entry
+                else:
+                    missing.append(key)
+        if not missing or not self._db_ready():
+            return found
+        try:
+            with engine.connect() as conn:
+                rows = conn.execute(text("""
+                    SELECT c.origin_key, c.dest_key, c.time_bucket, c.distance_m, c.duration_s, c.toll, c.fetched_at, c.expires_at
+                    FROM directions_cache c
+                    JOIN unnest(CAST(:o AS text[]), CAST(:d AS text[]), CAST(:b AS int[])) AS k(o, d, b)
+                      ON c.origin_key = k.o AND c.dest_key = k.d AND c.time_bucket = k.b
+                """), {
+                    "o": [k[0] for k in missing], "d": [k[1] for k in missing], "b": [k[2] for k in missing],
+                }).fetchall()
+        except Exception:
+            return found
+        for row in rows:
+            key = (row.origin_key, row.dest_key, int(row.time_bucket))
+            entry = CachedLeg(
+                distance_m=int(row.distance_m), duration_s=int(row.duration_s), toll=int(row.toll or 0),
+                fetched_at=row.fetched_at, expires_at=row.expires_at,
+            )
+            self._remember(key, entry)
+            found[key] = entry
+        return found
+
+    # ---- 공개 API ----
+
+    def get_many(self, keys: Iterable[LegKey]) -> Dict[LegKey, CachedLeg]:
+        """유효한(만료 전) 구간만 {키: CachedLeg}"""
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+        self._count('lookups', len(keys))
+        entries = self._load_many(keys)
+        valid = {k: e for k, e in entries.items() if not e.expired}
+        self._count('hits', len(valid))
+        self._count('expired', len(entries) - len(valid))
+        self._count('misses', len(keys) - len(entries))
+        return valid
+
+    def get(self, key: LegKey) -> Optional[CachedLeg]:
+        return self.get_many([key]).get(key)
+
+    def put(self, key: LegKey, distance_m: int, duration_s: int, toll: int = 0) -> CachedLeg:
+        now = datetime.datetime.now()
+        entry = CachedLeg(
+            distance_m=int(distance_m), duration_s=int(duration_s), toll=int(toll or 0),
+            fetched_at=now, expires_at=now + DIRECTIONS_TTL,
+        )
+        self._remember(key, entry)
+        self._count('writes')
+        if not self._db_ready():
+            return entry
+        try:
+            with engine.begin() as conn:
+                conn.execute(text("""
+                    INSERT INTO directions_cache
+                        (origin_key, dest_key, time_bucket, distance_m, duration_s, toll, fetched_at, expires_at)
+                    VALUES (:o, :d, :b, :distance_m, :duration_s, :toll, :fetched_at, :expires_at)
+                    ON CONFLICT (origin_key, dest_key, time_bucket) DO UPDATE SET
+                        distance_m = EXCLUDED.distance_m, duration_s = EXCLUDED.duration_s, toll = EXCLUDED.toll,
+                        fetched_at = EXCLUDED.fetched_at, expires_at = EXCLUDED.expires_at
+                """), {
+                    "o": key[0], "d": key[1], "b": key[2], "distance_m": entry.distance_m,
+                    "duration_s": entry.duration_s, "toll": entry.toll,
+                    "fetched_at": entry.fetched_at, "expires_at": entry.expires_at,
+                })
+        except Exception as e:
+            print(f"[DIRECTIONS_CACHE] 저장 실패: {e}")
+        return entry
+
+    def cached_matrix(self, points: Sequence[Tuple[float, float]], bucket: int = -1) -> np.ndarray:
+        """n개 좌표 사이 캐시된 소요시간 행렬 (분, 대각 0, 캐시에 없는 구간 NaN)"""
+        n = len(points)
+        matrix = np.full((n, n), np.nan)
+        np.fill_diagonal(matrix, 0.0)
+        keys = {
+            (i, j): leg_key(points[i][0], points[i][1], points[j][0], points[j][1], bucket)
+            for i in range(n) for j in range(n) if i != j
+        }
+        entries = self.get_many(keys.values())
+        for (i, j), key in keys.items():
+            entry = entries.get(key)
+            if entry is not None:
+                matrix[i, j] = entry.duration_s / 60.0
+        return matrix
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            memory_entries = len(self._memory)
+        counters['hit_rate'] = round(counters['hits'] / counters['lookups'], 4) if counters['lookups'] else None
+        counters['memory_entries'] = memory_entries
+        counters['db_enabled'] = self._db_ready()
+        return counters
+
+
+# 프로세스 공용 인스턴스
+directions_cache = DirectionsCache()
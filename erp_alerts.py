@@ -0,0 +1,311 @@
+"""
+ERP 경보(Alert) 엔진
+
+- structured_data 저장 시점(세션 flush 훅)과 하루 1회 일자 변경(rollover) 시점에만 경보를 계산해
+  order_alerts 테이블에 저장한다.
+- 대시보드는 렌더링마다 주문별 영업일 계산을 하지 않고, order_alerts 인덱스 조회 +
+  SQL GROUP BY 집계만 수행한다.
+- order_alerts 테이블 사용은 step 16 완료 후 (build_steps.step_ready, 앱 재시작 없이 반영)
+- Flask app import 없이 step runner에서도 재사용 가능
+"""
+
+from __future__ import annotations
+
+import datetime
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import event, inspect as sa_inspect, text
+
+from build_steps import step_ready
+from business_calendar import business_days_until, business_days_until_many
+from models import Order
+
+
+# 경보 기준 (영업일)
+MEASUREMENT_ALERT_DAYS = 4
+CONSTRUCTION_ALERT_DAYS = 3
+PRODUCTION_ALERT_DAYS = 2
+DRAWING_OVERDUE_HOURS = 48
+
+
+def _get_path(sd: Optional[Dict[str, Any]], *keys) -> Any:
+    cur: Any = sd or {}
+    for k in keys:
+        if not isinstance(cur, dict):
+            return None
+        cur = cur.get(k)
+    return cur
+
+
+def _within(days: Optional[int], limit: int) -> bool:
+    return days is not None and 0 <= days <= limit
+
+
+def _drawing_due_at(stage: Optional[str], stage_updated_at: Any) -> Optional[datetime.datetime]:
+    """도면/컨펌 단계 진입 후 48h 기한 (naive local time)"""
+    if stage not in ('DRAWING', 'CONFIRM') or not stage_updated_at:
+        return None
+    try:
+        ts = datetime.datetime.fromisoformat(str(stage_updated_at))
+    except Exception:
+        return None
+    if ts.tzinfo is not None:
+        ts = ts.astimezone().replace(tzinfo=None)
+    return ts + datetime.timedelta(hours=DRAWING_OVERDUE_HOURS)
+
+
+def _flags_from_days(stage: Optional[str], meas_d: Optional[int], cons_d: Optional[int]) -> Dict[str, bool]:
+    return {
+        'measurement_d4': _within(meas_d, MEASUREMENT_ALERT_DAYS),
+        'construction_d3': _within(cons_d, CONSTRUCTION_ALERT_DAYS),
+        # 생산 D-2: 아직 시공 단계가 아니면 생산 준비 경보로 간주(MVP)
+        'production_d2': _within(cons_d, PRODUCTION_ALERT_DAYS) and stage not in ('CONSTRUCTION',),
+    }
+
+
+def compute_alert_state(structured_data: Optional[Dict[str, Any]], today: Optional[datetime.date] = None) -> Dict[str, Any]:
+    """
+    structured_data → order_alerts 행 값 (order_id 제외).
+    경보 규칙(영업일 기준, today 기준):
+    - 실측 D-4 / 시공 D-3 / 생산 D-2: 대상일까지 남은 영업일 0~N일
+    - 도면 48h: DRAWING/CONFIRM 단계 진입(stage_updated_at) 후 48시간 경과
+    """
+    base = today or datetime.date.today()
+    stage = _get_path(structured_data, 'workflow', 'stage')
+    meas_date = _get_path(structured_data, 'schedule', 'measurement', 'date')
+    cons_date = _get_path(structured_data, 'schedule', 'construction', 'date')
+    meas_d = business_days_until(meas_date, today=base) if meas_date else None
+    cons_d = business_days_until(cons_date, today=base) if cons_date else None
+
+    row = {
+        'stage': str(stage)[:50] if stage else None,
+        'measurement_date': str(meas_date) if meas_date else None,
+        'construction_date': str(cons_date) if cons_date else None,
+        'measurement_days': meas_d,
+        'construction_days': cons_d,
+        'drawing_due_at': _drawing_due_at(stage, _get_path(structured_data, 'workflow', 'stage_updated_at')),
+        'computed_for': base,
+    }
+    row.update(_flags_from_days(row['stage'], meas_d, cons_d))
+    return row
+
+
+def alerts_view(state: Any, urgent: bool, now: Optional[datetime.datetime] = None) -> Dict[str, Any]:
+    """저장된 경보 상태(dict 또는 OrderAlert 행) → 대시보드 템플릿용 alerts dict"""
+    if isinstance(state, dict) or state is None:
+        get = (state or {}).get
+    else:
+        get = lambda key: getattr(state, key, None)
+    due_at = get('drawing_due_at')
+    current = now or datetime.datetime.now()
+    return {
+        'urgent': bool(urgent),
+        'measurement_d4': bool(get('measurement_d4')),
+        'measurement_days': get('measurement_days'),  # 실제 D-값 표시용
+        'construction_d3': bool(get('construction_d3')),
+        'construction_days': get('construction_days'),  # 실제 D-값 표시용
+        'production_d2': bool(get('production_d2')),
+        'production_days': get('construction_days'),  # 생산도 시공일 기준
+        'drawing_overdue': bool(due_at and due_at <= current),
+    }
+
+
+# -----------------------------
+# DB 반영
+# -----------------------------
+
+_UPSERT_SQL = text("""
+    INSERT INTO order_alerts (
+        order_id, stage, measurement_date, construction_date,
+        measurement_days, construction_days,
+        measurement_d4, construction_d3, production_d2,
+        drawing_due_at, computed_for, updated_at
+    ) VALUES (
+        :order_id, :stage, :measurement_date, :construction_date,
+        :measurement_days, :construction_days,
+        :measurement_d4, :construction_d3, :production_d2,
+        :drawing_due_at, :computed_for, NOW()
+    )
+    ON CONFLICT (order_id) DO UPDATE SET
+        stage = EXCLUDED.stage,
+        measurement_date = EXCLUDED.measurement_date,
+        construction_date = EXCLUDED.construction_date,
+        measurement_days = EXCLUDED.measurement_days,
+        construction_days = EXCLUDED.construction_days,
+        measurement_d4 = EXCLUDED.measurement_d4,
+        construction_d3 = EXCLUDED.construction_d3,
+        production_d2 = EXCLUDED.production_d2,
+        drawing_due_at = EXCLUDED.drawing_due_at,
+        computed_for = EXCLUDED.computed_for,
+        updated_at = NOW()
+""")
+
+
+def upsert_alert_rows(conn, rows: List[Dict[str, Any]]) -> int:
+    """order_alerts 다건 upsert (executemany). conn은 Session/Connection 모두 가능"""
+    if not rows:
+        return 0
+    conn.execute(_UPSERT_SQL, rows)
+    return len(rows)
+
+
+def refresh_order_alerts(db, order_ids: Iterable[int], today: Optional[datetime.date] = None) -> int:
+    """지정 주문들의 경보를 structured_data에서 다시 계산해 저장 (commit은 호출측)"""
+    ids = sorted({int(x) for x in order_ids if x is not None})
+    if not ids:
+        return 0
+    base = today or datetime.date.today()
+    result = db.execute(
+        text("SELECT id, structured_data FROM orders WHERE id = ANY(:ids)"),
+        {"ids": ids},
+    ).fetchall()
+    rows = []
+    for r in result:
+        state = compute_alert_state(r.structured_data if isinstance(r.structured_data, dict) else {}, today=base)
+        state['order_id'] = int(r.id)
+        rows.append(state)
+    return upsert_alert_rows(db, rows)
+
+
+def roll_over_alerts(db, today: Optional[datetime.date] = None, batch_size: int = 1000) -> Dict[str, int]:
+    """
+    일자 변경 처리 (commit은 호출측):
+    1) computed_for < today 인 행: 저장된 실측/시공일로 남은 영업일만 일괄 재계산 (JSON 파싱 없음)
+    2) 경보 행이 없는 ERP Beta 주문(raw SQL 생성 등): structured_data에서 새로 계산
+    """
+    base = today or datetime.date.today()
+    stats = {"rolled": 0, "created": 0}
+
+    stale = db.execute(text("""
+        SELECT order_id, stage, measurement_date, construction_date
+        FROM order_alerts
+        WHERE computed_for < :today
+    """), {"today": base}).fetchall()
+
+    if stale:
+        meas_days = business_days_until_many([r.measurement_date for r in stale], today=base)
+        cons_days = business_days_until_many([r.construction_date for r in stale], today=base)
+        updates = []
+        for r, md, cd in zip(stale, meas_days, cons_days):
+            row = {
+                'order_id': int(r.order_id),
+                'measurement_days': md,
+                'construction_days': cd,
+                'computed_for': base,
+            }
+            row.update(_flags_from_days(r.stage, md, cd))
+            updates.append(row)
+        for i in range(0, len(updates), batch_size):
+            db.execute(text("""
+                UPDATE order_alerts
+                SET measurement_days = :measurement_days,
+                    construction_days = :construction_days,
+                    measurement_d4 = :measurement_d4,
+                    construction_d3 = :construction_d3,
+                    production_d2 = :production_d2,
+                    computed_for = :computed_for,
+                    updated_at = NOW()
+                WHERE order_id = :order_id
+            """), updates[i:i + batch_size])
+        stats["rolled"] = len(updates)
+
+    missing = db.execute(text("""
+        SELECT o.id
+        FROM orders o
+        LEFT JOIN order_alerts a ON a.order_id = o.id
+        WHERE o.is_erp_beta = TRUE AND a.order_id IS NULL
+    """)).fetchall()
+    missing_ids = [int(r.id) for r in missing]
+    for i in range(0, len(missing_ids), batch_size):
+        stats["created"] += refresh_order_alerts(db, missing_ids[i:i + batch_size], today=base)
+
+    return stats
+
+
+_ROLLOVER_LOCK = threading.Lock()
+_LAST_ROLLOVER_DATE: Optional[datetime.date] = None
+
+
+def ensure_alerts_current(db) -> bool:
+    """
+    프로세스당 하루 1회 roll_over_alerts + 자동 Task 일괄 반영 실행 (대시보드 진입 시 호출).
+    경보 갱신 실패 시 False (호출측은 기존 실시간 계산으로 폴백).
+    """
+    global _LAST_ROLLOVER_DATE
+    today = datetime.date.today()
+    if _LAST_ROLLOVER_DATE == today:
+        return True
+    with _ROLLOVER_LOCK:
+        if _LAST_ROLLOVER_DATE == today:
+            return True
+        try:
+            stats = roll_over_alerts(db, today=today)
+            db.commit()
+            _LAST_ROLLOVER_DATE = today
+            if stats["rolled"] or stats["created"]:
+                print(f"[ERP_ALERTS] rollover {today}: rolled={stats['rolled']} created={stats['created']}")
+        except Exception as e:
+            try:
+                db.rollback()
+            except Exception:
+                pass
+            print(f"[ERP_ALERTS] rollover failed: {e}")
+            return False
+
+        # 새로 임박 구간에 들어온 주문의 D-N 자동 Task (실패해도 경보는 유지)
+        try:
+            from erp_automation import roll_over_auto_tasks  # local import
+            roll_over_auto_tasks(db)
+            db.commit()
+        except Exception as e:
+            try:
+                db.rollback()
+            except Exception:
+                pass
+            print(f"[ERP_ALERTS] auto-task rollover warning: {e}")
+        return True
+
+
+# -----------------------------
+# 저장 시점 갱신 (Session flush 훅)
+# -----------------------------
+
+def _after_flush(session, flush_context):
+    rows = []
+    today = datetime.date.today()
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, Order) or obj.id is None or not obj.is_erp_beta:
+            continue
+        state = sa_inspect(obj)
+        if obj not in session.new:
+            changed = (
+                state.attrs.structured_data.history.has_changes()
+                or state.attrs.is_erp_beta.history.has_changes()
+            )
+            if not changed:
+                continue
+        sd = obj.structured_data if isinstance(obj.structured_data, dict) else {}
+        row = compute_alert_state(sd, today=today)
+        row['order_id'] = int(obj.id)
+        rows.append(row)
+
+    if not rows:
+        return
+    conn = session.connection()
+    if not step_ready(conn, 16):
+        return
+    upsert_alert_rows(conn, rows)
+
+
+def refresh_alerts_if_ready(db, order_ids: Iterable[int], today: Optional[datetime.date] = None) -> int:
+    """flush 훅을 거치지 않는 structured_data 변경(jsonb_set raw UPDATE) 후 경보 갱신 (commit은 호출측)"""
+    if not step_ready(db, 16):
+        return 0
+    return refresh_order_alerts(db, order_ids, today=today)
+
+
+def register_alert_hooks(session_factory) -> None:
+    """Order.structured_data 변경이 flush될 때 같은 트랜잭션에서 order_alerts 갱신"""
+    if not event.contains(session_factory, 'after_flush', _after_flush):
+        event.listen(session_factory, 'after_flush', _after_flush)
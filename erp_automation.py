@@ -2,6 +2,9 @@
 ERP Automation (DB 반영) 모듈
 
 - 정책(erp_policy)에서 계산한 AutoTaskSpec을 DB에 upsert하는 역할
+- 주문 1건/여러 건의 spec을 INSERT ... ON CONFLICT 한 번으로 반영
+  (부분 유니크 인덱스 ux_order_tasks_open_auto_key: 열린 Task는 주문당 auto_key 1개)
+- build step 20 완료 전에는 기존 건별 SELECT/UPDATE/INSERT로 폴백 (build_steps.step_ready)
 - Flask app import 없이 step runner에서도 재사용 가능
 """
 
@@ -9,12 +12,28 @@ from __future__ import annotations
 
 import datetime
 import json
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from sqlalchemy import text
 
+from build_steps import step_ready
 from models import OrderTask
-from erp_policy import build_auto_tasks
+from erp_policy import AutoTaskSpec, build_auto_tasks
+
+
+# ON CONFLICT 대상 = 부분 유니크 인덱스 (models.OrderTask.__table_args__ / build step 20)
+_UPSERT_SQL = text("""
+    INSERT INTO order_tasks (order_id, title, status, owner_team, owner_user_id, due_date, meta, created_at, updated_at)
+    SELECT r.order_id, r.title, 'OPEN', r.owner_team, NULL, r.due_date, r.meta, NOW(), NOW()
+    FROM jsonb_to_recordset(CAST(:rows AS JSONB))
+        AS r(order_id INTEGER, title TEXT, owner_team TEXT, due_date TEXT, meta JSONB)
+    ON CONFLICT (order_id, (meta->>'auto_key')) WHERE status IN ('OPEN','IN_PROGRESS')
+    DO UPDATE SET
+        owner_team = COALESCE(EXCLUDED.owner_team, order_tasks.owner_team),
+        due_date = COALESCE(EXCLUDED.due_date, order_tasks.due_date),
+        updated_at = NOW(),
+        meta = COALESCE(EXCLUDED.meta, order_tasks.meta)
+""")
 
 
 def ensure_auto_task(
@@ -26,6 +45,7 @@ def ensure_auto_task(
     due_date: Optional[str],
     meta: Optional[Dict[str, Any]],
 ):
+    """auto_key 1건 upsert (건별 조회 방식, 인덱스 없는 DB용 폴백)"""
     row = db.execute(text("""
         SELECT id FROM order_tasks
         WHERE order_id=:oid
@@ -69,16 +89,93 @@ def ensure_auto_task(
     return None
 
 
+def _spec_row(order_id: int, s: AutoTaskSpec) -> Dict[str, Any]:
+    meta_obj = dict(s.meta) if isinstance(s.meta, dict) else {}
+    meta_obj.setdefault("auto_key", s.auto_key)
+    return {
+        "order_id": int(order_id),
+        "title": s.title,
+        "owner_team": s.owner_team,
+        "due_date": s.due_date,
+        "meta": meta_obj,
+    }
+
+
+def upsert_auto_task_rows(db, rows: List[Dict[str, Any]]) -> int:
+    """
+    spec 행 목록을 INSERT ... ON CONFLICT 한 문장으로 반영 (commit은 호출측).
+    같은 문장에서 한 행을 두 번 갱신할 수 없으므로 (order_id, auto_key) 중복은 마지막 값만 사용.
+    """
+    if not rows:
+        return 0
+    dedup: Dict[Tuple[int, str], Dict[str, Any]] = {}
+    for r in rows:
+        dedup[(r["order_id"], r["meta"]["auto_key"])] = r
+    payload = list(dedup.values())
+
+    if not step_ready(db, 20):
+        for r in payload:
+            ensure_auto_task(
+                db=db,
+                order_id=r["order_id"],
+                auto_key=r["meta"]["auto_key"],
+                title=r["title"],
+                owner_team=r["owner_team"],
+                due_date=r["due_date"],
+                meta=r["meta"],
+            )
+        return len(payload)
+
+    db.execute(_UPSERT_SQL, {"rows": json.dumps(payload, ensure_ascii=False)})
+    return len(payload)
+
+
 def apply_auto_tasks(db, order_id: int, structured_data: Dict[str, Any], now: Optional[datetime.datetime] = None):
+    """주문 1건의 자동 Task 반영 (structured_data 저장 시 호출)"""
     specs = build_auto_tasks(structured_data or {}, now=now)
-    for s in specs:
-        ensure_auto_task(
-            db=db,
-            order_id=order_id,
-            auto_key=s.auto_key,
-            title=s.title,
-            owner_team=s.owner_team,
-            due_date=s.due_date,
-            meta=s.meta,
-        )
+    return upsert_auto_task_rows(db, [_spec_row(order_id, s) for s in specs])
+
+
+def apply_auto_tasks_many(
+    db,
+    orders: Iterable[Tuple[int, Dict[str, Any]]],
+    now: Optional[datetime.datetime] = None,
+    batch_size: int = 500,
+) -> int:
+    """
+    여러 주문의 자동 Task 반영 (백필/일자 변경 시 호출, commit은 호출측).
+    orders: (order_id, structured_data) 목록 - batch_size 주문마다 upsert 1회
+    """
+    total = 0
+    rows: List[Dict[str, Any]] = []
+    pending = 0
+    for order_id, sd in orders:
+        for s in build_auto_tasks(sd or {}, now=now):
+            rows.append(_spec_row(order_id, s))
+        pending += 1
+        if pending >= batch_size:
+            total += upsert_auto_task_rows(db, rows)
+            rows, pending = [], 0
+    if rows:
+        total += upsert_auto_task_rows(db, rows)
+    return total
+
 
+def roll_over_auto_tasks(db, now: Optional[datetime.datetime] = None, batch_size: int = 500) -> int:
+    """
+    일자 변경 시 D-N 임박 자동 Task 반영 (commit은 호출측).
+    order_alerts에서 임박 경보가 켜진 주문만 대상으로 한다(부분 인덱스 사용).
+    """
+    result = db.execute(text("""
+        SELECT o.id, o.structured_data
+        FROM order_alerts a
+        JOIN orders o ON o.id = a.order_id
+        WHERE (a.measurement_d4 OR a.construction_d3 OR a.production_d2)
+          AND o.deleted_at IS NULL
+    """)).fetchall()
+    return apply_auto_tasks_many(
+        db,
+        ((int(r.id), r.structured_data if isinstance(r.structured_data, dict) else {}) for r in result),
+        now=now,
+        batch_size=batch_size,
+    )
@@ -1,12 +1,16 @@
 import argparse
 import datetime
 import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
 from flask import Flask
 
 # app.py의 Flask app과 db 헬퍼를 재사용
 from app import app  # noqa
-from db import get_db
+from db import get_db, engine
 
 
 STEP_SCHEMA = "ERP_BETA_STEP_1_SCHEMA"
@@ -23,6 +27,23 @@ STEP_BACKFILL_AUTO_TASKS = "ERP_DASH_STEP_11_BACKFILL_AUTO_TASKS"
 STEP_POLICY_JSON = "ERP_DASH_STEP_12_POLICY_JSON"
 STEP_TEMPLATES_JSON = "ERP_DASH_STEP_13_TEMPLATES_JSON"
 STEP_ERP_BETA_FLAG = "ERP_DASH_STEP_14_ERP_BETA_FLAG"
+STEP_STRUCTURED_PROJECTION = "ERP_DASH_STEP_15_STRUCTURED_PROJECTION"
+STEP_ORDER_ALERTS = "ERP_DASH_STEP_16_ORDER_ALERTS"
+STEP_QUEST_SUMMARY = "ERP_DASH_STEP_17_QUEST_SUMMARY"
+STEP_ORDER_QUESTS_TABLE = "ERP_DASH_STEP_18_ORDER_QUESTS_TABLE"
+STEP_ORDER_QUESTS_VERSION = "ERP_DASH_STEP_19_ORDER_QUESTS_VERSION"
+STEP_AUTO_TASK_UNIQUE = "ERP_DASH_STEP_20_AUTO_TASK_UNIQUE"
+STEP_PURGE_API_SAVE_ROWS = "ERP_DASH_STEP_21_PURGE_API_SAVE_ROWS"
+STEP_ORDER_SEARCH = "ERP_DASH_STEP_22_ORDER_SEARCH"
+STEP_ORDER_DATES = "ERP_DASH_STEP_23_ORDER_DATES"
+STEP_CALENDAR_FEED = "ERP_DASH_STEP_24_CALENDAR_FEED"
+STEP_PANEL_METRICS = "ERP_DASH_STEP_25_PANEL_METRICS"
+STEP_GEOCODE_CACHE = "ERP_DASH_STEP_26_GEOCODE_CACHE"
+STEP_ORDER_GEO = "ERP_DASH_STEP_27_ORDER_GEO"
+STEP_DIRECTIONS_CACHE = "ERP_DASH_STEP_28_DIRECTIONS_CACHE"
+STEP_FEED_WATERMARK = "ERP_DASH_STEP_29_FEED_WATERMARK"
+STEP_FEED_TRIGGER_COLUMNS = "ERP_DASH_STEP_30_FEED_TRIGGER_COLUMNS"
+STEP_ORDER_DATE_QUARANTINE = "ERP_DASH_STEP_31_ORDER_DATE_QUARANTINE"
 
 
 def _ensure_build_steps_table(db):
@@ -73,6 +94,136 @@ def _get_step_status(db, step_key):
     return dict(row._mapping) if row else None
 
 
+def _get_step_meta(db, step_key):
+    row = db.execute(
+        text("SELECT meta FROM system_build_steps WHERE step_key=:k"),
+        {"k": step_key},
+    ).fetchone()
+    return row.meta if row and isinstance(row.meta, dict) else {}
+
+
+# -----------------------------
+# Backfill 프레임워크
+# - orders.id keyset 범위 청크 단위 처리, 청크마다 별도 세션/commit
+# - 워커 풀로 청크 병렬 실행, 진행률/ETA 출력
+# - 완료된 연속 구간의 마지막 id를 system_build_steps.meta.cursor에 저장 → 재실행 시 이어서
+# -----------------------------
+
+BACKFILL_CHUNK_SIZE = int(os.getenv("ERP_BACKFILL_CHUNK_SIZE", "1000"))
+BACKFILL_WORKERS = int(os.getenv("ERP_BACKFILL_WORKERS", "4"))
+
+# 워커 전용 세션 (scoped_session과 분리: 청크별 독립 트랜잭션)
+_BackfillSession = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+
+def _plan_backfill_chunks(db, scope_sql, after_id, chunk_size):
+    """after_id 이후 대상 주문을 chunk_size개씩 나눈 (lo, hi] id 범위 목록"""
+    bounds = db.execute(text(f"""
+        SELECT id FROM (
+            SELECT id, ROW_NUMBER() OVER (ORDER BY id) AS rn
+            FROM orders
+            WHERE id > :after_id AND ({scope_sql})
+        ) s
+        WHERE rn % :chunk_size = 0
+        ORDER BY id
+    """), {"after_id": after_id, "chunk_size": chunk_size}).fetchall()
+    last = db.execute(
+        text(f"SELECT MAX(id) AS m, COUNT(*) AS c FROM orders WHERE id > :after_id AND ({scope_sql})"),
+        {"after_id": after_id},
+    ).fetchone()
+    db.commit()
+
+    edges = [int(r.id) for r in bounds]
+    if last.m is not None and (not edges or edges[-1] < int(last.m)):
+        edges.append(int(last.m))
+    ranges = []
+    lo = after_id
+    for hi in edges:
+        ranges.append((lo, hi))
+        lo = hi
+    return ranges, int(last.c or 0)
+
+
+def _run_backfill_chunk(process_chunk, lo, hi):
+    session = _BackfillSession()
+    try:
+        n = process_chunk(session, lo, hi)
+        session.commit()
+        return n or 0
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+def run_backfill(db, step_key, scope_sql, process_chunk, chunk_size=None, workers=None):
+    """
+    orders 전체 이력 백필 (step 함수 내부에서 호출, 상태 COMPLETED 처리는 호출측).
+    - scope_sql: 대상 주문 WHERE 조건 (orders 컬럼 기준 SQL 조각)
+    - process_chunk(session, lo, hi): id > lo AND id <= hi 범위 처리 후 처리 건수 반환 (commit은 프레임워크)
+    반환: {"orders": 대상 주문 수, "processed": 처리 건수, "cursor": 마지막 id}
+    """
+    chunk_size = max(1, int(chunk_size or BACKFILL_CHUNK_SIZE))
+    workers = max(1, int(workers or BACKFILL_WORKERS))
+    meta = _get_step_meta(db, step_key)
+    cursor = int(meta.get("cursor") or 0)
+    processed = int(meta.get("processed") or 0)
+
+    ranges, total = _plan_backfill_chunks(db, scope_sql, cursor, chunk_size)
+    if cursor:
+        print(f"  - resume from id>{cursor} ({total} orders left)")
+    if not ranges:
+        return {"orders": 0, "processed": processed, "cursor": cursor}
+
+    done = [False] * len(ranges)
+    watermark = 0  # 완료된 연속 청크 수
+    orders_done = 0
+    t0 = time.time()
+    failure = None
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = {}
+        queue = list(enumerate(ranges))
+        queue.reverse()
+
+        def _submit():
+            while queue and len(pending) < workers:
+                idx, (lo, hi) = queue.pop()
+                pending[pool.submit(_run_backfill_chunk, process_chunk, lo, hi)] = idx
+
+        _submit()
+        while pending:
+            finished, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+            for fut in finished:
+                idx = pending.pop(fut)
+                try:
+                    processed += fut.result()
+                except Exception as e:
+                    failure = failure or e
+                    queue.clear()  # 실행 중인 청크만 마무리하고 중단
+                    continue
+                done[idx] = True
+                orders_done += chunk_size if idx < len(ranges) - 1 else max(total - chunk_size * (len(ranges) - 1), 0)
+
+            while watermark < len(ranges) and done[watermark]:
+                watermark += 1
+            if watermark:
+                cursor = ranges[watermark - 1][1]
+
+            elapsed = time.time() - t0
+            rate = orders_done / elapsed if elapsed > 0 else 0
+            eta = (total - orders_done) / rate if rate > 0 else 0
+            progress = f"{min(orders_done, total)}/{total} orders, {rate:.0f}/s, ETA {eta:.0f}s"
+            _upsert_step(db, step_key, "RUNNING", message=progress, meta={"cursor": cursor, "processed": processed, "chunk_size": chunk_size})
+            print(f"  - {progress} (cursor={cursor})")
+            _submit()
+
+    if failure:
+        raise failure
+    return {"orders": total, "processed": processed, "cursor": cursor}
+
+
 def step_1_schema(db):
     """
     Step 1: orders 테이블에 ERP Beta 컬럼 추가 + 진행상태 기록
@@ -316,8 +467,28 @@ def step_6_events_tasks_tables(db):
         raise
 
 
+def _backfill_workflow_chunk(session, lo, hi):
+    # workflow 키가 없거나 stage가 없는 경우에만 채운다.
+    result = session.execute(text("""
+    UPDATE orders
+    SET structured_data = jsonb_set(
+        COALESCE(structured_data, '{}'::jsonb),
+        '{workflow}',
+        jsonb_build_object(
+            'stage', 'RECEIVED',
+            'stage_updated_at', to_jsonb(NOW()::text)
+        ),
+        true
+    )
+    WHERE id > :lo AND id <= :hi
+      AND structured_data IS NOT NULL
+      AND (structured_data->'workflow' IS NULL OR (structured_data->'workflow'->>'stage') IS NULL OR (structured_data->'workflow'->>'stage') = '');
+    """), {"lo": lo, "hi": hi})
+    return result.rowcount or 0
+
+
 def step_7_backfill_workflow(db):
-    """Step 7: structured_data에 workflow.stage가 없으면 기본값을 채움 (idempotent)"""
+    """Step 7: structured_data에 workflow.stage가 없으면 기본값을 채움 (idempotent, 청크 단위 재개 가능)"""
     _ensure_build_steps_table(db)
     existing = _get_step_status(db, STEP_BACKFILL_WORKFLOW)
     if existing and existing.get("status") == "COMPLETED":
@@ -327,26 +498,11 @@ def step_7_backfill_workflow(db):
     started_at = datetime.datetime.now()
     _upsert_step(db, STEP_BACKFILL_WORKFLOW, "RUNNING", message="Backfilling structured_data.workflow defaults", started_at=started_at)
     try:
-        # workflow 키가 없거나 stage가 없는 경우에만 채운다.
-        db.execute(text("""
-        UPDATE orders
-        SET structured_data = jsonb_set(
-            COALESCE(structured_data, '{}'::jsonb),
-            '{workflow}',
-            jsonb_build_object(
-                'stage', 'RECEIVED',
-                'stage_updated_at', to_jsonb(NOW()::text)
-            ),
-            true
-        )
-        WHERE structured_data IS NOT NULL
-          AND (structured_data->'workflow' IS NULL OR (structured_data->'workflow'->>'stage') IS NULL OR (structured_data->'workflow'->>'stage') = '');
-        """))
-        db.commit()
+        stats = run_backfill(db, STEP_BACKFILL_WORKFLOW, "structured_data IS NOT NULL", _backfill_workflow_chunk)
 
         completed_at = datetime.datetime.now()
-        _upsert_step(db, STEP_BACKFILL_WORKFLOW, "COMPLETED", message="workflow defaults backfilled", completed_at=completed_at)
-        print(f"[OK] {STEP_BACKFILL_WORKFLOW} completed")
+        _upsert_step(db, STEP_BACKFILL_WORKFLOW, "COMPLETED", message=f"workflow defaults backfilled ({stats['processed']} orders)", meta=stats, completed_at=completed_at)
+        print(f"[OK] {STEP_BACKFILL_WORKFLOW} completed ({stats['processed']} orders)")
     except Exception as e:
         db.rollback()
         completed_at = datetime.datetime.now()
@@ -427,8 +583,22 @@ def step_10_auto_tasks(db):
         raise
 
 
+def _backfill_auto_tasks_chunk(session, lo, hi):
+    from erp_automation import apply_auto_tasks_many  # local import
+
+    rows = session.execute(text("""
+        SELECT id, structured_data
+        FROM orders
+        WHERE id > :lo AND id <= :hi
+          AND deleted_at IS NULL AND structured_data IS NOT NULL
+        ORDER BY id
+    """), {"lo": lo, "hi": hi}).fetchall()
+    apply_auto_tasks_many(session, ((int(r.id), r.structured_data if isinstance(r.structured_data, dict) else {}) for r in rows))
+    return len(rows)
+
+
 def step_11_backfill_auto_tasks(db):
-    """Step 11: 기존 주문 structured_data 기반 자동 Task 백필(중복 방지)"""
+    """Step 11: 기존 주문 structured_data 기반 자동 Task 백필(중복 방지, 전체 이력 청크 단위 재개 가능)"""
     _ensure_build_steps_table(db)
     existing = _get_step_status(db, STEP_BACKFILL_AUTO_TASKS)
     if existing and existing.get("status") == "COMPLETED":
@@ -438,20 +608,16 @@ def step_11_backfill_auto_tasks(db):
     started_at = datetime.datetime.now()
     _upsert_step(db, STEP_BACKFILL_AUTO_TASKS, "RUNNING", message="Backfilling auto tasks from structured_data", started_at=started_at)
     try:
-        from models import Order  # local import
-        from erp_automation import apply_auto_tasks  # noqa
-
-        orders = db.query(Order).filter(Order.deleted_at.is_(None), Order.structured_data.isnot(None)).order_by(Order.created_at.desc()).limit(500).all()
-
-        changed = 0
-        for o in orders:
-            sd = o.structured_data or {}
-            apply_auto_tasks(db, o.id, sd)
-            changed += 1
+        stats = run_backfill(
+            db,
+            STEP_BACKFILL_AUTO_TASKS,
+            "deleted_at IS NULL AND structured_data IS NOT NULL",
+            _backfill_auto_tasks_chunk,
+        )
 
-        db.commit()
+        changed = stats["processed"]
         completed_at = datetime.datetime.now()
-        _upsert_step(db, STEP_BACKFILL_AUTO_TASKS, "COMPLETED", message=f"Backfilled auto tasks for {changed} orders", completed_at=completed_at)
+        _upsert_step(db, STEP_BACKFILL_AUTO_TASKS, "COMPLETED", message=f"Backfilled auto tasks for {changed} orders", meta=stats, completed_at=completed_at)
         print(f"[OK] {STEP_BACKFILL_AUTO_TASKS} completed ({changed} orders)")
     except Exception as e:
         try:
@@ -608,12 +774,1135 @@ def step_14_erp_beta_flag(db):
         raise
 
 
+def step_15_structured_projection(db):
+    """
+    Step 15: structured_data 투영 생성 컬럼(erp_stage/erp_*_date/erp_urgent/erp_customer_phone) + 인덱스 (idempotent)
+    - 생성 컬럼이므로 기존 행도 ADD COLUMN 시점에 DB가 채운다(별도 백필 불필요)
+    """
+    _ensure_build_steps_table(db)
+    existing = _get_step_status(db, STEP_STRUCTURED_PROJECTION)
+    if existing and existing.get("status") == "COMPLETED":
+        print(f"[SKIP] {STEP_STRUCTURED_PROJECTION} already completed")
+        return
+
+    started_at = datetime.datetime.now()
+    _upsert_step(db, STEP_STRUCTURED_PROJECTION, "RUNNING", message="Adding structured_data projection columns", started_at=started_at)
+    try:
+        from models import ERP_PROJECTION_COLUMNS, ERP_PROJECTION_INDEXES  # local import
+
+        for name, sql_type, expr in ERP_PROJECTION_COLUMNS:
+            db.execute(text(f"ALTER TABLE orders ADD COLUMN IF NOT EXISTS {name} {sql_type} GENERATED ALWAYS AS ({expr}) STORED"))
+        for index_name, column, where in ERP_PROJECTION_INDEXES:
+            where_sql = f" WHERE {where}" if where else ""
+            db.execute(text(f"CREATE INDEX IF NOT EXISTS {index_name} ON orders({column}){where_sql}"))
+        db.commit()
+
+        completed_at = datetime.datetime.now()
+        _upsert_step(
+            db,
+            STEP_STRUCTURED_PROJECTION,
+            "COMPLETED",
+            message="structured_data projection columns ready",
+            completed_at=completed_at,
+            meta={"orders_columns_added": [c[0] for c in ERP_PROJECTION_COLUMNS]},
+        )
+        print(f"[OK] {STEP_STRUCTURED_PROJECTION} completed")
+    except Exception as e:
+        try:
+            db.rollback()
+        except Exception:
+            pass
+        completed_at = datetime.datetime.now()
+        _upsert_step(db, STEP_STRUCTURED_PROJECTION, "FAILED", message=f"Failed: {str(e)}", completed_at=completed_at)
+        raise
+
+
+def step_16_order_alerts(db):
+    """
+    Step 16: order_alerts(경보 상태 저장) 테이블 + 부분 인덱스 생성 후 ERP Beta 주문 경보 백필 (idempotent)
+    - 이후 갱신은 structured_data 저장 시(flush 훅)와 일자 변경 시(erp_alerts.ensure_alerts_current) 수행
+    """
+    _ensure_build_steps_table(db)
+    existing = _get_step_status(db, STEP_ORDER_ALERTS)
+    if existing and existing.get("status") == "COMPLETED":
+        print(f"[SKIP] {STEP_ORDER_ALERTS} already completed")
+        return
+
+    started_at = datetime.datetime.now()
+    _upsert_step(db, STEP_ORDER_ALERTS, "RUNNING", message="Creating order_alerts table", started_at=started_at)
+    try:
+        db.execute(text("""
+        CREATE TABLE IF NOT EXISTS order_alerts (
+            order_id INTEGER PRIMARY KEY REFERENCES orders(id) ON DELETE CASCADE,
+            stage VARCHAR(50) NULL,
+            measurement_date VARCHAR NULL,
+            construction_date VARCHAR NULL,
+            measurement_days INTEGER NULL,
+            construction_days INTEGER NULL,
+            measurement_d4 BOOLEAN NOT NULL DEFAULT FALSE,
+            construction_d3 BOOLEAN NOT NULL DEFAULT FALSE,
+            production_d2 BOOLEAN NOT NULL DEFAULT FALSE,
+            drawing_due_at TIMESTAMP NULL,
+            computed_for DATE NOT NULL,
+            updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+        );
+        """))
+        db.execute(text("CREATE INDEX IF NOT EXISTS ix_order_alerts_computed_for ON order_alerts(computed_for)"))
+        db.execute(text("CREATE INDEX IF NOT EXISTS ix_order_alerts_measurement_d4 ON order_alerts(order_id) WHERE measurement_d4"))
+        db.execute(text("CREATE INDEX IF NOT EXISTS ix_order_alerts_construction_d3 ON order_alerts(order_id) WHERE construction_d3"))
+        db.execute(text("CREATE INDEX IF NOT EXISTS ix_order_alerts_production_d2 ON order_alerts(order_id) WHERE production_d2"))
+        db.execute(text("CREATE INDEX IF NOT EXISTS ix_order_alerts_drawing_due_at ON order_alerts(drawing_due_at) WHERE drawing_due_at IS NOT NULL"))
+        db.commit()
+
+        from erp_alerts import roll_over_alerts  # local import
+
+        stats = roll_over_alerts(db)
+        db.commit()
+
+        completed_at = datetime.datetime.now()
+        _upsert_step(
+            db,
+            STEP_ORDER_ALERTS,
+            "COMPLETED",
+            message=f"order_alerts ready (created={stats['created']}, rolled={stats['rolled']})",
+            completed_at=completed_at,
+            meta=stats,
+        )
+        print(f"[OK] {STEP_ORDER_ALERTS} completed (created={stats['created']}, rolled={stats['rolled']})")
+    except Exception as e:
+        try:
+            db.rollback()
+        except Exception:
+            pass
+        completed_at = datetime.datetime.now()
+        _upsert_step(db, STEP_ORDER_ALERTS, "FAILED", message=f"Failed: {str(e)}", completed_at=completed_at)
+        raise
+
+
+def step_17_quest_summary(db):
+    """
+    Step 17: orders.erp_quest_summary(현재 Quest 요약) 컬럼 + 팀 필터 GIN 인덱스 + ERP Beta 주문 백필 (idempotent)
+    - 이후 갱신은 Quest 승인/상태 변경, 구조화 데이터 저장 시점에 app에서 수행
+    """
+    _ensure_build_steps_table(db)
+    existing = _get_step_status(db, STEP_QUEST_SUMMARY)
+    if existing and existing.get("status") == "COMPLETED":
+        print(f"[SKIP] {STEP_QUEST_SUMMARY} already completed")
+        return
+
+    started_at = datetime.datetime.now()
+    _upsert_step(db, STEP_QUEST_SUMMARY, "RUNNING", message="Backfilling current quest summaries", started_at=started_at)
+    try:
+        from models import ERP_QUEST_TEAMS_INDEX  # local import
+        from erp_policy import resolve_quest_summary  # local import
+
+        db.execute(text("ALTER TABLE orders ADD COLUMN IF NOT EXISTS erp_quest_summary JSONB NULL"))
+        index_name, index_expr = ERP_QUEST_TEAMS_INDEX
+        db.execute(text(f"CREATE INDEX IF NOT EXISTS {index_name} ON orders USING gin ({index_expr})"))
+        db.commit()
+
+        updated = 0
+        last_id = 0
+        while True:
+            rows = db.execute(text("""
+                SELECT id, structured_data
+                FROM orders
+                WHERE is_erp_beta = TRUE AND id > :last_id
+                ORDER BY id
+                LIMIT 500
+            """), {"last_id": last_id}).fetchall()
+            if not rows:
+                break
+            params = [
+                {
+                    "id": int(r.id),
+                    "summary": json.dumps(
+                        resolve_quest_summary(r.structured_data if isinstance(r.structured_data, dict) else {}),
+                        ensure_ascii=False,
+                    ),
+                }
+                for r in rows
+            ]
+            db.execute(text("UPDATE orders SET erp_quest_summary = CAST(:summary AS JSONB) WHERE id = :id"), params)
+            db.commit()
+            updated += len(params)
+            last_id = int(rows[-1].id)
+
+        completed_at = datetime.datetime.now()
+        _upsert_step(
+            db,
+            STEP_QUEST_SUMMARY,
+            "COMPLETED",
+            message=f"Quest summaries backfilled: {updated}",
+            completed_at=completed_at,
+            meta={"updated": updated},
+        )
+        print(f"[OK] {STEP_QUEST_SUMMARY} completed (updated={updated})")
+    except Exception as e:
+        try:
+            db.rollback()
+        except Exception:
+            pass
+        completed_at = datetime.datetime.now()
+        _upsert_step(db, STEP_QUEST_SUMMARY, "FAILED", message=f"Failed: {str(e)}", completed_at=completed_at)
+        raise
+
+
+def step_18_order_quests_table(db):
+    """
+    Step 18: order_quests 테이블 생성 + structured_data.quests 이관 (idempotent, 재실행 시 남은 주문부터 이어서)
+    - 이관한 주문은 structured_data에서 quests 키를 제거하므로 조건(structured_data ? 'quests')만으로 재개 가능
+    """
+    _ensure_build_steps_table(db)
+    existing = _get_step_status(db, STEP_ORDER_QUESTS_TABLE)
+    if existing and existing.get("status") == "COMPLETED":
+        print(f"[SKIP] {STEP_ORDER_QUESTS_TABLE} already completed")
+        return
+
+    started_at = datetime.datetime.now()
+    _upsert_step(db, STEP_ORDER_QUESTS_TABLE, "RUNNING", message="Migrating structured_data.quests to order_quests", started_at=started_at)
+    try:
+        db.execute(text("""
+        CREATE TABLE IF NOT EXISTS order_quests (
+            id SERIAL PRIMARY KEY,
+            order_id INTEGER NOT NULL REFERENCES orders(id) ON DELETE CASCADE,
+            stage VARCHAR(50) NOT NULL,
+            title VARCHAR(255) NULL,
+            description TEXT NULL,
+            owner_team VARCHAR(50) NULL,
+            owner_person VARCHAR(100) NULL,
+            status VARCHAR(30) NOT NULL DEFAULT 'OPEN',
+            required_approvals JSONB NULL,
+            team_approvals JSONB NULL,
+            extra JSONB NULL,
+            created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+            updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
+            completed_at TIMESTAMP NULL
+        );
+        """))
+        db.execute(text("CREATE INDEX IF NOT EXISTS ix_order_quests_order_stage_status ON order_quests(order_id, stage, status)"))
+        db.commit()
+
+        from models import Order  # local import
+        from erp_quests import migrate_order_quests  # local import
+
+        orders_done = 0
+        quests_moved = 0
+        while True:
+            batch = (
+                db.query(Order)
+                .filter(Order.structured_data.has_key('quests'))
+                .order_by(Order.id.asc())
+                .limit(200)
+                .all()
+            )
+            if not batch:
+                break
+            for order in batch:
+                quests_moved += migrate_order_quests(db, order)
+            db.commit()
+            orders_done += len(batch)
+            print(f"  - migrated orders={orders_done} quests={quests_moved}")
+
+        completed_at = datetime.datetime.now()
+        _upsert_step(
+            db,
+            STEP_ORDER_QUESTS_TABLE,
+            "COMPLETED",
+            message=f"order_quests ready (orders={orders_done}, quests={quests_moved})",
+            completed_at=completed_at,
+            meta={"orders": orders_done, "quests": quests_moved},
+        )
+        print(f"[OK] {STEP_ORDER_QUESTS_TABLE} completed (orders={orders_done}, quests={quests_moved})")
+    except Exception as e:
+        try:
+            db.rollback()
+        except Exception:
+            pass
+        completed_at = datetime.datetime.now()
+        _upsert_step(db, STEP_ORDER_QUESTS_TABLE, "FAILED", message=f"Failed: {str(e)}", completed_at=completed_at)
+        raise
+
+
+def step_19_order_quests_version(db):
+    """Step 19: order_quests.version(낙관적 잠금) 컬럼 추가 (idempotent)"""
+    _ensure_build_steps_table(db)
+    existing = _get_step_status(db, STEP_ORDER_QUESTS_VERSION)
+    if existing and existing.get("status") == "COMPLETED":
+        print(f"[SKIP] {STEP_ORDER_QUESTS_VERSION} already completed")
+        return
+
+    started_at = datetime.datetime.now()
+    _upsert_step(db, STEP_ORDER_QUESTS_VERSION, "RUNNING", message="Adding order_quests.version", started_at=started_at)
+    try:
+        db.execute(text("ALTER TABLE order_quests ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1"))
+        db.commit()
+
+        completed_at = datetime.datetime.now()
+        _upsert_step(db, STEP_ORDER_QUESTS_VERSION, "COMPLETED", message="order_quests.version ready", completed_at=completed_at)
+        print(f"[OK] {STEP_ORDER_QUESTS_VERSION} completed")
+    except Exception as e:
+        try:
+            db.rollback()
+        except Exception:
+            pass
+        completed_at = datetime.datetime.now()
+        _upsert_step(db, STEP_ORDER_QUESTS_VERSION, "FAILED", message=f"Failed: {str(e)}", completed_at=completed_at)
+        raise
+
+
+def step_20_auto_task_unique(db):
+    """Step 20: 열린 자동 Task (order_id, auto_key) 부분 유니크 인덱스 (기존 중복은 CANCELLED 처리)"""
+    _ensure_build_steps_table(db)
+    existing = _get_step_status(db, STEP_AUTO_TASK_UNIQUE)
+    if existing and existing.get("status") == "COMPLETED":
+        print(f"[SKIP] {STEP_AUTO_TASK_UNIQUE} already completed")
+        return
+
+    started_at = datetime.datetime.now()
+    _upsert_step(db, STEP_AUTO_TASK_UNIQUE, "RUNNING", message="Creating ux_order_tasks_open_auto_key", started_at=started_at)
+    try:
+        # 같은 주문/auto_key로 열린 Task가 여러 개면 가장 오래된 것만 남김
+        result = db.execute(text("""
+            UPDATE order_tasks t
+            SET status = 'CANCELLED', updated_at = NOW()
+            FROM (
+                SELECT id,
+                       ROW_NUMBER() OVER (PARTITION BY order_id, (meta->>'auto_key') ORDER BY id) AS rn
+                FROM order_tasks
+                WHERE status IN ('OPEN','IN_PROGRESS') AND (meta->>'auto_key') IS NOT NULL
+            ) d
+            WHERE t.id = d.id AND d.rn > 1
+        """))
+        cancelled = result.rowcount or 0
+        db.execute(text("""
+            CREATE UNIQUE INDEX IF NOT EXISTS ux_order_tasks_open_auto_key
+            ON order_tasks (order_id, (meta->>'auto_key'))
+            WHERE status IN ('OPEN','IN_PROGRESS')
+        """))
+        db.commit()
+
+        completed_at = datetime.datetime.now()
+        _upsert_step(db, STEP_AUTO_TASK_UNIQUE, "COMPLETED", message=f"auto_key unique index ready (cancelled duplicates={cancelled})", completed_at=completed_at)
+        print(f"[OK] {STEP_AUTO_TASK_UNIQUE} completed (cancelled duplicates={cancelled})")
+    except Exception as e:
+        try:
+            db.rollback()
+        except Exception:
+            pass
+        completed_at = datetime.datetime.now()
+        _upsert_step(db, STEP_AUTO_TASK_UNIQUE, "FAILED", message=f"Failed: {str(e)}", completed_at=completed_at)
+        raise
+
+
+def step_21_purge_api_save_rows(db):
+    """Step 21: 저장 API가 주문별로 남기던 ERP_BETA_API_SAVE_* 체크포인트 행 정리 (텔레메트리는 erp_telemetry로 이전)"""
+    _ensure_build_steps_table(db)
+    existing = _get_step_status(db, STEP_PURGE_API_SAVE_ROWS)
+    if existing and existing.get("status") == "COMPLETED":
+        print(f"[SKIP] {STEP_PURGE_API_SAVE_ROWS} already completed")
+        return
+
+    started_at = datetime.datetime.now()
+    _upsert_step(db, STEP_PURGE_API_SAVE_ROWS, "RUNNING", message="Deleting ERP_BETA_API_* rows", started_at=started_at)
+    try:
+        result = db.execute(text("""
+            DELETE FROM system_build_steps
+            WHERE step_key LIKE 'ERP\\_BETA\\_API\\_SAVE\\_%' OR step_key = 'ERP_BETA_API_PARSE_TEXT'
+        """))
+        deleted = result.rowcount or 0
+        db.commit()
+
+        completed_at = datetime.datetime.now()
+        _upsert_step(db, STEP_PURGE_API_SAVE_ROWS, "COMPLETED", message=f"Deleted {deleted} API checkpoint rows", completed_at=completed_at)
+        print(f"[OK] {STEP_PURGE_API_SAVE_ROWS} completed (deleted={deleted})")
+    except Exception as e:
+        try:
+            db.rollback()
+        except Exception:
+            pass
+        completed_at = datetime.datetime.now()
+        _upsert_step(db, STEP_PURGE_API_SAVE_ROWS, "FAILED", message=f"Failed: {str(e)}", completed_at=completed_at)
+        raise
+
+
+def step_22_order_search(db):
+    """Step 22: 주문 검색 문서(search_document) 생성 컬럼 + pg_trgm/bigram GIN 인덱스"""
+    _ensure_build_steps_table(db)
+    existing = _get_step_status(db, STEP_ORDER_SEARCH)
+    if existing and existing.get("status") == "COMPLETED":
+        print(f"[SKIP] {STEP_ORDER_SEARCH} already completed")
+        return
+
+    started_at = datetime.datetime.now()
+    _upsert_step(db, STEP_ORDER_SEARCH, "RUNNING", message="Creating orders.search_document + search indexes", started_at=started_at)
+    try:
+        from models import ORDER_SEARCH_DOCUMENT_EXPR, ORDER_SEARCH_INDEXES  # local import
+
+        db.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        # 2글자 검색어(한글 이름 등)는 trigram이 없으므로 공백 없는 bigram 배열을 별도 GIN 인덱싱
+        db.execute(text("""
+            CREATE OR REPLACE FUNCTION foms_search_bigrams(doc TEXT) RETURNS TEXT[]
+            LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+                SELECT COALESCE(array_agg(DISTINCT g), '{}')
+                FROM (
+                    SELECT substr(doc, i, 2) AS g
+                    FROM generate_series(1, GREATEST(length(doc) - 1, 0)) AS i
+                ) s
+                WHERE g !~ '\\s'
+            $$
+        """))
+        db.execute(text(f"ALTER TABLE orders ADD COLUMN IF NOT EXISTS search_document TEXT GENERATED ALWAYS AS ({ORDER_SEARCH_DOCUMENT_EXPR}) STORED"))
+        for index_name, definition in ORDER_SEARCH_INDEXES:
+            db.execute(text(f"CREATE INDEX IF NOT EXISTS {index_name} ON orders {definition}"))
+        db.commit()
+
+        completed_at = datetime.datetime.now()
+        _upsert_step(db, STEP_ORDER_SEARCH, "COMPLETED", message="order search document/indexes ready", completed_at=completed_at,
+                     meta={"indexes": [i[0] for i in ORDER_SEARCH_INDEXES]})
+        print(f"[OK] {STEP_ORDER_SEARCH} completed")
+    except Exception as e:
+        try:
+            db.rollback()
+        except Exception:
+            pass
+        completed_at = datetime.datetime.now()
+        _upsert_step(db, STEP_ORDER_SEARCH, "FAILED", message=f"Failed: {str(e)}", completed_at=completed_at)
+        raise
+
+
+# 일정 문자열 → DATE (해석 불가 시 NULL). order_dates.parse_order_date와 같은 규칙
+_PARSE_DATE_FUNCTION_SQL = r"""
+    CREATE OR REPLACE FUNCTION foms_parse_date(value TEXT) RETURNS DATE
+    LANGUAGE plpgsql IMMUTABLE PARALLEL SAFE AS $$
+    DECLARE
+        v TEXT := btrim(COALESCE(value, ''));
+        m TEXT[];
+        y INTEGER;
+    BEGIN
+        IF v = '' THEN
+            RETURN NULL;
+        END IF;
+        m := regexp_match(v, '^(\d{4})\s*[-./년]\s*(\d{1,2})\s*[-./월]\s*(\d{1,2})');
+        IF m IS NULL THEN
+            m := regexp_match(v, '^(\d{4})(\d{2})(\d{2})');
+        END IF;
+        IF m IS NULL THEN
+            m := regexp_match(v, '^(\d{2})[-./](\d{1,2})[-./](\d{1,2})$');
+            IF m IS NULL THEN
+                RETURN NULL;
+            END IF;
+            m[1] := (2000 + m[1]::INTEGER)::TEXT;
+        END IF;
+        y := m[1]::INTEGER;
+        IF y < 1990 OR y > 2100 THEN
+            RETURN NULL;
+        END IF;
+        RETURN make_date(y, m[2]::INTEGER, m[3]::INTEGER);
+    EXCEPTION WHEN others THEN
+        RETURN NULL;
+    END
+    $$
+"""
+
+
+def _order_date_values_sql(alias):
+    """(컬럼명, 문자열 값, DATE 값) VALUES 목록 - alias: 'o'(orders 행) 또는 'NEW'(트리거)"""
+    from models import ORDER_DATE_COLUMNS  # local import
+
+    return ", ".join(f"('{source}', {alias}.{source}, {alias}.{typed})" for source, typed in ORDER_DATE_COLUMNS)
+
+
+# 해석 불가(값 있음 + DATE NULL)는 기록/갱신, 해석됐거나 비운 컬럼은 격리 해제
+_QUARANTINE_FAILED = "btrim(COALESCE(v.raw_value, '')) <> '' AND v.parsed IS NULL"
+_QUARANTINE_CLEARED = "(btrim(COALESCE(v.raw_value, '')) = '' OR v.parsed IS NOT NULL)"
+
+
+def _create_order_date_quarantine_trigger(db):
+    """
+    order_date_quarantine 유지 트리거 (AFTER INSERT / 일정 문자열 컬럼 UPDATE).
+    BEFORE 동기화 트리거가 채운 DATE 값을 보고 격리 기록/해제 (FK 때문에 AFTER에서 처리)
+    """
+    from models import ORDER_DATE_COLUMNS  # local import
+
+    values = _order_date_values_sql("NEW")
+    db.execute(text(f"""
+        CREATE OR REPLACE FUNCTION foms_orders_date_quarantine() RETURNS TRIGGER
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            DELETE FROM order_date_quarantine q
+            USING (VALUES {values}) AS v(column_name, raw_value, parsed)
+            WHERE q.order_id = NEW.id AND q.column_name = v.column_name AND {_QUARANTINE_CLEARED};
+            INSERT INTO order_date_quarantine (order_id, column_name, raw_value, detected_at)
+            SELECT NEW.id, v.column_name, v.raw_value, NOW()
+            FROM (VALUES {values}) AS v(column_name, raw_value, parsed)
+            WHERE {_QUARANTINE_FAILED}
+            ON CONFLICT (order_id, column_name)
+            DO UPDATE SET raw_value = EXCLUDED.raw_value, detected_at = EXCLUDED.detected_at;
+            RETURN NULL;
+        END
+        $$
+    """))
+    db.execute(text("DROP TRIGGER IF EXISTS foms_orders_date_quarantine ON orders"))
+    db.execute(text(f"""
+        CREATE TRIGGER foms_orders_date_quarantine
+        AFTER INSERT OR UPDATE OF {", ".join(source for source, _typed in ORDER_DATE_COLUMNS)} ON orders
+        FOR EACH ROW EXECUTE FUNCTION foms_orders_date_quarantine()
+    """))
+
+
+def _sync_order_date_quarantine_chunk(session, lo, hi):
+    """id (lo, hi] 주문의 격리 기록을 현재 DATE 값 기준으로 맞춤 (해제 + 기록), 기록 건수 반환"""
+    values = _order_date_values_sql("o")
+    session.execute(text(f"""
+        DELETE FROM order_date_quarantine q
+        USING orders o CROSS JOIN LATERAL (VALUES {values}) AS v(column_name, raw_value, parsed)
+        WHERE o.id > :lo AND o.id <= :hi
+          AND q.order_id = o.id AND q.column_name = v.column_name
+          AND {_QUARANTINE_CLEARED}
+    """), {"lo": lo, "hi": hi})
+    result = session.execute(text(f"""
+        INSERT INTO order_date_quarantine (order_id, column_name, raw_value, detected_at)
+        SELECT o.id, v.column_name, v.raw_value, NOW()
+        FROM orders o
+        CROSS JOIN LATERAL (VALUES {values}) AS v(column_name, raw_value, parsed)
+        WHERE o.id > :lo AND o.id <= :hi
+          AND {_QUARANTINE_FAILED}
+        ON CONFLICT (order_id, column_name)
+        DO UPDATE SET raw_value = EXCLUDED.raw_value, detected_at = EXCLUDED.detected_at
+    """), {"lo": lo, "hi": hi})
+    return result.rowcount or 0
+
+
+def _backfill_order_dates_chunk(session, lo, hi):
+    """id (lo, hi] 주문의 DATE 컬럼 채우기 + 해석 불가 값 격리(order_date_quarantine)"""
+    from models import ORDER_DATE_COLUMNS  # local import
+
+    sets = ", ".join(f"{typed} = foms_parse_date({source})" for source, typed in ORDER_DATE_COLUMNS)
+    result = session.execute(text(f"UPDATE orders SET {sets} WHERE id > :lo AND id <= :hi"), {"lo": lo, "hi": hi})
+    _sync_order_date_quarantine_chunk(session, lo, hi)
+    return result.rowcount or 0
+
+
+def _order_date_quarantine_report(db, samples=5):
+    """격리된 일정 값 컬럼별 건수 + 예시 출력, {컬럼: 건수} 반환"""
+    rows = db.execute(text("""
+        SELECT column_name, COUNT(*) AS c,
+               (array_agg(order_id::TEXT || '=' || raw_value ORDER BY order_id))[1:CAST(:samples AS INTEGER)] AS examples
+        FROM order_date_quarantine
+        GROUP BY column_name
+        ORDER BY column_name
+    """), {"samples": samples}).fetchall()
+    report = {}
+    for r in rows:
+        report[r.column_name] = int(r.c)
+        print(f"  - quarantine {r.column_name}: {r.c} (e.g. {', '.join(r.examples or [])})")
+    if not rows:
+        print("  - quarantine: none")
+    return report
+
+
+def step_23_order_dates(db):
+    """
+    Step 23: 일정 문자열 컬럼 → DATE 컬럼 온라인 이관
+    - foms_parse_date() + 동기화 트리거 먼저 생성(이후 쓰기는 자동 반영), 빈 컬럼 추가는 메타데이터만 변경
+    - 기존 행은 청크 단위 백필(재개 가능), 해석 불가 값은 order_date_quarantine에 기록
+      (이후 쓰기는 foms_orders_date_quarantine 트리거가 기록/해제)
+    - (status, 날짜) 인덱스는 CREATE INDEX CONCURRENTLY (쓰기 차단 없음)
+    """
+    _ensure_build_steps_table(db)
+    existing = _get_step_status(db, STEP_ORDER_DATES)
+    if existing and existing.get("status") == "COMPLETED":
+        print(f"[SKIP] {STEP_ORDER_DATES} already completed")
+        return
+
+    started_at = datetime.datetime.now()
+    _upsert_step(db, STEP_ORDER_DATES, "RUNNING", message="Adding DATE columns + sync trigger", started_at=started_at)
+    try:
+        from models import ORDER_DATE_COLUMNS, ORDER_DATE_INDEXES  # local import
+
+        db.execute(text(_PARSE_DATE_FUNCTION_SQL))
+        for _source, typed in ORDER_DATE_COLUMNS:
+            db.execute(text(f"ALTER TABLE orders ADD COLUMN IF NOT EXISTS {typed} DATE"))
+        db.execute(text("""
+            CREATE TABLE IF NOT EXISTS order_date_quarantine (
+                order_id INTEGER NOT NULL REFERENCES orders(id) ON DELETE CASCADE,
+                column_name VARCHAR(50) NOT NULL,
+                raw_value TEXT NOT NULL,
+                detected_at TIMESTAMP NOT NULL DEFAULT NOW(),
+                PRIMARY KEY (order_id, column_name)
+            )
+        """))
+        assignments = "\n".join(f"NEW.{typed} := foms_parse_date(NEW.{source});" for source, typed in ORDER_DATE_COLUMNS)
+        db.execute(text(f"""
+            CREATE OR REPLACE FUNCTION foms_orders_sync_dates() RETURNS TRIGGER
+            LANGUAGE plpgsql AS $$
+            BEGIN
+                {assignments}
+                RETURN NEW;
+            END
+            $$
+        """))
+        db.execute(text("DROP TRIGGER IF EXISTS foms_orders_sync_dates ON orders"))
+        db.execute(text(f"""
+            CREATE TRIGGER foms_orders_sync_dates
+            BEFORE INSERT OR UPDATE OF {", ".join(source for source, _typed in ORDER_DATE_COLUMNS)} ON orders
+            FOR EACH ROW EXECUTE FUNCTION foms_orders_sync_dates()
+        """))
+        _create_order_date_quarantine_trigger(db)
+        db.commit()
+
+        stats = run_backfill(db, STEP_ORDER_DATES, "TRUE", _backfill_order_dates_chunk)
+
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            for index_name, column in ORDER_DATE_INDEXES:
+                conn.execute(text(
+                    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name} ON orders (status, {column}) WHERE {column} IS NOT NULL"
+                ))
+            conn.execute(text("ANALYZE orders"))
+
+        stats["quarantine"] = _order_date_quarantine_report(db)
+        completed_at = datetime.datetime.now()
+        _upsert_step(db, STEP_ORDER_DATES, "COMPLETED", message=f"order DATE columns ready ({stats['processed']} orders, quarantined={sum(stats['quarantine'].values())})",
+                     meta=stats, completed_at=completed_at)
+        print(f"[OK] {STEP_ORDER_DATES} completed ({stats['processed']} orders)")
+    except Exception as e:
+        try:
+            db.rollback()
+        except Exception:
+            pass
+        completed_at = datetime.datetime.now()
+        _upsert_step(db, STEP_ORDER_DATES, "FAILED", message=f"Failed: {str(e)}", completed_at=completed_at)
+        raise
+
+
+# 캘린더 이벤트(calendar_feed.build_event / OrderRow)가 읽는 컬럼. 이 컬럼이 바뀔 때만 feed_version 갱신
+# (지오코딩 워커 lat/lng/geo_status, step 23/25/27 백필 등은 피드를 건드리지 않음)
+# erp_measurement_date/erp_construction_date, DATE 컬럼은 structured_data/문자열 컬럼에서 파생되므로 제외
+_FEED_TRIGGER_COLUMNS = [
+    "status", "customer_name", "phone", "address", "product", "options", "notes", "manager_name",
+    "received_date", "received_time", "measurement_date", "measurement_time", "scheduled_date",
+    "completion_date", "as_received_date", "as_completed_date", "is_erp_beta", "structured_data",
+]
+
+
+def _create_feed_version_triggers(db):
+    """feed_version 트리거: INSERT는 항상, UPDATE는 캘린더 관련 컬럼 값이 실제로 바뀐 경우만"""
+    cols = ", ".join(_FEED_TRIGGER_COLUMNS)
+    old_cols = ", ".join(f"OLD.{c}" for c in _FEED_TRIGGER_COLUMNS)
+    new_cols = ", ".join(f"NEW.{c}" for c in _FEED_TRIGGER_COLUMNS)
+    db.execute(text("DROP TRIGGER IF EXISTS foms_orders_feed_version ON orders"))
+    db.execute(text("DROP TRIGGER IF EXISTS foms_orders_feed_version_insert ON orders"))
+    db.execute(text("""
+        CREATE TRIGGER foms_orders_feed_version_insert
+        BEFORE INSERT ON orders
+        FOR EACH ROW EXECUTE FUNCTION foms_orders_feed_version()
+    """))
+    db.execute(text(f"""
+        CREATE TRIGGER foms_orders_feed_version
+        BEFORE UPDATE OF {cols} ON orders
+        FOR EACH ROW
+        WHEN (ROW({old_cols}) IS DISTINCT FROM ROW({new_cols}))
+        EXECUTE FUNCTION foms_orders_feed_version()
+    """))
+
+
+def step_24_calendar_feed(db):
+    """
+    Step 24: 캘린더 피드 변경 번호
+    - orders_feed_seq + orders.feed_version (INSERT / 캘린더 관련 컬럼 UPDATE 트리거가 부여)
+    - 하드 삭제는 order_feed_tombstones에 기록 (AFTER DELETE 트리거)
+    - 기존 행은 NULL(변경 이력 없음)로 두므로 백필 불필요
+    """
+    _ensure_build_steps_table(db)
+    existing = _get_step_status(db, STEP_CALENDAR_FEED)
+    if existing and existing.get("status") == "COMPLETED":
+        print(f"[SKIP] {STEP_CALENDAR_FEED} already completed")
+        return
+
+    started_at = datetime.datetime.now()
+    _upsert_step(db, STEP_CALENDAR_FEED, "RUNNING", message="Creating orders.feed_version + triggers", started_at=started_at)
+    try:
+        db.execute(text("CREATE SEQUENCE IF NOT EXISTS orders_feed_seq"))
+        db.execute(text("ALTER TABLE orders ADD COLUMN IF NOT EXISTS feed_version BIGINT"))
+        db.execute(text("""
+            CREATE TABLE IF NOT EXISTS order_feed_tombstones (
+                order_id INTEGER PRIMARY KEY,
+                feed_version BIGINT NOT NULL,
+                deleted_at TIMESTAMP NOT NULL DEFAULT NOW()
+            )
+        """))
+        db.execute(text("CREATE INDEX IF NOT EXISTS ix_order_feed_tombstones_feed_version ON order_feed_tombstones(feed_version)"))
+        db.execute(text("""
+            CREATE OR REPLACE FUNCTION foms_orders_feed_version() RETURNS TRIGGER
+            LANGUAGE plpgsql AS $$
+            BEGIN
+                NEW.feed_version := nextval('orders_feed_seq');
+                RETURN NEW;
+            END
+            $$
+        """))
+        db.execute(text("""
+            CREATE OR REPLACE FUNCTION foms_orders_feed_tombstone() RETURNS TRIGGER
+            LANGUAGE plpgsql AS $$
+            BEGIN
+                INSERT INTO order_feed_tombstones (order_id, feed_version, deleted_at)
+                VALUES (OLD.id, nextval('orders_feed_seq'), NOW())
+                ON CONFLICT (order_id) DO UPDATE
+                SET feed_version = EXCLUDED.feed_version, deleted_at = EXCLUDED.deleted_at;
+                RETURN OLD;
+            END
+            $$
+        """))
+        _create_feed_version_triggers(db)
+        db.execute(text("DROP TRIGGER IF EXISTS foms_orders_feed_tombstone ON orders"))
+        db.execute(text("""
+            CREATE TRIGGER foms_orders_feed_tombstone
+            AFTER DELETE ON orders
+            FOR EACH ROW EXECUTE FUNCTION foms_orders_feed_tombstone()
+        """))
+        db.commit()
+
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_orders_feed_version ON orders (feed_version) WHERE feed_version IS NOT NULL"
+            ))
+
+        completed_at = datetime.datetime.now()
+        _upsert_step(db, STEP_CALENDAR_FEED, "COMPLETED", message="calendar feed versioning ready", completed_at=completed_at)
+        print(f"[OK] {STEP_CALENDAR_FEED} completed")
+    except Exception as e:
+        try:
+            db.rollback()
+        except Exception:
+            pass
+        completed_at = datetime.datetime.now()
+        _upsert_step(db, STEP_CALENDAR_FEED, "FAILED", message=f"Failed: {str(e)}", completed_at=completed_at)
+        raise
+
+
+# 출고 패널 사전 계산 함수. erp_panels.order_spec_units / order_construction_workers와 같은 규칙
+_PANEL_METRICS_FUNCTIONS_SQL = [
+    r"""
+    CREATE OR REPLACE FUNCTION foms_spec_units(sd JSONB) RETURNS DOUBLE PRECISION
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+        SELECT COALESCE(SUM(
+            CASE WHEN m ~ '^([0-9]+\.?[0-9]*|\.[0-9]+)$' THEN round(m::NUMERIC / 300, 1) ELSE 0 END
+        ), 0)::DOUBLE PRECISION
+        FROM (
+            SELECT substring(replace(COALESCE(NULLIF(it->>'spec_width', ''), NULLIF(it->>'spec', ''), ''), ',', '') FROM '[0-9.]+') AS m
+            FROM jsonb_array_elements(CASE WHEN jsonb_typeof(sd->'items') = 'array' THEN sd->'items' ELSE '[]'::JSONB END) AS it
+            WHERE jsonb_typeof(it) = 'object'
+        ) s
+    $$
+    """,
+    r"""
+    CREATE OR REPLACE FUNCTION foms_construction_workers(sd JSONB) RETURNS TEXT[]
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+        SELECT COALESCE(array_agg(DISTINCT lower(btrim(w)) ORDER BY lower(btrim(w))) FILTER (WHERE btrim(w) <> ''), '{}')
+        FROM jsonb_array_elements_text(
+            CASE WHEN jsonb_typeof(sd #> '{shipment,construction_workers}') = 'array'
+                 THEN sd #> '{shipment,construction_workers}' ELSE '[]'::JSONB END
+        ) AS w
+    $$
+    """,
+]
+
+
+def _backfill_panel_metrics_chunk(session, lo, hi):
+    """id (lo, hi] 주문의 규격 합계/배정 시공자 채우기"""
+    result = session.execute(text("""
+        UPDATE orders
+        SET erp_spec_units = foms_spec_units(structured_data),
+            erp_construction_workers = foms_construction_workers(structured_data)
+        WHERE id > :lo AND id <= :hi AND structured_data IS NOT NULL
+    """), {"lo": lo, "hi": hi})
+    return result.rowcount or 0
+
+
+def step_25_panel_metrics(db):
+    """
+    Step 25: 출고 패널 집계용 사전 계산 컬럼 (erp_spec_units, erp_construction_workers)
+    - structured_data 저장 시 BEFORE 트리거가 계산 (ORM/raw SQL 경로 모두)
+    - 기존 행은 청크 단위 백필(재개 가능, structured_data를 건드리지 않으므로 트리거 미발동)
+    """
+    _ensure_build_steps_table(db)
+    existing = _get_step_status(db, STEP_PANEL_METRICS)
+    if existing and existing.get("status") == "COMPLETED":
+        print(f"[SKIP] {STEP_PANEL_METRICS} already completed")
+        return
+
+    started_at = datetime.datetime.now()
+    _upsert_step(db, STEP_PANEL_METRICS, "RUNNING", message="Adding panel metric columns + trigger", started_at=started_at)
+    try:
+        for sql in _PANEL_METRICS_FUNCTIONS_SQL:
+            db.execute(text(sql))
+        db.execute(text("ALTER TABLE orders ADD COLUMN IF NOT EXISTS erp_spec_units DOUBLE PRECISION"))
+        db.execute(text("ALTER TABLE orders ADD COLUMN IF NOT EXISTS erp_construction_workers TEXT[]"))
+        db.execute(text("""
+            CREATE OR REPLACE FUNCTION foms_orders_panel_metrics() RETURNS TRIGGER
+            LANGUAGE plpgsql AS $$
+            BEGIN
+                NEW.erp_spec_units := foms_spec_units(NEW.structured_data);
+                NEW.erp_construction_workers := foms_construction_workers(NEW.structured_data);
+                RETURN NEW;
+            END
+            $$
+        """))
+        db.execute(text("DROP TRIGGER IF EXISTS foms_orders_panel_metrics ON orders"))
+        db.execute(text("""
+            CREATE TRIGGER foms_orders_panel_metrics
+            BEFORE INSERT OR UPDATE OF structured_data ON orders
+            FOR EACH ROW EXECUTE FUNCTION foms_orders_panel_metrics()
+        """))
+        db.commit()
+
+        stats = run_backfill(db, STEP_PANEL_METRICS, "structured_data IS NOT NULL", _backfill_panel_metrics_chunk)
+
+        completed_at = datetime.datetime.now()
+        _upsert_step(db, STEP_PANEL_METRICS, "COMPLETED", message=f"panel metric columns ready ({stats['processed']} orders)",
+                     meta=stats, completed_at=completed_at)
+        print(f"[OK] {STEP_PANEL_METRICS} completed ({stats['processed']} orders)")
+    except Exception as e:
+        try:
+            db.rollback()
+        except Exception:
+            pass
+        completed_at = datetime.datetime.now()
+        _upsert_step(db, STEP_PANEL_METRICS, "FAILED", message=f"Failed: {str(e)}", completed_at=completed_at)
+        raise
+
+
+def step_26_geocode_cache(db):
+    """Step 26: 지오코딩 결과 캐시 테이블 (geocode_cache, 정규화 주소 키 + 만료 시각 인덱스)"""
+    _ensure_build_steps_table(db)
+    existing = _get_step_status(db, STEP_GEOCODE_CACHE)
+    if existing and existing.get("status") == "COMPLETED":
+        print(f"[SKIP] {STEP_GEOCODE_CACHE} already completed")
+        return
+
+    started_at = datetime.datetime.now()
+    _upsert_step(db, STEP_GEOCODE_CACHE, "RUNNING", message="Creating geocode_cache table", started_at=started_at)
+    try:
+        db.execute(text("""
+            CREATE TABLE IF NOT EXISTS geocode_cache (
+                address_key TEXT PRIMARY KEY,
+                address TEXT NOT NULL,
+                lat DOUBLE PRECISION NULL,
+                lng DOUBLE PRECISION NULL,
+                found BOOLEAN NOT NULL DEFAULT TRUE,
+                strategy VARCHAR(50) NULL,
+                confidence DOUBLE PRECISION NULL,
+                provider VARCHAR(30) NOT NULL DEFAULT 'kakao',
+                resolved_at TIMESTAMP NOT NULL DEFAULT NOW(),
+                expires_at TIMESTAMP NOT NULL
+            )
+        """))
+        db.execute(text("CREATE INDEX IF NOT EXISTS ix_geocode_cache_expires_at ON geocode_cache(expires_at)"))
+        db.commit()
+
+        completed_at = datetime.datetime.now()
+        _upsert_step(db, STEP_GEOCODE_CACHE, "COMPLETED", message="geocode_cache ready", completed_at=completed_at)
+        print(f"[OK] {STEP_GEOCODE_CACHE} completed")
+    except Exception as e:
+        try:
+            db.rollback()
+        except Exception:
+            pass
+        completed_at = datetime.datetime.now()
+        _upsert_step(db, STEP_GEOCODE_CACHE, "FAILED", message=f"Failed: {str(e)}", completed_at=completed_at)
+        raise
+
+
+# 지오코딩 대상 주소. order_geocoding.order_geo_address와 같은 규칙
+_GEO_ADDRESS_FUNCTION_SQL = r"""
+    CREATE OR REPLACE FUNCTION foms_geo_address(is_erp BOOLEAN, legacy TEXT, sd JSONB) RETURNS TEXT
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+        SELECT CASE
+            WHEN is_erp AND btrim(COALESCE(sd #>> '{site,address_full}', '')) NOT IN ('', '-')
+                THEN btrim(sd #>> '{site,address_full}')
+            WHEN is_erp AND btrim(COALESCE(sd #>> '{site,address_main}', '')) <> ''
+                THEN btrim(sd #>> '{site,address_main}')
+                     || CASE WHEN btrim(COALESCE(sd #>> '{site,address_detail}', '')) NOT IN ('', '-')
+                             THEN ' ' || btrim(sd #>> '{site,address_detail}') ELSE '' END
+            ELSE NULLIF(btrim(COALESCE(legacy, '')), '')
+        END
+    $$
+"""
+
+
+def _backfill_order_geo_chunk(session, lo, hi):
+    """id (lo, hi] 주문을 지오코딩 큐에 등록 (주소 없으면 NO_ADDRESS)"""
+    result = session.execute(text("""
+        UPDATE orders
+        SET geo_status = CASE WHEN foms_geo_address(is_erp_beta, address, structured_data) IS NULL
+                              THEN 'NO_ADDRESS' ELSE 'PENDING' END,
+            geo_updated_at = NOW()
+        WHERE id > :lo AND id <= :hi AND geo_status IS NULL
+    """), {"lo": lo, "hi": hi})
+    return result.rowcount or 0
+
+
+def step_27_order_geo(db):
+    """
+    Step 27: 주문 좌표 컬럼(lat/lng/geo_status) + 쓰기 시점 지오코딩 큐
+    - 주소가 바뀌는 INSERT/UPDATE마다 트리거가 좌표를 비우고 PENDING 처리 (ORM/raw SQL 경로 모두)
+    - 기존 행은 청크 단위로 PENDING 등록, 좌표는 앱의 order_geocoding 워커 풀이 채움
+    - 큐 조회용 부분 인덱스는 CREATE INDEX CONCURRENTLY
+    """
+    _ensure_build_steps_table(db)
+    existing = _get_step_status(db, STEP_ORDER_GEO)
+    if existing and existing.get("status") == "COMPLETED":
+        print(f"[SKIP] {STEP_ORDER_GEO} already completed")
+        return
+
+    started_at = datetime.datetime.now()
+    _upsert_step(db, STEP_ORDER_GEO, "RUNNING", message="Adding order geo columns + enqueue trigger", started_at=started_at)
+    try:
+        db.execute(text(_GEO_ADDRESS_FUNCTION_SQL))
+        db.execute(text("ALTER TABLE orders ADD COLUMN IF NOT EXISTS lat DOUBLE PRECISION"))
+        db.execute(text("ALTER TABLE orders ADD COLUMN IF NOT EXISTS lng DOUBLE PRECISION"))
+        db.execute(text("ALTER TABLE orders ADD COLUMN IF NOT EXISTS geo_status VARCHAR(20)"))
+        db.execute(text("ALTER TABLE orders ADD COLUMN IF NOT EXISTS geo_updated_at TIMESTAMP"))
+        db.execute(text("""
+            CREATE OR REPLACE FUNCTION foms_orders_geo_enqueue() RETURNS TRIGGER
+            LANGUAGE plpgsql AS $$
+            DECLARE
+                addr TEXT := foms_geo_address(NEW.is_erp_beta, NEW.address, NEW.structured_data);
+            BEGIN
+                IF TG_OP = 'INSERT'
+                   OR addr IS DISTINCT FROM foms_geo_address(OLD.is_erp_beta, OLD.address, OLD.structured_data) THEN
+                    NEW.lat := NULL;
+                    NEW.lng := NULL;
+                    NEW.geo_status := CASE WHEN addr IS NULL THEN 'NO_ADDRESS' ELSE 'PENDING' END;
+                    NEW.geo_updated_at := NOW();
+                END IF;
+                RETURN NEW;
+            END
+            $$
+        """))
+        db.execute(text("DROP TRIGGER IF EXISTS foms_orders_geo_enqueue ON orders"))
+        db.execute(text("""
+            CREATE TRIGGER foms_orders_geo_enqueue
+            BEFORE INSERT OR UPDATE OF address, structured_data, is_erp_beta ON orders
+            FOR EACH ROW EXECUTE FUNCTION foms_orders_geo_enqueue()
+        """))
+        db.commit()
+
+        stats = run_backfill(db, STEP_ORDER_GEO, "geo_status IS NULL", _backfill_order_geo_chunk)
+
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_orders_geo_queue ON orders (geo_status, id) "
+                "WHERE geo_status IN ('PENDING', 'RUNNING', 'ERROR')"
+            ))
+
+        completed_at = datetime.datetime.now()
+        _upsert_step(db, STEP_ORDER_GEO, "COMPLETED", message=f"order geo queue ready ({stats['processed']} orders queued)",
+                     meta=stats, completed_at=completed_at)
+        print(f"[OK] {STEP_ORDER_GEO} completed ({stats['processed']} orders)")
+    except Exception as e:
+        try:
+            db.rollback()
+        except Exception:
+            pass
+        completed_at = datetime.datetime.now()
+        _upsert_step(db, STEP_ORDER_GEO, "FAILED", message=f"Failed: {str(e)}", completed_at=completed_at)
+        raise
+
+
+def step_28_directions_cache(db):
+    """Step 28: 카카오 내비 구간 캐시 테이블 (directions_cache, 반올림 좌표 + 시간대 키)"""
+    _ensure_build_steps_table(db)
+    existing = _get_step_status(db, STEP_DIRECTIONS_CACHE)
+    if existing and existing.get("status") == "COMPLETED":
+        print(f"[SKIP] {STEP_DIRECTIONS_CACHE} already completed")
+        return
+
+    started_at = datetime.datetime.now()
+    _upsert_step(db, STEP_DIRECTIONS_CACHE, "RUNNING", message="Creating directions_cache table", started_at=started_at)
+    try:
+        db.execute(text("""
+            CREATE TABLE IF NOT EXISTS directions_cache (
+                origin_key VARCHAR(40) NOT NULL,
+                dest_key VARCHAR(40) NOT NULL,
+                time_bucket INTEGER NOT NULL DEFAULT -1,
+                distance_m INTEGER NOT NULL,
+                duration_s INTEGER NOT NULL,
+                toll INTEGER NOT NULL DEFAULT 0,
+                fetched_at TIMESTAMP NOT NULL DEFAULT NOW(),
+                expires_at TIMESTAMP NOT NULL,
+                PRIMARY KEY (origin_key, dest_key, time_bucket)
+            )
+        """))
+        db.execute(text("CREATE INDEX IF NOT EXISTS ix_directions_cache_expires_at ON directions_cache(expires_at)"))
+        db.commit()
+
+        completed_at = datetime.datetime.now()
+        _upsert_step(db, STEP_DIRECTIONS_CACHE, "COMPLETED", message="directions_cache ready", completed_at=completed_at)
+        print(f"[OK] {STEP_DIRECTIONS_CACHE} completed")
+    except Exception as e:
+        try:
+            db.rollback()
+        except Exception:
+            pass
+        completed_at = datetime.datetime.now()
+        _upsert_step(db, STEP_DIRECTIONS_CACHE, "FAILED", message=f"Failed: {str(e)}", completed_at=completed_at)
+        raise
+
+
+def step_29_feed_watermark(db):
+    """
+    Step 29: 캘린더 피드 커밋 워터마크
+    - orders.feed_xid / order_feed_tombstones.feed_xid: 변경한 트랜잭션 id (pg_current_xact_id, PostgreSQL 13+)
+    - step 24 트리거 함수가 feed_version과 함께 기록하도록 교체
+    - calendar_feed 커서는 시퀀스 head 대신 스냅샷 xmin (커밋 전 발급 번호로 인한 누락 방지)
+    - 기존 행은 NULL로 두므로 백필 불필요 (워터마크 이후 변경분만 조회)
+    """
+    _ensure_build_steps_table(db)
+    existing = _get_step_status(db, STEP_FEED_WATERMARK)
+    if existing and existing.get("status") == "COMPLETED":
+        print(f"[SKIP] {STEP_FEED_WATERMARK} already completed")
+        return
+
+    # 시퀀스/feed_version/트리거가 먼저 있어야 함
+    step_24_calendar_feed(db)
+
+    started_at = datetime.datetime.now()
+    _upsert_step(db, STEP_FEED_WATERMARK, "RUNNING", message="Adding feed_xid + trigger update", started_at=started_at)
+    try:
+        db.execute(text("ALTER TABLE orders ADD COLUMN IF NOT EXISTS feed_xid BIGINT"))
+        db.execute(text("ALTER TABLE order_feed_tombstones ADD COLUMN IF NOT EXISTS feed_xid BIGINT"))
+        db.execute(text("CREATE INDEX IF NOT EXISTS ix_order_feed_tombstones_feed_xid ON order_feed_tombstones(feed_xid)"))
+        db.execute(text("""
+            CREATE OR REPLACE FUNCTION foms_orders_feed_version() RETURNS TRIGGER
+            LANGUAGE plpgsql AS $$
+            BEGIN
+                NEW.feed_version := nextval('orders_feed_seq');
+                NEW.feed_xid := pg_current_xact_id()::text::bigint;
+                RETURN NEW;
+            END
+            $$
+        """))
+        db.execute(text("""
+            CREATE OR REPLACE FUNCTION foms_orders_feed_tombstone() RETURNS TRIGGER
+            LANGUAGE plpgsql AS $$
+            BEGIN
+                INSERT INTO order_feed_tombstones (order_id, feed_version, feed_xid, deleted_at)
+                VALUES (OLD.id, nextval('orders_feed_seq'), pg_current_xact_id()::text::bigint, NOW())
+                ON CONFLICT (order_id) DO UPDATE
+                SET feed_version = EXCLUDED.feed_version, feed_xid = EXCLUDED.feed_xid, deleted_at = EXCLUDED.deleted_at;
+                RETURN OLD;
+            END
+            $$
+        """))
+        db.commit()
+
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_orders_feed_xid ON orders (feed_xid) WHERE feed_xid IS NOT NULL"
+            ))
+
+        completed_at = datetime.datetime.now()
+        _upsert_step(db, STEP_FEED_WATERMARK, "COMPLETED", message="calendar feed commit watermark ready", completed_at=completed_at)
+        print(f"[OK] {STEP_FEED_WATERMARK} completed")
+    except Exception as e:
+        try:
+            db.rollback()
+        except Exception:
+            pass
+        completed_at = datetime.datetime.now()
+        _upsert_step(db, STEP_FEED_WATERMARK, "FAILED", message=f"Failed: {str(e)}", completed_at=completed_at)
+        raise
+
+
+def step_30_feed_trigger_columns(db):
+    """
+    Step 30: 캘린더 피드 트리거 컬럼 제한
+    - step 24가 만든 BEFORE INSERT OR UPDATE 트리거(모든 UPDATE에 발동)를 교체
+    - INSERT는 항상, UPDATE는 _FEED_TRIGGER_COLUMNS 값이 바뀐 경우만 feed_version/feed_xid 갱신
+    - 지오코딩/백필 UPDATE가 피드 델타를 불필요하게 키우지 않도록 함
+    """
+    _ensure_build_steps_table(db)
+    existing = _get_step_status(db, STEP_FEED_TRIGGER_COLUMNS)
+    if existing and existing.get("status") == "COMPLETED":
+        print(f"[SKIP] {STEP_FEED_TRIGGER_COLUMNS} already completed")
+        return
+
+    # 트리거 함수(feed_xid 포함)가 먼저 있어야 함
+    step_29_feed_watermark(db)
+
+    started_at = datetime.datetime.now()
+    _upsert_step(db, STEP_FEED_TRIGGER_COLUMNS, "RUNNING", message="Recreating feed_version triggers", started_at=started_at)
+    try:
+        _create_feed_version_triggers(db)
+        db.commit()
+
+        completed_at = datetime.datetime.now()
+        _upsert_step(db, STEP_FEED_TRIGGER_COLUMNS, "COMPLETED", message="feed_version triggers limited to calendar columns", completed_at=completed_at)
+        print(f"[OK] {STEP_FEED_TRIGGER_COLUMNS} completed")
+    except Exception as e:
+        try:
+            db.rollback()
+        except Exception:
+            pass
+        completed_at = datetime.datetime.now()
+        _upsert_step(db, STEP_FEED_TRIGGER_COLUMNS, "FAILED", message=f"Failed: {str(e)}", completed_at=completed_at)
+        raise
+
+
+def step_31_order_date_quarantine(db):
+    """
+    Step 31: order_date_quarantine 상시 유지
+    - step 23 격리 기록은 백필 시점 값이라 이후 수정/신규 주문이 반영되지 않았음
+    - foms_orders_date_quarantine 트리거 생성 (일정 컬럼 쓰기 시 격리 기록/해제)
+    - 기존 행은 청크 단위로 현재 DATE 값 기준 재조정 (재개 가능)
+    """
+    _ensure_build_steps_table(db)
+    existing = _get_step_status(db, STEP_ORDER_DATE_QUARANTINE)
+    if existing and existing.get("status") == "COMPLETED":
+        print(f"[SKIP] {STEP_ORDER_DATE_QUARANTINE} already completed")
+        return
+
+    # DATE 컬럼/격리 테이블이 먼저 있어야 함
+    step_23_order_dates(db)
+
+    started_at = datetime.datetime.now()
+    _upsert_step(db, STEP_ORDER_DATE_QUARANTINE, "RUNNING", message="Creating quarantine trigger", started_at=started_at)
+    try:
+        _create_order_date_quarantine_trigger(db)
+        db.commit()
+
+        stats = run_backfill(db, STEP_ORDER_DATE_QUARANTINE, "TRUE", _sync_order_date_quarantine_chunk)
+        stats["quarantine"] = _order_date_quarantine_report(db)
+        completed_at = datetime.datetime.now()
+        _upsert_step(db, STEP_ORDER_DATE_QUARANTINE, "COMPLETED", message=f"order date quarantine maintained by trigger (quarantined={sum(stats['quarantine'].values())})",
+                     meta=stats, completed_at=completed_at)
+        print(f"[OK] {STEP_ORDER_DATE_QUARANTINE} completed")
+    except Exception as e:
+        try:
+            db.rollback()
+        except Exception:
+            pass
+        completed_at = datetime.datetime.now()
+        _upsert_step(db, STEP_ORDER_DATE_QUARANTINE, "FAILED", message=f"Failed: {str(e)}", completed_at=completed_at)
+        raise
+
+
 def main():
+    global BACKFILL_CHUNK_SIZE, BACKFILL_WORKERS
     parser = argparse.ArgumentParser(description="ERP Beta step-by-step builder (resumable via DB checkpoints)")
-    parser.add_argument("--step", choices=["1", "2", "3", "4", "5", "6", "7", "8", "9", "10", "11", "12", "13", "14"], help="Run a single step")
+    parser.add_argument("--step", choices=["1", "2", "3", "4", "5", "6", "7", "8", "9", "10", "11", "12", "13", "14", "15", "16", "17", "18", "19", "20", "21", "22", "23", "24", "25", "26", "27", "28", "29", "30", "31"], help="Run a single step")
     parser.add_argument("--resume", action="store_true", help="Resume from the next incomplete step")
+    parser.add_argument("--chunk-size", type=int, default=None, help=f"Backfill chunk size (default {BACKFILL_CHUNK_SIZE})")
+    parser.add_argument("--workers", type=int, default=None, help=f"Backfill worker count (default {BACKFILL_WORKERS})")
     args = parser.parse_args()
 
+    if args.chunk_size:
+        BACKFILL_CHUNK_SIZE = args.chunk_size
+    if args.workers:
+        BACKFILL_WORKERS = args.workers
+
     with app.app_context():
         db = get_db()
         _ensure_build_steps_table(db)
@@ -660,6 +1949,57 @@ def main():
         if args.step == "14":
             step_14_erp_beta_flag(db)
             return
+        if args.step == "15":
+            step_15_structured_projection(db)
+            return
+        if args.step == "16":
+            step_16_order_alerts(db)
+            return
+        if args.step == "17":
+            step_17_quest_summary(db)
+            return
+        if args.step == "18":
+            step_18_order_quests_table(db)
+            return
+        if args.step == "19":
+            step_19_order_quests_version(db)
+            return
+        if args.step == "20":
+            step_20_auto_task_unique(db)
+            return
+        if args.step == "21":
+            step_21_purge_api_save_rows(db)
+            return
+        if args.step == "22":
+            step_22_order_search(db)
+            return
+        if args.step == "23":
+            step_23_order_dates(db)
+            return
+        if args.step == "24":
+            step_24_calendar_feed(db)
+            return
+        if args.step == "25":
+            step_25_panel_metrics(db)
+            return
+        if args.step == "26":
+            step_26_geocode_cache(db)
+            return
+        if args.step == "27":
+            step_27_order_geo(db)
+            return
+        if args.step == "28":
+            step_28_directions_cache(db)
+            return
+        if args.step == "29":
+            step_29_feed_watermark(db)
+            return
+        if args.step == "30":
+            step_30_feed_trigger_columns(db)
+            return
+        if args.step == "31":
+            step_31_order_date_quarantine(db)
+            return
 
         if args.resume:
             # 순차 실행(이미 COMPLETED면 skip) - 커넥션 로스트 시 재개
@@ -677,9 +2017,26 @@ def main():
             step_12_policy_json(db)
             step_13_templates_json(db)
             step_14_erp_beta_flag(db)
+            step_15_structured_projection(db)
+            step_16_order_alerts(db)
+            step_17_quest_summary(db)
+            step_18_order_quests_table(db)
+            step_19_order_quests_version(db)
+            step_20_auto_task_unique(db)
+            step_21_purge_api_save_rows(db)
+            step_22_order_search(db)
+            step_23_order_dates(db)
+            step_24_calendar_feed(db)
+            step_25_panel_metrics(db)
+            step_26_geocode_cache(db)
+            step_27_order_geo(db)
+            step_28_directions_cache(db)
+            step_29_feed_watermark(db)
+            step_30_feed_trigger_columns(db)
+            step_31_order_date_quarantine(db)
             return
 
-        print("Usage: python erp_build_step_runner.py --step 1..14  (or --resume)")
+        print("Usage: python erp_build_step_runner.py --step 1..31  (or --resume)")
 
 
 if __name__ == "__main__":
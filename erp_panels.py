@@ -0,0 +1,220 @@
+"""
+ERP 대시보드 날짜 패널 집계 (실측/출고)
+
+- 날짜별 건수: 일정 투영/DATE 컬럼 인덱스로 기간 후보를 좁힌 뒤 `GROUP BY 일정 문자열` 한 번으로 집계
+  → 주문 수가 아니라 (기간 내 일정 값 종류 수)만큼만 읽음, 1500건 제한 없이 정확
+- 출고 패널의 규격 합계/배정 시공자: 저장 시 DB 트리거가 미리 계산한 컬럼 사용 (build step 25)
+  - orders.erp_spec_units: items 규격(W)/300 합계 (spec_w300_value와 같은 규칙)
+  - orders.erp_construction_workers: shipment.construction_workers 정규화(trim/소문자) 이름 배열
+- step 25 완료 전에는 기간 내 후보 주문의 structured_data를 읽어 Python으로 같은 값을 계산 (폴백)
+- Flask app import 없이 재사용 가능
+"""
+
+from __future__ import annotations
+
+import datetime
+import re
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from typing import Any, Dict, Iterable, List, Set
+
+from sqlalchemy import and_, case, func, or_
+
+from build_steps import step_ready
+from models import Order
+from order_dates import DATE_COLUMN_OF, parse_order_date
+
+AS_STATUSES = ('AS_RECEIVED', 'AS_COMPLETED')
+
+_SPEC_NUMBER = re.compile(r'[0-9.]+')
+_TENTH = Decimal('0.1')
+_ZERO = Decimal(0)
+
+
+def _spec_w300(value: Any) -> Decimal:
+    """
+    규격(W)/300 (0.1 단위, 반올림은 0.5에서 올림).
+    foms_spec_units의 round(NUMERIC, 1)과 같은 결과가 나오도록 float 대신 Decimal로 계산
+    """
+    if value is None or value == '':
+        return _ZERO
+    m = _SPEC_NUMBER.search(str(value).replace(',', ''))
+    if not m:
+        return _ZERO
+    try:
+        n = Decimal(m.group())
+    except InvalidOperation:
+        return _ZERO
+    return (n / 300).quantize(_TENTH, rounding=ROUND_HALF_UP)
+
+
+def spec_w300_value(value: Any) -> float:
+    """규격(W)/300 수치 계산 (숫자 반환). 복합규격이면 첫 숫자 사용"""
+    return float(_spec_w300(value))
+
+
+def normalize_worker_name(name: Any) -> str:
+    # foms_construction_workers의 lower(btrim(w))와 같게 공백만 제거
+    return str(name or '').strip(' ').lower()
+
+
+def _item_spec(it: Dict[str, Any]) -> Any:
+    """COALESCE(NULLIF(spec_width, ''), NULLIF(spec, ''), '')와 같은 규칙 (0도 값으로 취급)"""
+    for key in ('spec_width', 'spec'):
+        value = it.get(key)
+        if value is not None and value != '':
+            return value
+    return ''
+
+
+def order_spec_units(sd: Any) -> float:
+    """structured_data items 규격 합계 (foms_spec_units와 같은 규칙)"""
+    if not isinstance(sd, dict):
+        return 0.0
+    items = sd.get('items')
+    if not isinstance(items, list):
+        return 0.0
+    return float(sum((_spec_w300(_item_spec(it)) for it in items if isinstance(it, dict)), _ZERO))
+
+
+def order_construction_workers(sd: Any) -> List[str]:
+    """structured_data 배정 시공자 정규화 이름 (foms_construction_workers와 같은 규칙)"""
+    if not isinstance(sd, dict):
+        return []
+    shipment = sd.get('shipment')
+    workers = shipment.get('construction_workers') if isinstance(shipment, dict) else None
+    if not isinstance(workers, list):
+        return []
+    return sorted({normalize_worker_name(w) for w in workers if normalize_worker_name(w)})
+
+
+def _filled(column):
+    return func.coalesce(column, '') != ''
+
+
+def _in_range(db, name: str, start: datetime.date, end: datetime.date):
+    """레거시 일정 컬럼 기간 조건: DATE 컬럼 인덱스(step 23 완료 후) 또는 ISO 문자열 범위"""
+    if step_ready(db, 23):
+        return getattr(Order, DATE_COLUMN_OF[name]).between(start, end)
+    return getattr(Order, name).between(start.isoformat(), end.isoformat())
+
+
+def in_window(rows: Iterable[Any], start: datetime.date, end: datetime.date):
+    """(일정 문자열, ...) 행 → (YYYY-MM-DD, 행) - 기간 밖/해석 불가 값 제외"""
+    for row in rows:
+        d = parse_order_date(row[0])
+        if d is None or d < start or d > end:
+            continue
+        yield d.isoformat(), row
+
+
+def measurement_date_key():
+    """실측일: ERP Beta는 structured_data 실측일(투영 컬럼) 우선, 없으면 레거시 measurement_date"""
+    return case(
+        (and_(Order.is_erp_beta.is_(True), _filled(Order.erp_measurement_date)), Order.erp_measurement_date),
+        else_=func.nullif(Order.measurement_date, ''),
+    )
+
+
+def measurement_counts(db, base_query, start: datetime.date, end: datetime.date) -> Dict[str, int]:
+    """기간 내 날짜별 실측 건수 {YYYY-MM-DD: 건수} (base_query: 상태/담당자 필터가 적용된 Order 쿼리)"""
+    key = measurement_date_key()
+    rows = (
+        base_query.with_entities(key, func.count())
+        .filter(or_(
+            _in_range(db, 'measurement_date', start, end),
+            and_(
+                Order.is_erp_beta.is_(True),
+                Order.erp_measurement_date.between(start.isoformat(), end.isoformat()),
+            ),
+        ))
+        .group_by(key)
+        .order_by(None)
+        .all()
+    )
+    counts: Dict[str, int] = {}
+    for day, row in in_window(rows, start, end):
+        counts[day] = counts.get(day, 0) + int(row[1])
+    return counts
+
+
+def construction_date_key():
+    """
+    시공일: AS 주문은 AS 접수일 → AS 완료일, ERP Beta 주문은 structured_data 시공일 → scheduled_date
+    """
+    is_as = Order.status.in_(AS_STATUSES)
+    is_erp = Order.is_erp_beta.is_(True)
+    return case(
+        (and_(is_as, _filled(Order.as_received_date)), Order.as_received_date),
+        (and_(is_as, _filled(Order.as_completed_date)), Order.as_completed_date),
+        (and_(is_erp, _filled(Order.erp_construction_date)), Order.erp_construction_date),
+        (is_erp, func.nullif(Order.scheduled_date, '')),
+        else_=None,
+    )
+
+
+def _construction_window(db, start: datetime.date, end: datetime.date):
+    is_as = Order.status.in_(AS_STATUSES)
+    is_erp = Order.is_erp_beta.is_(True)
+    return or_(
+        and_(is_as, or_(
+            _in_range(db, 'as_received_date', start, end),
+            _in_range(db, 'as_completed_date', start, end),
+        )),
+        and_(is_erp, or_(
+            Order.erp_construction_date.between(start.isoformat(), end.isoformat()),
+            _in_range(db, 'scheduled_date', start, end),
+        )),
+    )
+
+
+def construction_scope(db, base_query, start: datetime.date, end: datetime.date):
+    """기간 내 시공 후보 주문 쿼리 (ERP Beta + AS, 인덱스 컬럼으로 기간 제한 - 정확한 날짜는 construction_date_key로 확인)"""
+    return base_query.filter(
+        or_(Order.is_erp_beta.is_(True), Order.status.in_(AS_STATUSES)),
+        _construction_window(db, start, end),
+    ).order_by(None)
+
+
+def construction_panel_totals(db, base_query, start: datetime.date, end: datetime.date) -> Dict[str, Dict[str, Any]]:
+    """
+    기간 내 날짜별 시공 집계 {YYYY-MM-DD: {'count', 'spec_units', 'workers': set(정규화 이름)}}.
+    base_query: 상태/담당자 필터가 적용된 Order 쿼리 (ERP Beta/AS 범위는 여기서 제한)
+    """
+    key = construction_date_key()
+    scoped = construction_scope(db, base_query, start, end)
+    totals: Dict[str, Dict[str, Any]] = {}
+
+    def bucket(day: str) -> Dict[str, Any]:
+        entry = totals.get(day)
+        if entry is None:
+            entry = totals[day] = {'count': 0, 'spec_units': 0.0, 'workers': set()}
+        return entry
+
+    if step_ready(db, 25):
+        spec_units = func.coalesce(func.sum(case((Order.is_erp_beta.is_(True), Order.erp_spec_units), else_=0)), 0)
+        for day, row in in_window(scoped.with_entities(key, func.count(), spec_units).group_by(key).all(), start, end):
+            entry = bucket(day)
+            entry['count'] += int(row[1])
+            entry['spec_units'] += float(row[2] or 0)
+        worker_rows = scoped.with_entities(key, func.unnest(Order.erp_construction_workers)).distinct().all()
+        for day, row in in_window(worker_rows, start, end):
+            bucket(day)['workers'].add(row[1])
+        return totals
+
+    # 폴백: 기간 내 후보 주문만 읽어 Python으로 계산
+    for day, row in in_window(scoped.with_entities(key, Order.is_erp_beta, Order.structured_data).all(), start, end):
+        entry = bucket(day)
+        entry['count'] += 1
+        if row[1]:
+            entry['spec_units'] += order_spec_units(row[2])
+        entry['workers'].update(order_construction_workers(row[2]))
+    return totals
+
+
+def assigned_workers(totals: Dict[str, Dict[str, Any]], known_names: Set[str]) -> Dict[str, Set[str]]:
+    """날짜별 배정 시공자 중 설정에 등록된 이름만 {YYYY-MM-DD: set}"""
+    return {
+        day: entry['workers'] & known_names
+        for day, entry in totals.items()
+        if entry['workers'] & known_names
+    }
@@ -470,10 +470,11 @@ def get_next_stage_for_completed_quest(stage: Optional[str]) -> Optional[str]:
     return str(next_stage) if next_stage else None
 
 
-def check_quest_approvals_complete(sd: Dict[str, Any], stage: Optional[str]) -> tuple[bool, List[str]]:
+def check_quest_approvals_complete(sd: Dict[str, Any], stage: Optional[str], quests: Optional[List[Dict[str, Any]]] = None) -> tuple[bool, List[str]]:
     """
     현재 단계의 Quest에 대한 모든 필수 팀 승인이 완료되었는지 확인합니다.
     stage는 한글 단계명 또는 영문 코드 모두 지원합니다.
+    quests: order_quests 행 dict 목록 (OrderQuest.to_dict). 없으면 structured_data.quests(이관 전 데이터) 사용
     
     Returns:
         (is_complete, missing_teams): 승인 완료 여부와 미승인 팀 목록
@@ -481,8 +482,9 @@ def check_quest_approvals_complete(sd: Dict[str, Any], stage: Optional[str]) ->
     if not stage:
         return (False, [])
     
-    # structured_data.quests에서 현재 단계의 quest 찾기
-    quests = sd.get("quests") or []
+    # 현재 단계의 quest 찾기
+    if quests is None:
+        quests = (sd or {}).get("quests") or []
     if not isinstance(quests, list):
         return (False, [])
     
@@ -620,3 +622,135 @@ def create_quest_from_template(stage: Optional[str], owner_person: Optional[str]
     
     return quest
 
+
+
+# -----------------------------
+# Current Quest Summary (저장 시점 계산)
+# -----------------------------
+
+STAGE_CODE_TO_NAME: Dict[str, str] = {v: k for k, v in STAGE_NAME_TO_CODE.items()}
+
+
+def _is_lahom_orderer(sd: Dict[str, Any]) -> bool:
+    orderer_name = ((((sd or {}).get("parties") or {}).get("orderer") or {}).get("name") or "").strip()
+    return bool(orderer_name) and "라홈" in orderer_name
+
+
+def _approval_flag(team_approvals: Dict[str, Any], team: str) -> bool:
+    approval = team_approvals.get(str(team)) or team_approvals.get(team)
+    if approval is None:
+        return False
+    if isinstance(approval, dict):
+        return bool(approval.get("approved", False))
+    return bool(approval)
+
+
+def _pick_current_quest(quests: Any, stage_name: str, stage_code: str) -> Optional[Dict[str, Any]]:
+    """현재 단계 quest 중 OPEN 최신 → 없으면 전체 최신 (created_at/updated_at 기준)"""
+    if not isinstance(quests, list):
+        return None
+    matching = [
+        q for q in quests
+        if isinstance(q, dict) and q.get("stage") in (stage_name, stage_code)
+    ]
+    if not matching:
+        return None
+
+    def _ts(q: Dict[str, Any]) -> str:
+        return q.get("created_at") or q.get("updated_at") or "1970-01-01T00:00:00"
+
+    open_quests = [q for q in matching if str(q.get("status", "OPEN")).upper() == "OPEN"]
+    candidates = open_quests or matching
+    return max(candidates, key=_ts)
+
+
+# resolve_quest_summary가 읽는 structured_data 경로 (이 경로가 바뀌면 요약 재계산)
+QUEST_SUMMARY_INPUTS = (("workflow",), ("parties", "orderer", "name"))
+
+
+def resolve_quest_summary(sd: Dict[str, Any], quests: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """
+    현재 단계 Quest 요약 계산 (orders.erp_quest_summary 저장용).
+    quests/단계가 바뀌는 저장 시점(Quest 승인/상태 변경, 구조화 데이터 저장)에 호출하고,
+    대시보드는 저장된 요약을 그대로 읽는다.
+
+    - 단계: workflow.stage (없거나 알 수 없으면 주문접수)
+    - quest: 현재 단계 quest (없으면 템플릿 기반 표시용 quest, 저장하지 않음)
+    - 실측/고객컨펌 + 발주사에 '라홈' 포함 시 담당/필수 승인 팀을 라홈팀(CS)으로 변경
+    - 승인 상태: OPEN → 전부 미승인, COMPLETED → 전부 승인, 그 외 → team_approvals 확인
+    quests: order_quests 행 dict 목록 (없으면 structured_data.quests)
+    """
+    sd = sd or {}
+    if quests is None:
+        quests = sd.get("quests")
+    raw_stage = get_stage(sd)
+    stage_name = STAGE_CODE_TO_NAME.get(raw_stage or "", "주문접수")
+    stage_code = STAGE_NAME_TO_CODE[stage_name]
+    lahom_override = stage_code in ("MEASURE", "CONFIRM") and _is_lahom_orderer(sd)
+
+    responsible_team = DEFAULT_OWNER_TEAM_BY_STAGE.get(stage_code)
+    if lahom_override:
+        responsible_team = "CS"
+
+    summary: Dict[str, Any] = {
+        "stage": stage_code,
+        "responsible_team": responsible_team,
+        "has_quest": False,
+        "title": "",
+        "description": "",
+        "owner_team": "",
+        "status": "OPEN",
+        "all_approved": False,
+        "missing_teams": [],
+        "required_approvals": [],
+        "team_approvals": {},
+    }
+
+    quest = _pick_current_quest(quests, stage_name, stage_code)
+    if quest is None:
+        # 표시용 (저장하지 않음)
+        quest = create_quest_from_template(stage_name, None, sd)
+    if quest is None:
+        return summary
+
+    required_teams = get_required_approval_teams_for_stage(stage_name)
+    team_approvals_raw = quest.get("team_approvals") or {}
+    if not isinstance(team_approvals_raw, dict):
+        team_approvals_raw = {}
+    owner_team = quest.get("owner_team", "")
+    if lahom_override:
+        owner_team = "CS"
+        required_teams = ["CS"]
+        team_approvals_raw = {"CS": team_approvals_raw.get("CS", {})}
+
+    quest_status = str(quest.get("status", "OPEN")).upper()
+    if quest_status == "OPEN":
+        team_approvals = {t: False for t in required_teams}
+    elif quest_status == "COMPLETED":
+        team_approvals = {t: True for t in required_teams}
+    else:
+        team_approvals = {t: _approval_flag(team_approvals_raw, t) for t in required_teams}
+
+    if quest_status == "COMPLETED":
+        missing_teams: List[str] = []
+        all_approved = True
+    elif quest_status != "OPEN" and not required_teams:
+        # 승인 필요 없으면 status로만 판단
+        missing_teams = []
+        all_approved = False
+    else:
+        missing_teams = [t for t in required_teams if not team_approvals.get(t, False)]
+        all_approved = quest_status != "OPEN" and not missing_teams
+
+    summary.update({
+        "has_quest": True,
+        "title": quest.get("title", ""),
+        "description": quest.get("description", ""),
+        "owner_team": owner_team,
+        "status": quest.get("status", "OPEN"),
+        "all_approved": all_approved,
+        "missing_teams": missing_teams,
+        "required_approvals": required_teams,
+        "team_approvals": team_approvals,
+    })
+    return summary
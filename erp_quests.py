@@ -0,0 +1,282 @@
+"""
+ERP Quest 저장소(DB 반영) 모듈
+
+- Quest는 orders.structured_data.quests 대신 order_quests 테이블에 행 단위로 저장한다.
+  (승인 1건마다 structured_data 전체를 다시 쓰지 않도록)
+- 기존 structured_data.quests는 최초 접근 시(load_order_quests) 또는 build step 18에서 테이블로 이관 후 제거
+- Quest 생성/승인 판정 규칙은 erp_policy(create_quest_from_template, check_quest_approvals_complete)를 그대로 사용
+- Quest 변경(승인/상태/생성)은 주문 행 잠금(SELECT ... FOR UPDATE)으로 직렬화하고,
+  order_quests.version 낙관적 잠금 충돌 시 짧게 재시도한다.
+- Flask app import 없이 step runner에서도 재사용 가능
+"""
+
+from __future__ import annotations
+
+import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.orm.attributes import flag_modified
+from sqlalchemy.orm.exc import StaleDataError
+
+from erp_policy import (
+    STAGE_CODE_TO_NAME,
+    check_quest_approvals_complete,
+    create_quest_from_template,
+    get_next_stage_for_completed_quest,
+    get_required_approval_teams_for_stage,
+    get_stage,
+    resolve_quest_summary,
+)
+from models import Order, OrderEvent, OrderQuest
+
+
+# OrderQuest 컬럼으로 옮겨지는 quest dict 키 (그 외 키는 extra에 보존)
+_COLUMN_KEYS = {
+    "id", "stage", "title", "description", "owner_team", "owner_person", "status",
+    "required_approvals", "team_approvals", "created_at", "updated_at", "completed_at", "version",
+}
+
+
+def _parse_ts(value: Any) -> Optional[datetime.datetime]:
+    if not value:
+        return None
+    if isinstance(value, datetime.datetime):
+        return value
+    try:
+        ts = datetime.datetime.fromisoformat(str(value))
+    except Exception:
+        return None
+    if ts.tzinfo is not None:
+        ts = ts.astimezone().replace(tzinfo=None)
+    return ts
+
+
+def quest_row_from_dict(order_id: int, quest: Dict[str, Any]) -> OrderQuest:
+    """quest dict(create_quest_from_template/기존 structured_data.quests[] 형태) → OrderQuest"""
+    now = datetime.datetime.now()
+    required = quest.get("required_approvals")
+    approvals = quest.get("team_approvals")
+    extra = {k: v for k, v in quest.items() if k not in _COLUMN_KEYS}
+    return OrderQuest(
+        order_id=order_id,
+        stage=str(quest.get("stage") or "")[:50],
+        title=quest.get("title") or "",
+        description=quest.get("description") or "",
+        owner_team=quest.get("owner_team") or None,
+        owner_person=(quest.get("owner_person") or None),
+        status=str(quest.get("status") or "OPEN"),
+        required_approvals=[str(t) for t in required if t] if isinstance(required, list) else None,
+        team_approvals=approvals if isinstance(approvals, dict) else {},
+        extra=extra or None,
+        created_at=_parse_ts(quest.get("created_at")) or now,
+        updated_at=_parse_ts(quest.get("updated_at")) or now,
+        completed_at=_parse_ts(quest.get("completed_at")),
+    )
+
+
+def migrate_order_quests(db, order) -> int:
+    """
+    order.structured_data.quests → order_quests 이관 후 structured_data에서 quests 키 제거 (commit은 호출측).
+    이미 테이블에 행이 있으면 테이블을 원천으로 보고 JSON 쪽은 버린다.
+    """
+    sd = order.structured_data
+    if not isinstance(sd, dict) or "quests" not in sd:
+        return 0
+
+    migrated = 0
+    has_rows = db.query(OrderQuest.id).filter(OrderQuest.order_id == order.id).first() is not None
+    if not has_rows:
+        for q in sd.get("quests") or []:
+            if isinstance(q, dict):
+                db.add(quest_row_from_dict(order.id, q))
+                migrated += 1
+
+    new_sd = dict(sd)
+    new_sd.pop("quests", None)
+    order.structured_data = new_sd
+    db.flush()
+    return migrated
+
+
+def load_order_quests(db, order) -> List[OrderQuest]:
+    """주문의 Quest 목록 (생성 순). 미이관 주문은 먼저 이관한다."""
+    migrate_order_quests(db, order)
+    return (
+        db.query(OrderQuest)
+        .filter(OrderQuest.order_id == order.id)
+        .order_by(OrderQuest.id.asc())
+        .populate_existing()
+        .all()
+    )
+
+
+def find_stage_quest(rows: List[OrderQuest], stage_name: Optional[str], stage_code: Optional[str]) -> Optional[OrderQuest]:
+    """단계(한글 단계명 또는 영문 코드)가 일치하는 첫 번째 Quest"""
+    for row in rows:
+        if row.stage and row.stage in (stage_name, stage_code):
+            return row
+    return None
+
+
+def add_quest(db, order_id: int, quest: Dict[str, Any]) -> OrderQuest:
+    """quest dict를 order_quests에 추가 (flush까지, commit은 호출측)"""
+    row = quest_row_from_dict(order_id, quest)
+    db.add(row)
+    db.flush()
+    return row
+
+
+def quest_dicts(rows: List[OrderQuest]) -> List[Dict[str, Any]]:
+    return [row.to_dict() for row in rows]
+
+
+def refresh_quest_summary(order, sd: Dict[str, Any], quests: Optional[List[Dict[str, Any]]] = None) -> None:
+    """현재 Quest 요약(orders.erp_quest_summary) 갱신 - quests/단계 변경 저장 직전에 호출"""
+    try:
+        order.erp_quest_summary = resolve_quest_summary(sd or {}, quests)
+    except Exception as e:
+        # 요약 갱신 실패가 저장 자체를 막지 않음 (대시보드는 요약이 없으면 즉석 계산)
+        print(f"[ERP_BETA] quest summary warning: {e}")
+
+
+# -----------------------------
+# 동시성 안전 승인
+# -----------------------------
+
+class QuestApprovalError(Exception):
+    """승인 처리 불가 (API 응답 메시지/상태코드 포함)"""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+def lock_order(db, order_id: int) -> Optional[Order]:
+    """
+    주문 행 잠금(SELECT ... FOR UPDATE) 후 최신 상태로 로드.
+    같은 주문의 Quest 변경은 트랜잭션 종료(commit/rollback)까지 순서대로 처리된다.
+    """
+    return (
+        db.query(Order)
+        .filter(Order.id == order_id)
+        .with_for_update()
+        .populate_existing()
+        .first()
+    )
+
+
+def _apply_quest_approval_once(db, order_id: int, team: str, user_id: Optional[int], username: str) -> Dict[str, Any]:
+    order = lock_order(db, order_id)
+    if not order:
+        raise QuestApprovalError('주문을 찾을 수 없습니다.', 404)
+
+    quest_rows = load_order_quests(db, order)
+    sd = order.structured_data or {}
+    current_stage_code = get_stage(sd)  # 영문 코드 (예: 'RECEIVED')
+    if not current_stage_code:
+        raise QuestApprovalError('현재 단계가 없습니다.', 400)
+
+    # quest의 stage는 한글 단계명으로 저장됨 (영문 코드도 허용)
+    current_stage_name = STAGE_CODE_TO_NAME.get(current_stage_code, current_stage_code)
+    quest_row = find_stage_quest(quest_rows, current_stage_name, current_stage_code)
+    if not quest_row:
+        # Quest가 없으면 생성 (한글 단계명으로 생성)
+        new_quest = create_quest_from_template(current_stage_name, username, sd)
+        if not new_quest:
+            raise QuestApprovalError('Quest 템플릿을 찾을 수 없습니다.', 400)
+        quest_row = add_quest(db, order.id, new_quest)
+        quest_rows.append(quest_row)
+
+    # 팀 승인 처리 (order_quests 행만 갱신 - structured_data는 다시 쓰지 않음)
+    now = datetime.datetime.now()
+    team_approvals = dict(quest_row.team_approvals or {})
+    team_approvals[team] = {
+        "approved": True,
+        "approved_by": user_id,
+        "approved_by_name": username,
+        "approved_at": now.isoformat(),
+    }
+    quest_row.team_approvals = team_approvals
+    quest_row.updated_at = now
+    if quest_row.status == "OPEN":
+        quest_row.status = "IN_PROGRESS"
+
+    # 모든 필수 팀 승인 완료 확인 (한글 단계명 사용)
+    is_complete, missing_teams = check_quest_approvals_complete(sd, current_stage_name, quests=quest_dicts(quest_rows))
+
+    auto_transitioned = False
+    next_stage_name = None
+    if is_complete:
+        quest_row.status = "COMPLETED"
+        quest_row.completed_at = now
+
+        # 다음 단계로 자동 전환 (템플릿의 next_stage는 영문 코드)
+        next_stage_code = get_next_stage_for_completed_quest(current_stage_name)
+        if next_stage_code:
+            next_stage_name = STAGE_CODE_TO_NAME.get(next_stage_code, next_stage_code)
+
+            sd = dict(sd)
+            workflow = dict(sd.get("workflow") or {})
+            old_stage = workflow.get("stage")
+            workflow["stage"] = next_stage_code  # 영문 코드로 저장
+            workflow["stage_updated_at"] = now.isoformat()
+            sd["workflow"] = workflow
+            order.structured_data = sd
+            flag_modified(order, "structured_data")
+
+            # 다음 단계의 Quest 자동 생성 (한글 단계명으로 생성)
+            next_quest = create_quest_from_template(next_stage_name, username, sd)
+            if next_quest:
+                quest_rows.append(add_quest(db, order.id, next_quest))
+
+            db.add(OrderEvent(
+                order_id=order.id,
+                event_type='STAGE_AUTO_TRANSITIONED',
+                payload={
+                    'from': old_stage,
+                    'to': next_stage_code,
+                    'reason': 'quest_approvals_complete',
+                    'approved_teams': get_required_approval_teams_for_stage(current_stage_name),
+                },
+                created_by_user_id=user_id,
+            ))
+            auto_transitioned = True
+
+    refresh_quest_summary(order, sd, quest_dicts(quest_rows))
+    db.flush()  # version 충돌(StaleDataError)은 여기서 발생
+    return {
+        'quest': quest_row.to_dict(),
+        'all_approved': is_complete,
+        'missing_teams': missing_teams,
+        'auto_transitioned': auto_transitioned,
+        'next_stage': next_stage_name,
+    }
+
+
+def apply_quest_approval(
+    db,
+    order_id: int,
+    team: str,
+    user_id: Optional[int] = None,
+    username: str = '',
+    max_attempts: int = 3,
+) -> Dict[str, Any]:
+    """
+    팀별 Quest 승인 + 필수 팀 전원 승인 시 다음 단계 자동 전환 (commit 포함).
+    - 주문 행 잠금으로 동시 승인을 직렬화 → 승인 누락/중복 단계 전환 없음
+    - 잠금 밖 경로(다른 작업)와 version 충돌 시 rollback 후 재시도
+    """
+    last_error: Optional[Exception] = None
+    for _attempt in range(max_attempts):
+        try:
+            result = _apply_quest_approval_once(db, order_id, team, user_id, username)
+            db.commit()
+            return result
+        except StaleDataError as e:
+            db.rollback()
+            last_error = e
+        except Exception:
+            db.rollback()
+            raise
+    raise QuestApprovalError(f'동시 승인 충돌로 저장하지 못했습니다. 다시 시도해주세요. ({last_error})', 409)
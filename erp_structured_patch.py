@@ -0,0 +1,238 @@
+"""
+structured_data 부분 수정 (RFC 6902 JSON Patch)
+
+- PATCH /api/orders/<id>/structured 및 대시보드 인라인 편집(출고/실측)에서 사용
+- 연산은 Python에서 적용/검증하고(test 연산, 단계 전환 이벤트 판정용),
+  DB에는 변경된 경로만 jsonb_set / #- 로 한 번의 UPDATE에 반영한다.
+  → 전체 문서 재전송/재기록 없음, 다른 팀이 동시에 다른 경로를 수정해도 덮어쓰지 않음
+- Flask app import 없이 재사용 가능
+"""
+
+from __future__ import annotations
+
+import copy
+import json
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+Path = Tuple[str, ...]
+
+SUPPORTED_OPS = ("add", "remove", "replace", "move", "copy", "test")
+
+
+class JsonPatchError(Exception):
+    """잘못된 patch 문서/경로 (API에서는 400, test 실패는 409)"""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+def parse_pointer(pointer: Any) -> Path:
+    """RFC 6901 JSON Pointer → 토큰 튜플 ('' → 루트)"""
+    if not isinstance(pointer, str):
+        raise JsonPatchError(f"잘못된 경로: {pointer!r}")
+    if pointer == "":
+        return ()
+    if not pointer.startswith("/"):
+        raise JsonPatchError(f"경로는 '/'로 시작해야 합니다: {pointer}")
+    return tuple(t.replace("~1", "/").replace("~0", "~") for t in pointer[1:].split("/"))
+
+
+def format_pointer(path: Path) -> str:
+    return "".join("/" + t.replace("~", "~0").replace("/", "~1") for t in path)
+
+
+def _array_index(arr: list, token: str, allow_end: bool) -> int:
+    if allow_end and token == "-":
+        return len(arr)
+    if not token.isdigit() or (len(token) > 1 and token.startswith("0")):
+        raise JsonPatchError(f"잘못된 배열 인덱스: {token}")
+    idx = int(token)
+    if idx > len(arr) or (not allow_end and idx == len(arr)):
+        raise JsonPatchError(f"배열 인덱스 범위 초과: {token}")
+    return idx
+
+
+def _resolve_parent(doc: Any, path: Path, create_parents: bool) -> Any:
+    cur = doc
+    for token in path[:-1]:
+        if isinstance(cur, dict):
+            if token not in cur:
+                if not create_parents:
+                    raise JsonPatchError(f"경로가 없습니다: {format_pointer(path)}")
+                cur[token] = {}
+            elif cur[token] is None and create_parents:
+                cur[token] = {}
+            cur = cur[token]
+        elif isinstance(cur, list):
+            cur = cur[_array_index(cur, token, allow_end=False)]
+        else:
+            raise JsonPatchError(f"경로가 없습니다: {format_pointer(path)}")
+    if not isinstance(cur, (dict, list)):
+        raise JsonPatchError(f"경로가 없습니다: {format_pointer(path)}")
+    return cur
+
+
+def _get(doc: Any, path: Path) -> Any:
+    cur = doc
+    for token in path:
+        if isinstance(cur, dict) and token in cur:
+            cur = cur[token]
+        elif isinstance(cur, list):
+            cur = cur[_array_index(cur, token, allow_end=False)]
+        else:
+            raise JsonPatchError(f"경로가 없습니다: {format_pointer(path)}")
+    return cur
+
+
+def _add(doc: Any, path: Path, value: Any, create_parents: bool) -> Any:
+    if not path:
+        return value
+    parent = _resolve_parent(doc, path, create_parents)
+    if isinstance(parent, dict):
+        parent[path[-1]] = value
+    else:
+        parent.insert(_array_index(parent, path[-1], allow_end=True), value)
+    return doc
+
+
+def _remove(doc: Any, path: Path) -> Any:
+    if not path:
+        raise JsonPatchError("루트는 삭제할 수 없습니다.")
+    parent = _resolve_parent(doc, path, create_parents=False)
+    if isinstance(parent, dict):
+        if path[-1] not in parent:
+            raise JsonPatchError(f"경로가 없습니다: {format_pointer(path)}")
+        del parent[path[-1]]
+    else:
+        del parent[_array_index(parent, path[-1], allow_end=False)]
+    return doc
+
+
+def apply_patch(
+    doc: Optional[Dict[str, Any]],
+    operations: Any,
+    create_parents: bool = False,
+) -> Tuple[Dict[str, Any], List[Path]]:
+    """
+    patch 적용 결과 문서와 변경(touched) 경로 목록 반환. 원본 doc은 변경하지 않는다.
+    create_parents=True: add/replace 시 중간 객체가 없으면 생성 (서버 내부 호출용, RFC 확장)
+    """
+    if not isinstance(operations, list):
+        raise JsonPatchError("patch 본문은 연산(JSON 객체) 배열이어야 합니다.")
+
+    result: Any = copy.deepcopy(doc or {})
+    touched: List[Path] = []
+    for i, op in enumerate(operations):
+        if not isinstance(op, dict) or op.get("op") not in SUPPORTED_OPS:
+            raise JsonPatchError(f"{i}번째 연산이 올바르지 않습니다: {op!r}")
+        name = op["op"]
+        path = parse_pointer(op.get("path"))
+
+        if name in ("add", "replace", "test") and "value" not in op:
+            raise JsonPatchError(f"{i}번째 연산({name})에 value가 없습니다.")
+
+        if name == "test":
+            if _get(result, path) != op["value"]:
+                raise JsonPatchError(f"test 실패: {format_pointer(path)}", 409)
+            continue
+
+        if name == "add":
+            result = _add(result, path, copy.deepcopy(op["value"]), create_parents)
+        elif name == "remove":
+            result = _remove(result, path)
+        elif name == "replace":
+            value = copy.deepcopy(op["value"])
+            if not path:
+                result = value
+            else:
+                parent = _resolve_parent(result, path, create_parents)
+                if isinstance(parent, list):
+                    parent[_array_index(parent, path[-1], allow_end=False)] = value
+                elif path[-1] in parent or create_parents:
+                    parent[path[-1]] = value
+                else:
+                    raise JsonPatchError(f"경로가 없습니다: {format_pointer(path)}")
+        elif name in ("move", "copy"):
+            from_path = parse_pointer(op.get("from"))
+            value = copy.deepcopy(_get(result, from_path))
+            if name == "move":
+                if path[:len(from_path)] == from_path and path != from_path:
+                    raise JsonPatchError("자기 자신의 하위 경로로 이동할 수 없습니다.")
+                result = _remove(result, from_path)
+                touched.append(from_path)
+            result = _add(result, path, value, create_parents)
+
+        if not isinstance(result, dict):
+            raise JsonPatchError("structured_data는 JSON 객체여야 합니다.")
+        touched.append(path)
+
+    return result, touched
+
+
+def is_touched(touched: Sequence[Path], *prefix: str) -> bool:
+    """touched 경로 중 prefix와 겹치는(상위/하위) 경로가 있는지"""
+    n = len(prefix)
+    for p in touched:
+        m = min(n, len(p))
+        if p[:m] == prefix[:m]:
+            return True
+    return False
+
+
+def _write_target(old_doc: Any, path: Path) -> Path:
+    """
+    old_doc에 jsonb_set으로 안전하게 쓸 수 있는 경로.
+    - 중간 키가 없으면 없는 첫 키까지 (jsonb_set은 마지막 키만 생성)
+    - 배열을 지나면 배열 전체 (삽입/삭제 시 인덱스 이동)
+    """
+    cur = old_doc
+    for i, token in enumerate(path):
+        if isinstance(cur, dict):
+            if token not in cur:
+                return path[:i + 1]
+            cur = cur[token]
+        else:
+            return path[:i]
+    return path
+
+
+def _exists(doc: Any, path: Path) -> bool:
+    try:
+        _get(doc, path)
+        return True
+    except JsonPatchError:
+        return False
+
+
+def build_jsonb_update(
+    old_doc: Dict[str, Any],
+    new_doc: Dict[str, Any],
+    touched: Sequence[Path],
+    column: str = "structured_data",
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    old_doc → new_doc 변경을 touched 경로만 반영하는 SQL 식 + 바인드 파라미터.
+    예) jsonb_set(jsonb_set(COALESCE(structured_data, '{}'::jsonb), :p0, :v0, true), :p1, :v1, true) #- :p2
+    (호출측은 주문 행 잠금 상태에서 old_doc을 읽었어야 결과가 new_doc과 같다)
+    """
+    targets: List[Path] = []
+    for t in sorted({_write_target(old_doc, p) for p in touched}, key=len):
+        if not any(t[:len(x)] == x for x in targets):
+            targets.append(t)
+
+    expr = f"COALESCE({column}, '{{}}'::jsonb)"
+    params: Dict[str, Any] = {}
+    for i, t in enumerate(targets):
+        if not t:
+            params[f"jp_v{i}"] = json.dumps(new_doc, ensure_ascii=False)
+            expr = f"CAST(:jp_v{i} AS JSONB)"
+            continue
+        params[f"jp_p{i}"] = list(t)
+        if _exists(new_doc, t):
+            params[f"jp_v{i}"] = json.dumps(_get(new_doc, t), ensure_ascii=False)
+            expr = f"jsonb_set({expr}, CAST(:jp_p{i} AS TEXT[]), CAST(:jp_v{i} AS JSONB), true)"
+        else:
+            expr = f"({expr} #- CAST(:jp_p{i} AS TEXT[]))"
+    return expr, params
@@ -0,0 +1,80 @@
+"""
+ERP API 텔레메트리 (프로세스 내 링버퍼)
+
+- 저장/파싱 API의 호출 결과를 DB 대신 메모리에 기록한다.
+  (기존 system_build_steps 행 기록은 요청마다 트랜잭션 4개 + 주문별 행 누적을 만들었음)
+- 엔드포인트별 누적 카운트 + 최근 N건 지연시간(p50/p95/max)을 관리자 API로 노출
+- 프로세스(워커)별 집계이며 재시작 시 초기화된다.
+"""
+
+from __future__ import annotations
+
+import datetime
+import threading
+from collections import deque
+from typing import Any, Dict, Optional
+
+RING_SIZE = 1000
+
+_LOCK = threading.Lock()
+_RECENT: deque = deque(maxlen=RING_SIZE)
+_COUNTERS: Dict[str, Dict[str, Any]] = {}
+_STARTED_AT = datetime.datetime.now()
+
+
+def record(endpoint: str, status: str, duration_ms: float, order_id: Optional[int] = None, message: Optional[str] = None) -> None:
+    """호출 1건 기록 (status: COMPLETED/FAILED) - 락 안에서 메모리 갱신만 수행"""
+    entry = {
+        "endpoint": endpoint,
+        "status": status,
+        "duration_ms": round(float(duration_ms), 2),
+        "order_id": order_id,
+        "message": (message or "")[:200] or None,
+        "at": datetime.datetime.now().isoformat(timespec="seconds"),
+    }
+    with _LOCK:
+        _RECENT.append(entry)
+        c = _COUNTERS.setdefault(endpoint, {"count": 0, "completed": 0, "failed": 0, "total_ms": 0.0})
+        c["count"] += 1
+        c["completed" if status == "COMPLETED" else "failed"] += 1
+        c["total_ms"] += entry["duration_ms"]
+
+
+def _percentile(sorted_values, pct: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    idx = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def snapshot(recent: int = 50) -> Dict[str, Any]:
+    """관리자 API 응답용 집계"""
+    with _LOCK:
+        entries = list(_RECENT)
+        counters = {k: dict(v) for k, v in _COUNTERS.items()}
+
+    endpoints = {}
+    for name, c in counters.items():
+        lat = sorted(e["duration_ms"] for e in entries if e["endpoint"] == name)
+        endpoints[name] = {
+            "count": c["count"],
+            "completed": c["completed"],
+            "failed": c["failed"],
+            "avg_ms": round(c["total_ms"] / c["count"], 2) if c["count"] else None,
+            "p50_ms": _percentile(lat, 50),
+            "p95_ms": _percentile(lat, 95),
+            "max_ms": lat[-1] if lat else None,
+            "window": len(lat),
+        }
+    return {
+        "since": _STARTED_AT.isoformat(timespec="seconds"),
+        "ring_size": RING_SIZE,
+        "endpoints": endpoints,
+        "recent": entries[-recent:][::-1] if recent > 0 else [],
+    }
+
+
+def reset() -> None:
+    with _LOCK:
+        _RECENT.clear()
+        _COUNTERS.clear()
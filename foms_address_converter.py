@@ -1,10 +1,51 @@
 import requests
+import threading
 import time
-import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from map_config import KAKAO_REST_API_KEY, MAX_RETRIES, DELAY_BETWEEN_REQUESTS, MIN_LAT, MAX_LAT, MIN_LNG, MAX_LNG
+from requests.adapters import HTTPAdapter
+from map_config import (
+    KAKAO_REST_API_KEY, MAX_RETRIES, MIN_LAT, MAX_LAT, MIN_LNG, MAX_LNG,
+    KAKAO_REQUESTS_PER_SECOND, KAKAO_BURST, GEOCODE_CONCURRENCY, HTTP_POOL_SIZE,
+    KAKAO_NAVI_REQUESTS_PER_SECOND, KAKAO_NAVI_BURST,
+)
 from foms_address_learning import FOMSAddressLearningSystem
 from foms_advanced_address_processor import FOMSAdvancedAddressProcessor
+from directions_cache import directions_cache, leg_key, time_bucket
+from geocode_cache import geocode_cache, geocode_key, normalize_address
+
+# 변환 결과 신뢰도 (geocode_cache.confidence)
+_CONFIDENCE = {'address': 1.0, 'keyword': 0.7, 'simplified': 0.5}
+_API_ERROR_PREFIXES = ('API 오류', '키워드 API 오류')
+
+
+class TokenBucket:
+    """호출 속도 제한 (초당 rate개 토큰, 최대 burst개 적립). 스레드/green thread 공용"""
+
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.capacity = float(burst)
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """토큰 1개 사용 - 부족하면 채워질 때까지 대기 (락 밖에서 sleep)"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+# 프로세스 공용: 일괄 변환/백그라운드 워커/요청 중 변환이 함께 카카오 쿼터를 나눠 씀
+kakao_rate_limiter = TokenBucket(KAKAO_REQUESTS_PER_SECOND, KAKAO_BURST)
+kakao_navi_rate_limiter = TokenBucket(KAKAO_NAVI_REQUESTS_PER_SECOND, KAKAO_NAVI_BURST)
 
 
 class FOMSAddressConverter:
@@ -18,6 +59,12 @@ class FOMSAddressConverter:
         self.directions_url = "https://apis-navi.kakaomobility.com/v1/directions"
         self.headers = {"Authorization": f"KakaoAK {self.api_key}"}
         
+        # 커넥션 재사용 (요청마다 TCP/TLS 연결을 새로 맺지 않음)
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=HTTP_POOL_SIZE)
+        self.session.mount("https://", adapter)
+        
         # AI 시스템 초기화
         self.learning_system = FOMSAddressLearningSystem()
         self.advanced_processor = FOMSAdvancedAddressProcessor()
@@ -28,46 +75,16 @@ class FOMSAddressConverter:
         return MIN_LAT <= lat <= MAX_LAT and MIN_LNG <= lng <= MAX_LNG
     
     def _normalize_address(self, address):
-        """주소 정규화"""
-        address = str(address).strip()
-        
-        # 기본 정규화
-        address = re.sub(r'\s+', ' ', address)  # 다중 공백 제거
-        address = re.sub(r'[^\w\s가-힣\-]', ' ', address)  # 특수문자 제거 (하이픈 제외)
-        
-        # 행정구역 축약어 확장
-        replacements = {
-            r'^서울\s': '서울특별시 ',
-            r'^부산\s': '부산광역시 ',
-            r'^대구\s': '대구광역시 ',
-            r'^인천\s': '인천광역시 ',
-            r'^광주\s': '광주광역시 ',
-            r'^대전\s': '대전광역시 ',
-            r'^울산\s': '울산광역시 ',
-            r'^세종\s': '세종특별자치시 ',
-            r'^경기\s': '경기도 ',
-            r'^강원\s': '강원특별자치도 ',
-            r'^충북\s': '충청북도 ',
-            r'^충남\s': '충청남도 ',
-            r'^전북\s': '전북특별자치도 ',
-            r'^전남\s': '전라남도 ',
-            r'^경북\s': '경상북도 ',
-            r'^경남\s': '경상남도 ',
-            r'^제주\s': '제주특별자치도 '
-        }
-        
-        for pattern, replacement in replacements.items():
-            address = re.sub(pattern, replacement, address)
-        
-        return address.strip()
+        """주소 정규화 (geocode_cache 키와 같은 규칙)"""
+        return normalize_address(address)
     
     def _try_address_api(self, address):
         """주소 API로 변환 시도"""
         try:
             params = {"query": address}
-            response = requests.get(
+            kakao_rate_limiter.acquire()
+            response = self.session.get(
                 self.base_url, 
-                headers=self.headers, 
                 params=params, 
                 timeout=10
             )
@@ -92,6 +109,8 @@ class FOMSAddressConverter:
                         
                         if self._is_valid_coordinates(lat, lng):
                             return lat, lng, "성공"
+            else:
+                return None, None, f"API 오류: HTTP {response.status_code}"
             
             return None, None, "주소를 찾을 수 없음"
             
@@ -102,9 +121,9 @@ class FOMSAddressConverter:
         """키워드 API로 변환 시도"""
         try:
             params = {"query": address}
-            response = requests.get(
+            kakao_rate_limiter.acquire()
+            response = self.session.get(
                 self.keyword_url, 
-                headers=self.headers, 
                 params=params, 
                 timeout=10
             )
@@ -120,6 +139,8 @@ class FOMSAddressConverter:
                     
                     if self._is_valid_coordinates(lat, lng):
                         return lat, lng, "키워드 검색 성공"
+            else:
+                return None, None, f"키워드 API 오류: HTTP {response.status_code}"
             
             return None, None, "키워드 검색 실패"
             
@@ -127,18 +148,46 @@ class FOMSAddressConverter:
             return None, None, f"키워드 API 오류: {str(e)}"
     
     def convert_address(self, address):
-        """AI 기반 주소 변환"""
+        """AI 기반 주소 변환 (geocode_cache 우선, 만료/미스일 때만 API 호출)"""
+        lat, lng, status, _transient = self.lookup(address)
+        return lat, lng, status
+    
+    def lookup(self, address):
+        """convert_address + 일시 실패 여부 → (lat, lng, status, transient). transient=True면 나중에 재시도 대상"""
         if not address or str(address).strip() == '':
-            return None, None, "빈 주소"
+            return None, None, "빈 주소", False
+        
+        cached = geocode_cache.get(address)
+        if cached is not None and not cached.expired:
+            if cached.found:
+                return cached.lat, cached.lng, f"캐시 ({cached.strategy})", False
+            return None, None, "주소를 찾을 수 없음 (캐시)", False
+        
+        lat, lng, status, meta = self._resolve_address(address)
+        if lat is not None and lng is not None:
+            geocode_cache.put(address, lat, lng, meta['strategy'], meta['confidence'], provider=meta['provider'])
+        elif not meta['transient']:
+            geocode_cache.put_negative(address)
+        elif cached is not None and cached.found:
+            # 재검증 중 일시 오류: 만료된 좌표 계속 사용
+            geocode_cache.note_stale()
+            return cached.lat, cached.lng, f"캐시 ({cached.strategy}, 재검증 실패)", False
+        return lat, lng, status, meta['transient']
+    
+    def _resolve_address(self, address):
+        """학습 데이터 → 카카오 API 다중 전략 → (lat, lng, status, {strategy, confidence, provider, transient})"""
+        meta = {'strategy': None, 'confidence': None, 'provider': 'kakao', 'transient': False}
         
         # 1단계: 학습 데이터에서 검색
         try:
             learned_suggestion = self.learning_system.suggest_correction(address)
             if learned_suggestion and learned_suggestion.get('latitude') and learned_suggestion.get('longitude'):
+                meta.update(strategy='learning', confidence=float(learned_suggestion['confidence']), provider='learning')
                 return (
                     learned_suggestion['latitude'], 
                     learned_suggestion['longitude'], 
-                    f"학습 데이터 매칭 (신뢰도: {learned_suggestion['confidence']:.2f})"
+                    f"학습 데이터 매칭 (신뢰도: {learned_suggestion['confidence']:.2f})",
+                    meta,
                 )
         except Exception as e:
             pass
@@ -164,12 +213,16 @@ class FOMSAddressConverter:
                 # 주소 API 시도
                 lat, lng, status = self._try_address_api(addr_to_try)
                 if lat is not None and lng is not None:
-                    return lat, lng, f"{status} ({strategy_name})"
+                    meta.update(strategy=f"address:{strategy_name}", confidence=_CONFIDENCE['address'])
+                    return lat, lng, f"{status} ({strategy_name})", meta
+                meta['transient'] = meta['transient'] or status.startswith(_API_ERROR_PREFIXES)
                 
                 # 키워드 API 시도
                 lat, lng, status = self._try_keyword_api(addr_to_try)
                 if lat is not None and lng is not None:
-                    return lat, lng, f"{status} ({strategy_name})"
+                    meta.update(strategy=f"keyword:{strategy_name}", confidence=_CONFIDENCE['keyword'])
+                    return lat, lng, f"{status} ({strategy_name})", meta
+                meta['transient'] = meta['transient'] or status.startswith(_API_ERROR_PREFIXES)
         
         # 5단계: 주소 구성 요소 분석 후 재시도
         try:
@@ -181,19 +234,22 @@ class FOMSAddressConverter:
                 
                 lat, lng, status = self._try_address_api(simplified_address)
                 if lat is not None and lng is not None:
-                    return lat, lng, f"{status} (simplified)"
+                    meta.update(strategy="address:simplified", confidence=_CONFIDENCE['simplified'])
+                    return lat, lng, f"{status} (simplified)", meta
+                meta['transient'] = meta['transient'] or status.startswith(_API_ERROR_PREFIXES)
         except Exception as e:
             print(f"주소 구성 요소 분석 오류: {e}")
         
-        # API 호출 간격 제어
-        time.sleep(DELAY_BETWEEN_REQUESTS)
-        
         print(f"[CONVERTER] 모든 변환 시도 실패")
-        return None, None, "AI 변환 실패"
+        return None, None, "AI 변환 실패", meta
     
     def add_learning_data(self, original_address, corrected_address, lat, lng):
-        """학습 데이터 추가"""
+        """학습 데이터 추가 (캐시된 좌표도 교정값으로 갱신)"""
         self.learning_system.add_correction(original_address, corrected_address, lat, lng)
+        try:
+            geocode_cache.put(original_address, float(lat), float(lng), 'learning', 1.0, provider='learning')
+        except (TypeError, ValueError):
+            pass
     
     def get_address_suggestions(self, address):
         """주소 교정 제안"""
@@ -223,27 +279,93 @@ class FOMSAddressConverter:
         """주소 유효성 검증"""
         return self.advanced_processor.validate_address_structure(address)
     
+    def convert_many(self, addresses, max_workers=GEOCODE_CONCURRENCY):
+        """
+        여러 주소 동시 변환 → 입력 순서 그대로 [(lat, lng, status), ...].
+        같은 주소(geocode_key 기준)는 한 번만 변환, 카카오 호출 속도는 kakao_rate_limiter로 제한
+        """
+        addresses = list(addresses)
+        unique = {}
+        for address in addresses:
+            key = geocode_key(address)
+            if key and key not in unique:
+                unique[key] = address
+        
+        resolved = {}
+        if len(unique) == 1 or max_workers <= 1:
+            for key, address in unique.items():
+                resolved[key] = self.convert_address(address)
+        elif unique:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(unique))) as pool:
+                keys = list(unique)
+                for key, result in zip(keys, pool.map(self.convert_address, (unique[k] for k in keys))):
+                    resolved[key] = result
+        
+        return [resolved.get(geocode_key(address)) or (None, None, "빈 주소") for address in addresses]
+    
     def convert_addresses_batch(self, addresses):
         """여러 주소를 일괄 변환"""
-        results = []
-        
-        for i, address in enumerate(addresses):
-            lat, lng, status = self.convert_address(address)
-            results.append({
+        addresses = list(addresses)
+        return [
+            {
                 'original_address': address,
                 'latitude': lat,
                 'longitude': lng,
                 'status': status
-            })
-            
-            # API 호출 제한 준수
-            if i < len(addresses) - 1:
-                time.sleep(DELAY_BETWEEN_REQUESTS)
+            }
+            for address, (lat, lng, status) in zip(addresses, self.convert_many(addresses))
+        ]
+    
+    def route_legs(self, legs, max_workers=GEOCODE_CONCURRENCY):
+        """
+        여러 구간 거리/소요시간 → 입력 순서 그대로 [{'status', 'distance_km', 'duration_min', 'toll', 'summary', 'cached'}].
+        legs: [(출발 lat, 출발 lng, 도착 lat, 도착 lng), ...]
+        directions_cache(현재 시간대)에 있는 구간은 API 호출 없이, 없는 구간만 중복 제거 후 동시 조회
+        """
+        legs = list(legs)
+        bucket = time_bucket(datetime.now())
+        keys = [leg_key(*leg, bucket) for leg in legs]
+        cached = directions_cache.get_many(keys)
+        
+        missing = {}
+        for key, leg in zip(keys, legs):
+            if key not in cached and key not in missing:
+                missing[key] = leg
+        fetched = {}
+        if missing:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(missing)))) as pool:
+                for key, info in zip(missing, pool.map(lambda leg: self.calculate_route(*leg), missing.values())):
+                    fetched[key] = info
         
+        results = []
+        for key in keys:
+            entry = cached.get(key)
+            if entry is not None:
+                results.append({
+                    'status': 'success',
+                    'distance_km': entry.distance_km,
+                    'duration_min': entry.duration_min,
+                    'toll': entry.toll,
+                    'summary': self._route_summary(entry.distance_km, entry.duration_min, entry.toll),
+                    'cached': True,
+                })
+                continue
+            info = fetched.get(key) or {'status': 'error', 'message': '경로를 찾을 수 없습니다.'}
+            result = {k: v for k, v in info.items() if k != 'route_coords'}
+            result['cached'] = False
+            results.append(result)
         return results
     
+    @staticmethod
+    def _route_summary(distance_km, duration_min, toll):
+        return {
+            'distance_text': f"{distance_km}km",
+            'duration_text': f"{duration_min}분",
+            'toll_text': f"{toll:,}원" if toll > 0 else "무료"
+        }
+    
     def calculate_route(self, start_lat, start_lng, end_lat, end_lng):
-        """두 좌표 간의 차량 경로 및 소요시간 계산"""
+        """두 좌표 간의 차량 경로 및 소요시간 계산 (결과 거리/시간은 directions_cache에 저장)"""
         try:
             # 카카오 내비게이션 API 사용
             url = self.directions_url
@@ -256,12 +378,13 @@ class FOMSAddressConverter:
                 'alternatives': 'false'
             }
             
-            response = requests.get(url, params=params, headers=self.headers)
+            kakao_navi_rate_limiter.acquire()
+            response = self.session.get(url, params=params, timeout=10)
             
             if response.status_code == 200:
                 data = response.json()
                 
-                if 'routes' in data and len(data['routes']) > 0:
+                if 'routes' in data and len(data['routes']) > 0 and data['routes'][0].get('result_code', 0) == 0:
                     route = data['routes'][0]
                     summary = route.get('summary', {})
                     
@@ -292,17 +415,18 @@ class FOMSAddressConverter:
                                     lat = vertexes[i + 1]
                                     route_coords.append([lat, lng])
                     
+                    directions_cache.put(
+                        leg_key(start_lat, start_lng, end_lat, end_lng, time_bucket(datetime.now())),
+                        distance_m, duration_s, toll,
+                    )
+                    
                     return {
                         'status': 'success',
                         'distance_km': distance_km,
                         'duration_min': duration_min,
                         'toll': toll,
                         'route_coords': route_coords,
-                        'summary': {
-                            'distance_text': f"{distance_km}km",
-                            'duration_text': f"{duration_min}분",
-                            'toll_text': f"{toll:,}원" if toll > 0 else "무료"
-                        }
+                        'summary': self._route_summary(distance_km, duration_min, toll)
                     }
                 else:
                     return {
@@ -320,3 +444,17 @@ class FOMSAddressConverter:
                 'status': 'error',
                 'message': f'경로 계산 중 오류 발생: {str(e)}'
             }
+
+
+_SHARED_CONVERTER = None
+_SHARED_LOCK = threading.Lock()
+
+
+def get_address_converter():
+    """프로세스 공용 변환기 (학습 데이터 JSON을 요청마다 다시 읽지 않음)"""
+    global _SHARED_CONVERTER
+    if _SHARED_CONVERTER is None:
+        with _SHARED_LOCK:
+            if _SHARED_CONVERTER is None:
+                _SHARED_CONVERTER = FOMSAddressConverter()
+    return _SHARED_CONVERTER
@@ -1,14 +1,238 @@
 import json
 import os
 import re
+import sys
+import threading
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from difflib import SequenceMatcher
 from collections import defaultdict
+import numpy as np
 try:
     import Levenshtein
 except ImportError:
     # Levenshtein이 없으면 기본 difflib 사용
     Levenshtein = None
+try:
+    import fcntl
+except ImportError:
+    # Windows: 파일 잠금 없이 저장
+    fcntl = None
+try:
+    from rapidfuzz import process as rf_process
+    from rapidfuzz.distance import Levenshtein as rf_levenshtein
+except ImportError:
+    # RapidFuzz가 없으면 색인 없이 전체 비교
+    rf_process = rf_levenshtein = None
+
+SIMILARITY_THRESHOLD = 0.8
+SCORE_EPSILON = 1e-6      # RapidFuzz score_cutoff는 거리 한도로 바꿔 비교하므로 같은 점수도 탈락할 수 있음
+
+
+def _bigrams(text):
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+def _extract_best(address, choices, cutoff):
+    """choices 중 유사도 최고 (동점은 앞쪽) → (위치, 유사도) 또는 None"""
+    found = rf_process.extractOne(
+        address, choices, scorer=rf_levenshtein.normalized_similarity, score_cutoff=max(cutoff - SCORE_EPSILON, 0),
+    )
+    return (found[2], found[1]) if found else None
+
+
+class _GramSnapshot:
+    """색인 번호 0..size-1 원문의 2-gram 역색인 (생성 후 불변, numpy)"""
+
+    DENSE_RATIO = 32       # 전체의 1/32 이상에 나오는 2-gram은 0/1 배열 (더하기 1회로 집계)
+    DENSE_MAX = 256        # 0/1 배열 최대 개수 (메모리: size 바이트 × 개수)
+    HEAD_SIZE = 16
+
+    def __init__(self, originals):
+        self.originals = originals
+        self.size = len(originals)
+        self.lengths = np.fromiter((len(o) for o in originals), dtype=np.int32, count=self.size)
+        gram_counts = np.zeros(self.size, dtype=np.int32)
+        postings = defaultdict(list)
+        for idx, original in enumerate(originals):
+            grams = _bigrams(original)
+            gram_counts[idx] = len(grams)
+            for gram in grams:
+                postings[gram].append(idx)
+        self.gram_counts = _narrow(gram_counts)
+        self._edit_caps = {}   # threshold → 대상별 허용 편집거리 × 2
+        dense_min = max(self.size // self.DENSE_RATIO, 1)
+        frequent = sorted((g for g, ids in postings.items() if len(ids) >= dense_min), key=lambda g: -len(postings[g]))
+        self.dense = {}
+        for gram in frequent[:self.DENSE_MAX]:
+            row = np.zeros(self.size, dtype=np.uint8)
+            row[postings.pop(gram)] = 1
+            self.dense[gram] = row
+        self.sparse = {g: np.array(ids, dtype=np.int32) for g, ids in postings.items()}
+
+    def _score(self, address, ids, cutoff):
+        ids = np.sort(ids)
+        found = _extract_best(address, [self.originals[i] for i in ids.tolist()], cutoff)
+        return (int(ids[found[0]]), found[1]) if found else None
+
+    def _doubled_caps(self, threshold):
+        """대상 길이만으로 정해지는 허용 편집거리 (유사도 ≥ threshold ⇔ 편집거리 ≤ 긴 쪽 길이 × (1 - threshold)) × 2"""
+        caps = self._edit_caps.get(threshold)
+        if caps is None:
+            caps = self._edit_caps[threshold] = _narrow(2 * np.floor(self.lengths * (1 - threshold) + SCORE_EPSILON).astype(np.int32))
+        return caps
+
+    def best(self, address, threshold):
+        """
+        → (색인 번호, 유사도) 또는 None (threshold 미만 제외, 동점은 색인 번호가 작은 것)
+
+        - 공유 2-gram 수 c 집계 (편집 1회는 한쪽 2-gram 최대 2개만 없앰)
+          → 편집거리 d ≥ ⌈(max(query 2-gram 수, 대상 2-gram 수) - c) / 2⌉, d ≥ 길이 차
+        - 허용 편집거리(긴 쪽 길이 × (1 - threshold))를 넘는 대상은 전체 배열 연산 몇 번으로 제외 (누락 없음)
+        - 남은 후보는 유사도 상한(1 - d 하한 / 긴 쪽 길이) 순으로 HEAD_SIZE개를 먼저 비교해 기준 유사도 s를 얻고,
+          나머지는 상한 ≥ s인 후보만 비교
+        """
+        grams = _bigrams(address)
+        counts = np.zeros(self.size, dtype=np.uint8 if len(grams) < 255 else np.uint16)
+        for gram in grams:
+            row = self.dense.get(gram)
+            if row is not None:
+                np.add(counts, row, out=counts)
+                continue
+            ids = self.sparse.get(gram)
+            if ids is not None:
+                counts[ids] += 1
+
+        # max(2-gram 수) - c ≤ 2 × max(대상 허용 편집거리, query 허용 편집거리)
+        # (c ≤ 양쪽 2-gram 수라 음수가 없으므로 부호 없는 작은 정수형으로 계산, 스칼라 대신 배열로 비교 - numpy 고속 경로)
+        length = len(address)
+        caps = self._doubled_caps(threshold)
+        query_cap = 2 * int(length * (1 - threshold) + SCORE_EPSILON)
+        dtype = np.result_type(self.gram_counts, caps, counts, np.min_scalar_type(len(grams)), np.min_scalar_type(query_cap))
+        slack = np.full(self.size, len(grams), dtype=dtype)
+        np.maximum(slack, self.gram_counts, out=slack)
+        slack -= counts
+        allowed = np.full(self.size, query_cap, dtype=dtype)
+        np.maximum(allowed, caps, out=allowed)
+        ids = np.flatnonzero(slack <= allowed)
+
+        lengths = self.lengths[ids]
+        lower = np.maximum(
+            np.abs(lengths - length),
+            (np.maximum(self.gram_counts[ids].astype(np.int32), len(grams)) - counts[ids] + 1) // 2,
+        )
+        upper = 1 - lower / np.maximum(np.maximum(lengths, length), 1)
+        keep = upper >= threshold - SCORE_EPSILON
+        ids, upper = ids[keep], upper[keep]
+        if not len(ids):
+            return None
+
+        order = np.argsort(-upper, kind='stable')
+        ids, upper = ids[order], upper[order]
+        best = self._score(address, ids[:self.HEAD_SIZE], threshold)
+        floor = best[1] if best else threshold
+        rest = ids[self.HEAD_SIZE:][upper[self.HEAD_SIZE:] >= floor - SCORE_EPSILON]
+        if len(rest):
+            found = self._score(address, rest, floor)
+            if found and (best is None or found[1] > best[1] or (found[1] == best[1] and found[0] < best[0])):
+                best = found
+        return best
+
+
+def _narrow(values):
+    """0 이상 정수 배열 → 값이 들어가는 가장 작은 부호 없는 정수형"""
+    top = int(values.max()) if len(values) else 0
+    return values.astype(np.uint8 if top < 2 ** 8 else np.uint16 if top < 2 ** 16 else np.uint32)
+
+
+def _run_in_background(target, *args):
+    """CPU 작업을 요청 처리와 분리해 실행 (eventlet monkey_patch 환경: tpool OS 스레드, 그 외: 데몬 스레드)"""
+    patcher = sys.modules.get('eventlet.patcher')
+    if patcher is not None and patcher.is_monkey_patched('thread'):
+        import eventlet
+        from eventlet import tpool
+        eventlet.spawn_n(tpool.execute, target, *args)
+        return
+    threading.Thread(target=target, args=args, name="address-index-build", daemon=True).start()
+
+
+class CorrectionIndex:
+    """
+    학습된 수정 데이터 색인 (suggest_correction용)
+
+    - 완전 일치: original → 첫 번째 수정 데이터 (dict)
+    - 유사 일치: 2-gram 역색인(_GramSnapshot)으로 후보를 추린 뒤 RapidFuzz로 점수 계산
+      - 유사도 = 1 - 편집거리 / 긴 쪽 길이 (_calculate_similarity와 동일)
+      - 스냅샷 이후 추가된 데이터(tail)는 전체 비교, TAIL_LIMIT건을 넘으면 스냅샷 재생성
+      - 스냅샷 생성(10만 건 ≈ 1.5초)은 백그라운드에서 실행, 끝날 때까지 이전 스냅샷 + tail 전체 비교
+        (첫 생성 전에는 전체 비교)
+      - SCAN_LIMIT건 이하는 색인 없이 전체 비교 (RapidFuzz 일괄 비교가 더 빠름)
+    - 같은 original이 여러 번 학습된 경우 첫 번째만 색인, 동점은 먼저 학습된 것 (기존 선형 검색과 같은 결과)
+    """
+
+    SCAN_LIMIT = 2000
+    TAIL_LIMIT = 256
+
+    def __init__(self, corrections=()):
+        self.originals = []   # 색인 번호 → original
+        self.exact = {}       # original → 수정 데이터
+        self._snapshot = None
+        self._building = False
+        self._lock = threading.Lock()
+        for correction in corrections:
+            self.add(correction)
+
+    def __len__(self):
+        return len(self.originals)
+
+    def add(self, correction):
+        if not isinstance(correction, dict):
+            return
+        original = correction.get("original")
+        if not isinstance(original, str) or original in self.exact:
+            return
+        self.originals.append(original)
+        self.exact[original] = correction
+
+    def build_snapshot(self, total=None):
+        """originals[:total] 스냅샷 생성 (백그라운드 작업 본체, 벤치마크에서는 직접 호출)"""
+        try:
+            snapshot = _GramSnapshot(self.originals[:total if total is not None else len(self.originals)])
+            if self._snapshot is None or snapshot.size > self._snapshot.size:
+                self._snapshot = snapshot
+        finally:
+            self._building = False
+
+    def _current_snapshot(self):
+        """사용 가능한 스냅샷 (없거나 오래됐으면 백그라운드 생성 예약 - 기다리지 않음)"""
+        total = len(self.originals)
+        if total <= self.SCAN_LIMIT:
+            return None
+        snapshot = self._snapshot
+        if (snapshot is None or total - snapshot.size > self.TAIL_LIMIT) and not self._building:
+            with self._lock:
+                if not self._building:
+                    self._building = True
+                    try:
+                        _run_in_background(self.build_snapshot, total)
+                    except Exception:
+                        self._building = False
+                        raise
+        return snapshot
+
+    def best_match(self, address, threshold=SIMILARITY_THRESHOLD):
+        """유사도가 threshold 초과인 가장 비슷한 수정 데이터 → (correction, similarity) 또는 None"""
+        snapshot = self._current_snapshot()
+        best = snapshot.best(address, threshold) if snapshot else None
+        start = snapshot.size if snapshot else 0
+        tail = self.originals[start:]
+        if tail:
+            found = _extract_best(address, tail, best[1] if best else threshold)
+            if found and (best is None or found[1] > best[1]):
+                best = (start + found[0], found[1])
+        if best is None or best[1] <= threshold:
+            return None
+        return self.exact[self.originals[best[0]]], best[1]
 
 
 class FOMSAddressLearningSystem:
@@ -16,9 +240,74 @@ class FOMSAddressLearningSystem:
     
     def __init__(self, learning_file="foms_address_learning_data.json"):
         self.learning_file = learning_file
+        self._file_stamp = self._stamp()  # 마지막으로 읽거나 쓴 파일 (mtime, 크기) - 다른 프로세스 변경 감지용
         self.learning_data = self._load_learning_data()
         self._clean_patterns()  # 기존 데이터 정리
         self.patterns = self._extract_patterns()
+        self._index = None  # CorrectionIndex (첫 suggest_correction에서 생성, 데이터 변경 시 갱신)
+        self._index_lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+    
+    def _get_index(self):
+        """수정 데이터 색인 (없으면 생성)"""
+        index = self._index
+        if index is None:
+            with self._index_lock:
+                if self._index is None:
+                    self._index = CorrectionIndex(self.learning_data.get("corrections", []))
+                index = self._index
+        return index
+    
+    def _invalidate_index(self):
+        with self._index_lock:
+            self._index = None
+    
+    def _stamp(self):
+        try:
+            st = os.stat(self.learning_file)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+    
+    def _reload_if_changed(self):
+        """다른 워커 프로세스가 학습 파일을 바꿨으면 다시 읽음 (데이터/패턴/색인)"""
+        if self._stamp() == self._file_stamp:
+            return
+        with self._reload_lock:
+            stamp = self._stamp()
+            if stamp == self._file_stamp:
+                return
+            self._file_stamp = stamp
+            previous = self.learning_data.get("corrections", [])
+            self.learning_data = self._load_learning_data()
+            corrections = self.learning_data.setdefault("corrections", [])
+            self._clean_patterns()
+            self.patterns = self._extract_patterns()
+            if len(corrections) >= len(previous) and corrections[:len(previous)] == previous:
+                # 뒤에 추가만 된 경우 (add_correction) 기존 색인에 이어 붙임 - 스냅샷 재생성 없음
+                with self._index_lock:
+                    if self._index is not None:
+                        for correction in corrections[len(previous):]:
+                            self._index.add(correction)
+            else:
+                self._invalidate_index()
+    
+    @contextmanager
+    def _file_lock(self):
+        """프로세스 간 학습 파일 갱신 직렬화 (읽기 → 추가 → 저장 사이에 다른 워커의 추가를 덮어쓰지 않도록)"""
+        try:
+            lock_file = open(self.learning_file + ".lock", 'a') if fcntl is not None else None
+        except OSError:
+            lock_file = None
+        if lock_file is None:
+            yield
+            return
+        with lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
     
     def _load_learning_data(self):
         """학습 데이터 로드"""
@@ -34,8 +323,12 @@ class FOMSAddressLearningSystem:
     def _save_learning_data(self):
         """학습 데이터 저장"""
         try:
-            with open(self.learning_file, 'w', encoding='utf-8') as f:
+            # 임시 파일에 쓴 뒤 교체 → 다른 프로세스가 쓰는 중인 파일을 읽지 않음
+            tmp_file = f"{self.learning_file}.{os.getpid()}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
                 json.dump(self.learning_data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_file, self.learning_file)
+            self._file_stamp = self._stamp()
         except Exception as e:
             print(f"학습 데이터 저장 오류: {e}")
     
@@ -88,9 +381,14 @@ class FOMSAddressLearningSystem:
             "similarity": self._calculate_similarity(original_address, corrected_address)
         }
         
-        self.learning_data["corrections"].append(correction)
-        self._update_patterns(original_address, corrected_address)
-        self._save_learning_data()
+        with self._file_lock():
+            self._reload_if_changed()
+            self.learning_data["corrections"].append(correction)
+            with self._index_lock:
+                if self._index is not None:
+                    self._index.add(correction)
+            self._update_patterns(original_address, corrected_address)
+            self._save_learning_data()
         print(f"학습 데이터 추가: {original_address} -> {corrected_address}")
     
     def _calculate_similarity(self, addr1, addr2):
@@ -166,29 +464,34 @@ class FOMSAddressLearningSystem:
     def suggest_correction(self, address):
         """주소에 대한 수정 제안"""
         try:
+            self._reload_if_changed()
             # 완전 일치 검색
-            corrections = self.learning_data.get("corrections", [])
-            for correction in corrections:
-                if isinstance(correction, dict) and correction.get("original") == address:
-                    return {
-                        "suggested_address": correction.get("corrected", ""),
-                        "latitude": correction.get("latitude"),
-                        "longitude": correction.get("longitude"),
-                        "confidence": 1.0,
-                        "source": "exact_match"
-                    }
+            index = self._get_index()
+            correction = index.exact.get(address)
+            if correction is not None:
+                return {
+                    "suggested_address": correction.get("corrected", ""),
+                    "latitude": correction.get("latitude"),
+                    "longitude": correction.get("longitude"),
+                    "confidence": 1.0,
+                    "source": "exact_match"
+                }
             
-            # 유사도 기반 검색
+            # 유사도 기반 검색 (2-gram 색인 후보만 비교, RapidFuzz 없으면 전체 비교)
             best_match = None
             best_similarity = 0.0
             
-            for correction in corrections:
-                if isinstance(correction, dict) and "original" in correction:
+            if rf_process is not None:
+                found = index.best_match(address, SIMILARITY_THRESHOLD)
+                if found:
+                    best_match, best_similarity = found
+            else:
+                for original in index.originals:
                     try:
-                        similarity = self._calculate_similarity(address, correction["original"])
-                        if similarity > 0.8 and similarity > best_similarity:
+                        similarity = self._calculate_similarity(address, original)
+                        if similarity > SIMILARITY_THRESHOLD and similarity > best_similarity:
                             best_similarity = similarity
-                            best_match = correction
+                            best_match = index.exact[original]
                     except Exception:
                         continue
             
@@ -287,6 +590,7 @@ class FOMSAddressLearningSystem:
         new_count = len(self.learning_data["corrections"])
         
         if original_count != new_count:
+            self._invalidate_index()
             self._save_learning_data()
             print(f"오래된 데이터 {original_count - new_count}개 정리됨")
     
@@ -326,6 +630,7 @@ class FOMSAddressLearningSystem:
                 else:
                     self.learning_data["patterns"][pattern].extend(replacements)
             
+            self._invalidate_index()
             self._save_learning_data()
             self.patterns = self._extract_patterns()
             
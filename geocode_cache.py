@@ -0,0 +1,214 @@
+"""
+지오코딩 결과 캐시 (주소 → 좌표)
+
+- 키: 정규화 주소 (행정구역 축약어 확장, 특수문자/공백 제거, 소문자) - geocode_key()
+- 저장: geocode_cache 테이블 (build step 26) + 프로세스 내 LRU
+  - LRU 항목은 MEMORY_TTL 동안만 그대로 사용하고 이후 DB에서 다시 읽음
+    (다른 워커 프로세스가 쓴 값 - 예: 주소 학습 교정 - 이 늦어도 MEMORY_TTL 안에 반영)
+  - 성공: lat/lng, 변환 전략(strategy), 신뢰도(confidence), 제공자(provider), 확인 시각, 만료 시각
+  - 실패(주소를 찾을 수 없음)도 짧은 TTL로 저장 (negative caching) - API 오류 같은 일시 실패는 저장하지 않음
+- 만료된 성공 결과는 재검증 대상: 재조회가 일시 실패하면 기존 좌표를 계속 사용 (stale)
+- DB 쓰기는 요청 세션과 분리된 별도 커넥션 (요청 트랜잭션을 commit 하지 않음)
+- build step 26 완료 전에는 프로세스 내 LRU만 사용 (build_steps.engine_step_ready, 완료 후 재시작 없이 DB 사용)
+- 히트율 등 카운터는 프로세스별 집계 (관리자 API로 노출)
+- Flask app import 없이 재사용 가능
+"""
+
+from __future__ import annotations
+
+import datetime
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import text
+
+from build_steps import engine_step_ready
+from db import engine
+
+GEOCODE_TTL = datetime.timedelta(days=90)          # 성공 결과 재검증 주기
+NEGATIVE_TTL = datetime.timedelta(hours=24)        # 찾을 수 없음 결과 재시도 주기
+MEMORY_CACHE_SIZE = 5000
+MEMORY_TTL_SECONDS = 60.0                          # 프로세스 내 LRU 항목을 DB 재확인 없이 쓰는 시간
+
+_REGION_PREFIXES = (
+    (r'^서울\s', '서울특별시 '),
+    (r'^부산\s', '부산광역시 '),
+    (r'^대구\s', '대구광역시 '),
+    (r'^인천\s', '인천광역시 '),
+    (r'^광주\s', '광주광역시 '),
+    (r'^대전\s', '대전광역시 '),
+    (r'^울산\s', '울산광역시 '),
+    (r'^세종\s', '세종특별자치시 '),
+    (r'^경기\s', '경기도 '),
+    (r'^강원\s', '강원특별자치도 '),
+    (r'^충북\s', '충청북도 '),
+    (r'^충남\s', '충청남도 '),
+    (r'^전북\s', '전북특별자치도 '),
+    (r'^전남\s', '전라남도 '),
+    (r'^경북\s', '경상북도 '),
+    (r'^경남\s', '경상남도 '),
+    (r'^제주\s', '제주특별자치도 '),
+)
+
+
+def normalize_address(address: Any) -> str:
+    """주소 정규화 (다중 공백/특수문자 제거, 행정구역 축약어 확장)"""
+    address = str(address or '').strip()
+    address = re.sub(r'\s+', ' ', address)
+    address = re.sub(r'[^\w\s가-힣\-]', ' ', address)
+    for pattern, replacement in _REGION_PREFIXES:
+        address = re.sub(pattern, replacement, address)
+    return address.strip()
+
+
+def geocode_key(address: Any) -> str:
+    """캐시 키: 정규화 주소에서 공백 제거 + 소문자 ('서울 강남구 역삼동 1' == '서울특별시 강남구  역삼동 1')"""
+    return re.sub(r'\s+', '', normalize_address(address)).lower()
+
+
+@dataclass(frozen=True)
+class CachedGeocode:
+    lat: Optional[float]
+    lng: Optional[float]
+    found: bool
+    strategy: Optional[str]
+    confidence: Optional[float]
+    provider: str
+    resolved_at: datetime.datetime
+    expires_at: datetime.datetime
+
+    @property
+    def expired(self) -> bool:
+        return self.expires_at <= datetime.datetime.now()
+
+
+class GeocodeCache:
+    def __init__(self, memory_size: int = MEMORY_CACHE_SIZE):
+        self.memory_size = memory_size
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, Tuple[CachedGeocode, float]]" = OrderedDict()  # 키 → (항목, 적재 시각)
+        self._counters = {'lookups': 0, 'hits': 0, 'negative_hits': 0, 'misses': 0, 'expired': 0, 'stale_served': 0, 'writes': 0}
+
+    # ---- 저장소 ----
+
+    def _db_ready(self) -> bool:
+        return engine_step_ready(engine, 26)
+
+    def _remember(self, key: str, entry: CachedGeocode) -> None:
+        with self._lock:
+            self._memory[key] = (entry, time.monotonic())
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def _load(self, key: str) -> Optional[CachedGeocode]:
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None:
+                self._memory.move_to_end(key)
+        if cached is not None and (time.monotonic() - cached[1] < MEMORY_TTL_SECONDS or not self._db_ready()):
+            return cached[0]
+        if not self._db_ready():
+            return None
+        try:
+            with engine.connect() as conn:
+                row = conn.execute(text("""
+                    SELECT lat, lng, found, strategy, confidence, provider, resolved_at, expires_at
+                    FROM geocode_cache WHERE address_key = :k
+                """), {"k": key}).fetchone()
+        except Exception:
+            return cached[0] if cached is not None else None
+        if row is None:
+            with self._lock:
+                self._memory.pop(key, None)
+            return None
+        entry = CachedGeocode(
+            lat=row.lat, lng=row.lng, found=bool(row.found), strategy=row.strategy,
+            confidence=row.confidence, provider=row.provider,
+            resolved_at=row.resolved_at, expires_at=row.expires_at,
+        )
+        self._remember(key, entry)
+        return entry
+
+    def _store(self, address: str, entry: CachedGeocode) -> None:
+        key = geocode_key(address)
+        if not key:
+            return
+        self._remember(key, entry)
+        self._count('writes')
+        if not self._db_ready():
+            return
+        try:
+            with engine.begin() as conn:
+                conn.execute(text("""
+                    INSERT INTO geocode_cache
+                        (address_key, address, lat, lng, found, strategy, confidence, provider, resolved_at, expires_at)
+                    VALUES (:k, :address, :lat, :lng, :found, :strategy, :confidence, :provider, :resolved_at, :expires_at)
+                    ON CONFLICT (address_key) DO UPDATE SET
+                        address = EXCLUDED.address, lat = EXCLUDED.lat, lng = EXCLUDED.lng, found = EXCLUDED.found,
+                        strategy = EXCLUDED.strategy, confidence = EXCLUDED.confidence, provider = EXCLUDED.provider,
+                        resolved_at = EXCLUDED.resolved_at, expires_at = EXCLUDED.expires_at
+                """), {
+                    "k": key, "address": str(address)[:500], "lat": entry.lat, "lng": entry.lng, "found": entry.found,
+                    "strategy": entry.strategy, "confidence": entry.confidence, "provider": entry.provider,
+                    "resolved_at": entry.resolved_at, "expires_at": entry.expires_at,
+                })
+        except Exception as e:
+            print(f"[GEOCODE_CACHE] 저장 실패: {e}")
+
+    # ---- 공개 API ----
+
+    def get(self, address: Any) -> Optional[CachedGeocode]:
+        """캐시 조회 (만료된 항목도 반환 - 호출 측에서 expired 확인 후 재검증)"""
+        key = geocode_key(address)
+        if not key:
+            return None
+        self._count('lookups')
+        entry = self._load(key)
+        if entry is None:
+            self._count('misses')
+        elif entry.expired:
+            self._count('expired')
+        else:
+            self._count('hits' if entry.found else 'negative_hits')
+        return entry
+
+    def put(self, address: Any, lat: float, lng: float, strategy: Optional[str], confidence: Optional[float], provider: str = 'kakao') -> None:
+        now = datetime.datetime.now()
+        self._store(str(address), CachedGeocode(
+            lat=float(lat), lng=float(lng), found=True, strategy=strategy, confidence=confidence,
+            provider=provider, resolved_at=now, expires_at=now + GEOCODE_TTL,
+        ))
+
+    def put_negative(self, address: Any, provider: str = 'kakao') -> None:
+        now = datetime.datetime.now()
+        self._store(str(address), CachedGeocode(
+            lat=None, lng=None, found=False, strategy=None, confidence=None,
+            provider=provider, resolved_at=now, expires_at=now + NEGATIVE_TTL,
+        ))
+
+    def note_stale(self) -> None:
+        """재검증 실패로 만료된 좌표를 그대로 사용한 경우"""
+        self._count('stale_served')
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            memory_entries = len(self._memory)
+        served = counters['hits'] + counters['negative_hits']
+        counters['hit_rate'] = round(served / counters['lookups'], 4) if counters['lookups'] else None
+        counters['memory_entries'] = memory_entries
+        counters['db_enabled'] = self._db_ready()
+        return counters
+
+
+# 프로세스 공용 인스턴스
+geocode_cache = GeocodeCache()
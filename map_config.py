@@ -6,6 +6,14 @@ DEFAULT_CENTER = [37.5665, 126.9780]  # 서울 중심좌표
 MAX_RETRIES = 3                        # API 재시도 횟수
 DELAY_BETWEEN_REQUESTS = 0.1           # API 요청 간격 (초)
 
+# 카카오 로컬 API 호출 제한 (프로세스 공용 토큰 버킷)
+KAKAO_REQUESTS_PER_SECOND = 10         # 초당 평균 요청 수
+KAKAO_BURST = 10                       # 순간 최대 요청 수
+GEOCODE_CONCURRENCY = 8                # 일괄 변환 동시 작업 수
+KAKAO_NAVI_REQUESTS_PER_SECOND = 5     # 카카오 내비(길찾기) 초당 평균 요청 수
+KAKAO_NAVI_BURST = 5
+HTTP_POOL_SIZE = 16                    # 카카오 API 커넥션 풀 크기
+
 # 좌표 검증 범위 (한국)
 MIN_LAT, MAX_LAT = 33.0, 39.0         # 위도 범위
 MIN_LNG, MAX_LNG = 124.0, 132.0       # 경도 범위
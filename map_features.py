@@ -0,0 +1,165 @@
+"""
+주문 지도 GeoJSON (마커 + 서버 측 그리드 클러스터)
+
+- 좌표는 orders.lat/lng 저장 좌표(geo_status='OK', 백그라운드 지오코딩)만 사용 → 요청 중 외부 API 호출 없음
+  - 아직 좌표가 없는 주문 수는 meta.pending으로 알려줌
+- 조회는 (id, 상태, lat, lng) 4개 컬럼만 읽음 (structured_data/ORM 객체 생성 없음)
+- 낮은 줌(CLUSTER_MAX_ZOOM 미만): 웹 메르카토르 픽셀 격자(CELL_PX) 단위로 묶어 클러스터 1개로 전송
+  - 클러스터 속성: 건수(c), 상태별 건수(st), 확대 시 펼쳐질 줌(z)
+  - 격자 1칸에 1건뿐이면 일반 마커로 전송
+- 마커 속성은 최소(id, 상태 s) - 상세는 /api/orders/<id>/structured 등에서 클릭 시 조회
+- bbox(서,남,동,북)가 있으면 화면 밖 좌표는 SQL에서 제외 (여유 REGION_PAD 비율)
+- Flask app import 없이 재사용 가능
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from models import GEO_OK, GEO_QUEUE_STATUSES, Order
+
+CLUSTER_MAX_ZOOM = 15      # 이 줌부터는 개별 마커
+CELL_PX = 60               # 클러스터 격자 크기 (화면 픽셀)
+TILE_PX = 256
+MIN_ZOOM, MAX_ZOOM = 1, 19
+REGION_PAD = 0.25          # bbox 여유 (가로/세로 비율) - 조금 이동해도 다시 받지 않도록
+COORD_DECIMALS = 5
+
+
+def parse_bbox(value: Optional[str]) -> Optional[Tuple[float, float, float, float]]:
+    """'서,남,동,북' → (west, south, east, north). 잘못된 값은 None (전체)"""
+    if not value:
+        return None
+    try:
+        west, south, east, north = (float(x) for x in value.split(','))
+    except (TypeError, ValueError):
+        return None
+    if not (-180 <= west <= 180 and -180 <= east <= 180 and -90 <= south < north <= 90):
+        return None
+    return west, south, east, north
+
+
+def parse_zoom(value: Any, default: int = 11) -> int:
+    try:
+        return min(max(int(value), MIN_ZOOM), MAX_ZOOM)
+    except (TypeError, ValueError):
+        return default
+
+
+def located_points(query, bbox: Optional[Tuple[float, float, float, float]] = None) -> List[Tuple[int, str, float, float]]:
+    """필터가 적용된 Order 쿼리 → 저장 좌표가 있는 주문 [(id, status, lat, lng)] (bbox는 여유 포함 SQL 조건)"""
+    query = query.filter(Order.geo_status == GEO_OK, Order.lat.isnot(None), Order.lng.isnot(None))
+    if bbox is not None:
+        west, south, east, north = bbox
+        pad_x, pad_y = (east - west) * REGION_PAD, (north - south) * REGION_PAD
+        query = query.filter(
+            Order.lat.between(south - pad_y, north + pad_y),
+            Order.lng.between(west - pad_x, east + pad_x),
+        )
+    return query.with_entities(Order.id, Order.status, Order.lat, Order.lng).order_by(None).all()
+
+
+def pending_count(query) -> int:
+    """좌표 변환 대기 중인 주문 수 (워커가 아직 처리하지 않은 행)"""
+    return query.filter(Order.geo_status.in_(GEO_QUEUE_STATUSES)).order_by(None).count()
+
+
+def _pixels(lat: np.ndarray, lng: np.ndarray, zoom: int) -> Tuple[np.ndarray, np.ndarray]:
+    """위경도 → 줌 레벨 기준 웹 메르카토르 전역 픽셀 좌표"""
+    scale = TILE_PX * (2 ** zoom)
+    x = (lng + 180.0) / 360.0 * scale
+    s = np.sin(np.radians(np.clip(lat, -85.05, 85.05)))
+    y = (0.5 - np.log((1 + s) / (1 - s)) / (4 * np.pi)) * scale
+    return x, y
+
+
+def _in_bbox(lat: np.ndarray, lng: np.ndarray, bbox: Tuple[float, float, float, float]) -> np.ndarray:
+    west, south, east, north = bbox
+    pad_x, pad_y = (east - west) * REGION_PAD, (north - south) * REGION_PAD
+    return (lat >= south - pad_y) & (lat <= north + pad_y) & (lng >= west - pad_x) & (lng <= east + pad_x)
+
+
+def _point(lng: float, lat: float) -> Dict[str, Any]:
+    return {'type': 'Point', 'coordinates': [round(float(lng), COORD_DECIMALS), round(float(lat), COORD_DECIMALS)]}
+
+
+def build_features(
+    points: Sequence[Tuple[int, str, float, float]],
+    zoom: int,
+    bbox: Optional[Tuple[float, float, float, float]] = None,
+) -> List[Dict[str, Any]]:
+    """(id, status, lat, lng) 목록 → GeoJSON Feature 목록 (줌에 따라 격자 클러스터)"""
+    if not points:
+        return []
+    ids = np.fromiter((p[0] for p in points), dtype=np.int64, count=len(points))
+    statuses = np.array([p[1] or '' for p in points], dtype=object)
+    lat = np.fromiter((p[2] for p in points), dtype=float, count=len(points))
+    lng = np.fromiter((p[3] for p in points), dtype=float, count=len(points))
+
+    if bbox is not None:
+        keep = _in_bbox(lat, lng, bbox)
+        ids, statuses, lat, lng = ids[keep], statuses[keep], lat[keep], lng[keep]
+        if not len(ids):
+            return []
+
+    if zoom >= CLUSTER_MAX_ZOOM:
+        return [
+            {'type': 'Feature', 'geometry': _point(lng[i], lat[i]), 'properties': {'id': int(ids[i]), 's': statuses[i]}}
+            for i in range(len(ids))
+        ]
+
+    x, y = _pixels(lat, lng, zoom)
+    cells = np.stack([np.floor(x / CELL_PX), np.floor(y / CELL_PX)], axis=1).astype(np.int64)
+    _, group, counts = np.unique(cells, axis=0, return_inverse=True, return_counts=True)
+    group = group.ravel()
+    sum_lat = np.bincount(group, weights=lat)
+    sum_lng = np.bincount(group, weights=lng)
+
+    features: List[Dict[str, Any]] = []
+    # 격자 1칸 1건: 일반 마커
+    for i in np.nonzero(counts[group] == 1)[0].tolist():
+        features.append({
+            'type': 'Feature', 'geometry': _point(lng[i], lat[i]),
+            'properties': {'id': int(ids[i]), 's': statuses[i]},
+        })
+    # 2건 이상: 격자별로 정렬해 한 번에 나눈 뒤 상태별 건수 집계
+    multi = np.nonzero(counts[group] > 1)[0]
+    order = multi[np.argsort(group[multi], kind='stable')]
+    bounds = np.nonzero(np.diff(group[order]))[0] + 1
+    for idx in np.split(order, bounds) if len(order) else []:
+        g = int(group[idx[0]])
+        by_status: Dict[str, int] = {}
+        for st in statuses[idx].tolist():
+            by_status[st] = by_status.get(st, 0) + 1
+        features.append({
+            'type': 'Feature',
+            'geometry': _point(sum_lng[g] / counts[g], sum_lat[g] / counts[g]),
+            'properties': {'c': int(counts[g]), 'st': by_status, 'z': min(zoom + 2, CLUSTER_MAX_ZOOM)},
+        })
+    return features
+
+
+def feature_collection(
+    points: Sequence[Tuple[int, str, float, float]],
+    zoom: int,
+    bbox: Optional[Tuple[float, float, float, float]] = None,
+    pending: int = 0,
+) -> Tuple[str, str]:
+    """→ (GeoJSON 본문, strong ETag). 본문은 공백 없는 JSON (마커 수천 건 전송량 최소화)"""
+    features = build_features(points, zoom, bbox)
+    body = json.dumps({
+        'type': 'FeatureCollection',
+        'features': features,
+        'meta': {
+            'zoom': zoom,
+            'total': len(points),
+            'features': len(features),
+            'clustered': zoom < CLUSTER_MAX_ZOOM,
+            'pending': pending,
+        },
+    }, ensure_ascii=False, separators=(',', ':'))
+    return body, hashlib.sha1(body.encode('utf-8')).hexdigest()
@@ -1,11 +1,136 @@
 import datetime
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, func
-from sqlalchemy.orm import relationship
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy import Column, Integer, BigInteger, String, Text, Boolean, Date, DateTime, Float, ForeignKey, Index, Computed, func, text
+from sqlalchemy.orm import deferred, relationship
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
 from db import Base
 
+
+# ============================================
+# ERP Beta structured_data 투영(projection) 컬럼
+# ============================================
+# 대시보드/지도/캘린더가 자주 필터링하는 structured_data 경로를 Postgres 생성 컬럼
+# (GENERATED ALWAYS AS ... STORED)으로 orders에 노출한다.
+# - ORM/raw SQL(jsonb_set 등) 어떤 경로로 structured_data를 써도 DB가 자동으로 동기화
+# - B-tree/부분 인덱스로 WHERE 절에서 바로 필터 가능
+# (name, SQL 타입, 생성식) - models/erp_build_step_runner/safe_schema_migration 공용
+ERP_PROJECTION_COLUMNS = [
+    ('erp_stage', 'VARCHAR', "structured_data #>> '{workflow,stage}'"),
+    ('erp_measurement_date', 'VARCHAR', "structured_data #>> '{schedule,measurement,date}'"),
+    ('erp_construction_date', 'VARCHAR', "structured_data #>> '{schedule,construction,date}'"),
+    ('erp_urgent', 'BOOLEAN', "COALESCE((structured_data #> '{flags,urgent}') = 'true'::jsonb, false)"),
+    ('erp_customer_phone', 'VARCHAR', "structured_data #>> '{parties,customer,phone}'"),
+]
+
+# (index name, 컬럼, 부분 인덱스 조건)
+ERP_PROJECTION_INDEXES = [
+    ('ix_orders_erp_stage', 'erp_stage', 'is_erp_beta'),
+    ('ix_orders_erp_measurement_date', 'erp_measurement_date', 'erp_measurement_date IS NOT NULL'),
+    ('ix_orders_erp_construction_date', 'erp_construction_date', 'erp_construction_date IS NOT NULL'),
+    ('ix_orders_erp_urgent', 'id', 'erp_urgent'),
+    ('ix_orders_erp_customer_phone', 'erp_customer_phone', 'erp_customer_phone IS NOT NULL'),
+    ('ix_orders_measurement_date', 'measurement_date', None),
+]
+
+_ERP_PROJECTION_EXPR = {name: expr for name, _type, expr in ERP_PROJECTION_COLUMNS}
+
+# 현재 Quest 요약의 필수 승인 팀 (대시보드 팀 필터: erp_quest_summary -> 'required_approvals' ? :team)
+ERP_QUEST_TEAMS_INDEX = ('ix_orders_erp_quest_required_teams', "(erp_quest_summary -> 'required_approvals')")
+
+
+# ============================================
+# 주문 검색 문서 (order_search)
+# ============================================
+# 검색 대상 레거시 컬럼 + structured_data(고객/연락처/주소/담당자/제품)를 소문자로 이어 붙인 생성 컬럼.
+# pg_trgm / bigram GIN 인덱스(build step 22)로 부분일치 검색. 생성식은 IMMUTABLE 함수만 사용(concat_ws 불가).
+_ORDER_SEARCH_PARTS = [
+    "customer_name",
+    "phone",
+    "regexp_replace(COALESCE(phone, ''), '[^0-9]', '', 'g')",
+    "address",
+    "product",
+    "options",
+    "notes",
+    "manager_name",
+    "regional_memo",
+    "status",
+    "received_date",
+    "received_time",
+    "measurement_date",
+    "measurement_time",
+    "scheduled_date",
+    "completion_date",
+    "(payment_amount)::text",
+    "structured_data #>> '{parties,customer,name}'",
+    "structured_data #>> '{parties,customer,phone}'",
+    "regexp_replace(COALESCE(structured_data #>> '{parties,customer,phone}', ''), '[^0-9]', '', 'g')",
+    "structured_data #>> '{parties,orderer,name}'",
+    "structured_data #>> '{parties,manager,name}'",
+    "structured_data #>> '{site,address_full}'",
+    "structured_data #>> '{site,address_main}'",
+    "(jsonb_path_query_array(structured_data, '$.items[*].product_name'))::text",
+    "(jsonb_path_query_array(structured_data, '$.items[*].name'))::text",
+]
+ORDER_SEARCH_DOCUMENT_EXPR = "lower(" + " || ' ' || ".join(f"COALESCE({p}, '')" for p in _ORDER_SEARCH_PARTS) + ")"
+
+# (index name, 인덱스 정의) - pg_trgm 확장/foms_search_bigrams 함수가 필요하므로 create_all 대신 step 22에서 생성
+ORDER_SEARCH_INDEXES = [
+    ('ix_orders_search_document_trgm', 'USING gin (search_document gin_trgm_ops)'),
+    ('ix_orders_search_bigrams', 'USING gin (foms_search_bigrams(search_document))'),
+]
+
+
+# ============================================
+# 일정 날짜 타입 컬럼
+# ============================================
+# 문자열 일정 컬럼(YYYY-MM-DD)과 짝을 이루는 DATE 컬럼. 쓰기는 기존 문자열 컬럼으로 하고,
+# DB 트리거(foms_orders_sync_dates, build step 23)가 foms_parse_date()로 파싱해 동기화한다.
+# 파싱 불가 값은 DATE가 NULL로 남고 order_date_quarantine에 기록된다.
+# (문자열 컬럼, DATE 컬럼) - models/erp_build_step_runner/safe_schema_migration/order_dates 공용
+ORDER_DATE_COLUMNS = [
+    ('received_date', 'received_on'),
+    ('measurement_date', 'measurement_on'),
+    ('scheduled_date', 'scheduled_on'),
+    ('completion_date', 'completion_on'),
+    ('as_received_date', 'as_received_on'),
+    ('as_completed_date', 'as_completed_on'),
+    ('shipping_scheduled_date', 'shipping_scheduled_on'),
+]
+
+# (index name, DATE 컬럼) - (status, 날짜) 복합 부분 인덱스
+ORDER_DATE_INDEXES = [(f'ix_orders_status_{typed}', typed) for _source, typed in ORDER_DATE_COLUMNS]
+
+
+# ============================================
+# 주문 좌표 (쓰기 시점 지오코딩)
+# ============================================
+# 주소(ERP Beta: site.address_full → address_main + address_detail, 그 외: address)가 바뀌면
+# DB 트리거(foms_orders_geo_enqueue, build step 27)가 geo_status='PENDING'으로 되돌리고
+# order_geocoding 워커 풀이 좌표를 채운다.
+GEO_PENDING = 'PENDING'
+GEO_RUNNING = 'RUNNING'
+GEO_OK = 'OK'
+GEO_NOT_FOUND = 'NOT_FOUND'
+GEO_ERROR = 'ERROR'          # 일시 실패 (API 오류) - 일정 시간 후 재시도
+GEO_NO_ADDRESS = 'NO_ADDRESS'
+GEO_QUEUE_STATUSES = (GEO_PENDING, GEO_RUNNING, GEO_ERROR)
+
+
 class Order(Base):
     __tablename__ = 'orders'
+    __table_args__ = tuple(
+        Index(name, column, postgresql_where=text(where) if where else None)
+        for name, column, where in ERP_PROJECTION_INDEXES
+    ) + (
+        Index(ERP_QUEST_TEAMS_INDEX[0], text(ERP_QUEST_TEAMS_INDEX[1]), postgresql_using='gin'),
+    ) + tuple(
+        Index(name, 'status', column, postgresql_where=text(f'{column} IS NOT NULL'))
+        for name, column in ORDER_DATE_INDEXES
+    ) + (
+        Index('ix_orders_feed_version', 'feed_version', postgresql_where=text('feed_version IS NOT NULL')),
+        Index('ix_orders_feed_xid', 'feed_xid', postgresql_where=text('feed_xid IS NOT NULL')),
+        Index('ix_orders_geo_queue', 'geo_status', 'id',
+              postgresql_where=text("geo_status IN ('PENDING', 'RUNNING', 'ERROR')")),
+    )
     
     id = Column(Integer, primary_key=True)
     received_date = Column(String, nullable=False)
@@ -67,9 +192,46 @@ class Order(Base):
     structured_schema_version = Column(Integer, nullable=False, default=1)
     structured_confidence = Column(String(20), nullable=True)  # high/medium/low
     structured_updated_at = Column(DateTime, nullable=True)
+
+    # structured_data 투영 컬럼 (DB 생성 컬럼, 읽기 전용)
+    erp_stage = Column(String, Computed(_ERP_PROJECTION_EXPR['erp_stage'], persisted=True))
+    erp_measurement_date = Column(String, Computed(_ERP_PROJECTION_EXPR['erp_measurement_date'], persisted=True))
+    erp_construction_date = Column(String, Computed(_ERP_PROJECTION_EXPR['erp_construction_date'], persisted=True))
+    erp_urgent = Column(Boolean, Computed(_ERP_PROJECTION_EXPR['erp_urgent'], persisted=True))
+    erp_customer_phone = Column(String, Computed(_ERP_PROJECTION_EXPR['erp_customer_phone'], persisted=True))
+
+    # 현재 단계 Quest 요약 (erp_policy.resolve_quest_summary, Quest/단계 변경 저장 시점에 갱신)
+    erp_quest_summary = Column(JSONB, nullable=True)
+
+    # 일정 DATE 컬럼 (문자열 일정 컬럼에서 트리거로 동기화, 읽기 전용)
+    received_on = Column(Date, nullable=True)
+    measurement_on = Column(Date, nullable=True)
+    scheduled_on = Column(Date, nullable=True)
+    completion_on = Column(Date, nullable=True)
+    as_received_on = Column(Date, nullable=True)
+    as_completed_on = Column(Date, nullable=True)
+    shipping_scheduled_on = Column(Date, nullable=True)
+
+    # 변경 번호 (INSERT/UPDATE마다 트리거가 orders_feed_seq로 부여, calendar_feed 변경 감지용)
+    feed_version = Column(BigInteger, nullable=True)
+    # 변경한 트랜잭션 id (pg_current_xact_id, 트리거가 기록 - build step 29). 커밋 워터마크(스냅샷 xmin)와 비교
+    feed_xid = Column(BigInteger, nullable=True)
+
+    # 현장 좌표 (주소 변경 시 트리거가 PENDING 처리, order_geocoding 워커가 채움)
+    lat = Column(Float, nullable=True)
+    lng = Column(Float, nullable=True)
+    geo_status = Column(String(20), nullable=True)  # GEO_* (NULL: step 27 이전 행)
+    geo_updated_at = Column(DateTime, nullable=True)
+
+    # 출고 패널 집계용 사전 계산 값 (structured_data 저장 시 트리거가 갱신, erp_panels)
+    erp_spec_units = Column(Float, nullable=True)  # items 규격(W)/300 합계
+    erp_construction_workers = Column(ARRAY(Text), nullable=True)  # 배정 시공자 정규화 이름
+
+    # 검색 문서 (DB 생성 컬럼, 조회 시 기본 로딩 제외)
+    search_document = deferred(Column(Text, Computed(ORDER_SEARCH_DOCUMENT_EXPR, persisted=True)))
     
     def to_dict(self):
-        return {c.name: getattr(self, c.name) for c in self.__table__.columns}
+        return {c.name: getattr(self, c.name) for c in self.__table__.columns if c.name != 'search_document'}
 
 
 class OrderAttachment(Base):
@@ -121,6 +283,13 @@ class OrderEvent(Base):
 class OrderTask(Base):
     """팔로업/이슈 추적(Task)"""
     __tablename__ = 'order_tasks'
+    __table_args__ = (
+        # 열린 자동 Task는 주문당 auto_key 1개 (erp_automation의 INSERT ... ON CONFLICT 대상)
+        Index(
+            'ux_order_tasks_open_auto_key', 'order_id', text("(meta->>'auto_key')"),
+            unique=True, postgresql_where=text("status IN ('OPEN','IN_PROGRESS')"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True)
     order_id = Column(Integer, ForeignKey('orders.id', ondelete='CASCADE'), nullable=False, index=True)
@@ -137,6 +306,148 @@ class OrderTask(Base):
     owner_user = relationship('User', foreign_keys=[owner_user_id])
 
 
+class OrderQuest(Base):
+    """
+    단계별 Quest(팀 승인) - structured_data.quests에서 분리된 테이블.
+    승인 1건이 orders.structured_data 전체를 다시 쓰지 않도록 행 단위로 갱신한다.
+    """
+    __tablename__ = 'order_quests'
+    __table_args__ = (
+        Index('ix_order_quests_order_stage_status', 'order_id', 'stage', 'status'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    order_id = Column(Integer, ForeignKey('orders.id', ondelete='CASCADE'), nullable=False)
+    stage = Column(String(50), nullable=False)  # 한글 단계명 또는 영문 코드 (기존 quests[].stage 그대로)
+    title = Column(String(255), nullable=True)
+    description = Column(Text, nullable=True)
+    owner_team = Column(String(50), nullable=True)
+    owner_person = Column(String(100), nullable=True)
+    status = Column(String(30), nullable=False, default='OPEN')  # OPEN/IN_PROGRESS/COMPLETED
+    required_approvals = Column(JSONB, nullable=True)  # ["CS", "SALES"]
+    team_approvals = Column(JSONB, nullable=True)  # {"CS": {"approved": true, "approved_by": 1, ...}}
+    extra = Column(JSONB, nullable=True)  # 기존 quest dict의 기타 키 보존용
+    created_at = Column(DateTime, default=datetime.datetime.now, nullable=False)
+    updated_at = Column(DateTime, default=datetime.datetime.now, nullable=False)
+    completed_at = Column(DateTime, nullable=True)
+    # 낙관적 잠금 버전 (UPDATE ... WHERE version = :old, 충돌 시 StaleDataError)
+    version = Column(Integer, nullable=False, default=1, server_default='1')
+
+    order = relationship('Order', foreign_keys=[order_id])
+
+    __mapper_args__ = {'version_id_col': version}
+
+    def to_dict(self):
+        """기존 structured_data.quests[] 항목과 동일한 형태 (API 응답/erp_policy 입력용)"""
+        data = dict(self.extra or {})
+        data.update({
+            'id': self.id,
+            'stage': self.stage,
+            'title': self.title or '',
+            'description': self.description or '',
+            'owner_team': self.owner_team or '',
+            'owner_person': self.owner_person or '',
+            'status': self.status,
+            'required_approvals': list(self.required_approvals or []),
+            'team_approvals': dict(self.team_approvals or {}),
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'version': self.version,
+        })
+        if self.completed_at:
+            data['completed_at'] = self.completed_at.isoformat()
+        return data
+
+
+class OrderDateQuarantine(Base):
+    """
+    일정 문자열 컬럼 중 날짜로 해석할 수 없는 값 (주문/컬럼당 1행).
+    build step 23 백필 시 기록, 이후 쓰기는 트리거(foms_orders_date_quarantine, build step 31)가 기록/해제.
+    원본 문자열은 orders에 그대로 남고 DATE 컬럼만 NULL이다.
+    """
+    __tablename__ = 'order_date_quarantine'
+
+    order_id = Column(Integer, ForeignKey('orders.id', ondelete='CASCADE'), primary_key=True)
+    column_name = Column(String(50), primary_key=True)
+    raw_value = Column(Text, nullable=False)
+    detected_at = Column(DateTime, nullable=False, default=datetime.datetime.now)
+
+
+class OrderFeedTombstone(Base):
+    """하드 삭제된 주문 (calendar_feed 델타 동기화용, 삭제 트리거가 기록 - build step 24)"""
+    __tablename__ = 'order_feed_tombstones'
+
+    order_id = Column(Integer, primary_key=True)  # 삭제된 주문 id (FK 없음)
+    feed_version = Column(BigInteger, nullable=False, index=True)
+    feed_xid = Column(BigInteger, nullable=True, index=True)  # 삭제한 트랜잭션 id (build step 29)
+    deleted_at = Column(DateTime, nullable=False, default=datetime.datetime.now)
+
+
+class GeocodeCacheEntry(Base):
+    """
+    주소 → 좌표 캐시 (geocode_cache 모듈, 정규화 주소 키). found=False는 찾을 수 없음(negative) 결과.
+    expires_at이 지나면 다음 조회 시 재검증한다.
+    """
+    __tablename__ = 'geocode_cache'
+
+    address_key = Column(Text, primary_key=True)  # geocode_key(): 정규화 주소(공백 제거, 소문자)
+    address = Column(Text, nullable=False)  # 마지막으로 저장한 원본 주소
+    lat = Column(Float, nullable=True)
+    lng = Column(Float, nullable=True)
+    found = Column(Boolean, nullable=False, default=True)
+    strategy = Column(String(50), nullable=True)  # address:processed / keyword:original / learning 등
+    confidence = Column(Float, nullable=True)
+    provider = Column(String(30), nullable=False, default='kakao')
+    resolved_at = Column(DateTime, nullable=False, default=datetime.datetime.now)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+class DirectionsLeg(Base):
+    """
+    카카오 내비 구간(출발 → 도착) 캐시 (directions_cache 모듈). 좌표는 소수 4자리(약 10m) 반올림 키,
+    time_bucket은 출발 시간대(시 // DIRECTIONS_TIME_BUCKET_HOURS, 무관하면 -1).
+    """
+    __tablename__ = 'directions_cache'
+
+    origin_key = Column(String(40), primary_key=True)  # 'lat,lng' (반올림)
+    dest_key = Column(String(40), primary_key=True)
+    time_bucket = Column(Integer, primary_key=True, default=-1)
+    distance_m = Column(Integer, nullable=False)
+    duration_s = Column(Integer, nullable=False)
+    toll = Column(Integer, nullable=False, default=0)
+    fetched_at = Column(DateTime, nullable=False, default=datetime.datetime.now)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+class OrderAlert(Base):
+    """
+    ERP 경보 상태(주문당 1행). structured_data 저장 시/일자 변경 시 erp_alerts 모듈이 갱신한다.
+    - *_days: computed_for 기준 남은 영업일 (오늘 제외, 대상일 포함)
+    - drawing_due_at: 도면/컨펌 단계 48h 기한 (now() 비교로 초과 여부 판단)
+    - 긴급 여부는 orders.erp_urgent 투영 컬럼 사용
+    """
+    __tablename__ = 'order_alerts'
+    __table_args__ = (
+        Index('ix_order_alerts_measurement_d4', 'order_id', postgresql_where=text('measurement_d4')),
+        Index('ix_order_alerts_construction_d3', 'order_id', postgresql_where=text('construction_d3')),
+        Index('ix_order_alerts_production_d2', 'order_id', postgresql_where=text('production_d2')),
+        Index('ix_order_alerts_drawing_due_at', 'drawing_due_at', postgresql_where=text('drawing_due_at IS NOT NULL')),
+    )
+
+    order_id = Column(Integer, ForeignKey('orders.id', ondelete='CASCADE'), primary_key=True)
+    stage = Column(String(50), nullable=True)  # 계산 시점 workflow.stage (코드)
+    measurement_date = Column(String, nullable=True)  # 계산에 사용한 실측일 (YYYY-MM-DD)
+    construction_date = Column(String, nullable=True)  # 계산에 사용한 시공일 (YYYY-MM-DD)
+    measurement_days = Column(Integer, nullable=True)
+    construction_days = Column(Integer, nullable=True)
+    measurement_d4 = Column(Boolean, nullable=False, default=False, server_default='false')
+    construction_d3 = Column(Boolean, nullable=False, default=False, server_default='false')
+    production_d2 = Column(Boolean, nullable=False, default=False, server_default='false')
+    drawing_due_at = Column(DateTime, nullable=True)
+    computed_for = Column(Date, nullable=False, index=True)  # 영업일 계산 기준일
+    updated_at = Column(DateTime, default=datetime.datetime.now, nullable=False)
+
+
 class SystemBuildStep(Base):
     """빌드/마이그레이션 단계 진행상태 저장 (끊김 시 이어서 실행용)"""
     __tablename__ = 'system_build_steps'
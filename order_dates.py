@@ -0,0 +1,73 @@
+"""
+주문 일정 날짜 (문자열 컬럼 ↔ DATE 컬럼)
+
+- models.ORDER_DATE_COLUMNS: received_date → received_on 등 문자열/DATE 컬럼 쌍
+- DATE 컬럼은 DB 트리거가 foms_parse_date()로 동기화 (build step 23에서 함수/트리거/백필/인덱스 생성)
+- 템플릿/폼/API는 기존처럼 문자열 컬럼(YYYY-MM-DD)을 사용하고, 범위/비교 쿼리만 DATE 컬럼 사용
+- step 23 완료 전에는 기존 방식(문자열 date() 캐스팅)으로 폴백
+- parse_order_date는 foms_parse_date와 같은 규칙의 Python 구현 (ORM 객체/폼 값 비교용)
+- Flask app import 없이 재사용 가능
+"""
+
+from __future__ import annotations
+
+import datetime
+import re
+from typing import Any, Optional
+
+from sqlalchemy import func
+
+from build_steps import step_ready
+from models import ORDER_DATE_COLUMNS, Order
+
+DATE_COLUMN_OF = dict(ORDER_DATE_COLUMNS)
+
+_FULL_DATE = re.compile(r'^(\d{4})\s*[-./년]\s*(\d{1,2})\s*[-./월]\s*(\d{1,2})')
+_COMPACT_DATE = re.compile(r'^(\d{4})(\d{2})(\d{2})')
+_SHORT_DATE = re.compile(r'^(\d{2})[-./](\d{1,2})[-./](\d{1,2})$')
+
+
+def parse_order_date(value: Any) -> Optional[datetime.date]:
+    """
+    일정 문자열 → date (해석 불가 시 None).
+    허용: YYYY-MM-DD / YYYY.MM.DD / YYYY/MM/DD / YYYY년 M월 D일 (뒤에 시간 등 허용), YYYYMMDD, YY-MM-DD
+    """
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    v = str(value or '').strip()
+    if not v:
+        return None
+    m = _FULL_DATE.match(v) or _COMPACT_DATE.match(v)
+    year_offset = 0
+    if not m:
+        m = _SHORT_DATE.match(v)
+        year_offset = 2000
+    if not m:
+        return None
+    year = int(m.group(1)) + year_offset
+    if year < 1990 or year > 2100:
+        return None
+    try:
+        return datetime.date(year, int(m.group(2)), int(m.group(3)))
+    except ValueError:
+        return None
+
+
+def order_date_value(order: Any, name: str) -> Optional[datetime.date]:
+    """주문(ORM/OrderRow)의 일정 날짜: DATE 컬럼 값, 없으면 문자열 컬럼 파싱"""
+    typed = getattr(order, DATE_COLUMN_OF[name], None)
+    if typed is not None:
+        return typed
+    return parse_order_date(getattr(order, name, None))
+
+
+def order_date(db, name: str):
+    """
+    일정 날짜 비교용 SQL 식 (DATE).
+    step 23 완료 후: DATE 컬럼 ((status, 날짜) 인덱스 사용), 이전: 문자열 컬럼 date() 캐스팅
+    """
+    if step_ready(db, 23):
+        return getattr(Order, DATE_COLUMN_OF[name])
+    return func.date(func.nullif(getattr(Order, name), ''))
@@ -0,0 +1,222 @@
+"""
+주문 좌표 쓰기 시점 지오코딩 (백그라운드 워커 풀)
+
+- 큐: orders.geo_status = 'PENDING' (주소 변경 시 DB 트리거가 설정, build step 27)
+  - 워커는 FOR UPDATE SKIP LOCKED로 일정 건수씩 RUNNING 선점 → 좌표 변환 → OK/NOT_FOUND/ERROR 저장
+  - 선점 후 주소가 또 바뀌면 트리거가 PENDING으로 되돌리므로 저장하지 않고 다음 차례에 재처리
+  - RUNNING이 오래 남은 행(워커 중단)과 ERROR(일시 실패)는 일정 시간 후 다시 선점
+- 주문 저장(commit) 직후 after_commit 훅이 워커를 깨우고, raw SQL 변경은 주기 폴링으로 처리
+- 지도/경로 API는 order_coordinates()로 저장 좌표를 바로 사용, 미처리 행만 요청 중 변환 (폴백)
+  - 여러 주문은 orders_coordinates()로 미처리 행을 모아 converter.convert_many로 동시 변환
+- 워커 DB 작업은 요청 세션과 분리된 별도 커넥션 사용
+- 워커 풀은 step 27 완료 후 시작 (app.py), 연속 오류 시 재시도 간격을 늘림 (객체 누락 오류는 바로 최대 간격)
+- Flask app import 없이 재사용 가능
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event, inspect as sa_inspect, text
+
+from db import engine
+from models import GEO_ERROR, GEO_NOT_FOUND, GEO_OK, GEO_RUNNING, Order
+
+GEOCODE_WORKERS = int(os.getenv("FOMS_GEOCODE_WORKERS", "2"))
+CLAIM_BATCH = 20
+POLL_SECONDS = 5.0
+RUNNING_TIMEOUT_MINUTES = 10
+ERROR_RETRY_MINUTES = 60
+ERROR_BACKOFF_MAX_SECONDS = 300.0  # 연속 처리 오류 시 재시도 간격 상한 (poll_seconds부터 2배씩)
+
+# undefined_table / undefined_column / undefined_function: step 27 객체가 없음 → 곧바로 최대 간격
+_MISSING_OBJECT_CODES = {'42P01', '42703', '42883'}
+
+_GEO_FIELDS = ('address', 'structured_data', 'is_erp_beta')
+
+
+def order_geo_address(order: Any) -> Optional[str]:
+    """지오코딩 대상 주소 (foms_geo_address와 같은 규칙): ERP Beta 현장주소 우선, 없으면 레거시 address"""
+    sd = getattr(order, 'structured_data', None)
+    if getattr(order, 'is_erp_beta', False) and isinstance(sd, dict):
+        site = sd.get('site') or {}
+        full = str(site.get('address_full') or '').strip()
+        if full and full != '-':
+            return full
+        main = str(site.get('address_main') or '').strip()
+        if main:
+            detail = str(site.get('address_detail') or '').strip()
+            return f"{main} {detail}" if detail and detail != '-' else main
+    legacy = str(getattr(order, 'address', None) or '').strip()
+    return legacy or None
+
+
+def _stored_coordinates(order: Any) -> Optional[Tuple[float, float, str]]:
+    if getattr(order, 'geo_status', None) == GEO_OK and order.lat is not None and order.lng is not None:
+        return float(order.lat), float(order.lng), "저장 좌표"
+    return None
+
+
+def order_coordinates(order: Any, address: Optional[str], converter) -> Tuple[Optional[float], Optional[float], str]:
+    """
+    지도/경로용 좌표 → (lat, lng, status).
+    워커가 채운 좌표(geo_status='OK')는 외부 호출 없이 사용, 미처리/실패 행만 converter로 즉시 변환
+    """
+    return _stored_coordinates(order) or converter.convert_address(address)
+
+
+def orders_coordinates(
+    pairs: Sequence[Tuple[Any, Optional[str]]], converter
+) -> List[Tuple[Optional[float], Optional[float], str]]:
+    """
+    (order, address) 목록 → 같은 순서의 (lat, lng, status) 목록.
+    저장 좌표가 없는 행만 모아 converter.convert_many로 한 번에 변환 (전체 소요 ≈ 가장 느린 요청)
+    """
+    results: List[Any] = [None] * len(pairs)
+    pending: List[int] = []
+    for i, (order, _address) in enumerate(pairs):
+        results[i] = _stored_coordinates(order)
+        if results[i] is None:
+            pending.append(i)
+    if pending:
+        converted = converter.convert_many([pairs[i][1] for i in pending])
+        for i, result in zip(pending, converted):
+            results[i] = result
+    return results
+
+
+def _missing_object(exc: Exception) -> bool:
+    return getattr(getattr(exc, 'orig', None), 'pgcode', None) in _MISSING_OBJECT_CODES
+
+
+class GeocodeWorkerPool:
+    """PENDING 주문 좌표를 채우는 데몬 스레드 풀 (eventlet monkey_patch 환경에서는 green thread)"""
+
+    def __init__(self, workers: int = GEOCODE_WORKERS, batch: int = CLAIM_BATCH, poll_seconds: float = POLL_SECONDS):
+        self.workers = workers
+        self.batch = batch
+        self.poll_seconds = poll_seconds
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._threads = []
+        self._converter = None
+
+    @property
+    def started(self) -> bool:
+        return bool(self._threads)
+
+    def ensure_started(self) -> None:
+        if self._threads or self.workers <= 0:
+            return
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                t = threading.Thread(target=self._run, name=f"geocode-worker-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def _get_converter(self):
+        if self._converter is None:
+            from foms_address_converter import get_address_converter  # local import (학습 데이터 로드 지연)
+            self._converter = get_address_converter()
+        return self._converter
+
+    def _claim(self):
+        with engine.begin() as conn:
+            return conn.execute(text(f"""
+                UPDATE orders o
+                SET geo_status = 'RUNNING', geo_updated_at = NOW()
+                FROM (
+                    SELECT id FROM orders
+                    WHERE geo_status = 'PENDING'
+                       OR (geo_status = 'RUNNING' AND geo_updated_at < NOW() - INTERVAL '{RUNNING_TIMEOUT_MINUTES} minutes')
+                       OR (geo_status = 'ERROR' AND geo_updated_at < NOW() - INTERVAL '{ERROR_RETRY_MINUTES} minutes')
+                    ORDER BY id DESC
+                    LIMIT :n
+                    FOR UPDATE SKIP LOCKED
+                ) c
+                WHERE o.id = c.id
+                RETURNING o.id, foms_geo_address(o.is_erp_beta, o.address, o.structured_data) AS address
+            """), {"n": self.batch}).fetchall()
+
+    def _store(self, order_id: int, lat, lng, status: str) -> None:
+        with engine.begin() as conn:
+            conn.execute(text("""
+                UPDATE orders
+                SET lat = :lat, lng = :lng, geo_status = :status, geo_updated_at = NOW()
+                WHERE id = :id AND geo_status = :running
+            """), {"id": order_id, "lat": lat, "lng": lng, "status": status, "running": GEO_RUNNING})
+
+    def process_batch(self) -> int:
+        """PENDING 주문 최대 batch건 처리, 처리 건수 반환"""
+        rows = self._claim()
+        converter = self._get_converter()
+        for row in rows:
+            lat, lng, _status, transient = converter.lookup(row.address)
+            if lat is not None and lng is not None:
+                self._store(row.id, float(lat), float(lng), GEO_OK)
+            else:
+                self._store(row.id, None, None, GEO_ERROR if transient else GEO_NOT_FOUND)
+        return len(rows)
+
+    def _run(self) -> None:
+        failures = 0
+        while True:
+            try:
+                processed = self.process_batch()
+                failures = 0
+            except Exception as e:
+                failures += 1
+                if _missing_object(e):
+                    delay = ERROR_BACKOFF_MAX_SECONDS
+                else:
+                    delay = min(self.poll_seconds * 2 ** failures, ERROR_BACKOFF_MAX_SECONDS)
+                if failures & (failures - 1) == 0:  # 1, 2, 4, 8...번째 연속 오류만 기록
+                    print(f"[GEOCODE_WORKER] 처리 오류 ({failures}회 연속, {delay:.0f}초 후 재시도): {e}")
+                # 커밋 알림(wake)으로 앞당기지 않음
+                time.sleep(delay)
+                continue
+            if processed < self.batch:
+                self._wake.wait(self.poll_seconds)
+                self._wake.clear()
+
+
+geocode_workers = GeocodeWorkerPool()
+
+
+def _after_flush(session, flush_context):
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, Order):
+            continue
+        if obj in session.new:
+            session.info['geo_wake'] = True
+            return
+        state = sa_inspect(obj)
+        if any(getattr(state.attrs, name).history.has_changes() for name in _GEO_FIELDS):
+            session.info['geo_wake'] = True
+            return
+
+
+def _after_commit(session):
+    if session.info.pop('geo_wake', False):
+        geocode_workers.wake()
+
+
+def mark_geocode_pending(session) -> None:
+    """flush 훅을 거치지 않는 주소 변경(raw UPDATE) 후 commit 시 워커를 깨우도록 표시"""
+    session.info['geo_wake'] = True
+
+
+def register_geocode_hooks(session_factory) -> None:
+    """주소가 바뀐 주문이 commit되면 워커를 바로 깨움 (큐 등록 자체는 DB 트리거)"""
+    if not event.contains(session_factory, 'after_flush', _after_flush):
+        event.listen(session_factory, 'after_flush', _after_flush)
+    if not event.contains(session_factory, 'after_commit', _after_commit):
+        event.listen(session_factory, 'after_commit', _after_commit)
@@ -0,0 +1,110 @@
+"""
+주문 목록 페이지네이션 (keyset + 건수 추정)
+
+- keyset: ID 역순 정렬에서 after(<이 ID보다 작은) / before(>이 ID보다 큰) 커서로 이동
+  → OFFSET 없이 인덱스(PK) 범위 스캔, 새 주문이 들어와도 페이지 경계가 밀리지 않음
+- 건수: 기본은 플래너 추정치(EXPLAIN)를 쓰고, 추정치가 작으면 정확한 COUNT로 대체.
+  정확한 건수(exact=True)는 선택 시에만 계산하며, 결과는 필터 조건(SQL+파라미터)별로 짧게 캐시
+- Flask app import 없이 재사용 가능
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from models import Order
+
+# 추정치가 이 값 이하면 COUNT(*)도 충분히 싸므로 정확한 건수 사용
+EXACT_COUNT_THRESHOLD = 5000
+COUNT_CACHE_TTL_SECONDS = 30
+_COUNT_CACHE_MAX = 256
+
+_COUNT_LOCK = threading.Lock()
+_COUNT_CACHE: Dict[str, Tuple[float, int, bool]] = {}
+
+
+def _compiled(db, query):
+    stmt = query.order_by(None).statement
+    return stmt.compile(dialect=db.get_bind().dialect)
+
+
+def _signature(compiled) -> str:
+    return json.dumps([str(compiled), sorted((k, repr(v)) for k, v in compiled.params.items())], ensure_ascii=False)
+
+
+def estimate_count(db, query) -> Optional[int]:
+    """플래너 추정 행 수 (EXPLAIN, 실제 실행 없음). 실패 시 None"""
+    try:
+        compiled = _compiled(db, query)
+        row = db.connection().exec_driver_sql(
+            "EXPLAIN (FORMAT JSON) " + str(compiled), compiled.params
+        ).fetchone()
+        plan = row[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except Exception:
+        try:
+            db.rollback()
+        except Exception:
+            pass
+        return None
+
+
+def order_count(db, query, exact: bool = False) -> Tuple[int, bool]:
+    """
+    필터 적용된 주문 쿼리의 건수 → (건수, 정확 여부).
+    exact=False: 추정치가 EXACT_COUNT_THRESHOLD를 넘으면 추정치 반환
+    """
+    compiled = _compiled(db, query)
+    key = _signature(compiled)
+    now = time.monotonic()
+    with _COUNT_LOCK:
+        cached = _COUNT_CACHE.get(key)
+    if cached and cached[0] > now and (cached[2] or not exact):
+        return cached[1], cached[2]
+
+    count, is_exact = None, False
+    if not exact:
+        estimate = estimate_count(db, query)
+        if estimate is not None and estimate > EXACT_COUNT_THRESHOLD:
+            count = estimate
+    if count is None:
+        count, is_exact = query.order_by(None).count(), True
+
+    with _COUNT_LOCK:
+        if len(_COUNT_CACHE) >= _COUNT_CACHE_MAX:
+            _COUNT_CACHE.clear()
+        _COUNT_CACHE[key] = (now + COUNT_CACHE_TTL_SECONDS, count, is_exact)
+    return count, is_exact
+
+
+def keyset_page(
+    query,
+    per_page: int,
+    after_id: Optional[int] = None,
+    before_id: Optional[int] = None,
+) -> Tuple[List[Any], bool, bool]:
+    """
+    ID 역순 keyset 페이지 → (주문 목록, 이전 페이지 존재, 다음 페이지 존재).
+    after_id: 다음 페이지(이 ID보다 작은 주문), before_id: 이전 페이지(이 ID보다 큰 주문, 0이면 마지막 페이지)
+    """
+    if before_id is not None:
+        rows = (
+            query.filter(Order.id > before_id)
+            .order_by(Order.id.asc())
+            .limit(per_page + 1)
+            .all()
+        )
+        has_prev = len(rows) > per_page
+        rows = rows[:per_page][::-1]
+        return rows, has_prev, before_id > 0
+
+    if after_id is not None:
+        query = query.filter(Order.id < after_id)
+    rows = query.order_by(Order.id.desc()).limit(per_page + 1).all()
+    has_next = len(rows) > per_page
+    return rows[:per_page], after_id is not None, has_next
@@ -0,0 +1,170 @@
+"""
+주문 목록 표시용 view-model (OrderRow)
+
+- 목록/대시보드 템플릿에 ORM 인스턴스 대신 전달하는 읽기 전용 행 객체 (__slots__)
+  → copy.deepcopy(ORM) 제거, ERP Beta 표시값을 ORM 속성에 덮어써 세션이 dirty 되는 문제 제거
+- 레거시 컬럼 + ERP Beta structured_data 경로(고객/연락처/담당자/주소/제품/실측·시공일)를
+  모듈 로드 시 만든 추출기 목록으로 한 번에 매핑
+- Flask app import 없이 재사용 가능
+"""
+
+from __future__ import annotations
+
+from operator import attrgetter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from models import Order
+
+# 표시용 컬럼 (검색 문서 등 deferred 컬럼 제외)
+ORDER_ROW_COLUMNS: Tuple[str, ...] = tuple(
+    c.name for c in Order.__table__.columns if c.name != 'search_document'
+)
+
+PRODUCT_SUMMARY = 'summary'  # "제품1 외 N개" (주문 목록)
+PRODUCT_JOIN = 'join'        # "제품1, 제품2" (대시보드)
+
+
+def _path(*keys: str) -> Callable[[Dict[str, Any]], Any]:
+    def get(sd: Dict[str, Any]) -> Any:
+        cur: Any = sd
+        for k in keys:
+            if not isinstance(cur, dict):
+                return None
+            cur = cur.get(k)
+        return cur
+    return get
+
+
+def _as_str(getter: Callable[[Dict[str, Any]], Any]) -> Callable[[Dict[str, Any]], Any]:
+    def get(sd: Dict[str, Any]) -> Any:
+        value = getter(sd)
+        return str(value) if value else None
+    return get
+
+
+_site_full = _path('site', 'address_full')
+_site_main = _path('site', 'address_main')
+_site_detail = _path('site', 'address_detail')
+
+
+def _site_address(sd: Dict[str, Any]) -> Optional[str]:
+    full = _site_full(sd)
+    if full:
+        return full
+    main = _site_main(sd)
+    if not main:
+        return None
+    detail = _site_detail(sd)
+    return f"{main} {detail}".strip() if detail else main
+
+
+def _item_names(sd: Dict[str, Any]) -> List[str]:
+    items = sd.get('items')
+    if not isinstance(items, list):
+        return []
+    names = []
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        name = item.get('product_name')
+        if isinstance(name, str) and name.strip():
+            names.append(name.strip())
+    return names
+
+
+def _product_summary(sd: Dict[str, Any]) -> Optional[str]:
+    # 첫 번째 제품명 + 나머지 전체 품목 수 (이름 없는 품목도 개수에 포함)
+    items = sd.get('items')
+    if not isinstance(items, list) or not items or not isinstance(items[0], dict):
+        return None
+    name = items[0].get('product_name') or items[0].get('name')
+    if not name:
+        return None
+    return f"{name} 외 {len(items) - 1}개" if len(items) > 1 else name
+
+
+def _product_join(sd: Dict[str, Any]) -> Optional[str]:
+    names = _item_names(sd)
+    return ", ".join(names) if names else None
+
+
+# (표시 필드, structured_data 추출기) - 값이 있을 때만 레거시 컬럼 값을 대체
+_ERP_OVERRIDES: Tuple[Tuple[str, Callable[[Dict[str, Any]], Any]], ...] = (
+    ('customer_name', _path('parties', 'customer', 'name')),
+    ('phone', _path('parties', 'customer', 'phone')),
+    ('manager_name', _path('parties', 'manager', 'name')),
+    ('address', _site_address),
+    ('measurement_date', _as_str(_path('schedule', 'measurement', 'date'))),
+    ('measurement_time', _path('schedule', 'measurement', 'time')),
+    ('scheduled_date', _as_str(_path('schedule', 'construction', 'date'))),
+)
+_PRODUCT_EXTRACTORS = {PRODUCT_SUMMARY: _product_summary, PRODUCT_JOIN: _product_join}
+
+_read_columns = attrgetter(*ORDER_ROW_COLUMNS)
+_SLOT_INDEX = {name: i for i, name in enumerate(ORDER_ROW_COLUMNS)}
+_OVERRIDE_INDEXES = tuple((_SLOT_INDEX[name], fn) for name, fn in _ERP_OVERRIDES)
+_PRODUCT_INDEX = _SLOT_INDEX['product']
+
+
+class OrderRow:
+    """주문 1건의 표시값 (읽기 전용). 속성 이름은 Order 컬럼과 같다."""
+
+    __slots__ = ORDER_ROW_COLUMNS + ('display_options',)
+
+    def __init__(self, values: Iterable[Any], display_options: Any = None):
+        for name, value in zip(ORDER_ROW_COLUMNS, values):
+            object.__setattr__(self, name, value)
+        object.__setattr__(self, 'display_options', display_options)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"OrderRow is read-only: {name}")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"OrderRow is read-only: {name}")
+
+    def __repr__(self) -> str:
+        return f"<OrderRow id={self.id}>"
+
+    @classmethod
+    def from_order(
+        cls,
+        order: Order,
+        product_mode: str = PRODUCT_JOIN,
+        display_options: Any = None,
+    ) -> 'OrderRow':
+        values = list(_read_columns(order))
+        sd = values[_SLOT_INDEX['structured_data']]
+        if values[_SLOT_INDEX['is_erp_beta']] and isinstance(sd, dict) and sd:
+            for idx, extract in _OVERRIDE_INDEXES:
+                value = extract(sd)
+                if value:
+                    values[idx] = value
+            product = _PRODUCT_EXTRACTORS[product_mode](sd)
+            if product:
+                values[_PRODUCT_INDEX] = product
+        return cls(values, display_options)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in ORDER_ROW_COLUMNS}
+
+
+def order_rows(
+    orders: Iterable[Optional[Order]],
+    product_mode: str = PRODUCT_JOIN,
+    cache: Optional[Dict[int, OrderRow]] = None,
+) -> List[OrderRow]:
+    """
+    ORM 주문 목록 → OrderRow 목록.
+    cache: 같은 주문이 여러 목록(대시보드 섹션)에 나올 때 id별 변환 결과 재사용
+    """
+    if cache is None:
+        cache = {}
+    rows = []
+    for order in orders:
+        if order is None:
+            continue
+        row = cache.get(order.id)
+        if row is None:
+            row = cache[order.id] = OrderRow.from_order(order, product_mode=product_mode)
+        rows.append(row)
+    return rows
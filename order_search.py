@@ -0,0 +1,138 @@
+"""
+주문 검색 엔진 (공용 쿼리 빌더)
+
+- orders.search_document: 레거시 컬럼 + ERP Beta structured_data(고객/연락처/주소/담당자/제품)를
+  소문자로 이어 붙인 생성 컬럼 (models.ORDER_SEARCH_DOCUMENT_EXPR)
+- 인덱스 (build step 22):
+  - pg_trgm GIN(search_document gin_trgm_ops): 3글자 이상 부분일치 LIKE
+  - GIN(foms_search_bigrams(search_document)): 2글자 검색어(한글 이름 등)용 bigram 포함 검색
+- 검색어는 공백 단위 토큰 AND 매칭, 숫자만 입력하면 주문번호 일치도 허용
+  - 전화번호 형태 토큰(0으로 시작, 숫자 7자리 이상)은 입력 그대로 OR 숫자만 비교
+  - 날짜(2024-05-01)/소수(12.5) 등은 입력 그대로 비교 (저장 형식 유지)
+- step 22 완료 전에는 기존 컬럼별 ILIKE OR 검색으로 폴백 (build_steps.step_ready, 완료 후 재시작 없이 전환)
+- Flask app import 없이 재사용 가능
+"""
+
+from __future__ import annotations
+
+import re
+from typing import List, Optional
+
+from sqlalchemy import Text, and_, case, cast, func, literal, literal_column, or_
+from sqlalchemy.dialects.postgresql import ARRAY, array
+
+from build_steps import step_ready
+from models import Order
+
+
+# 폴백(인덱스 미적용) 검색 대상 컬럼
+LEGACY_SEARCH_COLUMNS = (
+    'customer_name', 'phone', 'address', 'product', 'options', 'notes', 'manager_name',
+    'regional_memo', 'status', 'received_date', 'received_time', 'measurement_date',
+    'measurement_time', 'scheduled_date', 'completion_date',
+)
+
+_PHONE_LIKE = re.compile(r'^0[0-9\-\.]*[0-9]$')
+PHONE_MIN_DIGITS = 7
+
+
+def search_tokens(search_text: Optional[str]) -> List[str]:
+    """검색어 → 토큰 목록 (소문자, 공백 단위)"""
+    return [tok for tok in (search_text or '').lower().split() if tok]
+
+
+def phone_digits(tok: str) -> Optional[str]:
+    """전화번호 형태 토큰(010-1234-5678, 02.123.4567 등) → 숫자만, 아니면 None"""
+    if not _PHONE_LIKE.match(tok):
+        return None
+    digits = re.sub(r'[^0-9]', '', tok)
+    return digits if len(digits) >= PHONE_MIN_DIGITS else None
+
+
+def token_variants(tok: str) -> List[str]:
+    """토큰 일치 후보: 입력 그대로 + (전화번호 형태면) 숫자만"""
+    digits = phone_digits(tok)
+    return [tok, digits] if digits and digits != tok else [tok]
+
+
+def _escape_like(value: str) -> str:
+    return value.replace('!', '!!').replace('%', '!%').replace('_', '!_')
+
+
+def _token_clause(tok: str):
+    variants = token_variants(tok)
+    if len(variants) > 1:
+        return or_(*[_token_clause(v) for v in variants])
+    doc = Order.search_document
+    clause = doc.like(f"%{_escape_like(tok)}%", escape='!')
+    if len(tok) == 2:
+        # 2글자는 trigram이 만들어지지 않으므로 bigram GIN 인덱스로 후보를 좁힌다
+        clause = and_(
+            func.foms_search_bigrams(doc).op('@>')(cast(array([tok]), ARRAY(Text))),
+            clause,
+        )
+    return clause
+
+
+def _legacy_token_clause(tok: str, columns=LEGACY_SEARCH_COLUMNS):
+    terms = [f"%{_escape_like(v)}%" for v in token_variants(tok)]
+    return or_(*[getattr(Order, name).ilike(term, escape='!') for name in columns for term in terms])
+
+
+def order_search_clause(db, search_text: Optional[str], columns=None):
+    """
+    검색어 → WHERE 조건 (검색어가 없으면 None).
+    columns: 폴백 검색 대상 컬럼 제한 (인덱스 검색은 항상 search_document 전체)
+    """
+    tokens = search_tokens(search_text)
+    if not tokens:
+        return None
+
+    if step_ready(db, 22):
+        matched = and_(*[_token_clause(tok) for tok in tokens])
+    else:
+        matched = and_(*[_legacy_token_clause(tok, columns or LEGACY_SEARCH_COLUMNS) for tok in tokens])
+
+    raw = (search_text or '').strip()
+    if raw.isdigit() and len(raw) <= 9:
+        # 주문번호 직접 입력
+        matched = or_(Order.id == int(raw), matched)
+    return matched
+
+
+def apply_order_search(query, db, search_text: Optional[str], columns=None):
+    """Order 쿼리에 검색 조건 적용 (index/download_excel/대시보드/채팅·견적 검색 공용)"""
+    clause = order_search_clause(db, search_text, columns=columns)
+    return query.filter(clause) if clause is not None else query
+
+
+def order_search_rank(db, search_text: Optional[str]):
+    """
+    검색 결과 정렬용 점수 (높을수록 우선):
+    주문번호 일치 > 연락처 숫자 일치 > trigram 단어 유사도 + 토큰 전체 단어 일치(ts_rank)
+    """
+    raw = (search_text or '').strip()
+    tokens = search_tokens(raw)
+    if not tokens:
+        return literal(0)
+
+    id_hit = case((Order.id == int(raw), 10.0), else_=0.0) if raw.isdigit() and len(raw) <= 9 else literal(0.0)
+    if not step_ready(db, 22):
+        return id_hit
+
+    q = ' '.join(tokens)
+    doc = Order.search_document
+    digits = ''.join(phone_digits(t) or (t if t.isdigit() else '') for t in tokens)
+    phone_hit = literal(0.0)
+    if len(digits) >= 7:
+        phone_hit = case(
+            (or_(
+                func.regexp_replace(func.coalesce(Order.phone, ''), '[^0-9]', '', 'g') == digits,
+                func.regexp_replace(func.coalesce(Order.erp_customer_phone, ''), '[^0-9]', '', 'g') == digits,
+            ), 5.0),
+            else_=0.0,
+        )
+    similarity = func.word_similarity(q, doc)
+    simple = literal_column("'simple'::regconfig")
+    word_rank = func.ts_rank(func.to_tsvector(simple, doc), func.plainto_tsquery(simple, q))
+    return id_hit + phone_hit + similarity + word_rank
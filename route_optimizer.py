@@ -0,0 +1,515 @@
+"""
+실측 동선 최적화 (하루 방문 순서)
+
+- 거리: 좌표 배열로 Haversine 거리 행렬을 한 번에 계산 (NumPy)
+- 이동시간: 거리/평균속도, 또는 호출 측이 넘긴 구간 소요시간 행렬(분, 예: directions_cache.cached_matrix)
+  - 행렬의 NaN(캐시에 없는 구간)은 거리/평균속도 추정치로 채움
+- 방문 시간대: 실측시간 '오전'/'오후'/'종일' 또는 'HH:MM'/'14시'/'오후 2시' → (시작, 종료) 분
+  - 일찍 도착하면 시작 시각까지 대기, 종료 시각을 넘긴 도착은 지각(분)으로 벌점
+- 탐색:
+  1) 시간대 인식 최근접 이웃으로 초기 경로 (지각이 가장 적고 빨리 시작할 수 있는 다음 방문지)
+  2) 2-opt(구간 뒤집기) / Or-opt(1~3개 연속 방문지 이동)로 개선이 없을 때까지 반복 (시간 제한)
+  - 이동거리 변화량은 행렬 연산으로 모든 후보를 한 번에 계산, 시간대 검증은 유망 후보만 시뮬레이션
+- 비용: 총 이동시간(분) + LATE_WEIGHT × 지각(분). 출발지 고정 없음(열린 경로)
+- 하루 전체 배차(plan_day): 여러 담당자(선택적 출발지)에게 방문지를 나누고 순서를 정함
+  1) 마감이 이른 방문지부터 비용 증가가 가장 작은 담당자/위치에 삽입 (고정 배정은 먼저)
+  2) 담당자 간 방문지 이동(relocate)/교환(swap) + 담당자별 2-opt/Or-opt (시간 제한)
+  - 담당자별 비용에 BALANCE_WEIGHT × (근무시간 h)^2 를 더해 부하를 고르게 분산
+- Flask app import 없이 재사용 가능
+"""
+
+from __future__ import annotations
+
+import math
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DAY_START = 9 * 60
+DAY_END = 18 * 60
+NOON = 12 * 60
+EXPLICIT_SLACK = 30        # 'HH:MM' 약속 전후 허용 (분)
+SERVICE_MINUTES = 30       # 방문지 1곳 실측 소요 (분)
+AVG_SPEED_KMH = 30.0       # 거리 → 이동시간 환산 (도심 차량 평균)
+LATE_WEIGHT = 10.0         # 지각 1분 = 이동 10분
+DEFAULT_TIME_BUDGET = 0.05  # 초
+DAY_PLAN_TIME_BUDGET = 0.3  # 초, 하루 전체 배차
+BALANCE_WEIGHT = 15.0      # 담당자 (근무시간 h)^2 당 이동 분
+
+_EARTH_DIAMETER_KM = 12742.0
+
+
+@dataclass(frozen=True)
+class RouteStop:
+    key: Any
+    lat: float
+    lng: float
+    window: Tuple[int, int] = (DAY_START, DAY_END)
+
+
+@dataclass(frozen=True)
+class RouteManager:
+    name: str
+    lat: Optional[float] = None  # 출발지 (없으면 첫 방문지에서 시작)
+    lng: Optional[float] = None
+
+    @property
+    def has_origin(self) -> bool:
+        return self.lat is not None and self.lng is not None
+
+
+def _clock(hour: int, minute: int = 0) -> Optional[int]:
+    if 0 <= hour <= 23 and 0 <= minute <= 59:
+        return hour * 60 + minute
+    return None
+
+
+def time_window(value: Any) -> Tuple[int, int]:
+    """실측시간 값 → 방문 가능 시간대 (분). 해석 불가/종일은 업무시간 전체"""
+    s = str(value or '').strip()
+    if not s or s == '종일':
+        return DAY_START, DAY_END
+    m = re.search(r'(\d{1,2})\s*(?::|시)\s*(\d{1,2})?', s)
+    if m:
+        hour = int(m.group(1))
+        if '오후' in s and hour < 12:
+            hour += 12
+        t = _clock(hour, int(m.group(2) or 0))
+        if t is not None:
+            return t - EXPLICIT_SLACK, t + EXPLICIT_SLACK
+    if '오전' in s:
+        return DAY_START, NOON
+    if '오후' in s:
+        return NOON, DAY_END
+    return DAY_START, DAY_END
+
+
+def haversine_km(a_lat: float, a_lng: float, b_lat: float, b_lng: float) -> float:
+    lat1, lng1, lat2, lng2 = map(math.radians, (a_lat, a_lng, b_lat, b_lng))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return _EARTH_DIAMETER_KM * math.asin(min(1.0, math.sqrt(h)))
+
+
+def haversine_matrix(lats: Sequence[float], lngs: Sequence[float]) -> np.ndarray:
+    """n개 좌표 → n×n 거리 행렬 (km)"""
+    lat = np.radians(np.asarray(lats, dtype=float))
+    lng = np.radians(np.asarray(lngs, dtype=float))
+    dlat = lat[:, None] - lat[None, :]
+    dlng = lng[:, None] - lng[None, :]
+    h = np.sin(dlat / 2) ** 2 + np.cos(lat)[:, None] * np.cos(lat)[None, :] * np.sin(dlng / 2) ** 2
+    return _EARTH_DIAMETER_KM * np.arcsin(np.minimum(1.0, np.sqrt(h)))
+
+
+def _travel_matrix(distance: np.ndarray, durations: Optional[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """→ (이동시간 행렬, 탐색용 대칭 행렬). durations의 NaN은 거리 추정치로 대체"""
+    estimate = distance / AVG_SPEED_KMH * 60.0
+    if durations is None:
+        return estimate, estimate
+    travel = np.asarray(durations, dtype=float)
+    travel = np.where(np.isnan(travel), estimate, travel)
+    # 2-opt 뒤집기 변화량 계산은 대칭 행렬 기준 (왕복 평균), 시뮬레이션은 원래 방향 사용
+    return travel, (travel + travel.T) / 2
+
+
+def greedy_order(distance: np.ndarray, start: int = 0) -> List[int]:
+    """기존 동선 추천과 같은 순수 최근접 이웃 (시간대 무시) - 비교 기준"""
+    n = distance.shape[0]
+    route = [start]
+    left = np.ones(n, dtype=bool)
+    left[start] = False
+    while left.any():
+        row = np.where(left, distance[route[-1]], np.inf)
+        nxt = int(np.argmin(row))
+        route.append(nxt)
+        left[nxt] = False
+    return route
+
+
+def path_length(matrix: np.ndarray, route: Sequence[int]) -> float:
+    if len(route) < 2:
+        return 0.0
+    r = np.asarray(route)
+    return float(matrix[r[:-1], r[1:]].sum())
+
+
+class _Schedule:
+    """경로 시뮬레이션 (도착/지각) - 이동시간 행렬(분) + 시간대"""
+
+    def __init__(self, travel: np.ndarray, windows: Sequence[Tuple[int, int]], service: float):
+        self.travel = travel.tolist()
+        self.opens = [w[0] for w in windows]
+        self.closes = [w[1] for w in windows]
+        self.service = service
+
+    def simulate(self, route: Sequence[int], origin: Optional[int] = None) -> Tuple[float, float, List[float]]:
+        """→ (이동시간 합, 지각 합, 각 방문지 시작 시각). origin: 출발지 노드 (DAY_START에 출발)"""
+        travel, opens, closes = self.travel, self.opens, self.closes
+        if not route:
+            return 0.0, 0.0, []
+        first = route[0]
+        moving = travel[origin][first] if origin is not None else 0.0
+        clock = max(DAY_START + moving, opens[first])
+        starts = [clock]
+        late = max(0.0, clock - closes[first])
+        prev = first
+        for node in route[1:]:
+            leg = travel[prev][node]
+            moving += leg
+            clock = max(clock + self.service + leg, opens[node])
+            late += max(0.0, clock - closes[node])
+            starts.append(clock)
+            prev = node
+        return moving, late, starts
+
+    def cost(self, route: Sequence[int], origin: Optional[int] = None) -> float:
+        moving, late, _ = self.simulate(route, origin)
+        return moving + LATE_WEIGHT * late
+
+
+def _window_greedy(sched: _Schedule, n: int) -> List[int]:
+    """시간대 인식 최근접 이웃: 지각 없는 곳 → 가장 빨리 시작할 수 있는 곳 → 마감이 이른 곳"""
+    travel, opens, closes = sched.travel, sched.opens, sched.closes
+    first = min(range(n), key=lambda i: (opens[i], closes[i]))
+    route = [first]
+    left = set(range(n)) - {first}
+    clock = max(DAY_START, opens[first])
+    while left:
+        prev = route[-1]
+
+        def rank(i):
+            arrive = clock + sched.service + travel[prev][i]
+            begin = max(arrive, opens[i])
+            return (begin > closes[i], begin, closes[i])
+
+        nxt = min(left, key=rank)
+        clock = max(clock + sched.service + travel[prev][nxt], opens[nxt])
+        route.append(nxt)
+        left.discard(nxt)
+    return route
+
+
+def _padded(travel: np.ndarray, origin: Optional[int] = None) -> np.ndarray:
+    """
+    열린 경로를 순환 경로로 다루기 위한 더미 노드(n) 추가.
+    경로 끝 → 더미는 0, 더미 → 경로 처음은 출발지가 있으면 출발지에서의 이동시간
+    """
+    n = travel.shape[0]
+    out = np.zeros((n + 1, n + 1))
+    out[:n, :n] = travel
+    if origin is not None:
+        out[n, :n] = travel[origin]
+    return out
+
+
+def _two_opt_candidates(padded: np.ndarray, route: List[int]) -> List[Tuple[int, int, float]]:
+    """route[i..j] 뒤집기 후보를 이동시간 변화량 순서로 (행렬 연산으로 전체 계산)"""
+    n = len(route)
+    cyc = np.asarray([padded.shape[0] - 1] + route)  # 0번 위치 = 더미
+    a = cyc[:-1]            # route[i-1] (i = 1..n) - cyc 위치 기준 i-1
+    b = cyc[1:]             # route[i]
+    nxt = np.append(cyc[2:], cyc[0])  # route[j+1] (j = 1..n, 마지막은 더미)
+    delta = (
+        padded[a[:, None], b[None, :]] + padded[b[:, None], nxt[None, :]]
+        - padded[a, b][:, None] - padded[b, nxt][None, :]
+    )
+    iu = np.triu_indices(n, k=1)
+    values = delta[iu]
+    order = np.argsort(values, kind='stable')
+    return [(int(iu[0][k]), int(iu[1][k]), float(values[k])) for k in order]
+
+
+def _or_opt_candidates(padded: np.ndarray, route: List[int], max_len: int = 3) -> List[Tuple[int, int, int, float]]:
+    """연속 구간 route[i:i+L]을 다른 간선 사이로 옮기는 후보 (변화량 순)"""
+    n = len(route)
+    dummy = padded.shape[0] - 1
+    cyc = [dummy] + route + [dummy]
+    out = []
+    for length in range(1, min(max_len, n - 1) + 1):
+        for i in range(n - length + 1):
+            seg_first, seg_last = route[i], route[i + length - 1]
+            before, after = cyc[i], cyc[i + length + 1]
+            removal = padded[before, seg_first] + padded[seg_last, after] - padded[before, after]
+            rest = cyc[:i + 1] + cyc[i + length + 1:]
+            u = np.asarray(rest[:-1])
+            v = np.asarray(rest[1:])
+            insertion = padded[u, seg_first] + padded[seg_last, v] - padded[u, v]
+            gains = insertion - removal
+            for k in np.nonzero(gains < -1e-9)[0]:
+                if k == i:  # 원래 자리
+                    continue
+                out.append((i, length, int(k), float(gains[k])))
+    out.sort(key=lambda c: c[3])
+    return out
+
+
+def _apply_or_opt(route: List[int], i: int, length: int, k: int) -> List[int]:
+    seg = route[i:i + length]
+    rest = route[:i] + route[i + length:]
+    return rest[:k] + seg + rest[k:]
+
+
+def _improve(
+    sched: _Schedule, padded: np.ndarray, route: List[int], origin: Optional[int], deadline: float,
+) -> Tuple[List[int], float, int]:
+    """한 경로 순서 개선 (2-opt → Or-opt, 개선이 없거나 시간 초과 시 종료) → (경로, 비용, 이동 횟수)"""
+    best = sched.cost(route, origin)
+    moves = 0
+    improved = len(route) > 2
+    while improved and time.perf_counter() < deadline:
+        improved = False
+        _, late, _ = sched.simulate(route, origin)
+        # 지각이 없으면 이동시간이 줄어드는 후보만 검증, 있으면 모든 후보 검증
+        for i, j, delta in _two_opt_candidates(padded, route):
+            if late <= 0 and delta >= -1e-9:
+                break
+            cand = route[:i] + route[i:j + 1][::-1] + route[j + 1:]
+            cost = sched.cost(cand, origin)
+            if cost < best - 1e-9:
+                route, best, improved = cand, cost, True
+                moves += 1
+                break
+            if time.perf_counter() >= deadline:
+                break
+        if improved:
+            continue
+        for i, length, k, _gain in _or_opt_candidates(padded, route):
+            cand = _apply_or_opt(route, i, length, k)
+            cost = sched.cost(cand, origin)
+            if cost < best - 1e-9:
+                route, best, improved = cand, cost, True
+                moves += 1
+                break
+            if time.perf_counter() >= deadline:
+                break
+    return route, best, moves
+
+
+def optimize_route(
+    stops: Sequence[RouteStop],
+    durations: Optional[np.ndarray] = None,
+    time_budget: float = DEFAULT_TIME_BUDGET,
+    service_minutes: float = SERVICE_MINUTES,
+) -> Dict[str, Any]:
+    """
+    방문 순서 최적화.
+    durations: 구간 소요시간 행렬(분, stops 순서, NaN 허용) - 없으면 Haversine 거리/평균속도
+    → {'order': [stops 인덱스], 'starts': [방문 시작(분)], 'late': [지각(분)], 'distance_km', 'travel_min', 'late_min', 'stats'}
+    """
+    started = time.perf_counter()
+    n = len(stops)
+    if n == 0:
+        return {'order': [], 'starts': [], 'late': [], 'distance_km': 0.0, 'travel_min': 0.0, 'late_min': 0.0, 'stats': {}}
+
+    distance = haversine_matrix([s.lat for s in stops], [s.lng for s in stops])
+    travel, search = _travel_matrix(distance, durations)
+    windows = [s.window for s in stops]
+    sched = _Schedule(travel, windows, service_minutes)
+
+    route = _window_greedy(sched, n)
+    greedy_cost = sched.cost(route)
+    route, best, moves = _improve(sched, _padded(search), route, None, started + time_budget)
+
+    moving, late_total, starts = sched.simulate(route)
+    late = [max(0.0, t - windows[node][1]) for node, t in zip(route, starts)]
+    return {
+        'order': route,
+        'starts': starts,
+        'late': late,
+        'distance_km': round(path_length(distance, route), 2),
+        'travel_min': round(moving, 1),
+        'late_min': round(late_total, 1),
+        'stats': {
+            'stops': n,
+            'greedy_cost': round(greedy_cost, 1),
+            'cost': round(best, 1),
+            'moves': moves,
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 1),
+        },
+    }
+
+
+class _DayRoutes:
+    """담당자별 경로 상태 + 비용 (plan_day 내부)"""
+
+    def __init__(self, sched: _Schedule, origins: List[Optional[int]], service: float):
+        self.sched = sched
+        self.origins = origins
+        self.service = service
+        self.routes: List[List[int]] = [[] for _ in origins]
+        self.costs: List[float] = [0.0 for _ in origins]
+
+    def cost(self, k: int, route: Sequence[int]) -> float:
+        if not route:
+            return 0.0
+        moving, late, starts = self.sched.simulate(route, self.origins[k])
+        hours = (starts[-1] + self.service - DAY_START) / 60.0
+        return moving + LATE_WEIGHT * late + BALANCE_WEIGHT * hours * hours
+
+    def set(self, k: int, route: List[int], cost: Optional[float] = None) -> None:
+        self.routes[k] = route
+        self.costs[k] = self.cost(k, route) if cost is None else cost
+
+    def best_insertion(self, k: int, node: int) -> Tuple[float, int]:
+        """담당자 k 경로에 node를 넣을 최적 위치 → (비용 증가, 위치)"""
+        route = self.routes[k]
+        best = (float('inf'), 0)
+        for pos in range(len(route) + 1):
+            delta = self.cost(k, route[:pos] + [node] + route[pos:]) - self.costs[k]
+            if delta < best[0]:
+                best = (delta, pos)
+        return best
+
+    def insert(self, k: int, node: int, pos: int) -> None:
+        route = self.routes[k]
+        self.set(k, route[:pos] + [node] + route[pos:])
+
+    @property
+    def total(self) -> float:
+        return sum(self.costs)
+
+
+def plan_day(
+    stops: Sequence[RouteStop],
+    managers: Sequence[RouteManager],
+    pinned: Optional[Dict[int, int]] = None,
+    durations: Optional[np.ndarray] = None,
+    time_budget: float = DAY_PLAN_TIME_BUDGET,
+    service_minutes: float = SERVICE_MINUTES,
+) -> Dict[str, Any]:
+    """
+    하루 실측 배차 (담당자별 방문지 분배 + 순서).
+    pinned: {stops 인덱스: managers 인덱스} 고정 배정
+    durations: 구간 소요시간 행렬(분, NaN 허용) - 노드 순서는 stops 다음에 출발지가 있는 managers
+    → {'routes': [{'manager', 'order', 'starts', 'late', 'distance_km', 'travel_min', 'late_min', 'finish'}], 'stats'}
+    """
+    started = time.perf_counter()
+    deadline = started + time_budget
+    pinned = dict(pinned or {})
+    n, m = len(stops), len(managers)
+    if m == 0:
+        raise ValueError("담당자가 없습니다.")
+
+    origins: List[Optional[int]] = []
+    lats, lngs = [s.lat for s in stops], [s.lng for s in stops]
+    windows = [s.window for s in stops]
+    for mgr in managers:
+        if mgr.has_origin:
+            origins.append(len(lats))
+            lats.append(mgr.lat)
+            lngs.append(mgr.lng)
+            windows.append((DAY_START, DAY_END))
+        else:
+            origins.append(None)
+    distance = haversine_matrix(lats, lngs)
+    travel, search = _travel_matrix(distance, durations)
+    sched = _Schedule(travel, windows, service_minutes)
+    day = _DayRoutes(sched, origins, service_minutes)
+    padded = [_padded(search, origin) for origin in origins]
+
+    # 1) 삽입: 고정 배정 → 마감이 이른 방문지 순
+    for node in sorted(pinned, key=lambda i: windows[i]):
+        k = pinned[node]
+        day.insert(k, node, day.best_insertion(k, node)[1])
+    for node in sorted((i for i in range(n) if i not in pinned), key=lambda i: (windows[i][1], windows[i][0])):
+        delta, pos, k = min(day.best_insertion(k, node) + (k,) for k in range(m))
+        day.insert(k, node, pos)
+    for k in range(m):
+        day.set(k, *_improve_day_route(day, padded, k, deadline))
+    construction_cost = day.total
+
+    # 2) 담당자 간 이동/교환 + 담당자별 순서 개선
+    moves = 0
+    improved = m > 1
+    while improved and time.perf_counter() < deadline:
+        improved = False
+        for a in range(m):
+            for node in list(day.routes[a]):
+                if node in pinned:
+                    continue
+                without = [x for x in day.routes[a] if x != node]
+                gain = day.costs[a] - day.cost(a, without)
+                for b in range(m):
+                    if b == a:
+                        continue
+                    delta, pos = day.best_insertion(b, node)
+                    if delta - gain < -1e-6:
+                        day.set(a, without)
+                        day.insert(b, node, pos)
+                        for k in (a, b):
+                            day.set(k, *_improve_day_route(day, padded, k, deadline))
+                        improved = True
+                        moves += 1
+                        break
+                if improved or time.perf_counter() >= deadline:
+                    break
+            if improved or time.perf_counter() >= deadline:
+                break
+        if improved or time.perf_counter() >= deadline:
+            continue
+        for a in range(m):
+            for b in range(a + 1, m):
+                for i, x in enumerate(day.routes[a]):
+                    if x in pinned:
+                        continue
+                    for j, y in enumerate(day.routes[b]):
+                        if y in pinned:
+                            continue
+                        ra = day.routes[a][:i] + [y] + day.routes[a][i + 1:]
+                        rb = day.routes[b][:j] + [x] + day.routes[b][j + 1:]
+                        ca, cb = day.cost(a, ra), day.cost(b, rb)
+                        if ca + cb < day.costs[a] + day.costs[b] - 1e-6:
+                            day.set(a, ra, ca)
+                            day.set(b, rb, cb)
+                            for k in (a, b):
+                                day.set(k, *_improve_day_route(day, padded, k, deadline))
+                            improved = True
+                            moves += 1
+                            break
+                    if improved or time.perf_counter() >= deadline:
+                        break
+                if improved or time.perf_counter() >= deadline:
+                    break
+            if improved or time.perf_counter() >= deadline:
+                break
+
+    routes = []
+    for k, mgr in enumerate(managers):
+        route, origin = day.routes[k], origins[k]
+        moving, late_total, starts = sched.simulate(route, origin)
+        path = ([origin] if origin is not None else []) + route
+        routes.append({
+            'manager': mgr.name,
+            'origin': origin is not None,
+            'order': route,
+            'starts': starts,
+            'late': [max(0.0, t - windows[node][1]) for node, t in zip(route, starts)],
+            'distance_km': round(path_length(distance, path), 2),
+            'travel_min': round(moving, 1),
+            'late_min': round(late_total, 1),
+            'finish': (starts[-1] + service_minutes) if starts else None,
+        })
+    return {
+        'routes': routes,
+        'stats': {
+            'stops': n,
+            'managers': m,
+            'construction_cost': round(construction_cost, 1),
+            'cost': round(day.total, 1),
+            'moves': moves,
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 1),
+        },
+    }
+
+
+def _improve_day_route(day: _DayRoutes, padded: List[np.ndarray], k: int, deadline: float) -> Tuple[List[int], float]:
+    """담당자 k 경로 순서 개선 (순서만 바뀌므로 근무시간 항은 다시 계산)"""
+    route, _, _ = _improve(day.sched, padded[k], day.routes[k], day.origins[k], deadline)
+    return route, day.cost(k, route)
+
+
+def format_clock(minutes: float) -> str:
+    m = int(round(minutes))
+    return f"{m // 60:02d}:{m % 60:02d}"
@@ -8,6 +8,7 @@
 import logging
 from sqlalchemy import text
 from db import get_db
+from models import ERP_PROJECTION_COLUMNS, ORDER_DATE_COLUMNS, ORDER_SEARCH_DOCUMENT_EXPR
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -41,6 +42,25 @@ class SafeSchemaMigration:
             ('structured_confidence', 'VARCHAR(20)'),
             ('structured_updated_at', 'TIMESTAMP')
         ]
+        # structured_data 투영 생성 컬럼 (structured_data 이후에 추가되어야 함)
+        self.columns_to_add += [
+            (name, f"{sql_type} GENERATED ALWAYS AS ({expr}) STORED")
+            for name, sql_type, expr in ERP_PROJECTION_COLUMNS
+        ]
+        self.columns_to_add.append(('erp_quest_summary', 'JSONB'))
+        # 일정 DATE 컬럼 (동기화 트리거/백필/인덱스는 erp_build_step_runner step 23)
+        self.columns_to_add += [(typed, 'DATE') for _source, typed in ORDER_DATE_COLUMNS]
+        # 캘린더 피드 변경 번호 (시퀀스/트리거는 erp_build_step_runner step 24)
+        self.columns_to_add.append(('feed_version', 'BIGINT'))
+        # 캘린더 피드 커밋 워터마크용 트랜잭션 id (트리거는 erp_build_step_runner step 29)
+        self.columns_to_add.append(('feed_xid', 'BIGINT'))
+        # 출고 패널 사전 계산 값 (계산 함수/트리거/백필은 erp_build_step_runner step 25)
+        self.columns_to_add += [('erp_spec_units', 'DOUBLE PRECISION'), ('erp_construction_workers', 'TEXT[]')]
+        # 현장 좌표 (지오코딩 큐 트리거/백필은 erp_build_step_runner step 27)
+        self.columns_to_add += [('lat', 'DOUBLE PRECISION'), ('lng', 'DOUBLE PRECISION'),
+                                ('geo_status', 'VARCHAR(20)'), ('geo_updated_at', 'TIMESTAMP')]
+        # 검색 문서 (pg_trgm/bigram 인덱스는 erp_build_step_runner step 22)
+        self.columns_to_add.append(('search_document', f"TEXT GENERATED ALWAYS AS ({ORDER_SEARCH_DOCUMENT_EXPR}) STORED"))
     
     def check_column_exists(self, db, column_name):
         """컬럼 존재 여부 확인"""
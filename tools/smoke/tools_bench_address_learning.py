@@ -0,0 +1,162 @@
+import os
+import sys
+import time
+import random
+import tempfile
+
+# 스크립트 위치와 무관하게 프로젝트 루트 import 보장
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from foms_address_learning import SIMILARITY_THRESHOLD, FOMSAddressLearningSystem  # noqa: E402
+
+CITIES = ["서울특별시", "경기도", "인천광역시"]
+GUS = ["강남구", "서초구", "송파구", "마포구", "성남시 분당구", "수원시 영통구", "고양시 일산동구", "남동구", "부평구", "용인시 수지구"]
+SYLLABLES = "가경고관광교구금남내능노대도동두래마명목문미반방백범봉부북산삼상서석선성세소송수시신안양연영오옥용우원월은을의이인일장정조중지진창천청초충태평포풍하학한해향현호화효흥"
+SUFFIXES = ["로", "대로", "길"]
+APTS = ["래미안", "자이", "힐스테이트", "푸르지오", "아이파크", "e편한세상", "롯데캐슬", "더샵"]
+NOISE = "가나다라마바사아자차카타파하0123456789 -"
+
+
+def make_roads(rnd, count=3000):
+    """도로명 (음절 2~3개 + 로/대로/길) - 실제 학습 데이터처럼 도로명이 다양하도록"""
+    return [''.join(rnd.choice(SYLLABLES) for _ in range(rnd.randint(2, 3))) + rnd.choice(SUFFIXES) for _ in range(count)]
+
+
+def make_address(rnd, roads):
+    return (f"{rnd.choice(CITIES)} {rnd.choice(GUS)} {rnd.choice(roads)} {rnd.randint(1, 300)} "
+            f"{rnd.choice(APTS)} {rnd.randint(101, 130)}동 {rnd.randint(1, 25)}{rnd.randint(1, 4):02d}호")
+
+
+def perturb(rnd, text, edits):
+    """오타 흉내: 삽입/삭제/치환 edits회"""
+    chars = list(text)
+    for _ in range(edits):
+        op = rnd.choice("ids")
+        pos = rnd.randrange(len(chars))
+        if op == "i":
+            chars.insert(pos, rnd.choice(NOISE))
+        elif op == "d" and len(chars) > 1:
+            del chars[pos]
+        else:
+            chars[pos] = rnd.choice(NOISE)
+    return "".join(chars)
+
+
+def make_system(n, seed=0):
+    rnd = random.Random(seed)
+    system = FOMSAddressLearningSystem(learning_file=os.path.join(tempfile.gettempdir(), "foms_bench_learning.json"))
+    system.learning_data = {"corrections": [], "patterns": {}}
+    system.patterns = {}
+    system._invalidate_index()
+    roads = make_roads(rnd)
+    system.bench_roads = roads
+    for _ in range(n):
+        original = make_address(rnd, roads)
+        system.learning_data["corrections"].append({
+            "original": original, "corrected": original.replace("  ", " "),
+            "latitude": 37.5, "longitude": 127.0, "timestamp": "2026-01-01T00:00:00", "similarity": 1.0,
+        })
+    return system, rnd
+
+
+def legacy_suggest(system, address):
+    """기존 suggest_correction (선형 완전 일치 + 전체 유사도 비교)"""
+    corrections = system.learning_data["corrections"]
+    for correction in corrections:
+        if correction.get("original") == address:
+            return correction.get("corrected"), 1.0
+    best, best_similarity = None, 0.0
+    for correction in corrections:
+        similarity = system._calculate_similarity(address, correction["original"])
+        if similarity > SIMILARITY_THRESHOLD and similarity > best_similarity:
+            best, best_similarity = correction, similarity
+    return (best.get("corrected"), best_similarity) if best else (None, 0.0)
+
+
+def make_queries(system, rnd, count):
+    originals = [c["original"] for c in system.learning_data["corrections"]]
+    queries = []
+    for i in range(count):
+        kind = i % 4
+        if kind == 0:
+            queries.append(rnd.choice(originals))                              # 완전 일치
+        elif kind == 1:
+            queries.append(perturb(rnd, rnd.choice(originals), 1))             # 오타 1
+        elif kind == 2:
+            queries.append(perturb(rnd, rnd.choice(originals), 4))             # 오타 4 (경계)
+        else:
+            queries.append(make_address(rnd, system.bench_roads))              # 미학습 주소
+    return queries
+
+
+def run(n, queries=400, legacy_queries=60, repeats=3):
+    system, rnd = make_system(n)
+    qs = make_queries(system, rnd, queries)
+
+    # 요청 경로는 스냅샷 생성을 기다리지 않음 (백그라운드 생성 예약만)
+    index = system._get_index()
+    t0 = time.perf_counter()
+    snapshot = index._current_snapshot()
+    schedule_ms = (time.perf_counter() - t0) * 1000
+    assert snapshot is None and schedule_ms < 50, schedule_ms
+    t0 = time.perf_counter()
+    while n > index.SCAN_LIMIT and index._snapshot is None:
+        time.sleep(0.01)
+    build_ms = (time.perf_counter() - t0) * 1000
+
+    # 질의별 repeats회 중 최솟값 (같은 머신의 다른 프로세스 영향 제거)
+    timings = []
+    results = []
+    for q in qs:
+        elapsed = []
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            suggestion = system.suggest_correction(q)
+            elapsed.append((time.perf_counter() - t0) * 1000)
+        timings.append(min(elapsed))
+        results.append((suggestion["suggested_address"], suggestion["confidence"]) if suggestion and suggestion["source"] != "pattern_match" else (None, 0.0))
+
+    # 기존 방식과 결과 비교 (같은 제안, 같은 유사도)
+    sample = sorted(random.Random(1).sample(range(len(qs)), legacy_queries))
+    legacy_ms = []
+    for i in sample:
+        t0 = time.perf_counter()
+        expected = legacy_suggest(system, qs[i])
+        legacy_ms.append((time.perf_counter() - t0) * 1000)
+        assert expected[0] == results[i][0] and abs(expected[1] - results[i][1]) < 1e-9, (qs[i], expected, results[i])
+
+    # 스냅샷 이후 학습된 데이터 (tail 전체 비교) 도 같은 결과
+    for _ in range(30):
+        original = make_address(rnd, system.bench_roads)
+        correction = {"original": original, "corrected": original + " (tail)", "latitude": 37.5, "longitude": 127.0}
+        system.learning_data["corrections"].append(correction)
+        index.add(correction)
+        query = perturb(rnd, original, 2)
+        suggestion = system.suggest_correction(query)
+        got = (suggestion["suggested_address"], suggestion["confidence"]) if suggestion else (None, 0.0)
+        expected = legacy_suggest(system, query)
+        assert expected[0] == got[0] and abs(expected[1] - got[1]) < 1e-9, (query, expected, got)
+
+    fuzzy = sorted(t for q, t in zip(qs, timings) if q not in system._index.exact)
+    timings.sort()
+    print(f"[corrections={n}] index build {build_ms:.0f} ms in background (scheduled in {schedule_ms:.2f} ms), "
+          f"queries={len(qs)} x best of {repeats} (checked {len(sample)} against legacy)")
+    print(f"  legacy : avg {sum(legacy_ms) / len(legacy_ms):8.3f} ms")
+    print(f"  indexed: avg {sum(timings) / len(timings):8.3f} ms  p50 {timings[len(timings) // 2]:.3f} ms  "
+          f"p95 {timings[int(len(timings) * 0.95)]:.3f} ms")
+    print(f"  similarity only ({len(fuzzy)}): p50 {fuzzy[len(fuzzy) // 2]:.3f} ms  p95 {fuzzy[int(len(fuzzy) * 0.95)]:.3f} ms")
+    return fuzzy
+
+
+def main():
+    run(1000)
+    fuzzy = run(100000, legacy_queries=40)
+    # 10만 건에서도 유사도 검색 1ms 미만 (중앙값, p95)
+    assert fuzzy[len(fuzzy) // 2] < 1.0
+    assert fuzzy[int(len(fuzzy) * 0.95)] < 1.0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import os
+import sys
+import random
+import datetime
+
+# 스크립트 위치와 무관하게 프로젝트 루트 import 보장
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from crew_planner import Crew, PlanOrder, plan_assignments  # noqa: E402
+
+
+# 수도권 권역 (대략적인 중심 좌표)
+AREAS = [
+    ("서울 강남구", 37.517, 127.047), ("서울 송파구", 37.514, 127.106), ("서울 마포구", 37.566, 126.901),
+    ("서울 노원구", 37.654, 127.056), ("경기 성남시", 37.420, 127.126), ("경기 용인시", 37.241, 127.178),
+    ("경기 고양시", 37.658, 126.832), ("경기 수원시", 37.263, 127.028), ("인천 연수구", 37.410, 126.678),
+    ("경기 화성시", 37.199, 126.831),
+]
+
+
+def make_load(seed=7, days=14, orders_per_day=(8, 18), workers=12, pinned_ratio=0.3):
+    """2주치 현실적인 시공 부하 (시공자 10~20 용량, 주문 규격 2~12, 일부 기존 배정/휴무)"""
+    rnd = random.Random(seed)
+    start = datetime.date(2026, 3, 2)
+    crews = []
+    for i in range(workers):
+        off = {(start + datetime.timedelta(days=rnd.randrange(days))).isoformat() for _ in range(rnd.randrange(3))}
+        crews.append(Crew(name=f"시공자{i + 1:02d}", capacity=float(rnd.choice([10, 10, 15, 20])), off_dates=frozenset(off)))
+
+    orders = []
+    oid = 1000
+    for d in range(days):
+        day = start + datetime.timedelta(days=d)
+        if day.weekday() == 6:
+            continue
+        for _ in range(rnd.randint(*orders_per_day)):
+            oid += 1
+            area, lat, lng = rnd.choice(AREAS)
+            workers_pinned = ()
+            if rnd.random() < pinned_ratio:
+                workers_pinned = (rnd.choice(crews).key,)
+            orders.append(PlanOrder(
+                order_id=oid,
+                date=day.isoformat(),
+                units=round(rnd.uniform(2, 12), 1),
+                workers=workers_pinned,
+                area=area,
+                lat=lat + rnd.uniform(-0.03, 0.03),
+                lng=lng + rnd.uniform(-0.03, 0.03),
+            ))
+    return orders, crews
+
+
+def check_feasible(plan, crews):
+    """용량/휴무 위반 없는지 확인 (기존 배정으로 이미 초과된 경우 제외)"""
+    off = {c.name: c.off_dates for c in crews}
+    for day in plan["dates"]:
+        for crew in day["crews"]:
+            assert day["date"] not in off[crew["name"]], (day["date"], crew["name"])
+            proposed = sum(o["units"] for o in crew["orders"] if not o["pinned"])
+            if proposed:
+                assert crew["load"] <= crew["capacity"] + 0.05, (day["date"], crew)
+
+
+def main():
+    orders, crews = make_load()
+    print(f"orders={len(orders)} crews={len(crews)}")
+    for cluster in (False, True):
+        timings = []
+        for _ in range(5):
+            plan = plan_assignments(orders, crews, cluster=cluster)
+            timings.append(plan["stats"]["elapsed_ms"])
+            check_feasible(plan, crews)
+        stats = plan["stats"]
+        print(
+            f"cluster={cluster}: median {sorted(timings)[len(timings) // 2]}ms max {max(timings)}ms "
+            f"cost {stats['greedy_cost']} -> {stats['cost']} moves={stats['moves']} unassigned={stats['unassigned']}"
+        )
+        assert max(timings) < 1000, timings
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
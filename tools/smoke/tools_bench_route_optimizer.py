@@ -0,0 +1,95 @@
+import os
+import sys
+import time
+import random
+
+# 스크립트 위치와 무관하게 프로젝트 루트 import 보장
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from route_optimizer import (  # noqa: E402
+    AVG_SPEED_KMH, SERVICE_MINUTES, RouteManager, RouteStop, _Schedule, greedy_order, haversine_matrix,
+    optimize_route, path_length, plan_day, time_window,
+)
+
+OPEN_DAY = None  # 시간대 제약 없음 (순수 경로 길이 비교)
+TIMES = ["", "", "종일", "오전", "오전", "오후", "오후", "10:00", "14:30", "오후 4시"]
+
+
+def make_day(seed, n, times):
+    """수도권 하루 실측 n건 (times에서 실측시간 무작위)"""
+    rnd = random.Random(seed)
+    stops = []
+    for i in range(n):
+        stops.append(RouteStop(
+            key=i,
+            lat=37.45 + rnd.uniform(0, 0.25),
+            lng=126.85 + rnd.uniform(0, 0.35),
+            window=time_window(rnd.choice(times)) if times is not OPEN_DAY else (0, 48 * 60),
+        ))
+    # 기존 API: 실측시간이 가장 빠른 주문부터 최근접 이웃
+    stops.sort(key=lambda s: s.window[0])
+    return stops
+
+
+def run(label, n, times, days=20):
+    rows = []
+    for seed in range(days):
+        stops = make_day(seed, n, times)
+        distance = haversine_matrix([s.lat for s in stops], [s.lng for s in stops])
+
+        t0 = time.perf_counter()
+        baseline = greedy_order(distance, 0)
+        greedy_ms = (time.perf_counter() - t0) * 1000
+
+        result = optimize_route(stops)
+        # 기준 경로 지각 (같은 시뮬레이션)
+        sched = _Schedule(distance / AVG_SPEED_KMH * 60.0, [s.window for s in stops], SERVICE_MINUTES)
+        _, greedy_late, _ = sched.simulate(baseline)
+        rows.append((path_length(distance, baseline), greedy_late, greedy_ms,
+                     result["distance_km"], result["late_min"], result["stats"]["elapsed_ms"]))
+
+    def avg(i):
+        return sum(r[i] for r in rows) / len(rows)
+
+    print(f"[{label}] days={len(rows)} stops={n}")
+    print(f"  greedy   : {avg(0):6.1f} km  late {avg(1):7.1f} min  {avg(2):5.2f} ms")
+    print(f"  optimized: {avg(3):6.1f} km  late {avg(4):7.1f} min  {avg(5):5.2f} ms (max {max(r[5] for r in rows)} ms)")
+    assert max(r[5] for r in rows) < 200
+
+
+def run_day(n=50, managers=5, days=10):
+    """하루 전체 배차: 담당자 출발지 있음, 일부 고정 배정"""
+    timings, late, spread, km = [], [], [], []
+    for seed in range(days):
+        rnd = random.Random(seed)
+        stops = make_day(seed, n, TIMES)
+        crew = [RouteManager(f"담당{i + 1}", 37.45 + rnd.uniform(0, 0.25), 126.85 + rnd.uniform(0, 0.35)) for i in range(managers)]
+        pinned = {i: rnd.randrange(managers) for i in rnd.sample(range(n), n // 10)}
+        plan = plan_day(stops, crew, pinned=pinned)
+        assigned = sorted(node for r in plan["routes"] for node in r["order"])
+        assert assigned == list(range(n)), "모든 방문지가 정확히 한 번 배정되어야 함"
+        for node, k in pinned.items():
+            assert node in plan["routes"][k]["order"]
+        counts = [len(r["order"]) for r in plan["routes"]]
+        timings.append(plan["stats"]["elapsed_ms"])
+        late.append(sum(r["late_min"] for r in plan["routes"]))
+        km.append(sum(r["distance_km"] for r in plan["routes"]))
+        spread.append(max(counts) - min(counts))
+    print(f"[하루 배차] days={days} stops={n} managers={managers}")
+    print(f"  {sum(km) / days:6.1f} km  late {sum(late) / days:6.1f} min  방문 수 편차 {sum(spread) / days:.1f}  "
+          f"{sum(timings) / days:6.1f} ms (max {max(timings)} ms)")
+    assert max(timings) < 1000
+
+
+def main():
+    run("시간대 없음", 30, OPEN_DAY)
+    run("담당자 1명 하루", 10, TIMES)
+    run("시간대 혼합", 30, TIMES)
+    run_day()
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import os
+import sys
+import tempfile
+
+# 스크립트 위치와 무관하게 프로젝트 루트 import 보장
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import geocode_cache as geocode_cache_module  # noqa: E402
+from foms_address_learning import FOMSAddressLearningSystem  # noqa: E402
+from geocode_cache import GeocodeCache, geocode_key  # noqa: E402
+
+
+def _check_learning_across_processes(tmp_dir):
+    """같은 학습 파일을 쓰는 두 인스턴스(= 두 워커 프로세스)가 서로의 교정을 보고, 추가가 유실되지 않음"""
+    path = os.path.join(tmp_dir, "learning.json")
+    a = FOMSAddressLearningSystem(learning_file=path)
+    b = FOMSAddressLearningSystem(learning_file=path)
+    assert b.suggest_correction("서울 강남구 역삼동 1") is None
+
+    a.add_correction("서울 강남구 역삼동 1", "서울특별시 강남구 역삼동 1", 37.5, 127.03)
+    found = b.suggest_correction("서울 강남구 역삼동 1")
+    assert found and found["source"] == "exact_match" and found["latitude"] == 37.5, found
+
+    # b는 a의 추가를 다시 읽은 뒤 자기 교정을 덧붙임 (a의 교정을 덮어쓰지 않음)
+    b.add_correction("부산 해운대구 우동 2", "부산광역시 해운대구 우동 2", 35.16, 129.16)
+    assert a.suggest_correction("부산 해운대구 우동 2")["longitude"] == 129.16
+    fresh = FOMSAddressLearningSystem(learning_file=path)
+    originals = sorted(c["original"] for c in fresh.learning_data["corrections"])
+    assert originals == ["부산 해운대구 우동 2", "서울 강남구 역삼동 1"], originals
+    assert not [f for f in os.listdir(tmp_dir) if f.endswith(".tmp")]  # 임시 파일은 교체 후 남지 않음
+
+
+def _check_geocode_memory_cache():
+    """geocode_cache 테이블(step 26) 없이 프로세스 내 LRU만으로 동작"""
+    geocode_cache_module.engine_step_ready = lambda bind, step: False
+    assert geocode_key("서울 강남구  역삼동 1") == geocode_key("서울특별시 강남구 역삼동 1!")
+
+    cache = GeocodeCache(memory_size=2)
+    cache.put("서울 강남구 역삼동 1", 37.5, 127.03, strategy="original", confidence=1.0)
+    hit = cache.get("서울특별시 강남구 역삼동 1")
+    assert hit and hit.found and (hit.lat, hit.lng) == (37.5, 127.03)
+
+    cache.put_negative("없는 주소 999")
+    miss = cache.get("없는 주소 999")
+    assert miss and not miss.found and not miss.expired
+
+    # DB가 없으면 MEMORY_TTL이 지나도 메모리 항목을 계속 사용
+    key = geocode_key("서울 강남구 역삼동 1")
+    entry, _loaded_at = cache._memory[key]
+    cache._memory[key] = (entry, -geocode_cache_module.MEMORY_TTL_SECONDS * 2)
+    assert cache.get("서울 강남구 역삼동 1") is entry
+
+    # LRU: 가장 오래 안 쓴 항목부터 제거
+    cache.put("부산 해운대구 우동 2", 35.16, 129.16, strategy="original", confidence=1.0)
+    assert cache.get("없는 주소 999") is None
+    assert cache.get("서울 강남구 역삼동 1") is not None
+
+    stats = cache.stats()
+    assert stats["memory_entries"] == 2 and stats["db_enabled"] is False
+    assert (stats["hits"], stats["negative_hits"], stats["misses"]) == (3, 1, 1), stats
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        _check_learning_across_processes(tmp_dir)
+    _check_geocode_memory_cache()
+    print("OK: address corrections shared across workers, geocode memory cache")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import os
+import sys
+from types import SimpleNamespace
+
+# 스크립트 위치와 무관하게 프로젝트 루트 import 보장
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import build_steps  # noqa: E402
+from build_steps import NOT_READY_RECHECK_SECONDS, engine_step_ready, step_ready  # noqa: E402
+
+
+class FakeDb:
+    """system_build_steps 조회만 흉내 (status=None이면 행 없음, error면 조회 실패)"""
+
+    def __init__(self, status=None, error=False):
+        self.status = status
+        self.error = error
+        self.queries = 0
+        self.rollbacks = 0
+
+    def execute(self, _sql, params):
+        self.queries += 1
+        if self.error:
+            raise RuntimeError("relation does not exist")
+        row = SimpleNamespace(status=self.status) if self.status else None
+        return SimpleNamespace(fetchone=lambda: row)
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+class FakeEngine:
+    def __init__(self, db):
+        self.db = db
+        self.connects = 0
+
+    def connect(self):
+        self.connects += 1
+        engine = self
+
+        class _Conn:
+            def __enter__(self):
+                return engine.db
+
+            def __exit__(self, *exc):
+                return False
+
+        return _Conn()
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _reset():
+    build_steps._completed.clear()
+    build_steps._checked_at.clear()
+
+
+def main():
+    clock = Clock()
+    build_steps.time.monotonic = clock
+
+    # 미완료: 재확인 간격 안에서는 조회하지 않음
+    _reset()
+    db = FakeDb(status="RUNNING")
+    assert step_ready(db, 23) is False and db.queries == 1
+    clock.now += NOT_READY_RECHECK_SECONDS - 1
+    assert step_ready(db, 23) is False and db.queries == 1
+
+    # 간격이 지나면 다시 조회 → 완료되면 이후 조회 없이 True
+    db.status = "COMPLETED"
+    clock.now += 2
+    assert step_ready(db, 23) is True and db.queries == 2
+    clock.now += 1
+    assert step_ready(db, 23) is True and db.queries == 2
+
+    # 행 없음/조회 실패도 미완료로 캐시 (실패 시 rollback)
+    _reset()
+    db = FakeDb(error=True)
+    assert step_ready(db, 22) is False and db.rollbacks == 1
+    assert step_ready(db, 22) is False and db.queries == 1
+    db.error = False
+    clock.now += NOT_READY_RECHECK_SECONDS
+    assert step_ready(db, 22) is False and db.queries == 2   # 행 없음
+    db.status = "COMPLETED"
+    clock.now += NOT_READY_RECHECK_SECONDS
+    assert step_ready(db, 22) is True
+
+    # step별로 독립
+    assert step_ready(FakeDb(status="FAILED"), 16) is False
+    assert step_ready(FakeDb(status="COMPLETED"), 22) is True
+
+    # engine 버전: 재확인 차례일 때만 커넥션을 연다
+    _reset()
+    engine = FakeEngine(FakeDb(status="RUNNING"))
+    assert engine_step_ready(engine, 26) is False and engine.connects == 1
+    assert engine_step_ready(engine, 26) is False and engine.connects == 1
+    engine.db.status = "COMPLETED"
+    clock.now += NOT_READY_RECHECK_SECONDS
+    assert engine_step_ready(engine, 26) is True and engine.connects == 2
+    assert engine_step_ready(engine, 26) is True and engine.connects == 2
+    assert step_ready(FakeDb(status="RUNNING"), 26) is True   # 완료 캐시는 공유
+
+    print("OK: build step readiness re-check interval")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import os
+import sys
+
+# 스크립트 위치와 무관하게 프로젝트 루트 import 보장
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from app import app
+from db import engine, get_db
+from sqlalchemy import text
+
+from build_steps import step_ready
+from calendar_feed import calendar_feed, feed_watermark
+from models import GEO_OK, GEO_RUNNING
+from order_geocoding import GeocodeWorkerPool
+
+
+def _feed_row(conn, order_id):
+    return conn.execute(
+        text("SELECT feed_version, feed_xid, lat, lng, geo_status, geo_updated_at FROM orders WHERE id = :id"),
+        {"id": order_id},
+    ).fetchone()
+
+
+def main():
+    with app.app_context():
+        db = get_db()
+        if not step_ready(db, 30):
+            raise RuntimeError("step 30(ERP_DASH_STEP_30_FEED_TRIGGER_COLUMNS)이 COMPLETED가 아닙니다.")
+        order_id = db.execute(text("SELECT id FROM orders WHERE status != 'DELETED' ORDER BY id DESC LIMIT 1")).scalar()
+        if order_id is None:
+            raise RuntimeError("주문이 1건 이상 필요합니다.")
+        cursor, _head = feed_watermark(db)
+        db.commit()
+
+    with engine.connect() as conn:
+        before = _feed_row(conn, order_id)
+
+    try:
+        # 1) 지오코딩 워커 선점 + 저장: 캘린더 컬럼이 그대로면 피드가 움직이지 않아야 함
+        with engine.begin() as conn:
+            conn.execute(
+                text("UPDATE orders SET geo_status = :running, geo_updated_at = NOW() WHERE id = :id"),
+                {"id": order_id, "running": GEO_RUNNING},
+            )
+        GeocodeWorkerPool()._store(order_id, 37.5665, 126.9780, GEO_OK)
+
+        with engine.connect() as conn:
+            after = _feed_row(conn, order_id)
+        assert after.geo_status == GEO_OK, after
+        assert (after.feed_version, after.feed_xid) == (before.feed_version, before.feed_xid), (before, after)
+
+        with app.app_context():
+            db = get_db()
+            delta = calendar_feed.delta(db, cursor)
+            ids = {e["id"] for e in delta["events"]} | set(delta["removed"])
+            assert order_id not in ids, f"지오코딩 저장이 피드 델타에 포함됨: {order_id}"
+            db.commit()
+
+        # 2) 캘린더 컬럼(notes)이 바뀌면 피드가 움직여야 함 (같은 트랜잭션에서 원래 값으로 복원)
+        with engine.begin() as conn:
+            notes = conn.execute(text("SELECT notes FROM orders WHERE id = :id"), {"id": order_id}).scalar()
+            conn.execute(text("UPDATE orders SET notes = :n WHERE id = :id"), {"id": order_id, "n": (notes or "") + "#"})
+            conn.execute(text("UPDATE orders SET notes = :n WHERE id = :id"), {"id": order_id, "n": notes})
+        with engine.connect() as conn:
+            touched = _feed_row(conn, order_id)
+        assert touched.feed_version != before.feed_version, (before, touched)
+    finally:
+        with engine.begin() as conn:
+            conn.execute(
+                text("UPDATE orders SET lat = :lat, lng = :lng, geo_status = :status, geo_updated_at = :at WHERE id = :id"),
+                {"id": order_id, "lat": before.lat, "lng": before.lng, "status": before.geo_status, "at": before.geo_updated_at},
+            )
+
+    print(f"OK: geocode store kept feed_version={before.feed_version} for order {order_id}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import os
+import sys
+import datetime
+
+# 스크립트 위치와 무관하게 프로젝트 루트 import 보장
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from app import app
+from db import engine, get_db
+from sqlalchemy import text
+
+from build_steps import step_ready
+from calendar_feed import _month_key, _order_entry, calendar_feed
+from models import Order
+
+BULK_ROWS = 60   # 이전 FEED_OVERLAP(50)보다 많은 행을 한 트랜잭션에서 변경
+
+
+_TOUCH_MARK = "#feed-touch#"
+
+
+def _touch(conn, ids):
+    # 트리거는 캘린더 컬럼 값이 바뀔 때만 발생(step 30) → 같은 트랜잭션에서 notes를 바꿨다가 되돌림
+    conn.execute(text(
+        "UPDATE orders SET notes = CASE WHEN notes IS NULL THEN :mark ELSE notes || '#' END WHERE id = ANY(:ids)"
+    ), {"ids": list(ids), "mark": _TOUCH_MARK})
+    conn.execute(text(
+        "UPDATE orders SET notes = CASE WHEN notes = :mark THEN NULL ELSE left(notes, -1) END WHERE id = ANY(:ids)"
+    ), {"ids": list(ids), "mark": _TOUCH_MARK})
+
+
+def main():
+    with app.app_context():
+        db = get_db()
+        if not step_ready(db, 29):
+            raise RuntimeError("step 29(ERP_DASH_STEP_29_FEED_WATERMARK)가 COMPLETED가 아닙니다.")
+        orders = db.query(Order).filter(Order.status != 'DELETED').order_by(Order.id.desc()).limit(BULK_ROWS * 2).all()
+        if len(orders) < BULK_ROWS * 2:
+            raise RuntimeError(f"주문이 {BULK_ROWS * 2}건 이상 필요합니다.")
+        slow_ids = [o.id for o in orders[:BULK_ROWS]]
+        fast_ids = [o.id for o in orders[BULK_ROWS:]]
+        # 지연 트랜잭션 주문 중 캘린더 이벤트가 있는 주문의 월
+        month = next((_month_key(day) for day, _e in map(_order_entry, orders[:BULK_ROWS]) if day), None)
+        _events, _etag, cursor0 = calendar_feed.events(db, datetime.date.today(), datetime.date.today())
+        db.commit()
+
+    # 1) 대량 변경 트랜잭션: 번호는 먼저 발급, 커밋은 나중에
+    slow = engine.connect()
+    slow_tx = slow.begin()
+    _touch(slow, slow_ids)
+
+    # 2) 다른 트랜잭션이 더 많은 번호를 받아 먼저 커밋 (시퀀스 head가 지연 트랜잭션 번호를 50개 넘게 지나감)
+    with engine.begin() as fast:
+        _touch(fast, fast_ids)
+
+    with app.app_context():
+        db = get_db()
+        mid = calendar_feed.delta(db, cursor0)
+        cursor1 = mid["cursor"]
+        # 지연 트랜잭션 커밋 전 상태로 월 버킷 캐시
+        old_bucket = None
+        if month:
+            first = datetime.date.fromisoformat(month + "-01")
+            calendar_feed._scanned_at = 0.0
+            calendar_feed.events(db, first, first)
+            old_bucket = calendar_feed._buckets.get(month)
+        db.commit()
+
+    # 3) 지연 트랜잭션 커밋
+    slow_tx.commit()
+    slow.close()
+
+    with app.app_context():
+        db = get_db()
+        # 커서1 이후 델타에 지연 트랜잭션의 60건이 모두 포함되어야 함
+        late = calendar_feed.delta(db, cursor1)
+        assert not late["reset"], late
+        seen = {e["id"] for e in late["events"]} | set(late["removed"])
+        missing = set(slow_ids) - seen
+        assert not missing, f"지연 커밋 주문 누락: {sorted(missing)[:10]}"
+
+        # 캐시된 월 버킷도 무효화되어 다시 만들어져야 함
+        if month:
+            first = datetime.date.fromisoformat(month + "-01")
+            calendar_feed._scanned_at = 0.0
+            calendar_feed.events(db, first, first)
+            assert old_bucket is not None and calendar_feed._buckets.get(month) is not old_bucket, "월 버킷이 갱신되지 않음"
+        db.commit()
+
+    print(f"OK: {BULK_ROWS} late-committed rows seen after cursor {cursor1}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import datetime
+import math
+import os
+import sys
+
+# 스크립트 위치와 무관하게 프로젝트 루트 import 보장
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import directions_cache as directions_cache_module  # noqa: E402
+from directions_cache import CachedLeg, DirectionsCache, directions_cache, leg_key, time_bucket  # noqa: E402
+from foms_address_converter import FOMSAddressConverter  # noqa: E402
+
+
+def _check_keys():
+    # 소수 4자리(약 10m) 반올림 + 3시간 단위 시간대
+    assert leg_key(37.123449, 127.00001, 35.1, 129.2) == ("37.1234,127.0000", "35.1000,129.2000", -1)
+    assert leg_key(37.12341, 127.0, 35.1, 129.2, 3) == leg_key(37.12344, 127.00004, 35.1, 129.2, 3)
+    assert leg_key(37.1, 127.0, 35.1, 129.2, 3) != leg_key(35.1, 129.2, 37.1, 127.0, 3)  # 방향 구분
+    assert time_bucket(None) == -1
+    assert [time_bucket(datetime.datetime(2026, 1, 1, h)) for h in (0, 2, 3, 8, 9, 23)] == [0, 0, 1, 2, 3, 7]
+
+
+def _check_lru_ttl():
+    cache = DirectionsCache(memory_size=2)
+    a, b, c = (leg_key(37.0, 127.0, 37.0 + i, 127.0, 2) for i in (0.1, 0.2, 0.3))
+
+    entry = cache.put(a, 12345, 1830, 2400)
+    assert (entry.distance_km, entry.duration_min, entry.toll) == (12.3, 30, 2400)
+    assert cache.get(a) == entry
+    assert cache.get(leg_key(37.0, 127.0, 37.1, 127.0, 3)) is None  # 다른 시간대
+
+    # LRU(용량 2): b 추가 후 a를 다시 읽었으므로 c 추가 시 가장 오래 안 쓴 b가 빠짐
+    cache.put(b, 1000, 60)
+    cache.get(a)
+    cache.put(c, 2000, 120)
+    assert set(cache.get_many([a, b, c])) == {a, c}
+
+    # TTL: 만료 항목은 돌려주지 않고 expired로 집계
+    now = datetime.datetime.now()
+    cache._remember(b, CachedLeg(distance_m=1, duration_s=60, toll=0,
+                                 fetched_at=now - datetime.timedelta(days=31), expires_at=now - datetime.timedelta(days=1)))
+    before = cache.stats()
+    assert cache.get(b) is None
+    after = cache.stats()
+    assert after["expired"] == before["expired"] + 1 and after["misses"] == before["misses"]
+    assert after["memory_entries"] == 2 and after["db_enabled"] is False
+
+    # 행렬: 캐시된 구간은 분, 없는 구간 NaN, 대각 0
+    cache = DirectionsCache()
+    points = [(37.0, 127.0), (37.1, 127.0), (37.2, 127.0)]
+    cache.put(leg_key(*points[0], *points[1], 2), 5000, 600)
+    cache.put(leg_key(*points[1], *points[2], 2), 5000, 900)
+    m = cache.cached_matrix(points, bucket=2)
+    assert m[0, 1] == 10.0 and m[1, 2] == 15.0 and m[0, 0] == m[1, 1] == m[2, 2] == 0.0
+    assert math.isnan(m[1, 0]) and math.isnan(m[0, 2])
+    assert math.isnan(cache.cached_matrix(points, bucket=3)[0, 1])
+
+
+def _check_route_legs():
+    # 캐시에 없는 구간만 (중복 제거 후) API 조회, 조회 결과는 캐시에 저장되어 다음 호출은 캐시 사용
+    calls = []
+
+    def calculate_route(start_lat, start_lng, end_lat, end_lng):
+        calls.append((start_lat, start_lng, end_lat, end_lng))
+        directions_cache.put(leg_key(start_lat, start_lng, end_lat, end_lng, time_bucket(datetime.datetime.now())), 8000, 720, 0)
+        return {"status": "success", "distance_km": 8.0, "duration_min": 12, "toll": 0, "route_coords": [[1, 2]]}
+
+    converter = object.__new__(FOMSAddressConverter)
+    converter.calculate_route = calculate_route
+    legs = [(36.5, 127.5, 36.6, 127.6), (36.6, 127.6, 36.7, 127.7), (36.5, 127.5, 36.6, 127.6)]
+
+    first = converter.route_legs(legs)
+    assert len(calls) == 2 and [r["cached"] for r in first] == [False, False, False]
+    assert all("route_coords" not in r for r in first)
+
+    second = converter.route_legs(legs)
+    assert len(calls) == 2 and [r["cached"] for r in second] == [True, True, True]
+    assert second[0]["summary"] == {"distance_text": "8.0km", "duration_text": "12분", "toll_text": "무료"}
+
+
+def main():
+    directions_cache_module.engine_step_ready = lambda bind, step: False  # directions_cache 테이블(step 28) 없이
+    _check_keys()
+    _check_lru_ttl()
+    _check_route_legs()
+    print("OK: directions cache keys, LRU/TTL and route_legs reuse")
+
+
+if __name__ == "__main__":
+    main()
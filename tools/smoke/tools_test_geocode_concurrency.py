@@ -0,0 +1,116 @@
+import os
+import sys
+import threading
+from types import SimpleNamespace
+
+# 스크립트 위치와 무관하게 프로젝트 루트 import 보장
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import foms_address_converter  # noqa: E402
+from foms_address_converter import FOMSAddressConverter, TokenBucket  # noqa: E402
+from models import GEO_OK, GEO_PENDING  # noqa: E402
+from order_geocoding import orders_coordinates  # noqa: E402
+
+
+class FakeTime:
+    """monotonic/sleep 대체 - sleep은 시계만 앞으로 돌림"""
+
+    def __init__(self):
+        self.now = 100.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(round(seconds, 6))
+        self.now += seconds
+
+
+def _check_token_bucket():
+    clock = FakeTime()
+    real_time = foms_address_converter.time
+    foms_address_converter.time = clock
+    try:
+        bucket = TokenBucket(rate=2, burst=3)
+        for _ in range(3):
+            bucket.acquire()  # burst만큼은 대기 없이
+        assert clock.slept == [] and clock.now == 100.0
+        bucket.acquire()
+        bucket.acquire()
+        assert clock.slept == [0.5, 0.5] and clock.now == 101.0
+
+        # 쉬는 동안 적립되지만 burst를 넘지 않음
+        clock.now += 10
+        for _ in range(3):
+            bucket.acquire()
+        assert clock.slept == [0.5, 0.5]
+        bucket.acquire()
+        assert clock.slept == [0.5, 0.5, 0.5]
+    finally:
+        foms_address_converter.time = real_time
+
+
+def _converter(convert_address):
+    # __init__(학습 데이터 로드/HTTP 세션) 없이 convert_many만 사용
+    converter = object.__new__(FOMSAddressConverter)
+    converter.convert_address = convert_address
+    return converter
+
+
+def _check_convert_many():
+    # 중복 주소(geocode_key 기준)는 한 번만, 서로 다른 주소는 동시에 변환 (Barrier: 모두 동시에 들어와야 통과)
+    addresses = ["서울 강남구 역삼동 1", "부산 해운대구 우동 2", "서울특별시 강남구 역삼동 1", "대구 중구 동인동 3", "", None]
+    barrier = threading.Barrier(3, timeout=5)
+    calls = []
+
+    def convert_address(address):
+        calls.append(address)
+        barrier.wait()
+        return (float(len(calls)), 127.0, f"변환:{address}")
+
+    results = _converter(convert_address).convert_many(addresses, max_workers=4)
+    assert sorted(calls) == sorted(["서울 강남구 역삼동 1", "부산 해운대구 우동 2", "대구 중구 동인동 3"]), calls
+    assert results[0] == results[2] and results[0][2] == "변환:서울 강남구 역삼동 1"
+    assert results[1][2] == "변환:부산 해운대구 우동 2" and results[3][2] == "변환:대구 중구 동인동 3"
+    assert results[4] == results[5] == (None, None, "빈 주소")
+
+    # 단일 주소/max_workers=1은 스레드 없이 순차 변환
+    seq = []
+    converter = _converter(lambda address: seq.append(threading.current_thread()) or (1.0, 2.0, "OK"))
+    assert converter.convert_many(["a 1", "b 2"], max_workers=1) == [(1.0, 2.0, "OK")] * 2
+    assert all(t is threading.current_thread() for t in seq)
+
+    # convert_addresses_batch는 같은 경로를 사용
+    batch = converter.convert_addresses_batch(["a 1"])
+    assert batch == [{"original_address": "a 1", "latitude": 1.0, "longitude": 2.0, "status": "OK"}]
+
+
+def _check_orders_coordinates():
+    # 워커가 저장한 좌표(geo_status=OK)는 그대로, 나머지만 convert_many 한 번으로 변환
+    stored = SimpleNamespace(geo_status=GEO_OK, lat=37.1, lng=127.1)
+    pending = SimpleNamespace(geo_status=GEO_PENDING, lat=None, lng=None)
+    batches = []
+
+    class Converter:
+        def convert_many(self, addresses):
+            batches.append(list(addresses))
+            return [(35.0, 129.0, "OK") for _ in addresses]
+
+    results = orders_coordinates([(stored, "주소1"), (pending, "주소2"), (pending, "주소3")], Converter())
+    assert batches == [["주소2", "주소3"]]
+    assert results == [(37.1, 127.1, "저장 좌표"), (35.0, 129.0, "OK"), (35.0, 129.0, "OK")]
+    assert orders_coordinates([(stored, "주소1")], Converter()) == [(37.1, 127.1, "저장 좌표")] and len(batches) == 1
+
+
+def main():
+    _check_token_bucket()
+    _check_convert_many()
+    _check_orders_coordinates()
+    print("OK: shared rate limiter and concurrent geocoding")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import os
+import sys
+from types import SimpleNamespace
+
+# 스크립트 위치와 무관하게 프로젝트 루트 import 보장
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from sqlalchemy.exc import OperationalError, ProgrammingError  # noqa: E402
+
+import order_geocoding  # noqa: E402
+from models import GEO_ERROR, GEO_NOT_FOUND, GEO_OK  # noqa: E402
+from order_geocoding import ERROR_BACKOFF_MAX_SECONDS, GeocodeWorkerPool  # noqa: E402
+
+
+class _Stop(BaseException):
+    """_run 무한 루프 종료용"""
+
+
+def _pg_error(cls, pgcode):
+    return cls("SELECT 1", {}, SimpleNamespace(pgcode=pgcode))
+
+
+def _run_delays(errors, poll_seconds=5.0):
+    """process_batch가 errors를 차례로 던질 때 _run이 기다리는 시간 목록"""
+    pool = GeocodeWorkerPool(workers=1, poll_seconds=poll_seconds)
+    queue = list(errors)
+    delays = []
+
+    def process_batch():
+        raise queue.pop(0)
+
+    def sleep(seconds):
+        delays.append(seconds)
+        if not queue:
+            raise _Stop()
+
+    pool.process_batch = process_batch
+    order_geocoding.time = SimpleNamespace(sleep=sleep)
+    try:
+        pool._run()
+    except _Stop:
+        pass
+    return delays
+
+
+def _check_backoff():
+    # 일시 오류: poll_seconds부터 2배씩, 상한 ERROR_BACKOFF_MAX_SECONDS
+    transient = [_pg_error(OperationalError, None) for _ in range(8)]
+    assert _run_delays(transient) == [10.0, 20.0, 40.0, 80.0, 160.0, 300.0, 300.0, 300.0]
+    assert ERROR_BACKOFF_MAX_SECONDS == 300.0
+
+    # 테이블/컬럼/함수 누락(step 27 미실행)은 첫 오류부터 최대 간격
+    for code in ("42P01", "42703", "42883"):
+        assert _run_delays([_pg_error(ProgrammingError, code)] * 2) == [ERROR_BACKOFF_MAX_SECONDS] * 2, code
+
+    # 누락 오류 뒤의 일시 오류는 연속 횟수 기준으로 계속 늘어남
+    mixed = [_pg_error(ProgrammingError, "42P01"), _pg_error(OperationalError, None), ValueError("x")]
+    assert _run_delays(mixed, poll_seconds=1.0) == [ERROR_BACKOFF_MAX_SECONDS, 4.0, 8.0]
+
+
+def _check_process_batch():
+    class Converter:
+        def lookup(self, address):
+            return {
+                "found": (37.5, 127.0, "OK", False),
+                "missing": (None, None, "NOT_FOUND", False),
+                "api-down": (None, None, "ERROR", True),
+            }[address]
+
+    stored = []
+    pool = GeocodeWorkerPool(workers=1, batch=3)
+    pool._converter = Converter()
+    pool._claim = lambda: [SimpleNamespace(id=1, address="found"), SimpleNamespace(id=2, address="missing"),
+                           SimpleNamespace(id=3, address="api-down")]
+    pool._store = lambda order_id, lat, lng, status: stored.append((order_id, lat, lng, status))
+    assert pool.process_batch() == 3
+    assert stored == [(1, 37.5, 127.0, GEO_OK), (2, None, None, GEO_NOT_FOUND), (3, None, None, GEO_ERROR)], stored
+
+
+def main():
+    _check_backoff()
+    _check_process_batch()
+    print("OK: geocode worker backoff and batch statuses")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import json
+import os
+import sys
+
+# 스크립트 위치와 무관하게 프로젝트 루트 import 보장
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from map_features import (  # noqa: E402
+    CLUSTER_MAX_ZOOM, build_features, feature_collection, parse_bbox, parse_zoom,
+)
+
+# 서울 시청 부근 3건(수십 m), 강남 1건, 부산 2건(수십 m)
+POINTS = [
+    (1, "RECEIVED", 37.56650, 126.97800),
+    (2, "MEASURED", 37.56660, 126.97810),
+    (3, "RECEIVED", 37.56640, 126.97790),
+    (4, "SCHEDULED", 37.49790, 127.02760),
+    (5, "COMPLETED", 35.17960, 129.07560),
+    (6, None, 35.17970, 129.07570),
+]
+
+
+def _split(features):
+    markers = {f["properties"]["id"]: f for f in features if "id" in f["properties"]}
+    clusters = [f for f in features if "c" in f["properties"]]
+    return markers, clusters
+
+
+def _check_params():
+    assert parse_bbox("126.8,37.4,127.2,37.7") == (126.8, 37.4, 127.2, 37.7)
+    for value in (None, "", "1,2,3", "a,b,c,d", "126,38,127,37", "200,37,201,38"):
+        assert parse_bbox(value) is None, value
+    assert parse_zoom("12") == 12 and parse_zoom("0") == 1 and parse_zoom("30") == 19
+    assert parse_zoom("x") == 11 and parse_zoom(None, default=7) == 7
+
+
+def _check_clusters():
+    # 낮은 줌: 같은 격자 칸은 클러스터 1개 (건수, 상태별 건수, 펼칠 줌, 중심 = 평균 좌표)
+    markers, clusters = _split(build_features(POINTS, zoom=10))
+    assert set(markers) == {4}, markers
+    assert sorted(c["properties"]["c"] for c in clusters) == [2, 3]
+    seoul = next(c for c in clusters if c["properties"]["c"] == 3)
+    assert seoul["properties"]["st"] == {"RECEIVED": 2, "MEASURED": 1}
+    assert seoul["properties"]["z"] == 12
+    assert seoul["geometry"]["coordinates"] == [126.978, 37.5665]
+    busan = next(c for c in clusters if c["properties"]["c"] == 2)
+    assert busan["properties"]["st"] == {"COMPLETED": 1, "": 1}
+
+    # 전국 줌: 서울 4건이 한 칸, 펼칠 줌은 CLUSTER_MAX_ZOOM을 넘지 않음
+    markers, clusters = _split(build_features(POINTS, zoom=5))
+    assert not markers and sorted(c["properties"]["c"] for c in clusters) == [2, 4]
+    assert all(c["properties"]["z"] == 7 for c in clusters)
+    _m, clusters = _split(build_features(POINTS, zoom=CLUSTER_MAX_ZOOM - 1))
+    assert all(c["properties"]["z"] == CLUSTER_MAX_ZOOM for c in clusters)
+
+    # 클러스터 건수 합 + 마커 수 = 전체
+    for zoom in range(1, CLUSTER_MAX_ZOOM):
+        markers, clusters = _split(build_features(POINTS, zoom=zoom))
+        assert len(markers) + sum(c["properties"]["c"] for c in clusters) == len(POINTS), zoom
+
+    # CLUSTER_MAX_ZOOM 이상: 모두 개별 마커 (속성은 id, s만)
+    features = build_features(POINTS, zoom=CLUSTER_MAX_ZOOM)
+    assert [f["properties"] for f in features] == [{"id": p[0], "s": p[1] or ""} for p in POINTS]
+    assert features[0]["geometry"] == {"type": "Point", "coordinates": [126.978, 37.5665]}
+
+    # bbox(+여유) 밖은 제외
+    markers, clusters = _split(build_features(POINTS, zoom=CLUSTER_MAX_ZOOM, bbox=(126.9, 37.5, 127.0, 37.6)))
+    assert set(markers) == {1, 2, 3} and not clusters
+    assert build_features(POINTS, zoom=10, bbox=(100.0, 10.0, 101.0, 11.0)) == []
+    assert build_features([], zoom=10) == []
+
+
+def _check_collection():
+    body, etag = feature_collection(POINTS, zoom=10, pending=7)
+    assert ", " not in body and ": " not in body  # 구분자 공백 없는 JSON
+    doc = json.loads(body)
+    assert doc["type"] == "FeatureCollection"
+    assert doc["meta"] == {"zoom": 10, "total": 6, "features": 3, "clustered": True, "pending": 7}
+    assert len(doc["features"]) == 3
+
+    # 같은 입력이면 같은 ETag, 하나라도 바뀌면 다른 ETag
+    assert feature_collection(POINTS, zoom=10, pending=7) == (body, etag)
+    assert feature_collection(POINTS, zoom=10, pending=8)[1] != etag
+    assert feature_collection(POINTS[:-1], zoom=10, pending=7)[1] != etag
+    assert json.loads(feature_collection(POINTS, zoom=16)[0])["meta"]["clustered"] is False
+
+
+def main():
+    _check_params()
+    _check_clusters()
+    _check_collection()
+    print("OK: map features grid clustering and GeoJSON output")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import datetime
+import os
+import sys
+from types import SimpleNamespace
+
+# 스크립트 위치와 무관하게 프로젝트 루트 import 보장
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from order_dates import order_date_value, parse_order_date  # noqa: E402
+
+
+def main():
+    d = datetime.date
+
+    # 허용 형식 (구분자/한글/뒤에 붙은 시간)
+    assert parse_order_date("2024-05-01") == d(2024, 5, 1)
+    assert parse_order_date("2024.5.1") == d(2024, 5, 1)
+    assert parse_order_date("2024/05/01") == d(2024, 5, 1)
+    assert parse_order_date("2024년 5월 1일") == d(2024, 5, 1)
+    assert parse_order_date("2024 - 05 - 01") == d(2024, 5, 1)
+    assert parse_order_date("  2024-05-01 14:00") == d(2024, 5, 1)
+    assert parse_order_date("20240501") == d(2024, 5, 1)
+    assert parse_order_date("24-05-01") == d(2024, 5, 1)
+    assert parse_order_date("24.5.1") == d(2024, 5, 1)
+
+    # date/datetime은 그대로 (datetime → date)
+    assert parse_order_date(d(2024, 5, 1)) == d(2024, 5, 1)
+    assert parse_order_date(datetime.datetime(2024, 5, 1, 9, 30)) == d(2024, 5, 1)
+
+    # 해석 불가 → None
+    for value in (None, "", "   ", "미정", "5월 1일", "2024-13-01", "2024-02-30", "2023-02-29",
+                  "1989-12-31", "2101-01-01", "24-05-01 14:00", "2024-05", "240501"):
+        assert parse_order_date(value) is None, value
+    assert parse_order_date("2024-02-29") == d(2024, 2, 29)  # 윤년
+    assert parse_order_date("1990-01-01") == d(1990, 1, 1)   # 연도 경계
+    assert parse_order_date("2100-12-31") == d(2100, 12, 31)
+
+    # DATE 컬럼 값 우선, 없으면 문자열 컬럼 파싱
+    order = SimpleNamespace(received_date="2024-05-01", received_on=None,
+                            measurement_date="미정", measurement_on=d(2024, 6, 2))
+    assert order_date_value(order, "received_date") == d(2024, 5, 1)
+    assert order_date_value(order, "measurement_date") == d(2024, 6, 2)
+    assert order_date_value(SimpleNamespace(), "scheduled_date") is None
+
+    print("OK: order date parsing")
+
+
+if __name__ == "__main__":
+    main()
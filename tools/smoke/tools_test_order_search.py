@@ -0,0 +1,32 @@
+import os
+import sys
+
+# 스크립트 위치와 무관하게 프로젝트 루트 import 보장
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from order_search import phone_digits, search_tokens, token_variants  # noqa: E402
+
+
+def main():
+    # 토큰은 소문자/공백 단위, 입력 형식 유지
+    assert search_tokens("  홍길동  ABC ") == ["홍길동", "abc"]
+
+    # 전화번호 형태: 입력 그대로 + 숫자만
+    assert token_variants("010-1234-5678") == ["010-1234-5678", "01012345678"]
+    assert token_variants("02.123.4567") == ["02.123.4567", "021234567"]
+    assert token_variants("01012345678") == ["01012345678"]
+    assert phone_digits("010-12") is None  # 숫자 7자리 미만
+
+    # 날짜/소수/짧은 숫자는 그대로 (search_document와 레거시 컬럼에 대시/소수점 포함 저장)
+    assert token_variants("2024-05-01") == ["2024-05-01"]
+    assert token_variants("12.5") == ["12.5"]
+    assert token_variants("1588-1234") == ["1588-1234"]
+    assert token_variants("101동") == ["101동"]
+
+    print("OK: order search tokens")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import os
+import sys
+
+# 스크립트 위치와 무관하게 프로젝트 루트 import 보장
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from erp_panels import order_construction_workers, order_spec_units, spec_w300_value  # noqa: E402
+
+
+def main():
+    # round(NUMERIC, 1)과 같은 반올림 (.x5는 올림 - float round(0.15, 1)은 0.1)
+    assert spec_w300_value("45") == 0.2
+    assert spec_w300_value("15") == 0.1
+    assert spec_w300_value("75") == 0.3
+    assert spec_w300_value("1,050") == 3.5
+    assert spec_w300_value(1050.0) == 3.5
+    assert spec_w300_value("W1200*H2400") == 4.0   # 복합규격은 첫 숫자
+    assert spec_w300_value("12.") == 0.0           # '12.'도 숫자 (SQL 정규식과 같음)
+    assert spec_w300_value(".6") == 0.0
+    assert spec_w300_value("150.") == 0.5
+
+    # SQL CASE에서 숫자가 아닌 값 → 0
+    for value in (None, "", ".", "1.2.3", "미정", "１２", True):
+        assert spec_w300_value(value) == 0.0, value
+
+    # spec_width 우선, 빈 문자열이면 spec (0은 값으로 취급)
+    sd = {"items": [
+        {"spec_width": "900", "spec": "3000"},
+        {"spec_width": "", "spec": "600"},
+        {"spec_width": 0, "spec": "600"},
+        {"spec": "45"},
+        "잘못된 항목",
+        {"name": "규격 없음"},
+    ]}
+    assert order_spec_units(sd) == 3.0 + 2.0 + 0.0 + 0.2
+    for sd in (None, [], {}, {"items": {}}, {"items": "x"}):
+        assert order_spec_units(sd) == 0.0, sd
+
+    # 시공자: 공백만 trim + 소문자, 빈 값/None 제외, 중복 제거, 정렬
+    sd = {"shipment": {"construction_workers": [" Kim ", "kim", "박시공", "", "  ", None, 12, "\tLee"]}}
+    assert order_construction_workers(sd) == ["\tlee", "12", "kim", "박시공"]
+    for sd in (None, {}, {"shipment": None}, {"shipment": ["kim"]}, {"shipment": {"construction_workers": "kim"}}):
+        assert order_construction_workers(sd) == [], sd
+
+    print("OK: panel metrics match foms_spec_units / foms_construction_workers rules")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Quest 동시 승인 스트레스 스모크 테스트
+
+- 최신 ERP Beta 주문을 생산(PRODUCTION) 단계로 두고, 필수 승인 팀 N개짜리 Quest를 만든 뒤
+  N개 프로세스가 동시에 각자 다른 팀으로 /quest/approve 호출
+- 기대: N개 승인 전부 기록 + Quest COMPLETED + STAGE_AUTO_TRANSITIONED 이벤트 정확히 1건
+
+실행: python tools/smoke/tools_test_quest_approve_concurrency.py [N]
+"""
+import os
+import sys
+import json
+import multiprocessing as mp
+
+# 스크립트 위치와 무관하게 프로젝트 루트 import 보장
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+STAGE = "PRODUCTION"
+STAGE_NAME = "생산"
+NEXT_STAGE = "CONSTRUCTION"
+
+
+def _approve_worker(args):
+    order_id, team, barrier = args
+    from app import app  # 프로세스별 독립 DB 커넥션
+
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess["user_id"] = 1
+        sess["username"] = f"smoke-{team}"
+        sess["role"] = "ADMIN"
+
+    barrier.wait()
+    r = client.post(
+        f"/api/orders/{order_id}/quest/approve",
+        data=json.dumps({"team": team}),
+        content_type="application/json",
+    )
+    return team, r.status_code, r.get_json()
+
+
+def _prepare(n):
+    from app import app
+    from db import get_db
+    from sqlalchemy import text
+
+    teams = [f"SMOKE_TEAM_{i}" for i in range(n)]
+    with app.app_context():
+        db = get_db()
+        row = db.execute(text("SELECT id FROM orders WHERE is_erp_beta = TRUE ORDER BY id DESC LIMIT 1")).fetchone()
+        if not row:
+            raise RuntimeError("ERP Beta 주문 데이터가 없습니다.")
+        order_id = int(row.id)
+
+        # structured_data.quests 미이관 주문이면 제거(테이블이 원천)
+        db.execute(text("""
+            UPDATE orders
+            SET structured_data = jsonb_set(
+                COALESCE(structured_data, '{}'::jsonb) - 'quests',
+                '{workflow}',
+                COALESCE(structured_data->'workflow', '{}'::jsonb) || jsonb_build_object('stage', CAST(:stage AS TEXT)),
+                true
+            )
+            WHERE id = :oid
+        """), {"oid": order_id, "stage": STAGE})
+        db.execute(text("DELETE FROM order_quests WHERE order_id = :oid AND stage IN (:s1, :s2, :s3, :s4)"),
+                   {"oid": order_id, "s1": STAGE, "s2": STAGE_NAME, "s3": NEXT_STAGE, "s4": "시공"})
+        db.execute(text("""
+            INSERT INTO order_quests (order_id, stage, title, status, required_approvals, team_approvals, created_at, updated_at, version)
+            VALUES (:oid, :stage, 'smoke concurrency', 'OPEN', CAST(:req AS JSONB), '{}'::jsonb, NOW(), NOW(), 1)
+        """), {"oid": order_id, "stage": STAGE_NAME, "req": json.dumps(teams)})
+        max_ev = db.execute(text("SELECT COALESCE(MAX(id), 0) AS m FROM order_events")).fetchone()
+        db.commit()
+        return order_id, teams, int(max_ev.m)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    order_id, teams, max_event_id = _prepare(n)
+    print(f"order_id={order_id} parallel approvals={n}")
+
+    ctx = mp.get_context("spawn")
+    with ctx.Manager() as manager:
+        barrier = manager.Barrier(n)
+        with ctx.Pool(processes=n) as pool:
+            results = pool.map(_approve_worker, [(order_id, t, barrier) for t in teams])
+
+    for team, status, body in results:
+        print(team, status, (body or {}).get("success"), (body or {}).get("message"))
+        assert status == 200, f"{team} 승인 실패: {status} {body}"
+
+    from app import app
+    from db import get_db
+    from sqlalchemy import text
+
+    with app.app_context():
+        db = get_db()
+        quest = db.execute(text("""
+            SELECT status, team_approvals, version FROM order_quests
+            WHERE order_id = :oid AND stage = :stage ORDER BY id DESC LIMIT 1
+        """), {"oid": order_id, "stage": STAGE_NAME}).fetchone()
+        approvals = quest.team_approvals or {}
+        missing = [t for t in teams if not (approvals.get(t) or {}).get("approved")]
+        print("quest:", quest.status, "version:", quest.version, "missing:", missing)
+        assert not missing, f"승인 누락: {missing}"
+        assert quest.status == "COMPLETED"
+
+        transitions = db.execute(text("""
+            SELECT COUNT(*) AS c FROM order_events
+            WHERE order_id = :oid AND event_type = 'STAGE_AUTO_TRANSITIONED' AND id > :max_id
+        """), {"oid": order_id, "max_id": max_event_id}).fetchone()
+        print("STAGE_AUTO_TRANSITIONED:", transitions.c)
+        assert int(transitions.c) == 1
+
+        stage = db.execute(text("SELECT structured_data->'workflow'->>'stage' AS s FROM orders WHERE id = :oid"),
+                           {"oid": order_id}).fetchone()
+        assert stage.s == NEXT_STAGE, stage.s
+
+    print("[OK] concurrent quest approval smoke test passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import copy
+import json
+import os
+import sys
+
+# 스크립트 위치와 무관하게 프로젝트 루트 import 보장
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from erp_structured_patch import (  # noqa: E402
+    JsonPatchError, apply_patch, build_jsonb_update, format_pointer, is_touched, parse_pointer,
+)
+
+OLD = {
+    "parties": {"customer": {"name": "홍길동", "phone": "010-1111-2222"}},
+    "site": {"address_full": "서울 강남구 역삼동 1"},
+    "items": [{"product_name": "A"}, {"product_name": "B"}],
+    "schedule": {"measurement": {"date": "2026-10-20"}},
+    "a/b": {"~k": 1},
+}
+
+
+def _jsonb_set(doc, path, value):
+    """PostgreSQL jsonb_set(doc, path, value, true): 중간 경로가 없으면 그대로"""
+    doc = copy.deepcopy(doc)
+    cur = doc
+    for token in path[:-1]:
+        if isinstance(cur, dict) and token in cur:
+            cur = cur[token]
+        elif isinstance(cur, list) and token.isdigit() and int(token) < len(cur):
+            cur = cur[int(token)]
+        else:
+            return doc
+    if isinstance(cur, dict):
+        cur[path[-1]] = value
+    elif isinstance(cur, list) and int(path[-1]) < len(cur):
+        cur[int(path[-1])] = value
+    return doc
+
+
+def _jsonb_delete_path(doc, path):
+    """PostgreSQL doc #- path"""
+    doc = copy.deepcopy(doc)
+    cur = doc
+    for token in path[:-1]:
+        if isinstance(cur, dict) and token in cur:
+            cur = cur[token]
+        else:
+            return doc
+    if isinstance(cur, dict):
+        cur.pop(path[-1], None)
+    return doc
+
+
+def _run_sql(old, expr, params):
+    """build_jsonb_update 결과 식을 jsonb 연산 순서대로 흉내 (jp_p{i}/jp_v{i} 순서 = 중첩 순서)"""
+    doc = copy.deepcopy(old)
+    i = 0
+    while f"jp_p{i}" in params or f"jp_v{i}" in params:
+        path, value = params.get(f"jp_p{i}"), params.get(f"jp_v{i}")
+        if path is None:
+            doc = json.loads(value)
+        elif value is not None:
+            doc = _jsonb_set(doc, path, json.loads(value))
+        else:
+            doc = _jsonb_delete_path(doc, path)
+        i += 1
+    return doc
+
+
+def _check_round_trip(operations, create_parents=False):
+    new, touched = apply_patch(OLD, operations, create_parents=create_parents)
+    expr, params = build_jsonb_update(OLD, new, touched)
+    assert _run_sql(OLD, expr, params) == new, (operations, expr, params)
+    return new, touched, expr, params
+
+
+def main():
+    # JSON Pointer 이스케이프 (~0 = ~, ~1 = /)
+    assert parse_pointer("/a~1b/~0k") == ("a/b", "~k")
+    assert format_pointer(("a/b", "~k")) == "/a~1b/~0k"
+    assert parse_pointer("") == ()
+
+    # 단일 경로 replace → jsonb_set 1회, 원본 문서는 그대로
+    new, touched, expr, params = _check_round_trip([{"op": "replace", "path": "/parties/customer/phone", "value": "010-9999-0000"}])
+    assert touched == [("parties", "customer", "phone")]
+    assert expr == "jsonb_set(COALESCE(structured_data, '{}'::jsonb), CAST(:jp_p0 AS TEXT[]), CAST(:jp_v0 AS JSONB), true)"
+    assert params == {"jp_p0": ["parties", "customer", "phone"], "jp_v0": '"010-9999-0000"'}
+    assert OLD["parties"]["customer"]["phone"] == "010-1111-2222"
+
+    # 중간 객체가 없으면 없는 첫 키 단위로 기록 (jsonb_set은 마지막 키만 생성)
+    new, _t, _e, params = _check_round_trip([{"op": "add", "path": "/parties/manager/name", "value": "김담당"}], create_parents=True)
+    assert new["parties"]["manager"] == {"name": "김담당"} and params["jp_p0"] == ["parties", "manager"]
+
+    # 배열 삽입/삭제는 배열 전체를 기록 (인덱스 이동), 상위 경로가 있으면 하위 경로는 합침
+    _check_round_trip([{"op": "add", "path": "/items/1", "value": {"product_name": "C"}}, {"op": "remove", "path": "/items/0"}])
+    _n, _t, _e, params = _check_round_trip([
+        {"op": "add", "path": "/schedule/construction", "value": {"date": "2026-11-01"}},
+        {"op": "replace", "path": "/schedule/construction/date", "value": "2026-11-02"},
+    ])
+    assert [params[k] for k in sorted(params) if k.startswith("jp_p")] == [["schedule", "construction"]]
+
+    # remove → #-, move는 원래 경로 삭제 + 새 경로 기록, 이스케이프 키도 그대로
+    new, _t, expr, _p = _check_round_trip([{"op": "remove", "path": "/site/address_full"}])
+    assert new["site"] == {} and "#-" in expr
+    new, touched, _e, _p = _check_round_trip([{"op": "move", "from": "/site/address_full", "path": "/site/address_main"}])
+    assert new["site"] == {"address_main": "서울 강남구 역삼동 1"} and touched == [("site", "address_full"), ("site", "address_main")]
+    _check_round_trip([{"op": "copy", "from": "/a~1b/~0k", "path": "/a~1b/k2"}])
+
+    # 루트 교체는 문서 전체
+    _n, _t, expr, _p = _check_round_trip([{"op": "replace", "path": "", "value": {"items": []}}])
+    assert expr == "CAST(:jp_v0 AS JSONB)"
+
+    # test 실패는 409, 잘못된 연산/경로는 400 (원본은 변경 없음)
+    new, touched = apply_patch(OLD, [{"op": "test", "path": "/items/0/product_name", "value": "A"}])
+    assert new == OLD and touched == []
+    errors = [
+        ([{"op": "test", "path": "/items/0/product_name", "value": "Z"}], 409),
+        ([{"op": "replace", "path": "/parties/manager/name", "value": "x"}], 400),
+        ([{"op": "add", "path": "/items/5", "value": 1}], 400),
+        ([{"op": "add", "path": "/items/01", "value": 1}], 400),
+        ([{"op": "move", "from": "/site", "path": "/site/inner"}], 400),
+        ([{"op": "replace", "path": "", "value": []}], 400),
+        ([{"op": "add", "path": "/x"}], 400),
+        ([{"op": "bogus", "path": "/x"}], 400),
+        ({"op": "add"}, 400),
+    ]
+    for operations, status in errors:
+        try:
+            apply_patch(OLD, operations)
+        except JsonPatchError as e:
+            assert e.status_code == status, (operations, e.status_code)
+        else:
+            raise AssertionError(f"JsonPatchError 없음: {operations}")
+
+    # touched 경로와 상위/하위로 겹치는지
+    assert is_touched([("schedule", "measurement", "date")], "schedule")
+    assert is_touched([("schedule",)], "schedule", "measurement")
+    assert not is_touched([("site", "address_full")], "schedule")
+    assert is_touched([()], "quests")
+
+    print("OK: structured_data JSON Patch apply + jsonb update")
+
+
+if __name__ == "__main__":
+    main()